@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+# Importación de las respuestas del formulario de bienestar exportadas a Excel.
+import datetime
+
+import dateutil.parser
+from django.utils import timezone
+
+from apps.Bienestar.models import Colaborador
+from apps.main.importar import FilaInvalida, Importador
+
+PREGUNTAS = 17
+
+
+def texto(valor):
+    if valor is None or valor == '':
+        return None
+    return str(valor).strip()
+
+
+class ImportadorBienestar(Importador):
+    """Crea un :class:`Colaborador` por cada respuesta. Las columnas son la marca temporal, el correo,
+    el nombre, la edad, el DPI y las respuestas de las preguntas en orden.
+    Se omiten las respuestas cuya marca temporal ya está registrada.
+    """
+    tipo = 'bienestar'
+    modelo = Colaborador
+
+    def claves_existentes(self):
+        return set(Colaborador.objects.values_list('fecha', flat=True))
+
+    def clave(self, colaborador):
+        return colaborador.fecha
+
+    def fecha(self, valor):
+        if isinstance(valor, str) and valor.strip():
+            valor = dateutil.parser.parse(valor)
+        if not isinstance(valor, datetime.datetime):
+            raise FilaInvalida('La marca temporal no es una fecha')
+        if timezone.is_naive(valor):
+            valor = timezone.make_aware(valor)
+        return valor
+
+    def crear(self, fila):
+        fila = tuple(fila) + (None,) * (5 + PREGUNTAS - len(fila))
+        marca_temporal, correo, nombre, edad, dpi = fila[:5]
+        if not correo:
+            raise FilaInvalida('No tiene correo electrónico')
+        colaborador = Colaborador(
+            fecha=self.fecha(marca_temporal),
+            email=texto(correo),
+            usuario=texto(nombre),
+            edad=int(edad) if edad not in (None, '') else None,
+            dpi=texto(dpi))
+        for numero, respuesta in enumerate(fila[5:5 + PREGUNTAS], 1):
+            setattr(colaborador, 'pregunta{}'.format(numero), texto(respuesta))
+        return colaborador
@@ -1,3 +1,94 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
+from datetime import datetime, timedelta
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from openpyxl import Workbook
+
+from apps.Bienestar.importar import ImportadorBienestar
+from apps.Bienestar.models import Colaborador
+from apps.main import importar
+from apps.main.models import Importacion
+
+
+def crear_libro(filas):
+    libro = Workbook(write_only=True)
+    hoja = libro.create_sheet()
+    hoja.append(['Marca temporal', 'Correo', 'Nombre', 'Edad', 'DPI'] + ['Pregunta'] * 17)
+    for fila in filas:
+        hoja.append(fila)
+    archivo = io.BytesIO()
+    libro.save(archivo)
+    return SimpleUploadedFile('bienestar.xlsx', archivo.getvalue())
+
+
+class ImportadorBienestarTestCase(TestCase):
+    """Pruebas para la importación de :class:`Colaborador`es con :class:`ImportadorBienestar`"""
+
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        ajustes = override_settings(MEDIA_ROOT=self.media)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        self.addCleanup(shutil.rmtree, self.media)
+        self.usuario = User.objects.create(username='bienestar')
+
+    def test_importar(self):
+        inicio = datetime(2020, 8, 1, 8, 0)
+        filas = [
+            [inicio + timedelta(minutes=i), 'colaborador{}@funsepa.org'.format(i % 100), 'Colaborador', 30, 1234,
+             'No', None, 'Sí', 'No', 'No', None, 'Bueno']
+            for i in range(50000)]
+        # Una fila repetida dentro del archivo y una con la marca temporal inválida
+        filas.append(filas[-1])
+        filas.append(['ayer', 'otro@funsepa.org'])
+        for fila in filas[:10]:
+            Colaborador.objects.create(fecha=timezone.make_aware(fila[0]), email=fila[1])
+
+        importacion = importar.registrar(ImportadorBienestar.tipo, crear_libro(filas), self.usuario)
+        self.assertEqual(importar.pendiente(ImportadorBienestar.tipo, self.usuario), importacion)
+        with CaptureQueriesContext(connection) as consultas:
+            importacion = ImportadorBienestar().importar(importacion)
+        # Las respuestas existentes se consultan una sola vez en lugar de una consulta por fila
+        self.assertEqual(
+            len([consulta for consulta in consultas if consulta['sql'].startswith('SELECT')]), 1)
+
+        importacion = Importacion.objects.get(id=importacion.id)
+        self.assertEqual(importacion.estado, Importacion.TERMINADA)
+        self.assertEqual(
+            (importacion.filas, importacion.creados, importacion.duplicados, importacion.rechazados),
+            (50002, 49990, 11, 1))
+        self.assertIn('Fila 50003', importacion.errores)
+        self.assertIsNotNone(importacion.duracion)
+        self.assertIsNone(importar.pendiente(ImportadorBienestar.tipo, self.usuario))
+
+        self.assertEqual(Colaborador.objects.count(), 50000)
+        colaborador = Colaborador.objects.get(fecha=timezone.make_aware(inicio + timedelta(minutes=10)))
+        self.assertEqual((colaborador.dpi, colaborador.edad), ('1234', 30))
+        self.assertEqual((colaborador.pregunta1, colaborador.pregunta7), ('No', 'Bueno'))
+
+    def test_archivo_invalido(self):
+        archivo = SimpleUploadedFile('bienestar.xlsx', b'no es un libro de excel')
+        importacion = ImportadorBienestar().importar(
+            importar.registrar(ImportadorBienestar.tipo, archivo, self.usuario))
+        self.assertEqual(importacion.estado, Importacion.FALLIDA)
+        self.assertEqual(importacion.creados, 0)
+        self.assertTrue(importacion.errores)
+
+    def test_error_del_importador(self):
+        # Los errores que no son del archivo ni de la base de datos no se ocultan como importación fallida
+        class Importador(ImportadorBienestar):
+            def crear(self, fila):
+                raise RuntimeError('Error del importador')
+
+        importacion = importar.registrar(
+            ImportadorBienestar.tipo, crear_libro([[datetime(2020, 8, 1), 'colaborador@funsepa.org']]), self.usuario)
+        with self.assertRaises(RuntimeError):
+            Importador().importar(importacion)
+        self.assertEqual(importar.pendiente(ImportadorBienestar.tipo, self.usuario), importacion)
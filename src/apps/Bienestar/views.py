@@ -3,8 +3,10 @@ from django.views.generic import TemplateView, FormView, DetailView, View, Creat
 from django.middleware import csrf
 from apps.Bienestar.models import Colaborador
 from apps.Bienestar import forms as bienestar_f
+from apps.Bienestar.importar import ImportadorBienestar
+from apps.main import importar
+from apps.main.models import Importacion
 from django.urls import reverse_lazy
-from openpyxl import load_workbook
 from django.http import HttpResponse, HttpResponseRedirect
 from rest_framework import views, status
 from rest_framework.response import Response
@@ -18,22 +20,15 @@ import datetime
 import dateutil.parser
 import os
 from django.conf import settings
-from django.core.files.storage import FileSystemStorage
 
 # Create your views here.
 class BienestarExcelAddView(LoginRequiredMixin, TemplateView):
     template_name = 'bienestar/cargar_excel.html'
     def post(self,request):
         if request.method == 'POST' and request.FILES['myfile']:
-            file_list =os.listdir(settings.MEDIA_ROOT_EXCEL_BIENESTAR)
-            number_file=len(file_list)
-            myfile=request.FILES['myfile']
-            new_name=str('Bienestar') + str(number_file) +str(".")+str(myfile.name.split(".")[-1])            
-            fs=FileSystemStorage(location=settings.MEDIA_ROOT_EXCEL_BIENESTAR)
-            filename=fs.save(new_name, myfile)
-            uploaded_file_url=fs.url(filename)
+            importacion = importar.registrar(ImportadorBienestar.tipo, request.FILES['myfile'], request.user)
             return render(request, 'bienestar/cargar_excel.html',{
-                'uploaded_file_url':uploaded_file_url
+                'uploaded_file_url':importacion.archivo.url
         })
         return render(request,'bienestar/cargar_excel.html')
 
@@ -86,70 +81,17 @@ class ResultadoBienestarJson(LoginRequiredMixin, views.APIView):
         """ Importar registros de excel con DjangoRestFramework para Bienestar
         """
         def get(self, request):
-            file_list =os.listdir(settings.MEDIA_ROOT_EXCEL_BIENESTAR)
-            number_file=len(file_list)
-            name_file =file_list[number_file-1]
-            ruta = str(settings.MEDIA_ROOT_EXCEL_BIENESTAR)+str(name_file)
-            listado_datos=[]
-            wb_obj = load_workbook(filename = ruta)
-            sheet_obj = wb_obj.active
-            m_row = sheet_obj.max_row
-            m_col= sheet_obj.max_column
-            for i in range(2, m_row+1):
-                marca_temporal=sheet_obj.cell(row=i, column=1).value
-                correo=sheet_obj.cell(row=i, column=2).value
-                if Colaborador.objects.filter(fecha=marca_temporal,email=correo).exists():
-                    print("Si existe el colaborador")
-                else:
-                    print("El colaborador no existe")
-                    nombre=sheet_obj.cell(row=i, column=3).value
-                    edad=sheet_obj.cell(row=i, column=4).value
-                    dpi=sheet_obj.cell(row=i, column=5).value
-                    pregunta1=sheet_obj.cell(row=i, column=6).value
-                    pregunta2=sheet_obj.cell(row=i, column=7).value
-                    pregunta3=sheet_obj.cell(row=i, column=8).value
-                    pregunta4=sheet_obj.cell(row=i, column=9).value
-                    pregunta5=sheet_obj.cell(row=i, column=10).value
-                    pregunta6=sheet_obj.cell(row=i, column=11).value
-                    pregunta7=sheet_obj.cell(row=i, column=12).value
-                    pregunta8=sheet_obj.cell(row=i, column=13).value
-                    pregunta9=sheet_obj.cell(row=i, column=14).value
-                    pregunta10=sheet_obj.cell(row=i, column=15).value
-                    pregunta11=sheet_obj.cell(row=i, column=16).value
-                    pregunta12=sheet_obj.cell(row=i, column=17).value
-                    pregunta13=sheet_obj.cell(row=i, column=18).value
-                    pregunta14=sheet_obj.cell(row=i, column=19).value
-                    pregunta15=sheet_obj.cell(row=i, column=20).value
-                    pregunta16=sheet_obj.cell(row=i, column=21).value
-                    pregunta17=sheet_obj.cell(row=i, column=22).value
-                    ingresar_colaborador=Colaborador(
-                        fecha=marca_temporal,
-                        email=correo,
-                        usuario=nombre,
-                        edad=edad,
-                        dpi=dpi,
-                        pregunta1=pregunta1,
-                        pregunta2=pregunta2,
-                        pregunta3=pregunta3,
-                        pregunta4=pregunta4,
-                        pregunta5=pregunta5,
-                        pregunta6=pregunta6,
-                        pregunta7=pregunta7,
-                        pregunta8=pregunta8,
-                        pregunta9=pregunta9,
-                        pregunta10=pregunta10,
-                        pregunta11=pregunta11,
-                        pregunta12=pregunta12,
-                        pregunta13=pregunta13,
-                        pregunta14=pregunta14,
-                        pregunta15=pregunta15,
-                        pregunta16=pregunta16,
-                        pregunta17=pregunta17
-                    )
-                    ingresar_colaborador.save()
+            importacion = importar.pendiente(ImportadorBienestar.tipo, request.user)
+            if importacion is None:
+                return Response(
+                    "No hay ningún archivo pendiente de importar",
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            importador = ImportadorBienestar()
+            importacion = importador.importar(importacion)
             return Response(
-                "Datos ingresados Correctamente",
-                status=status.HTTP_200_OK
+                importador.resumen(importacion),
+                status=status.HTTP_200_OK if importacion.estado == Importacion.TERMINADA else status.HTTP_400_BAD_REQUEST
             )
 class InformeBienestarJson(LoginRequiredMixin, views.APIView):
         """ Regreso los datos obtenidos del modelo de `Bienestar` para generar el informe
@@ -2,4 +2,7 @@ from django.apps import AppConfig
 
 
 class ContaConfig(AppConfig):
-    name = 'conta'
+    name = 'apps.conta'
+
+    def ready(self):
+        from . import signals
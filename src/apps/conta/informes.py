@@ -0,0 +1,252 @@
+"""Cálculo de existencias y saldos contables por tipo de dispositivo.
+
+Los informes de contabilidad necesitan, para cada :class:`inventario.DispositivoTipo`, la cantidad de
+dispositivos (o repuestos) útiles y comprados a una fecha, el saldo monetario de ambos y el precio
+estándar del período. En lugar de consultar tipo por tipo, estos datos se obtienen con consultas
+agrupadas por tipo, cuyo número no depende de la cantidad de tipos del informe.
+"""
+
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, Exists, IntegerField, OuterRef, Q, Subquery, Sum, When
+
+from apps.conta import models as conta_m
+
+DISPOSITIVO = conta_m.PrecioEstandar.DISPOSITIVO
+REPUESTO = conta_m.PrecioEstandar.REPUESTO
+
+# Para cada inventario: modelo de movimientos, modelo de precios y campo que apunta al objeto
+INVENTARIOS = {
+    DISPOSITIVO: (conta_m.MovimientoDispositivo, conta_m.PrecioDispositivo, 'dispositivo'),
+    REPUESTO: (conta_m.MovimientoRepuesto, conta_m.PrecioRepuesto, 'repuesto'),
+}
+
+
+def periodos_historicos(periodo):
+    """Períodos cuyos precios se toman en cuenta para valorar el inventario útil de `periodo`.
+    Hasta 2018 el saldo se calculaba con los precios de todos los períodos anteriores, a partir de
+    entonces únicamente con los del propio período.
+    """
+    if periodo.fecha_fin.year <= 2018:
+        return list(conta_m.PeriodoFiscal.objects.filter(
+            fecha_fin__lte=periodo.fecha_fin).values_list('id', flat=True))
+    return [periodo.id]
+
+
+def ultimo_cierre(tipos, fecha, inventario=DISPOSITIVO):
+    """Devuelve los :class:`CierreInventario` más recientes con fecha menor o igual a `fecha`,
+    indexados por el id del tipo.
+    """
+    fechas = conta_m.CierreInventario.objects.filter(
+        inventario=inventario,
+        fecha__lte=fecha).order_by('-fecha').values('fecha')[:1]
+    cierres = conta_m.CierreInventario.objects.filter(
+        inventario=inventario,
+        tipo_dispositivo__in=tipos,
+        fecha=Subquery(fechas))
+    return {cierre.tipo_dispositivo_id: cierre for cierre in cierres}
+
+
+def calcular_existencias(tipos, fecha, periodo, inventario=DISPOSITIVO, periodos_utiles=None,
+                         precio_por_defecto=True, usar_cierres=True):
+    """Devuelve un diccionario indexado por el id de cada tipo de `tipos` (objetos o ids) con las llaves
+    `existencia`, `saldo_total` y `precio_estandar` a la `fecha` indicada, además del detalle de
+    `utiles`, `compras`, `saldo_utiles` y `saldo_compras`.
+
+    Un objeto forma parte de la existencia si tiene un alta con fecha menor o igual a `fecha` y no tiene
+    una baja en ese rango. Las compras (entradas contables) se valoran con sus precios activos; el resto,
+    con los precios de `periodos_utiles` (por defecto, únicamente `periodo`). Si un tipo no tiene precios
+    útiles y `precio_por_defecto` es verdadero, se usa el precio estándar del período.
+
+    Si existe un :class:`CierreInventario` anterior a `fecha` y `usar_cierres` es verdadero, las cantidades
+    y el saldo de compras parten de ese cierre y solo se consultan los movimientos posteriores. El saldo de
+    útiles se suma desde los precios de `periodos_utiles`, que cambian con las revaluaciones.
+    """
+    modelo_movimiento, modelo_precio, campo = INVENTARIOS[inventario]
+    if periodos_utiles is None:
+        periodos_utiles = [periodo.id]
+    tipos = [int(getattr(tipo, 'pk', tipo)) for tipo in tipos]
+    campo_tipo = '{}__tipo'.format(campo)
+    campo_contable = '{}__entrada__tipo__contable'.format(campo)
+    campo_in = '{}__in'.format(campo)
+
+    cierres = ultimo_cierre(tipos, fecha, inventario) if usar_cierres else {}
+    fecha_cierre = next(iter(cierres.values())).fecha if cierres else None
+
+    def bajas(**filtros):
+        return modelo_movimiento.objects.filter(tipo_movimiento=modelo_movimiento.BAJA, **filtros).values(campo)
+
+    def existe_movimiento(tipo_movimiento, **filtros):
+        """Indica si el objeto de cada fila tiene un movimiento de `tipo_movimiento` con los `filtros`."""
+        filtros[campo] = OuterRef(campo)
+        return Exists(modelo_movimiento.objects.filter(tipo_movimiento=tipo_movimiento, **filtros))
+
+    def por_tipo(filas):
+        return {fila[campo_tipo]: fila for fila in filas}
+
+    def contar(movimientos):
+        # Cada movimiento de alta cuenta como una unidad de existencia
+        return por_tipo(movimientos.order_by().values(campo_tipo).annotate(
+            compras=Count(Case(When(**{campo_contable: True, 'then': 1}), output_field=IntegerField())),
+            utiles=Count(Case(When(**{campo_contable: False, 'then': 1}), output_field=IntegerField()))))
+
+    def sumar_precios(precios, **sumas):
+        return por_tipo(precios.order_by().values(campo_tipo).annotate(**{
+            nombre: Sum(Case(When(condicion, then='precio'), output_field=DecimalField()))
+            for nombre, condicion in sumas.items()}))
+
+    precios_tipos = modelo_precio.objects.filter(**{'{}__in'.format(campo_tipo): tipos})
+    utiles_periodo = Q(**{campo_contable: False}) & Q(periodo__in=periodos_utiles)
+    compras_activas = Q(**{campo_contable: True}) & Q(activo=True)
+
+    if fecha_cierre is None:
+        altas = modelo_movimiento.objects.filter(
+            tipo_movimiento=modelo_movimiento.ALTA,
+            fecha__lte=fecha,
+            **{'{}__in'.format(campo_tipo): tipos}).exclude(**{campo_in: bajas(fecha__lte=fecha)})
+        cantidades = contar(altas)
+        saldos = sumar_precios(
+            modelo_precio.objects.filter(**{campo_in: altas.values(campo)}),
+            utiles=utiles_periodo,
+            compras=compras_activas)
+        salientes = {}
+    else:
+        # Solo se consultan los movimientos posteriores al cierre; la existencia de cada objeto se valida con
+        # subconsultas por objeto en lugar de recorrer todas las altas y bajas anteriores
+        altas_tipos = modelo_movimiento.objects.filter(
+            tipo_movimiento=modelo_movimiento.ALTA,
+            **{'{}__in'.format(campo_tipo): tipos})
+        # Altas posteriores al cierre que siguen en existencia
+        entradas = altas_tipos.filter(fecha__gt=fecha_cierre, fecha__lte=fecha).annotate(
+            con_baja=existe_movimiento(modelo_movimiento.BAJA, fecha__lte=fecha)).filter(con_baja=False)
+        # Altas que estaban en existencia al cierre y se dieron de baja después de él
+        salidas = altas_tipos.filter(
+            fecha__lte=fecha_cierre,
+            **{campo_in: bajas(fecha__gt=fecha_cierre, fecha__lte=fecha)}).annotate(
+            con_baja=existe_movimiento(modelo_movimiento.BAJA, fecha__lte=fecha_cierre)).filter(con_baja=False)
+        cantidades = contar(entradas)
+        for tipo, fila in contar(salidas).items():
+            cantidad = cantidades.setdefault(tipo, {'compras': 0, 'utiles': 0})
+            cantidad['compras'] -= fila['compras']
+            cantidad['utiles'] -= fila['utiles']
+
+        # Útiles: los precios del período de los objetos en existencia a la fecha
+        saldos = sumar_precios(
+            precios_tipos.filter(periodo__in=periodos_utiles, **{campo_contable: False}).annotate(
+                con_alta=existe_movimiento(modelo_movimiento.ALTA, fecha__lte=fecha),
+                con_baja=existe_movimiento(modelo_movimiento.BAJA, fecha__lte=fecha)).filter(
+                con_alta=True, con_baja=False),
+            utiles=utiles_periodo)
+        # El saldo de compras no cambia por revaluaciones, por lo que parte del cierre: se suman las compras
+        # nuevas y se restan las que salieron
+        nuevas = entradas.annotate(
+            alta_anterior=existe_movimiento(modelo_movimiento.ALTA, fecha__lte=fecha_cierre)).filter(
+            alta_anterior=False)
+        for tipo, fila in sumar_precios(
+                precios_tipos.filter(**{campo_in: nuevas.values(campo)}), compras=compras_activas).items():
+            saldos.setdefault(tipo, {})['compras'] = fila['compras']
+        salientes = sumar_precios(
+            precios_tipos.filter(**{campo_in: salidas.values(campo)}), compras=compras_activas)
+
+    precios = dict(conta_m.PrecioEstandar.objects.filter(
+        tipo_dispositivo__in=tipos,
+        periodo=periodo,
+        inventario=inventario).values_list('tipo_dispositivo', 'precio'))
+
+    resultado = {}
+    for tipo in tipos:
+        cantidad = cantidades.get(tipo, {})
+        saldo = saldos.get(tipo, {})
+        cierre = cierres.get(tipo)
+        utiles = cantidad.get('utiles', 0)
+        compras = cantidad.get('compras', 0)
+        precio = precios.get(tipo)
+
+        saldo_compras = saldo.get('compras')
+        if saldo_compras is None:
+            saldo_compras = 0
+        if cierre is not None:
+            utiles += cierre.utiles
+            compras += cierre.compras
+            saldo_compras += cierre.saldo_compras - (salientes.get(tipo, {}).get('compras') or 0)
+
+        saldo_utiles = saldo.get('utiles')
+        if saldo_utiles is None:
+            saldo_utiles = utiles * precio if precio_por_defecto and precio is not None else 0
+
+        resultado[tipo] = {
+            'existencia': utiles + compras,
+            'saldo_total': saldo_utiles + saldo_compras,
+            'precio_estandar': precio,
+            'utiles': utiles,
+            'compras': compras,
+            'saldo_utiles': saldo_utiles,
+            'saldo_compras': saldo_compras,
+        }
+    return resultado
+
+
+def invalidar_cierres(fecha, inventario=DISPOSITIVO):
+    """Elimina los :class:`CierreInventario` de `inventario` con fecha igual o posterior a `fecha`, que ya no
+    coinciden con los movimientos después de registrar uno con esa fecha. Mientras el comando
+    `cerrar_periodos` los vuelve a generar, los informes parten del cierre anterior.
+    Devuelve la cantidad de cierres eliminados.
+    """
+    eliminados, _ = conta_m.CierreInventario.objects.filter(inventario=inventario, fecha__gte=fecha).delete()
+    return eliminados
+
+
+def cerrar_periodo(periodo, usar_cierres=True):
+    """Guarda un :class:`CierreInventario` de cada tipo de dispositivo e inventario con la existencia y el
+    saldo a la fecha de fin de `periodo`, reemplazando los que ya tuviera.
+    Devuelve la cantidad de cierres creados.
+    """
+    from apps.inventario import models as inv_m
+
+    tipos = list(inv_m.DispositivoTipo.objects.values_list('id', flat=True))
+    periodos_utiles = periodos_historicos(periodo)
+    cierres = []
+    with transaction.atomic():
+        conta_m.CierreInventario.objects.filter(periodo=periodo).delete()
+        for inventario in INVENTARIOS:
+            existencias = calcular_existencias(
+                tipos,
+                periodo.fecha_fin,
+                periodo,
+                inventario=inventario,
+                periodos_utiles=periodos_utiles,
+                usar_cierres=usar_cierres)
+            for tipo, existencia in existencias.items():
+                cierres.append(conta_m.CierreInventario(
+                    periodo=periodo,
+                    tipo_dispositivo_id=tipo,
+                    inventario=inventario,
+                    fecha=periodo.fecha_fin,
+                    utiles=existencia['utiles'],
+                    compras=existencia['compras'],
+                    saldo_utiles=existencia['saldo_utiles'],
+                    saldo_compras=existencia['saldo_compras']))
+        conta_m.CierreInventario.objects.bulk_create(cierres)
+    return len(cierres)
+
+
+def verificar_cierre(periodo):
+    """Compara los :class:`CierreInventario` de `periodo` con un cálculo completo de la existencia.
+    Devuelve una lista de tuplas `(cierre, campo, guardado, calculado)` con las diferencias encontradas.
+    """
+    diferencias = []
+    periodos_utiles = periodos_historicos(periodo)
+    for inventario in INVENTARIOS:
+        cierres = list(periodo.cierres.filter(inventario=inventario).select_related('tipo_dispositivo'))
+        existencias = calcular_existencias(
+            [cierre.tipo_dispositivo_id for cierre in cierres],
+            periodo.fecha_fin,
+            periodo,
+            inventario=inventario,
+            periodos_utiles=periodos_utiles,
+            usar_cierres=False)
+        for cierre in cierres:
+            calculado = existencias[cierre.tipo_dispositivo_id]
+            for campo in ('utiles', 'compras', 'saldo_utiles', 'saldo_compras'):
+                if getattr(cierre, campo) != calculado[campo]:
+                    diferencias.append((cierre, campo, getattr(cierre, campo), calculado[campo]))
+    return diferencias
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.conta import informes
+from apps.conta import models as conta_m
+
+
+class Command(BaseCommand):
+    help = (
+        'Genera los cierres de inventario de los períodos fiscales anteriores al actual que aún no los tienen '
+        'y, opcionalmente, los compara con un cálculo completo de la existencia.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'periodos',
+            nargs='*',
+            type=int,
+            help='IDs de los períodos a cerrar. Si no se indica ninguno, se cierran los que no tienen cierre.')
+        parser.add_argument(
+            '--regenerar',
+            action='store_true',
+            help='Vuelve a generar los cierres que ya existen.')
+        parser.add_argument(
+            '--verificar',
+            action='store_true',
+            help='Únicamente compara los cierres existentes con el cálculo completo.')
+
+    def handle(self, *args, **options):
+        periodos = conta_m.PeriodoFiscal.objects.order_by('fecha_fin')
+        if options['periodos']:
+            periodos = periodos.filter(id__in=options['periodos'])
+        else:
+            periodos = periodos.filter(actual=False)
+
+        if options['verificar']:
+            total = 0
+            for periodo in periodos.filter(cierres__isnull=False).distinct():
+                for cierre, campo, guardado, calculado in informes.verificar_cierre(periodo):
+                    total += 1
+                    self.stdout.write('{} ({}) {}: {} != {}'.format(cierre, cierre.inventario, campo, guardado, calculado))
+            if total:
+                raise CommandError('{} diferencias encontradas'.format(total))
+            self.stdout.write('Los cierres coinciden con el cálculo completo')
+            return
+
+        if not options['regenerar'] and not options['periodos']:
+            periodos = periodos.filter(cierres__isnull=True)
+        # Cada cierre parte del anterior, por lo que se generan en orden cronológico
+        for periodo in periodos.distinct():
+            creados = informes.cerrar_periodo(periodo)
+            self.stdout.write('{}: {} cierres'.format(periodo, creados))
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-18 16:06
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0079_secuenciatriage'),
+        ('conta', '0003_precioestandar_revaluar'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CierreInventario',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('inventario', models.CharField(choices=[('dispositivo', 'Dispositivo'), ('repuesto', 'Repuesto')], default='dispositivo', max_length=12)),
+                ('fecha', models.DateField()),
+                ('utiles', models.PositiveIntegerField(default=0)),
+                ('compras', models.PositiveIntegerField(default=0)),
+                ('saldo_utiles', models.DecimalField(decimal_places=2, default=0.0, max_digits=14)),
+                ('saldo_compras', models.DecimalField(decimal_places=2, default=0.0, max_digits=14)),
+                ('fecha_creacion', models.DateTimeField(default=django.utils.timezone.now)),
+                ('periodo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cierres', to='conta.PeriodoFiscal')),
+                ('tipo_dispositivo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cierres', to='inventario.DispositivoTipo')),
+            ],
+            options={
+                'verbose_name': 'Cierre de inventario',
+                'verbose_name_plural': 'Cierres de inventario',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='cierreinventario',
+            index=models.Index(fields=['inventario', 'fecha'], name='conta_cierr_inventa_6f3831_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='cierreinventario',
+            unique_together=set([('periodo', 'tipo_dispositivo', 'inventario')]),
+        ),
+    ]
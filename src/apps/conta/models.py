@@ -151,3 +151,34 @@ class MovimientoRepuesto(models.Model):
 
     def __str__(self):
         return '{} - {}'.format(self.tipo_movimiento, self.repuesto)
+
+
+class CierreInventario(models.Model):
+    """Existencia y saldo de un tipo de dispositivo al cierre de un :class:`PeriodoFiscal`.
+    Los informes parten del cierre más reciente y únicamente recorren los movimientos posteriores a él.
+    Los cierres se generan desde :func:`apps.conta.informes.cerrar_periodo`.
+    """
+
+    periodo = models.ForeignKey(PeriodoFiscal, on_delete=models.CASCADE, related_name='cierres')
+    tipo_dispositivo = models.ForeignKey('inventario.DispositivoTipo', on_delete=models.CASCADE, related_name='cierres')
+    inventario = models.CharField(
+        max_length=12,
+        choices=PrecioEstandar.INVENTARIO_CHOICES,
+        default=PrecioEstandar.DISPOSITIVO)
+    fecha = models.DateField()
+    utiles = models.PositiveIntegerField(default=0)
+    compras = models.PositiveIntegerField(default=0)
+    saldo_utiles = models.DecimalField(max_digits=14, decimal_places=2, default=0.0)
+    saldo_compras = models.DecimalField(max_digits=14, decimal_places=2, default=0.0)
+    fecha_creacion = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        unique_together = ('periodo', 'tipo_dispositivo', 'inventario')
+        verbose_name = 'Cierre de inventario'
+        verbose_name_plural = 'Cierres de inventario'
+        indexes = [
+            models.Index(fields=['inventario', 'fecha'])
+        ]
+
+    def __str__(self):
+        return '{} - {}'.format(self.periodo, self.tipo_dispositivo)
@@ -0,0 +1,31 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.conta import informes
+from apps.conta import models as conta_m
+
+
+@receiver(pre_save, sender=conta_m.PeriodoFiscal)
+def detectar_cierre_periodo(sender, instance, **kwargs):
+    """Marca el :class:`PeriodoFiscal` que deja de ser el período actual para generar su cierre."""
+    instance._cerrar = bool(
+        instance.pk and
+        not instance.actual and
+        sender.objects.filter(pk=instance.pk, actual=True).exists())
+
+
+@receiver(post_save, sender=conta_m.PeriodoFiscal)
+def cerrar_periodo(sender, instance, **kwargs):
+    """Guarda los :class:`CierreInventario` del período que dejó de ser el actual."""
+    if getattr(instance, '_cerrar', False):
+        informes.cerrar_periodo(instance)
+
+
+@receiver([post_save, post_delete], sender=conta_m.MovimientoDispositivo)
+@receiver([post_save, post_delete], sender=conta_m.MovimientoRepuesto)
+def invalidar_cierres(sender, instance, **kwargs):
+    """Elimina los cierres que ya no incluyen un movimiento registrado con fecha de un período cerrado."""
+    if sender is conta_m.MovimientoDispositivo:
+        informes.invalidar_cierres(instance.fecha, informes.DISPOSITIVO)
+    else:
+        informes.invalidar_cierres(instance.fecha, informes.REPUESTO)
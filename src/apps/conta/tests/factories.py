@@ -0,0 +1,13 @@
+import factory
+from django.utils import timezone
+from apps.conta import models
+
+
+class PeriodoFiscalFactory(factory.django.DjangoModelFactory):
+    """Fábrica para :class:'PeriodoFiscal'"""
+    class Meta:
+        model = models.PeriodoFiscal
+
+    fecha_inicio = factory.LazyFunction(lambda: timezone.now().date().replace(month=1, day=1))
+    fecha_fin = factory.LazyFunction(lambda: timezone.now().date().replace(month=12, day=31))
+    actual = True
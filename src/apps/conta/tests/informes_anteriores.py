@@ -0,0 +1,303 @@
+"""Implementación anterior de los informes de existencias, consultando tipo por tipo.
+Se conserva únicamente para comparar sus resultados con los de :mod:`apps.conta.informes`.
+"""
+from datetime import datetime, timedelta
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Q, Sum
+from django.utils.datastructures import MultiValueDictKeyError
+from rest_framework import status, views
+from rest_framework.response import Response
+
+from apps.conta import models as conta_m
+from apps.inventario import models as inv_m
+
+
+def get_existencia(tipo_dispositivo, fecha, periodo):
+    result = {}
+    periodos_anteriores = conta_m.PeriodoFiscal.objects.filter(fecha_fin__lte=periodo.fecha_fin).values('id')
+
+    bajas = conta_m.MovimientoDispositivo.objects.filter(
+        tipo_movimiento=-1,
+        dispositivo__tipo=tipo_dispositivo,
+        fecha__lte=fecha).values('dispositivo')
+    compras = conta_m.MovimientoDispositivo.objects.filter(
+        tipo_movimiento=1,
+        dispositivo__tipo=tipo_dispositivo,
+        fecha__lte=fecha,
+        dispositivo__entrada__tipo__contable=True).exclude(dispositivo__in=bajas).values('dispositivo')
+    utiles = conta_m.MovimientoDispositivo.objects.filter(
+        tipo_movimiento=1,
+        dispositivo__tipo=tipo_dispositivo,
+        fecha__lte=fecha).exclude(
+        dispositivo__in=bajas).exclude(dispositivo__in=compras).values('dispositivo')
+
+    # Obtener Precio Estandar Actual y Anterior
+    precio = conta_m.PrecioEstandar.objects.filter(
+        tipo_dispositivo=tipo_dispositivo,
+        periodo=periodo,
+        inventario='dispositivo').first().precio
+
+    # Obtener Precio Total
+    if periodo.fecha_fin.year <= 2018:
+        precio_tipo_dispositivo = conta_m.PrecioDispositivo.objects.filter(
+            dispositivo__in=utiles,
+            periodo__in=periodos_anteriores).aggregate(Sum('precio'))
+    else:
+        precio_tipo_dispositivo = conta_m.PrecioDispositivo.objects.filter(
+            dispositivo__in=utiles,
+            periodo=periodo).aggregate(Sum('precio'))
+
+    precio_tipo_compras = conta_m.PrecioDispositivo.objects.filter(
+        dispositivo__in=compras,
+        activo=True).aggregate(Sum('precio'))
+
+    if precio_tipo_dispositivo['precio__sum'] is not None:
+        precio_tipo_dispositivo = precio_tipo_dispositivo['precio__sum']
+    else:
+        if precio is not None:
+            precio_tipo_dispositivo = len(utiles) * precio
+        else:
+            precio_tipo_dispositivo = 0
+
+    if precio_tipo_compras['precio__sum'] is not None:
+        precio_tipo_compras = precio_tipo_compras['precio__sum']
+    else:
+        precio_tipo_compras = 0
+
+    precio_total = precio_tipo_dispositivo + precio_tipo_compras
+    existencia = len(utiles) + len(compras)
+
+    result['saldo_total'] = precio_total
+    result['existencia'] = existencia
+    result['precio_estandar'] = precio
+    return result
+
+
+class InformeCantidadJson(views.APIView):
+
+    def get(self, request):
+        repuesto_dispositivo = self.request.GET['dispositivo']
+        id_periodo = self.request.GET['periodo']
+        dispositivos = inv_m.DispositivoTipo.objects.all().exclude(conta=False)
+        lista_dispositivos = {}
+        lista = []
+        acumulador_anterior = 0
+        acumulador = 0
+        periodo = conta_m.PeriodoFiscal.objects.get(id=id_periodo)
+        nueva_fecha = periodo.fecha_fin - timedelta(days=365)
+        nueva_fecha_inicio = periodo.fecha_inicio - timedelta(days=365)
+        periodo_anterior = conta_m.PeriodoFiscal.objects.get(fecha_fin=nueva_fecha)
+        periodos_anteriores = conta_m.PeriodoFiscal.objects.filter(fecha_fin__lt=periodo.fecha_inicio).values('id')
+        try:
+            for tipo in dispositivos:
+                precio_total_anterior = 0
+                precio_tipo_dispositivo = 0
+                precio_tipo_compras = 0
+                dispositivo = {}
+                if repuesto_dispositivo == str(1):
+                    # Obtener Total Anterior
+                    totales_anterior = get_existencia(tipo,nueva_fecha,periodo_anterior)
+                    precio_anterior = totales_anterior['precio_estandar']
+                    precio_total_anterior = totales_anterior['saldo_total']
+                    acumulador_anterior += precio_total_anterior
+
+                    # Obtener Precio Estandar Actual y Anterior
+                    total_actual = get_existencia(tipo,nueva_fecha,periodo)
+                    precio = total_actual['precio_estandar']
+                    precio_total = total_actual['saldo_total']
+                    acumulador += precio_total
+
+                    # Obtener Existencia
+                    disponible = total_actual['existencia']
+                else:
+                    bajas = conta_m.MovimientoRepuesto.objects.filter(
+                        tipo_movimiento=-1,
+                        repuesto__tipo=tipo,
+                        fecha__lte=nueva_fecha).values('repuesto')
+                    compras = conta_m.MovimientoRepuesto.objects.filter(
+                        tipo_movimiento=1,
+                        repuesto__tipo=tipo,
+                        fecha__lte=nueva_fecha,
+                        repuesto__entrada__tipo__contable=True).exclude(repuesto__in=bajas).values('repuesto')
+                    utiles = conta_m.MovimientoRepuesto.objects.filter(
+                        tipo_movimiento=1,
+                        repuesto__tipo=tipo,
+                        fecha__lte=nueva_fecha).exclude(
+                            repuesto__in=bajas).exclude(repuesto__in=compras).values('repuesto')
+                    # Obtener Total Anterior
+                    if periodo_anterior.fecha_fin.year <= 2018:
+                        precio_tipo_dispositivo = conta_m.PrecioRepuesto.objects.filter(
+                            repuesto__in=utiles,
+                            periodo__in=periodos_anteriores).aggregate(Sum('precio'))
+                    else:
+                        precio_tipo_dispositivo = conta_m.PrecioRepuesto.objects.filter(
+                            repuesto__in=utiles,
+                            periodo=periodo_anterior).aggregate(Sum('precio'))
+
+                    precio_tipo_compras = conta_m.PrecioRepuesto.objects.filter(
+                        repuesto__in=compras,
+                        activo=True).aggregate(Sum('precio'))
+
+                    if precio_tipo_dispositivo['precio__sum'] is not None:
+                        precio_tipo_dispositivo = precio_tipo_dispositivo['precio__sum']
+                    else:
+                        precio_tipo_dispositivo = 0
+
+                    if precio_tipo_compras['precio__sum'] is not None:
+                        precio_tipo_compras = precio_tipo_compras['precio__sum']
+                    else:
+                        precio_tipo_compras = 0
+                    precio_total_anterior = precio_tipo_dispositivo + precio_tipo_compras
+                    acumulador_anterior += precio_total_anterior
+                    # Obtener Precio Estandar Actual y Anterior
+                    precio = conta_m.PrecioEstandar.objects.filter(
+                        tipo_dispositivo=tipo,
+                        periodo=periodo,
+                        inventario='repuesto').first().precio
+
+                    precio_anterior = conta_m.PrecioEstandar.objects.filter(
+                        tipo_dispositivo=tipo,
+                        periodo=periodo_anterior,
+                        inventario='repuesto').first().precio
+                    # Obtener Total Actual
+                    precio_tipo_dispositivo = conta_m.PrecioRepuesto.objects.filter(
+                        repuesto__in=utiles,
+                        periodo=periodo).aggregate(Sum('precio'))
+                    precio_tipo_compras = conta_m.PrecioRepuesto.objects.filter(
+                        repuesto__in=compras,
+                        activo=True).aggregate(Sum('precio'))
+
+                    if precio_tipo_dispositivo['precio__sum'] is not None:
+                        precio_tipo_dispositivo = precio_tipo_dispositivo['precio__sum']
+                    else:
+                        if precio is not None:
+                            precio_tipo_dispositivo = len(utiles) * precio
+                        else:
+                            precio_tipo_dispositivo = 0
+
+                    if precio_tipo_compras['precio__sum'] is not None:
+                        precio_tipo_compras = precio_tipo_compras['precio__sum']
+                    else:
+                        precio_tipo_compras = 0
+
+                    precio_total = precio_tipo_dispositivo + precio_tipo_compras
+                    acumulador += precio_total
+                    disponible = len(utiles) + len(compras)
+                if precio is not None and precio_anterior is not None:
+                    dispositivo['tipo'] = tipo.tipo
+                    dispositivo['cantidad'] = disponible
+                    dispositivo['precio'] = str(precio)
+                    dispositivo['precio_anterior'] = precio_anterior
+                    dispositivo['total_anterior'] = precio_total_anterior
+                    dispositivo['total'] = precio_total
+                    dispositivo['acumulador_total'] = acumulador
+                    dispositivo['acumulador_anterior'] = acumulador_anterior
+                    lista.append(dispositivo)
+                    lista_dispositivos[tipo.tipo] = dispositivo
+            return Response(lista)
+        except ObjectDoesNotExist as e:
+            return Response(
+                {
+                    'mensaje': str(e)
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+
+class InformeResumenJson(views.APIView):
+    """ Lista todas las salidas de desecho con triage que han sucedido en un rango de fechas,
+    Solamente cuentan aquellas salidas que han sido cerradas.
+    """
+    def get(self, request):
+        fecha_inicio = self.request.GET['fecha_min']
+        fecha_fin = self.request.GET['fecha_max']
+        try:
+            tipo_dispositivo = []
+            tipo_dispositivo = self.request.GET.getlist('tipo_dispositivo[]')
+            if len(tipo_dispositivo) == 0:
+                tipo = self.request.GET['tipo_dispositivo']
+                tipo_dispositivo.append(tipo)
+        except MultiValueDictKeyError as e:
+            tipo_dispositivo = 0
+
+        # Filtrar por tipos de dispositivos seleccionados
+        if tipo_dispositivo == 0 or not tipo_dispositivo:
+            dispositivos = self.request.user.tipos_dispositivos.tipos.filter(conta=True)
+        else:
+            dispositivos = self.request.user.tipos_dispositivos.tipos.filter(id__in=tipo_dispositivo)
+
+        # Validar que el rango de fechas pertenezcan a un solo período fiscal
+        validar_fecha = conta_m.PeriodoFiscal.objects.filter(fecha_inicio__lte=fecha_inicio, fecha_fin__gte=fecha_fin)
+        acumulador = 0
+        acumulador_anterior = 0
+        acumulador_ant_ex = 0
+        acumulador_act_ex = 0
+
+        if validar_fecha.count() == 1:
+            # Obtener datos de Periodo Fiscal
+            periodo = validar_fecha[0]
+            lista_dispositivos = {}
+            lista = []
+            for tipo in dispositivos:
+                dispositivo = {}
+                # Obtener Saldo Anterior
+                fecha_inicial = datetime.strptime(fecha_inicio, '%Y-%m-%d') - timedelta(days=1)
+                totales_anterior = get_existencia(tipo,fecha_inicial,periodo)
+                precio_total_anterior = totales_anterior['saldo_total']
+                existencia_anterior = totales_anterior['existencia']
+                acumulador_anterior += precio_total_anterior
+                acumulador_ant_ex += existencia_anterior
+
+                # Obtener Saldo Actual
+                total_actual = get_existencia(tipo,fecha_fin,periodo)
+                precio = total_actual['precio_estandar']
+                precio_total = total_actual['saldo_total']
+                existencia = total_actual['existencia']
+                acumulador += precio_total
+                acumulador_act_ex += existencia
+
+                # Obtener Total de Entradas
+                entradas = inv_m.EntradaDetalle.objects.filter(
+                        Q(fecha_dispositivo__gte=fecha_inicio),
+                        Q(fecha_dispositivo__lte=fecha_fin),
+                        Q(tipo_dispositivo=tipo)
+                        ).aggregate(Sum('util'))
+
+                if entradas['util__sum'] is not None:
+                    entradas = entradas['util__sum']
+                else:
+                    entradas = 0
+
+                # Obtener Total de Salidas
+                salida_especial = inv_m.SalidaTipo.objects.get(especial=True)
+                salidas = len(inv_m.DispositivoPaquete.objects.filter(
+                        Q(paquete__salida__fecha__gte=fecha_inicio),
+                        Q(paquete__salida__fecha__lte=fecha_fin),
+                        Q(dispositivo__tipo=tipo),
+                        Q(paquete__salida__en_creacion=False)))
+
+                desecho = len(inv_m.DesechoDispositivo.objects.filter(
+                        Q(desecho__fecha__gte=fecha_inicio),
+                        Q(desecho__fecha__lte=fecha_fin),
+                        Q(dispositivo__tipo=tipo),
+                        Q(desecho__en_creacion=False)))
+
+                salidas += desecho
+
+                dispositivo['tipo'] = tipo.tipo
+                dispositivo['existencia_anterior'] = existencia_anterior
+                dispositivo['saldo_anterior'] = precio_total_anterior
+                dispositivo['entradas'] = str(entradas)
+                dispositivo['salidas'] = salidas
+                dispositivo['existencia'] = existencia
+                dispositivo['saldo_actual'] = precio_total
+                dispositivo['costo_inicial'] = acumulador_anterior
+                dispositivo['total_inicial'] = acumulador_ant_ex
+                dispositivo['rango_fechas'] = str(fecha_inicio)+"  AL  "+str(fecha_fin)
+                dispositivo['costo_final'] = acumulador
+                dispositivo['total_final'] = acumulador_act_ex
+                lista.append(dispositivo)
+            return Response(lista)
+        else:
+            print("No existe en el periodo fiscal")
@@ -0,0 +1,240 @@
+import io
+import random
+from datetime import date, timedelta
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.utils.six import StringIO
+from openpyxl import load_workbook
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.conta import models as conta_m
+from apps.conta import informes, views
+from apps.conta.tests import informes_anteriores
+from apps.conta.tests.factories import PeriodoFiscalFactory
+from apps.inventario import models as inv_m
+from apps.inventario.tests import factories
+
+
+class InformesExistenciaTestCase(TestCase):
+    """Compara los informes de existencias con su implementación anterior sobre datos generados."""
+
+    fixtures = ['dispositivo_estado', 'dispositivo_etapa']
+
+    def setUp(self):
+        azar = random.Random(2019)
+        self.usuario = factories.UserFactory()
+        self.periodos = {
+            anio: PeriodoFiscalFactory(
+                fecha_inicio=date(anio, 1, 1),
+                fecha_fin=date(anio, 12, 31),
+                actual=anio == 2019)
+            for anio in (2017, 2018, 2019)}
+        compra = factories.EntradaFactory(tipo__contable=True, creada_por=self.usuario)
+        donacion = factories.EntradaFactory(tipo__contable=False, creada_por=self.usuario)
+        estado_repuesto = inv_m.RepuestoEstado.objects.create(nombre='Almacenaje')
+        tipo_salida = inv_m.SalidaTipo.objects.create(nombre='Entrega', slug='E')
+        # La implementación anterior requiere que exista el tipo de salida especial
+        inv_m.SalidaTipo.objects.create(nombre='Especial', slug='ES', especial=True)
+        empresa = inv_m.DesechoEmpresa.objects.create(nombre='Empresa', encargado='Encargado', telefono=1, dpi='1')
+
+        self.tipos = [
+            factories.DispositivoTipoFactory(tipo=slug, slug=slug)
+            for slug in ('M', 'T', 'S', 'HDD')]
+        factories.DispositivoTipoFactory(tipo='CPU', slug='CPU', conta=False)
+        asignacion = inv_m.AsignacionTecnico.objects.create(usuario=self.usuario)
+        asignacion.tipos.add(*self.tipos)
+
+        def fecha_al_azar():
+            return date(2017, 1, 1) + timedelta(days=azar.randint(0, 3 * 365))
+
+        def periodo_de(fecha):
+            return self.periodos[fecha.year]
+
+        for tipo in self.tipos:
+            for anio, periodo in self.periodos.items():
+                for inventario in (conta_m.PrecioEstandar.DISPOSITIVO, conta_m.PrecioEstandar.REPUESTO):
+                    conta_m.PrecioEstandar.objects.create(
+                        periodo=periodo,
+                        tipo_dispositivo=tipo,
+                        precio=azar.randint(10, 500),
+                        inventario=inventario,
+                        creado_por=self.usuario)
+            # El último tipo no tiene precios de dispositivos útiles, para usar el precio estándar
+            con_precios = tipo != self.tipos[-1]
+            dispositivos = []
+            for indice in range(12):
+                entrada = compra if indice % 3 == 0 else donacion
+                dispositivo = inv_m.Monitor.objects.create(tipo=tipo, entrada=entrada)
+                dispositivos.append(dispositivo)
+                alta = fecha_al_azar()
+                conta_m.MovimientoDispositivo.objects.create(
+                    fecha=alta, dispositivo=dispositivo, periodo_fiscal=periodo_de(alta))
+                if indice % 5 == 0:
+                    baja = min(alta + timedelta(days=azar.randint(1, 300)), date(2019, 12, 31))
+                    conta_m.MovimientoDispositivo.objects.create(
+                        fecha=baja,
+                        dispositivo=dispositivo,
+                        periodo_fiscal=periodo_de(baja),
+                        tipo_movimiento=conta_m.MovimientoDispositivo.BAJA)
+                if con_precios or entrada == compra:
+                    for periodo in azar.sample(list(self.periodos.values()), 2):
+                        conta_m.PrecioDispositivo.objects.create(
+                            dispositivo=dispositivo,
+                            periodo=periodo,
+                            precio=azar.randint(1, 900),
+                            activo=azar.random() < 0.7)
+
+                repuesto = inv_m.Repuesto.objects.create(entrada=entrada, tipo=tipo, estado=estado_repuesto)
+                alta = fecha_al_azar()
+                conta_m.MovimientoRepuesto.objects.create(
+                    fecha=alta, repuesto=repuesto, periodo_fiscal=periodo_de(alta))
+                if indice % 4 == 0:
+                    conta_m.MovimientoRepuesto.objects.create(
+                        fecha=alta + timedelta(days=10),
+                        repuesto=repuesto,
+                        periodo_fiscal=periodo_de(alta + timedelta(days=10)),
+                        tipo_movimiento=conta_m.MovimientoRepuesto.BAJA)
+                if con_precios:
+                    conta_m.PrecioRepuesto.objects.create(
+                        repuesto=repuesto,
+                        periodo=azar.choice(list(self.periodos.values())),
+                        precio=azar.randint(1, 90))
+
+            for _ in range(3):
+                factories.EntradaDetalleFactory(
+                    entrada=donacion,
+                    tipo_dispositivo=tipo,
+                    util=azar.randint(1, 20),
+                    fecha_dispositivo=fecha_al_azar())
+
+            for indice, en_creacion in enumerate((False, True)):
+                salida = inv_m.SalidaInventario.objects.create(
+                    tipo_salida=tipo_salida,
+                    fecha=date(2019, 4 + indice, 15),
+                    creada_por=self.usuario,
+                    en_creacion=en_creacion)
+                paquete = inv_m.Paquete.objects.create(salida=salida, creado_por=self.usuario, indice=1)
+                for dispositivo in dispositivos[indice * 3:indice * 3 + 3]:
+                    inv_m.DispositivoPaquete.objects.create(
+                        dispositivo=dispositivo, paquete=paquete, asignado_por=self.usuario)
+            desecho = inv_m.DesechoSalida.objects.create(
+                fecha=date(2019, 6, 1), empresa=empresa, creado_por=self.usuario, en_creacion=False)
+            for dispositivo in dispositivos[-2:]:
+                inv_m.DesechoDispositivo.objects.create(desecho=desecho, dispositivo=dispositivo)
+
+    def consultar(self, vista, datos):
+        request = APIRequestFactory().get('/', datos)
+        force_authenticate(request, user=self.usuario)
+        return vista.as_view()(request)
+
+    def comparar(self, vista, vista_anterior, datos):
+        respuesta = self.consultar(vista, datos)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.data, self.consultar(vista_anterior, datos).data)
+        return respuesta.data
+
+    def test_informe_cantidad(self):
+        for periodo in (self.periodos[2018], self.periodos[2019]):
+            for dispositivo in ('1', '2'):
+                datos = self.comparar(
+                    views.InformeCantidadJson,
+                    informes_anteriores.InformeCantidadJson,
+                    {'periodo': periodo.id, 'dispositivo': dispositivo})
+                self.assertEqual(len(datos), len(self.tipos))
+
+    def test_informe_resumen(self):
+        rangos = (('2018-01-01', '2018-12-31'), ('2019-03-01', '2019-09-30'), ('2019-05-01', '2019-05-01'))
+        for fecha_min, fecha_max in rangos:
+            datos = self.comparar(
+                views.InformeResumenJson,
+                informes_anteriores.InformeResumenJson,
+                {'fecha_min': fecha_min, 'fecha_max': fecha_max})
+            self.assertEqual(len(datos), len(self.tipos))
+        self.comparar(
+            views.InformeResumenJson,
+            informes_anteriores.InformeResumenJson,
+            {'fecha_min': '2019-01-01', 'fecha_max': '2019-12-31', 'tipo_dispositivo': self.tipos[1].id})
+
+    def test_exportar(self):
+        datos = {'fecha_min': '2019-01-01', 'fecha_max': '2019-12-31'}
+        filas = self.consultar(views.InformeResumenJson, datos).data
+        respuesta = self.consultar(views.InformeResumenJson, dict(datos, formato='xlsx'))
+        libro = load_workbook(io.BytesIO(b''.join(respuesta.streaming_content)), read_only=True)
+        registros = list(libro.active.iter_rows(values_only=True))
+        self.assertEqual(registros[0][:2], ('Tipo', 'Existencia inicial'))
+        self.assertEqual([registro[0] for registro in registros[1:]], [fila['tipo'] for fila in filas])
+
+        # Un rango de fechas de dos períodos fiscales no se puede consultar
+        respuesta = self.consultar(views.InformeSalidaJson, {
+            'fecha_min': '2018-06-01', 'fecha_max': '2019-06-01', 'tipo_dispositivo': self.tipos[0].id})
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertIn('mensaje', respuesta.data)
+
+        # Sin el precio estándar de las donaciones tampoco se empieza a descargar el archivo
+        factories.EntradaDetalleFactory(
+            entrada=inv_m.Entrada.objects.filter(tipo__contable=False).first(),
+            tipo_dispositivo=self.tipos[0],
+            precio_unitario=0,
+            fecha_dispositivo=date(2019, 6, 1))
+        datos = {'fecha_min': '2019-01-01', 'fecha_max': '2019-12-31', 'tipo_dispositivo': self.tipos[0].id}
+        self.assertEqual(self.consultar(views.InformeEntradaJson, dict(datos, formato='xlsx')).status_code, 200)
+        conta_m.PrecioEstandar.objects.filter(
+            tipo_dispositivo=self.tipos[0], periodo=self.periodos[2019],
+            inventario=conta_m.PrecioEstandar.DISPOSITIVO).delete()
+        respuesta = self.consultar(views.InformeEntradaJson, dict(datos, formato='xlsx'))
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertIn('mensaje', respuesta.data)
+
+    def test_consultas_constantes(self):
+        # El número de consultas no depende de la cantidad de tipos del informe
+        with self.assertNumQueries(12):
+            self.consultar(views.InformeCantidadJson, {'periodo': self.periodos[2019].id, 'dispositivo': '1'})
+        with self.assertNumQueries(14):
+            self.consultar(views.InformeResumenJson, {'fecha_min': '2019-01-01', 'fecha_max': '2019-12-31'})
+
+    def test_informes_con_cierres(self):
+        call_command('cerrar_periodos', stdout=StringIO())
+        self.assertEqual(conta_m.CierreInventario.objects.filter(periodo=self.periodos[2019]).count(), 0)
+        self.assertEqual(
+            conta_m.CierreInventario.objects.filter(periodo=self.periodos[2018]).count(),
+            2 * inv_m.DispositivoTipo.objects.count())
+        call_command('cerrar_periodos', verificar=True, stdout=StringIO())
+        self.test_informe_cantidad()
+        self.test_informe_resumen()
+
+    def test_cierre_al_cambiar_periodo_actual(self):
+        periodo = self.periodos[2019]
+        periodo.actual = False
+        periodo.save()
+        self.assertEqual(informes.verificar_cierre(periodo), [])
+        existencia = conta_m.CierreInventario.objects.get(
+            periodo=periodo,
+            tipo_dispositivo=self.tipos[0],
+            inventario=conta_m.PrecioEstandar.DISPOSITIVO)
+        totales = views.get_existencia(self.tipos[0], periodo.fecha_fin, periodo)
+        self.assertEqual(existencia.utiles + existencia.compras, totales['existencia'])
+
+    def test_verificar_cierre_desactualizado(self):
+        informes.cerrar_periodo(self.periodos[2018])
+        # Un cierre modificado fuera del sistema deja de coincidir con los movimientos
+        conta_m.CierreInventario.objects.filter(tipo_dispositivo=self.tipos[0]).update(utiles=0)
+        with self.assertRaises(CommandError):
+            call_command('cerrar_periodos', verificar=True, stdout=StringIO())
+
+    def test_movimiento_en_periodo_cerrado(self):
+        for anio in (2017, 2018):
+            informes.cerrar_periodo(self.periodos[anio])
+        # Un movimiento registrado con fecha de un período cerrado elimina ese cierre y los posteriores
+        conta_m.MovimientoDispositivo.objects.create(
+            fecha=date(2018, 6, 1),
+            dispositivo=inv_m.Monitor.objects.create(tipo=self.tipos[0], entrada=inv_m.Entrada.objects.first()),
+            periodo_fiscal=self.periodos[2018])
+        self.assertEqual(
+            set(conta_m.CierreInventario.objects.filter(
+                inventario=conta_m.PrecioEstandar.DISPOSITIVO).values_list('periodo', flat=True)),
+            {self.periodos[2017].id})
+        self.test_informe_cantidad()
+        call_command('cerrar_periodos', stdout=StringIO())
+        call_command('cerrar_periodos', verificar=True, stdout=StringIO())
+        self.test_informe_cantidad()
@@ -8,6 +8,7 @@ from django.views.generic.edit import CreateView, UpdateView, FormView
 from apps.conta import models as conta_m
 from apps.inventario import models as inv_m
 from apps.conta import forms as conta_f
+from apps.conta import informes
 from rest_framework import views, status
 from rest_framework.response import Response
 from django.core.exceptions import ObjectDoesNotExist
@@ -21,70 +22,20 @@ from operator import __and__ as AND
 from django.db import connection
 
 from apps.escuela import models as escuela_m
+from apps.main.mixins import ExportarApiMixin, InformeInvalido
 
-"""
-    Función que devuelve la existencia y saldo monetario basado en el tipo de dispositivo, 
-    fecha y periodo a buscar. 
-"""
-def get_existencia(tipo_dispositivo, fecha, periodo):
-    result = {}
-    periodos_anteriores = conta_m.PeriodoFiscal.objects.filter(fecha_fin__lte=periodo.fecha_fin).values('id')
-
-    bajas = conta_m.MovimientoDispositivo.objects.filter(
-        tipo_movimiento=-1,
-        dispositivo__tipo=tipo_dispositivo,
-        fecha__lte=fecha).values('dispositivo')
-    compras = conta_m.MovimientoDispositivo.objects.filter(
-        tipo_movimiento=1,
-        dispositivo__tipo=tipo_dispositivo,
-        fecha__lte=fecha,
-        dispositivo__entrada__tipo__contable=True).exclude(dispositivo__in=bajas).values('dispositivo')
-    utiles = conta_m.MovimientoDispositivo.objects.filter(
-        tipo_movimiento=1,
-        dispositivo__tipo=tipo_dispositivo,
-        fecha__lte=fecha).exclude(
-        dispositivo__in=bajas).exclude(dispositivo__in=compras).values('dispositivo')
-
-    # Obtener Precio Estandar Actual y Anterior
-    precio = conta_m.PrecioEstandar.objects.filter(
-        tipo_dispositivo=tipo_dispositivo,
-        periodo=periodo,
-        inventario='dispositivo').first().precio
-
-    # Obtener Precio Total
-    if periodo.fecha_fin.year <= 2018:
-        precio_tipo_dispositivo = conta_m.PrecioDispositivo.objects.filter(
-            dispositivo__in=utiles,
-            periodo__in=periodos_anteriores).aggregate(Sum('precio'))
-    else:
-        precio_tipo_dispositivo = conta_m.PrecioDispositivo.objects.filter(
-            dispositivo__in=utiles,
-            periodo=periodo).aggregate(Sum('precio'))
-
-    precio_tipo_compras = conta_m.PrecioDispositivo.objects.filter(
-        dispositivo__in=compras,
-        activo=True).aggregate(Sum('precio'))
-
-    if precio_tipo_dispositivo['precio__sum'] is not None:
-        precio_tipo_dispositivo = precio_tipo_dispositivo['precio__sum']
-    else:
-        if precio is not None:
-            precio_tipo_dispositivo = len(utiles) * precio
-        else:
-            precio_tipo_dispositivo = 0
 
-    if precio_tipo_compras['precio__sum'] is not None:
-        precio_tipo_compras = precio_tipo_compras['precio__sum']
-    else:
-        precio_tipo_compras = 0
-
-    precio_total = precio_tipo_dispositivo + precio_tipo_compras
-    existencia = len(utiles) + len(compras)
+def get_existencia(tipo_dispositivo, fecha, periodo):
+    """Devuelve la existencia y saldo monetario basado en el tipo de dispositivo,
+    fecha y periodo a buscar. Ver :func:`apps.conta.informes.calcular_existencias`.
+    """
+    existencias = informes.calcular_existencias(
+        [tipo_dispositivo],
+        fecha,
+        periodo,
+        periodos_utiles=informes.periodos_historicos(periodo))
+    return next(iter(existencias.values()))
 
-    result['saldo_total'] = precio_total
-    result['existencia'] = existencia
-    result['precio_estandar'] = precio
-    return result
 
 class PeriodoFiscalCreateView(LoginRequiredMixin, CreateView):
     """ Vista   para obtener los datos de Periodo Fiscal mediante una :class:`PeriodoFiscal`
@@ -227,142 +178,115 @@ class ContabilidadResumenInformeListView(LoginRequiredMixin, FormView):
         form.fields['tipo_dispositivo'].queryset = self.request.user.tipos_dispositivos.tipos.filter(usa_triage=True)
         return form
 
-class InformeCantidadJson(views.APIView):
-    
-    def get(self, request):
+class InformeCantidadJson(ExportarApiMixin, views.APIView):
+    """Existencia y saldo de los tipos contables al cierre del periodo anterior y del actual.
+    El parámetro `dispositivo` indica si se consulta el inventario de dispositivos (`1`) o el de repuestos.
+    Los datos de todos los tipos se obtienen desde :mod:`apps.conta.informes`.
+    """
+    columnas = (
+        ('tipo', 'Tipo'),
+        ('cantidad', 'Existencia'),
+        ('precio_anterior', 'Precio anterior'),
+        ('total_anterior', 'Saldo anterior'),
+        ('precio', 'Precio'),
+        ('total', 'Saldo'),
+    )
+    nombre_archivo = 'existencias'
+
+    def get_filas(self, request):
         repuesto_dispositivo = self.request.GET['dispositivo']
         id_periodo = self.request.GET['periodo']
-        dispositivos = inv_m.DispositivoTipo.objects.all().exclude(conta=False)
-        lista_dispositivos = {}
+        dispositivos = list(inv_m.DispositivoTipo.objects.all().exclude(conta=False))
         lista = []
         acumulador_anterior = 0
         acumulador = 0
-        periodo = conta_m.PeriodoFiscal.objects.get(id=id_periodo)
-        nueva_fecha = periodo.fecha_fin - timedelta(days=365)
-        nueva_fecha_inicio = periodo.fecha_inicio - timedelta(days=365)
-        periodo_anterior = conta_m.PeriodoFiscal.objects.get(fecha_fin=nueva_fecha)
-        periodos_anteriores = conta_m.PeriodoFiscal.objects.filter(fecha_fin__lt=periodo.fecha_inicio).values('id')
         try:
-            for tipo in dispositivos:
-                precio_total_anterior = 0
-                precio_tipo_dispositivo = 0
-                precio_tipo_compras = 0
-                dispositivo = {}
-                if repuesto_dispositivo == str(1):
-                    # Obtener Total Anterior
-                    totales_anterior = get_existencia(tipo,nueva_fecha,periodo_anterior)
-                    precio_anterior = totales_anterior['precio_estandar']
-                    precio_total_anterior = totales_anterior['saldo_total']
-                    acumulador_anterior += precio_total_anterior
-
-                    # Obtener Precio Estandar Actual y Anterior
-                    total_actual = get_existencia(tipo,nueva_fecha,periodo)
-                    precio = total_actual['precio_estandar']
-                    precio_total = total_actual['saldo_total']
-                    acumulador += precio_total
-
-                    # Obtener Existencia
-                    disponible = total_actual['existencia']
+            periodo = conta_m.PeriodoFiscal.objects.get(id=id_periodo)
+            nueva_fecha = periodo.fecha_fin - timedelta(days=365)
+            periodo_anterior = conta_m.PeriodoFiscal.objects.get(fecha_fin=nueva_fecha)
+            if repuesto_dispositivo == str(1):
+                totales_anterior = informes.calcular_existencias(
+                    dispositivos,
+                    nueva_fecha,
+                    periodo_anterior,
+                    periodos_utiles=informes.periodos_historicos(periodo_anterior))
+                totales_actual = informes.calcular_existencias(
+                    dispositivos,
+                    nueva_fecha,
+                    periodo,
+                    periodos_utiles=informes.periodos_historicos(periodo))
+            else:
+                if periodo_anterior.fecha_fin.year <= 2018:
+                    periodos_anteriores = list(conta_m.PeriodoFiscal.objects.filter(
+                        fecha_fin__lt=periodo.fecha_inicio).values_list('id', flat=True))
                 else:
-                    bajas = conta_m.MovimientoRepuesto.objects.filter(
-                        tipo_movimiento=-1,
-                        repuesto__tipo=tipo,
-                        fecha__lte=nueva_fecha).values('repuesto')
-                    compras = conta_m.MovimientoRepuesto.objects.filter(
-                        tipo_movimiento=1,
-                        repuesto__tipo=tipo,
-                        fecha__lte=nueva_fecha,
-                        repuesto__entrada__tipo__contable=True).exclude(repuesto__in=bajas).values('repuesto')
-                    utiles = conta_m.MovimientoRepuesto.objects.filter(
-                        tipo_movimiento=1,
-                        repuesto__tipo=tipo,
-                        fecha__lte=nueva_fecha).exclude(
-                            repuesto__in=bajas).exclude(repuesto__in=compras).values('repuesto')
-                    # Obtener Total Anterior
-                    if periodo_anterior.fecha_fin.year <= 2018:
-                        precio_tipo_dispositivo = conta_m.PrecioRepuesto.objects.filter(
-                            repuesto__in=utiles,
-                            periodo__in=periodos_anteriores).aggregate(Sum('precio'))
-                    else:
-                        precio_tipo_dispositivo = conta_m.PrecioRepuesto.objects.filter(
-                            repuesto__in=utiles,
-                            periodo=periodo_anterior).aggregate(Sum('precio'))
-
-                    precio_tipo_compras = conta_m.PrecioRepuesto.objects.filter(
-                        repuesto__in=compras,
-                        activo=True).aggregate(Sum('precio'))
-
-                    if precio_tipo_dispositivo['precio__sum'] is not None:
-                        precio_tipo_dispositivo = precio_tipo_dispositivo['precio__sum']
-                    else:
-                        precio_tipo_dispositivo = 0
-
-                    if precio_tipo_compras['precio__sum'] is not None:
-                        precio_tipo_compras = precio_tipo_compras['precio__sum']
-                    else:
-                        precio_tipo_compras = 0
-                    precio_total_anterior = precio_tipo_dispositivo + precio_tipo_compras
-                    acumulador_anterior += precio_total_anterior
-                    # Obtener Precio Estandar Actual y Anterior
-                    precio = conta_m.PrecioEstandar.objects.filter(
-                        tipo_dispositivo=tipo,
-                        periodo=periodo,
-                        inventario='repuesto').first().precio
-
-                    precio_anterior = conta_m.PrecioEstandar.objects.filter(
-                        tipo_dispositivo=tipo,
-                        periodo=periodo_anterior,
-                        inventario='repuesto').first().precio
-                    # Obtener Total Actual
-                    precio_tipo_dispositivo = conta_m.PrecioRepuesto.objects.filter(
-                        repuesto__in=utiles,
-                        periodo=periodo).aggregate(Sum('precio'))
-                    precio_tipo_compras = conta_m.PrecioRepuesto.objects.filter(
-                        repuesto__in=compras,
-                        activo=True).aggregate(Sum('precio'))
-
-                    if precio_tipo_dispositivo['precio__sum'] is not None:
-                        precio_tipo_dispositivo = precio_tipo_dispositivo['precio__sum']
-                    else:
-                        if precio is not None:
-                            precio_tipo_dispositivo = len(utiles) * precio
-                        else:
-                            precio_tipo_dispositivo = 0
-
-                    if precio_tipo_compras['precio__sum'] is not None:
-                        precio_tipo_compras = precio_tipo_compras['precio__sum']
-                    else:
-                        precio_tipo_compras = 0
-
-                    precio_total = precio_tipo_dispositivo + precio_tipo_compras
-                    acumulador += precio_total
-                    disponible = len(utiles) + len(compras)
+                    periodos_anteriores = [periodo_anterior.id]
+                totales_anterior = informes.calcular_existencias(
+                    dispositivos,
+                    nueva_fecha,
+                    periodo_anterior,
+                    inventario=informes.REPUESTO,
+                    periodos_utiles=periodos_anteriores,
+                    precio_por_defecto=False)
+                totales_actual = informes.calcular_existencias(
+                    dispositivos,
+                    nueva_fecha,
+                    periodo,
+                    inventario=informes.REPUESTO)
+
+            for tipo in dispositivos:
+                anterior = totales_anterior[tipo.id]
+                actual = totales_actual[tipo.id]
+                precio_anterior = anterior['precio_estandar']
+                precio_total_anterior = anterior['saldo_total']
+                acumulador_anterior += precio_total_anterior
+                precio = actual['precio_estandar']
+                precio_total = actual['saldo_total']
+                acumulador += precio_total
                 if precio is not None and precio_anterior is not None:
-                    dispositivo['tipo'] = tipo.tipo
-                    dispositivo['cantidad'] = disponible
-                    dispositivo['precio'] = str(precio)
-                    dispositivo['precio_anterior'] = precio_anterior
-                    dispositivo['total_anterior'] = precio_total_anterior
-                    dispositivo['total'] = precio_total
-                    dispositivo['acumulador_total'] = acumulador
-                    dispositivo['acumulador_anterior'] = acumulador_anterior
-                    lista.append(dispositivo)
-                    lista_dispositivos[tipo.tipo] = dispositivo
-            return Response(lista)
+                    lista.append({
+                        'tipo': tipo.tipo,
+                        'cantidad': actual['existencia'],
+                        'precio': str(precio),
+                        'precio_anterior': precio_anterior,
+                        'total_anterior': precio_total_anterior,
+                        'total': precio_total,
+                        'acumulador_total': acumulador,
+                        'acumulador_anterior': acumulador_anterior,
+                    })
+            return lista
         except ObjectDoesNotExist as e:
-            return Response(
-                {
-                    'mensaje': str(e)
-                },
-                status=status.HTTP_400_BAD_REQUEST
-            )
+            raise InformeInvalido(str(e))
+
 
+def get_periodo_rango(fecha_inicio, fecha_fin):
+    """Devuelve el :class:`PeriodoFiscal` que contiene todo el rango de fechas del informe.
 
-class InformeEntradaJson(views.APIView):
+    Raises:
+        InformeInvalido: si el rango no pertenece a un solo período fiscal.
+    """
+    validar_fecha = conta_m.PeriodoFiscal.objects.filter(fecha_inicio__lte=fecha_inicio, fecha_fin__gte=fecha_fin)
+    if validar_fecha.count() != 1:
+        raise InformeInvalido('El rango de fechas no pertenece a un solo período fiscal')
+    return validar_fecha[0]
+
+
+class InformeEntradaJson(ExportarApiMixin, views.APIView):
     """ Si es Donacion o Contenedor ir a traer el precio estandar del modelo de contabilidad
     en caso contrario desde el precio_unitario del detalle de entrada
     """
-    def get(self, request):
+    columnas = (
+        ('fecha', 'Fecha'),
+        ('id', 'Entrada'),
+        ('tipo', 'Tipo de entrada'),
+        ('proveedor', 'Proveedor'),
+        ('util', 'Cantidad'),
+        ('precio', 'Precio'),
+        ('total', 'Total'),
+    )
+    nombre_archivo = 'entradas'
+
+    def get_filas(self, request):
         try:
             donante = self.request.GET['donante']
         except MultiValueDictKeyError as e:
@@ -381,57 +305,64 @@ class InformeEntradaJson(views.APIView):
         tipo_dispositivo_nombre = inv_m.DispositivoTipo.objects.get(pk=tipo_dispositivo)
 
         # Validar que el rango de fechas pertenezcan a un solo período fiscal
-        validar_fecha = conta_m.PeriodoFiscal.objects.filter(fecha_inicio__lte=fecha_inicio, fecha_fin__gte=fecha_fin)
-        if validar_fecha.count() == 1:
-
-            # Obtener datos de Periodo Fiscal
-            periodo = validar_fecha[0]
-            lista_dispositivos = {}
-            lista = []
-
-            # Preparar Filtros de Búsqueda
-            q = []
-            q.append(Q(tipo_dispositivo=tipo_dispositivo))
-
-            if donante and donante != 0:
-                q.append(Q(entrada__proveedor=donante))
-
-            if tipo_entrada and tipo_entrada != 0:
-                q.append(Q(entrada__tipo__in=tipo_entrada))
-
-            # obtener Listado de Detalles de Entrada Aplicando Filtros
-            entrada_detalle = inv_m.EntradaDetalle.objects.values('entrada','precio_unitario').filter(
-                        Q(fecha_dispositivo__gte=fecha_inicio),
-                        Q(fecha_dispositivo__lte=fecha_fin),
-                        reduce(AND,q)
-                        ).exclude(entrada__tipo__nombre='Especial').annotate(Sum('util'),Sum('precio_unitario'))
-
-
-            # Obtener Existencia Inicial y Saldo Inicial
-            fecha_inicial = datetime.strptime(fecha_inicio, '%Y-%m-%d') - timedelta(days=1)
-            totales_anterior = get_existencia(tipo_dispositivo,fecha_inicial,periodo)
-            precio_anterior = totales_anterior['precio_estandar']
-            precio_total_anterior = totales_anterior['saldo_total']
-            existencia_anterior = totales_anterior['existencia']
-
-            # Obtener Existencia Final y Saldo Final
-            total_actual = get_existencia(tipo_dispositivo,fecha_fin,periodo)
-            precio_actual = total_actual['precio_estandar']
-            precio_total = total_actual['saldo_total']
-            existencia_actual = total_actual['existencia']
+        periodo = get_periodo_rango(fecha_inicio, fecha_fin)
+
+        # Preparar Filtros de Búsqueda
+        q = []
+        q.append(Q(tipo_dispositivo=tipo_dispositivo))
+
+        if donante and donante != 0:
+            q.append(Q(entrada__proveedor=donante))
+
+        if tipo_entrada and tipo_entrada != 0:
+            q.append(Q(entrada__tipo__in=tipo_entrada))
+
+        # obtener Listado de Detalles de Entrada Aplicando Filtros
+        entrada_detalle = list(inv_m.EntradaDetalle.objects.values('entrada', 'precio_unitario').filter(
+                    Q(fecha_dispositivo__gte=fecha_inicio),
+                    Q(fecha_dispositivo__lte=fecha_fin),
+                    reduce(AND, q)
+                    ).exclude(entrada__tipo__nombre='Especial').annotate(Sum('util'), Sum('precio_unitario')))
+        entradas = inv_m.Entrada.objects.select_related('tipo', 'proveedor').in_bulk(
+            {datos_entrada['entrada'] for datos_entrada in entrada_detalle})
+
+        # Obtener Existencia Inicial y Saldo Inicial
+        fecha_inicial = datetime.strptime(fecha_inicio, '%Y-%m-%d') - timedelta(days=1)
+        totales_anterior = get_existencia(tipo_dispositivo, fecha_inicial, periodo)
+        precio_total_anterior = totales_anterior['saldo_total']
+        existencia_anterior = totales_anterior['existencia']
+
+        # Obtener Existencia Final y Saldo Final
+        total_actual = get_existencia(tipo_dispositivo, fecha_fin, periodo)
+        precio_total = total_actual['saldo_total']
+        existencia_actual = total_actual['existencia']
+
+        def usa_precio_estandar(datos_entrada):
+            """Las donaciones y contenedores sin precio de compra se valoran con el precio estándar."""
+            precio = datos_entrada['precio_unitario__sum']
+            return (not precio or precio == 0) and not entradas[datos_entrada['entrada']].tipo.contable
+
+        # Obtener Precio Estandar, el mismo para todas las entradas del informe. Se obtiene antes de generar
+        # las filas para que el error se responda como informe inválido y no a mitad de la exportación.
+        precio_estandar = None
+        if any(usa_precio_estandar(datos_entrada) for datos_entrada in entrada_detalle):
+            try:
+                precio_estandar = conta_m.PrecioEstandar.objects.get(
+                    tipo_dispositivo=tipo_dispositivo,
+                    periodo=periodo,
+                    inventario="dispositivo").precio
+            except ObjectDoesNotExist as e:
+                raise InformeInvalido(str(e))
+
+        def filas():
             for datos_entrada in entrada_detalle:
-                entrada = inv_m.Entrada.objects.get(pk=datos_entrada['entrada'])
-                precio = datos_entrada['precio_unitario__sum']
+                entrada = entradas[datos_entrada['entrada']]
                 cantidad = datos_entrada['util__sum']
                 dispositivo = {}
-                
+
                 # Validar Precio de Compra y Donación
-                if (not precio or precio == 0) and not entrada.tipo.contable:
-                    # Obtener Precio Estandar
-                    precio = conta_m.PrecioEstandar.objects.get(
-                        tipo_dispositivo=tipo_dispositivo,
-                        periodo=periodo,
-                        inventario="dispositivo").precio
+                if usa_precio_estandar(datos_entrada):
+                    precio = precio_estandar
                 else:
                     precio = 0
                 dispositivo['fecha'] = entrada.fecha
@@ -448,15 +379,22 @@ class InformeEntradaJson(views.APIView):
                 dispositivo['tipo_dispositivo'] = tipo_dispositivo_nombre.tipo
                 dispositivo['total_costo_despues'] = precio_total
                 dispositivo['total_despues'] = existencia_actual
-                lista.append(dispositivo)
-            return Response(lista)
-        else:
-            print("No existe en el periodo fiscal")
+                yield dispositivo
+        return filas()
+
 
-class InformeEntradaDispositivoJson(views.APIView):
+class InformeEntradaDispositivoJson(ExportarApiMixin, views.APIView):
     """ Lista los dispositivos ingresados al sistema por rango de fechas
     """
-    def get(self, request):
+    columnas = (
+        ('triage', 'Triage'),
+        ('entrada', 'Entrada'),
+        ('fecha', 'Fecha'),
+        ('tipo_entrada', 'Tipo de entrada'),
+    )
+    nombre_archivo = 'entrada_dispositivos'
+
+    def get_filas(self, request):
         try:
             no_entrada = self.request.GET['no_entrada']
         except MultiValueDictKeyError as e:
@@ -468,64 +406,67 @@ class InformeEntradaDispositivoJson(views.APIView):
         tipo_dispositivo_nombre = inv_m.DispositivoTipo.objects.get(pk=tipo_dispositivo)
 
         # Validar que el rango de fechas pertenezcan a un solo período fiscal
-        validar_fecha = conta_m.PeriodoFiscal.objects.filter(fecha_inicio__lte=fecha_inicio, fecha_fin__gte=fecha_fin)
-        print(validar_fecha)
-        if validar_fecha.count() == 1:
-
-            # Obtener datos de Periodo Fiscal
-            periodo = validar_fecha[0]
-            lista_dispositivos = {}
-            lista = []
-
-            # Preparar Filtros de Búsqueda
-            q = []
-            q.append(Q(tipo=tipo_dispositivo))
-
-            if no_entrada and no_entrada != 0:
-                q.append(Q(entrada_detalle__entrada=no_entrada))
-
-            # obtener Listado de Detalles de Entrada Aplicando Filtros
-            entrada_detalle = inv_m.Dispositivo.objects.filter(
-                        Q(entrada_detalle__fecha_dispositivo__gte=fecha_inicio),
-                        Q(entrada_detalle__fecha_dispositivo__lte=fecha_fin),
-                        reduce(AND,q)
-                        ).exclude(entrada_detalle__entrada__tipo__nombre='Especial')
-
-            print(entrada_detalle)
-
-            # Obtener Existencia Inicial y Saldo Inicial
-            fecha_inicial = datetime.strptime(fecha_inicio, '%Y-%m-%d') - timedelta(days=1)
-            totales_anterior = get_existencia(tipo_dispositivo,fecha_inicial,periodo)
-            existencia_anterior = totales_anterior['existencia']
-
-            # Obtener Existencia Final y Saldo Final
-            total_actual = get_existencia(tipo_dispositivo,fecha_fin,periodo)
-            existencia_actual = total_actual['existencia']
-
-            for detalle in entrada_detalle:
-                entrada = inv_m.Entrada.objects.get(pk=detalle.entrada_detalle.entrada.id)
+        periodo = get_periodo_rango(fecha_inicio, fecha_fin)
+
+        # Preparar Filtros de Búsqueda
+        q = []
+        q.append(Q(tipo=tipo_dispositivo))
+
+        if no_entrada and no_entrada != 0:
+            q.append(Q(entrada_detalle__entrada=no_entrada))
+
+        # obtener Listado de Detalles de Entrada Aplicando Filtros
+        entrada_detalle = inv_m.Dispositivo.objects.filter(
+                    Q(entrada_detalle__fecha_dispositivo__gte=fecha_inicio),
+                    Q(entrada_detalle__fecha_dispositivo__lte=fecha_fin),
+                    reduce(AND, q)
+                    ).exclude(entrada_detalle__entrada__tipo__nombre='Especial').select_related(
+                    'entrada_detalle__entrada__tipo')
+
+        # Obtener Existencia Inicial y Saldo Inicial
+        fecha_inicial = datetime.strptime(fecha_inicio, '%Y-%m-%d') - timedelta(days=1)
+        totales_anterior = get_existencia(tipo_dispositivo, fecha_inicial, periodo)
+        existencia_anterior = totales_anterior['existencia']
+
+        # Obtener Existencia Final y Saldo Final
+        total_actual = get_existencia(tipo_dispositivo, fecha_fin, periodo)
+        existencia_actual = total_actual['existencia']
+
+        def filas():
+            for detalle in entrada_detalle.iterator():
+                entrada = detalle.entrada_detalle.entrada
                 dispositivo = {}
-            
+
                 dispositivo['triage'] = detalle.triage
-                dispositivo['entrada'] = detalle.entrada_detalle.entrada.id
+                dispositivo['entrada'] = entrada.id
                 dispositivo['fecha'] = detalle.entrada_detalle.fecha_dispositivo
-                dispositivo['tipo_entrada'] = detalle.entrada_detalle.entrada.tipo.nombre
+                dispositivo['tipo_entrada'] = entrada.tipo.nombre
                 dispositivo['url'] = detalle.get_absolute_url()
-                dispositivo['url_entrada'] = detalle.entrada_detalle.entrada.get_absolute_url()
-    
+                dispositivo['url_entrada'] = entrada.get_absolute_url()
+
                 dispositivo['total_final'] = existencia_anterior
                 dispositivo['rango_fechas'] = str(fecha_inicio)+"  AL  "+str(fecha_fin)
                 dispositivo['tipo_dispositivo'] = tipo_dispositivo_nombre.tipo
                 dispositivo['total_despues'] = existencia_actual
-                lista.append(dispositivo)
-            return Response(lista)
-        else:
-            print("No existe en el periodo fiscal")
+                yield dispositivo
+        return filas()
+
 
-class InformeSalidaJson(views.APIView):
+class InformeSalidaJson(ExportarApiMixin, views.APIView):
     """ Listar las salidas por el tipo seleccionado, si es compra o no traer o excluir los dispositivos de compra del listado. 
     """
-    def get(self, request):
+    columnas = (
+        ('fecha', 'Fecha'),
+        ('no_salida', 'No. de salida'),
+        ('tipo', 'Tipo de salida'),
+        ('beneficiado', 'Beneficiado'),
+        ('util', 'Cantidad'),
+        ('precio', 'Precio'),
+        ('total', 'Total'),
+    )
+    nombre_archivo = 'salidas'
+
+    def get_filas(self, request):
         try:
             udi = self.request.GET['udi']
         except MultiValueDictKeyError as e:
@@ -561,71 +502,68 @@ class InformeSalidaJson(views.APIView):
         tipo_dispositivo_nombre = inv_m.DispositivoTipo.objects.get(pk=tipo_dispositivo)
 
         # Validar que el rango de fechas pertenezcan a un solo período fiscal
-        validar_fecha = conta_m.PeriodoFiscal.objects.filter(fecha_inicio__lte=fecha_inicio, fecha_fin__gte=fecha_fin)
-        if validar_fecha.count() == 1:
-
-            # Obtener datos de Periodo Fiscal
-            periodo = validar_fecha[0]
-            salida_especial = inv_m.SalidaTipo.objects.get(especial=True)
-            tipo_compra =  inv_m.EntradaTipo.objects.get(contable=True)
-            lista_dispositivos = {}
-            lista = []
-
-            # Armar Query de Consulta
-            sql_select = '''SELECT isi.id as 'Salida', COUNT(*) AS 'CANTIDAD', cpd.precio AS 'PRECIO', SUM(cpd.precio) AS 'TOTAL' 
-                    FROM inventario_dispositivopaquete idp
-                    INNER JOIN inventario_dispositivo id on idp.dispositivo_id = id.id
-                    INNER JOIN inventario_paquete ip on idp.paquete_id = ip.id
-                    INNER JOIN inventario_salidainventario isi on ip.salida_id = isi.id
-                    INNER JOIN inventario_entrada ie on id.entrada_id = ie.id
-                    INNER JOIN conta_preciodispositivo cpd on idp.dispositivo_id = cpd.dispositivo_id'''
-
-            sql_where = """ WHERE id.tipo_id = {tipo_dispositivo}
-                    AND isi.en_creacion = 0
-                    AND isi.fecha between '{fecha_inicio}' AND '{fecha_fin}'
-                    AND isi.tipo_salida_id <> {especial}
-                    AND cpd.activo = 1""".format(tipo_dispositivo = tipo_dispositivo,
-                                                                                        fecha_inicio=fecha_inicio,
-                                                                                        fecha_fin=fecha_fin,
-                                                                                        especial=salida_especial.id)
-            sql_group = " GROUP BY isi.id, cpd.precio"
-
-            if udi and udi != 0:
-                escuela = escuela_m.Escuela.objects.get(codigo=udi)
-                if escuela:
-                    sql_where += " AND isi.escuela_id = " + str(escuela.id)
-
-            if beneficiado and beneficiado != 0:
-                sql_where += " AND isi.beneficiario_id = " + str(beneficiado)
-
-            if tipo_salida and tipo_salida != 0:
-                sql_where += " AND isi.tipo_salida_id in (" + ','.join(tipo_salida) + ")"
-
-            if compra and not donaciones:
-                sql_where += " AND ie.tipo_id = " + str(tipo_compra.id)
-            elif not compra and donaciones:
-                sql_where += " AND ie.tipo_id <> " + str(tipo_compra.id)
-
-            sql_query = sql_select + sql_where + sql_group
-
-            with connection.cursor() as cursor:
-                cursor.execute(sql_query)
-                result =cursor.fetchall()
-
-            # Obtener Existencia Inicial y Saldo Inicial
-            fecha_inicial = datetime.strptime(fecha_inicio, '%Y-%m-%d') - timedelta(days=1)
-            totales_anterior = get_existencia(tipo_dispositivo,fecha_inicial,periodo)
-            precio_anterior = totales_anterior['precio_estandar']
-            precio_total_anterior = totales_anterior['saldo_total']
-            existencia_anterior = totales_anterior['existencia']
-
-            # Obtener Existencia Final y Saldo Final
-            total_actual = get_existencia(tipo_dispositivo,fecha_fin,periodo)
-            precio_actual = total_actual['precio_estandar']
-            precio_total = total_actual['saldo_total']
-            existencia_actual = total_actual['existencia']
+        periodo = get_periodo_rango(fecha_inicio, fecha_fin)
+        salida_especial = inv_m.SalidaTipo.objects.get(especial=True)
+        tipo_compra =  inv_m.EntradaTipo.objects.get(contable=True)
+
+        # Armar Query de Consulta
+        sql_select = '''SELECT isi.id as 'Salida', COUNT(*) AS 'CANTIDAD', cpd.precio AS 'PRECIO', SUM(cpd.precio) AS 'TOTAL' 
+                FROM inventario_dispositivopaquete idp
+                INNER JOIN inventario_dispositivo id on idp.dispositivo_id = id.id
+                INNER JOIN inventario_paquete ip on idp.paquete_id = ip.id
+                INNER JOIN inventario_salidainventario isi on ip.salida_id = isi.id
+                INNER JOIN inventario_entrada ie on id.entrada_id = ie.id
+                INNER JOIN conta_preciodispositivo cpd on idp.dispositivo_id = cpd.dispositivo_id'''
+
+        sql_where = """ WHERE id.tipo_id = {tipo_dispositivo}
+                AND isi.en_creacion = 0
+                AND isi.fecha between '{fecha_inicio}' AND '{fecha_fin}'
+                AND isi.tipo_salida_id <> {especial}
+                AND cpd.activo = 1""".format(tipo_dispositivo = tipo_dispositivo,
+                                                                                    fecha_inicio=fecha_inicio,
+                                                                                    fecha_fin=fecha_fin,
+                                                                                    especial=salida_especial.id)
+        sql_group = " GROUP BY isi.id, cpd.precio"
+
+        if udi and udi != 0:
+            escuela = escuela_m.Escuela.objects.get(codigo=udi)
+            if escuela:
+                sql_where += " AND isi.escuela_id = " + str(escuela.id)
+
+        if beneficiado and beneficiado != 0:
+            sql_where += " AND isi.beneficiario_id = " + str(beneficiado)
+
+        if tipo_salida and tipo_salida != 0:
+            sql_where += " AND isi.tipo_salida_id in (" + ','.join(tipo_salida) + ")"
+
+        if compra and not donaciones:
+            sql_where += " AND ie.tipo_id = " + str(tipo_compra.id)
+        elif not compra and donaciones:
+            sql_where += " AND ie.tipo_id <> " + str(tipo_compra.id)
+
+
+        sql_query = sql_select + sql_where + sql_group
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql_query)
+            result =cursor.fetchall()
+        salidas = inv_m.SalidaInventario.objects.select_related(
+            'escuela', 'beneficiario', 'tipo_salida').in_bulk({datos_salida[0] for datos_salida in result})
+
+        # Obtener Existencia Inicial y Saldo Inicial
+        fecha_inicial = datetime.strptime(fecha_inicio, '%Y-%m-%d') - timedelta(days=1)
+        totales_anterior = get_existencia(tipo_dispositivo, fecha_inicial, periodo)
+        precio_total_anterior = totales_anterior['saldo_total']
+        existencia_anterior = totales_anterior['existencia']
+
+        # Obtener Existencia Final y Saldo Final
+        total_actual = get_existencia(tipo_dispositivo, fecha_fin, periodo)
+        precio_total = total_actual['saldo_total']
+        existencia_actual = total_actual['existencia']
+
+        def filas():
             for datos_salida in result:
-                salida = inv_m.SalidaInventario.objects.get(pk=datos_salida[0])
+                salida = salidas[datos_salida[0]]
                 cantidad = datos_salida[1]
                 precio = datos_salida[2]
                 total = datos_salida[3]
@@ -653,16 +591,25 @@ class InformeSalidaJson(views.APIView):
                 dispositivo['tipo_dispositivo'] = tipo_dispositivo_nombre.tipo
                 dispositivo['total_costo_despues'] = precio_total
                 dispositivo['total_despues'] = existencia_actual
-                lista.append(dispositivo)
-            return Response(lista)
-        else:
-            print("No existe en el periodo fiscal")
+                yield dispositivo
+        return filas()
+
 
-class InformeDesechoJson(views.APIView):
+class InformeDesechoJson(ExportarApiMixin, views.APIView):
     """ Lista todas las salidas de desecho con triage que han sucedido en un rango de fechas, 
     Solamente cuentan aquellas salidas que han sido cerradas. 
     """
-    def get(self, request):
+    columnas = (
+        ('fecha', 'Fecha'),
+        ('id', 'Desecho'),
+        ('recolectora', 'Empresa recolectora'),
+        ('util', 'Cantidad'),
+        ('precio', 'Precio'),
+        ('total', 'Total'),
+    )
+    nombre_archivo = 'desechos'
+
+    def get_filas(self, request):
         try:
             empresa = self.request.GET['empresa']
         except MultiValueDictKeyError as e:
@@ -674,53 +621,50 @@ class InformeDesechoJson(views.APIView):
         tipo_dispositivo_nombre = inv_m.DispositivoTipo.objects.get(pk=tipo_dispositivo)
 
         # Validar que el rango de fechas pertenezcan a un solo período fiscal
-        validar_fecha = conta_m.PeriodoFiscal.objects.filter(fecha_inicio__lte=fecha_inicio, fecha_fin__gte=fecha_fin)
-        if validar_fecha.count() == 1:
-
-            # Obtener datos de Periodo Fiscal
-            periodo = validar_fecha[0]
-            lista_dispositivos = {}
-            lista = []
-
-            # Preparar Filtros de Búsqueda
-            q = []
-            q.append(Q(dispositivo__tipo=tipo_dispositivo))
-
-            if empresa and empresa != 0:
-                q.append(Q(desecho__empresa=empresa))
-
-            # obtener Listado de Detalles de Desecho Aplicando Filtros
-            salida_detalle = inv_m.DesechoDispositivo.objects.values('desecho').filter(
-                        Q(desecho__fecha__gte=fecha_inicio),
-                        Q(desecho__fecha__lte=fecha_fin),
-                        Q(aprobado=True),
-                        Q(desecho__en_creacion=False),
-                        reduce(AND,q)
-                        ).annotate(Count('dispositivo'))
-
-            # Obtener Existencia Inicial y Saldo Inicial
-            fecha_inicial = datetime.strptime(fecha_inicio, '%Y-%m-%d') - timedelta(days=1)
-            totales_anterior = get_existencia(tipo_dispositivo,fecha_inicial,periodo)
-            precio_anterior = totales_anterior['precio_estandar']
-            precio_total_anterior = totales_anterior['saldo_total']
-            existencia_anterior = totales_anterior['existencia']
-
-            # Obtener Existencia Final y Saldo Final
-            total_actual = get_existencia(tipo_dispositivo,fecha_fin,periodo)
-            precio_actual = total_actual['precio_estandar']
-            precio_total = total_actual['saldo_total']
-            existencia_actual = total_actual['existencia']
-            
+        periodo = get_periodo_rango(fecha_inicio, fecha_fin)
+
+        # Preparar Filtros de Búsqueda
+        q = []
+        q.append(Q(dispositivo__tipo=tipo_dispositivo))
+
+        if empresa and empresa != 0:
+            q.append(Q(desecho__empresa=empresa))
+
+        # obtener Listado de Detalles de Desecho Aplicando Filtros
+        salida_detalle = list(inv_m.DesechoDispositivo.objects.values('desecho').filter(
+                    Q(desecho__fecha__gte=fecha_inicio),
+                    Q(desecho__fecha__lte=fecha_fin),
+                    Q(aprobado=True),
+                    Q(desecho__en_creacion=False),
+                    reduce(AND, q)
+                    ).annotate(Count('dispositivo')))
+        desechos = inv_m.DesechoSalida.objects.select_related('empresa').in_bulk(
+            {datos_desecho['desecho'] for datos_desecho in salida_detalle})
+
+        # Obtener Existencia Inicial y Saldo Inicial
+        fecha_inicial = datetime.strptime(fecha_inicio, '%Y-%m-%d') - timedelta(days=1)
+        totales_anterior = get_existencia(tipo_dispositivo, fecha_inicial, periodo)
+        precio_total_anterior = totales_anterior['saldo_total']
+        existencia_anterior = totales_anterior['existencia']
+
+        # Obtener Existencia Final y Saldo Final
+        total_actual = get_existencia(tipo_dispositivo, fecha_fin, periodo)
+        precio_total = total_actual['saldo_total']
+        existencia_actual = total_actual['existencia']
+
+        def filas():
+            precio = None
             for datos_desecho in salida_detalle:
-                salida = inv_m.DesechoSalida.objects.get(pk=datos_desecho['desecho'])
+                salida = desechos[datos_desecho['desecho']]
                 cantidad = datos_desecho['dispositivo__count']
                 dispositivo = {}
-                
-                # Obtener Precio Estandar
-                precio = conta_m.PrecioEstandar.objects.get(
-                    tipo_dispositivo=tipo_dispositivo,
-                    periodo=periodo,
-                    inventario="dispositivo").precio
+
+                # Obtener Precio Estandar, el mismo para todos los desechos del informe
+                if precio is None:
+                    precio = conta_m.PrecioEstandar.objects.get(
+                        tipo_dispositivo=tipo_dispositivo,
+                        periodo=periodo,
+                        inventario="dispositivo").precio
 
                 dispositivo['fecha'] = salida.fecha
                 dispositivo['id'] = salida.id
@@ -735,16 +679,26 @@ class InformeDesechoJson(views.APIView):
                 dispositivo['tipo_dispositivo'] = tipo_dispositivo_nombre.tipo
                 dispositivo['total_costo_despues'] = precio_total
                 dispositivo['total_despues'] = existencia_actual
-                lista.append(dispositivo)
-            return Response(lista)
-        else:
-            print("No existe en el periodo fiscal")
+                yield dispositivo
+        return filas()
+
 
-class InformeResumenJson(views.APIView):
+class InformeResumenJson(ExportarApiMixin, views.APIView):
     """ Lista todas las salidas de desecho con triage que han sucedido en un rango de fechas, 
     Solamente cuentan aquellas salidas que han sido cerradas. 
     """
-    def get(self, request):
+    columnas = (
+        ('tipo', 'Tipo'),
+        ('existencia_anterior', 'Existencia inicial'),
+        ('saldo_anterior', 'Saldo inicial'),
+        ('entradas', 'Entradas'),
+        ('salidas', 'Salidas'),
+        ('existencia', 'Existencia final'),
+        ('saldo_actual', 'Saldo final'),
+    )
+    nombre_archivo = 'resumen'
+
+    def get_filas(self, request):
         fecha_inicio = self.request.GET['fecha_min']
         fecha_fin = self.request.GET['fecha_max']
         try:
@@ -763,76 +717,65 @@ class InformeResumenJson(views.APIView):
             dispositivos = self.request.user.tipos_dispositivos.tipos.filter(id__in=tipo_dispositivo)
 
         # Validar que el rango de fechas pertenezcan a un solo período fiscal
-        validar_fecha = conta_m.PeriodoFiscal.objects.filter(fecha_inicio__lte=fecha_inicio, fecha_fin__gte=fecha_fin)
+        periodo = get_periodo_rango(fecha_inicio, fecha_fin)
         acumulador = 0
         acumulador_anterior = 0
         acumulador_ant_ex = 0
         acumulador_act_ex = 0
+        dispositivos = list(dispositivos)
+        lista = []
 
-        if validar_fecha.count() == 1:
-            # Obtener datos de Periodo Fiscal
-            periodo = validar_fecha[0]
-            lista_dispositivos = {}
-            lista = []
-            for tipo in dispositivos:
-                dispositivo = {}
-                # Obtener Saldo Anterior
-                fecha_inicial = datetime.strptime(fecha_inicio, '%Y-%m-%d') - timedelta(days=1)
-                totales_anterior = get_existencia(tipo,fecha_inicial,periodo)
-                precio_total_anterior = totales_anterior['saldo_total']
-                existencia_anterior = totales_anterior['existencia']
-                acumulador_anterior += precio_total_anterior
-                acumulador_ant_ex += existencia_anterior
-
-                # Obtener Saldo Actual
-                total_actual = get_existencia(tipo,fecha_fin,periodo)
-                precio = total_actual['precio_estandar']
-                precio_total = total_actual['saldo_total']
-                existencia = total_actual['existencia']
-                acumulador += precio_total
-                acumulador_act_ex += existencia
-
-                # Obtener Total de Entradas
-                entradas = inv_m.EntradaDetalle.objects.filter(
-                        Q(fecha_dispositivo__gte=fecha_inicio),
-                        Q(fecha_dispositivo__lte=fecha_fin),
-                        Q(tipo_dispositivo=tipo)
-                        ).aggregate(Sum('util'))
-
-                if entradas['util__sum'] is not None:
-                    entradas = entradas['util__sum']
-                else:
-                    entradas = 0
-
-                # Obtener Total de Salidas
-                salida_especial = inv_m.SalidaTipo.objects.get(especial=True)
-                salidas = len(inv_m.DispositivoPaquete.objects.filter(
-                        Q(paquete__salida__fecha__gte=fecha_inicio),
-                        Q(paquete__salida__fecha__lte=fecha_fin),
-                        Q(dispositivo__tipo=tipo),
-                        Q(paquete__salida__en_creacion=False)))
-
-                desecho = len(inv_m.DesechoDispositivo.objects.filter(
-                        Q(desecho__fecha__gte=fecha_inicio),
-                        Q(desecho__fecha__lte=fecha_fin),
-                        Q(dispositivo__tipo=tipo),
-                        Q(desecho__en_creacion=False)))
-
-                salidas += desecho
-
-                dispositivo['tipo'] = tipo.tipo
-                dispositivo['existencia_anterior'] = existencia_anterior
-                dispositivo['saldo_anterior'] = precio_total_anterior
-                dispositivo['entradas'] = str(entradas)
-                dispositivo['salidas'] = salidas
-                dispositivo['existencia'] = existencia
-                dispositivo['saldo_actual'] = precio_total
-                dispositivo['costo_inicial'] = acumulador_anterior
-                dispositivo['total_inicial'] = acumulador_ant_ex
-                dispositivo['rango_fechas'] = str(fecha_inicio)+"  AL  "+str(fecha_fin)
-                dispositivo['costo_final'] = acumulador
-                dispositivo['total_final'] = acumulador_act_ex
-                lista.append(dispositivo)
-            return Response(lista)
-        else:
-            print("No existe en el periodo fiscal")
\ No newline at end of file
+        # Obtener Saldo Anterior y Actual de todos los tipos
+        fecha_inicial = datetime.strptime(fecha_inicio, '%Y-%m-%d') - timedelta(days=1)
+        periodos_utiles = informes.periodos_historicos(periodo)
+        totales_anterior = informes.calcular_existencias(
+            dispositivos, fecha_inicial, periodo, periodos_utiles=periodos_utiles)
+        totales_actual = informes.calcular_existencias(
+            dispositivos, fecha_fin, periodo, periodos_utiles=periodos_utiles)
+
+        # Obtener Total de Entradas
+        entradas = dict(inv_m.EntradaDetalle.objects.filter(
+            fecha_dispositivo__gte=fecha_inicio,
+            fecha_dispositivo__lte=fecha_fin,
+            tipo_dispositivo__in=dispositivos).order_by().values_list('tipo_dispositivo').annotate(Sum('util')))
+
+        # Obtener Total de Salidas
+        salidas = dict(inv_m.DispositivoPaquete.objects.filter(
+            paquete__salida__fecha__gte=fecha_inicio,
+            paquete__salida__fecha__lte=fecha_fin,
+            dispositivo__tipo__in=dispositivos,
+            paquete__salida__en_creacion=False).order_by().values_list('dispositivo__tipo').annotate(Count('id')))
+        desecho = dict(inv_m.DesechoDispositivo.objects.filter(
+            desecho__fecha__gte=fecha_inicio,
+            desecho__fecha__lte=fecha_fin,
+            dispositivo__tipo__in=dispositivos,
+            desecho__en_creacion=False).order_by().values_list('dispositivo__tipo').annotate(Count('id')))
+
+        for tipo in dispositivos:
+            totales = totales_anterior[tipo.id]
+            precio_total_anterior = totales['saldo_total']
+            existencia_anterior = totales['existencia']
+            acumulador_anterior += precio_total_anterior
+            acumulador_ant_ex += existencia_anterior
+
+            totales = totales_actual[tipo.id]
+            precio_total = totales['saldo_total']
+            existencia = totales['existencia']
+            acumulador += precio_total
+            acumulador_act_ex += existencia
+
+            lista.append({
+                'tipo': tipo.tipo,
+                'existencia_anterior': existencia_anterior,
+                'saldo_anterior': precio_total_anterior,
+                'entradas': str(entradas.get(tipo.id) or 0),
+                'salidas': salidas.get(tipo.id, 0) + desecho.get(tipo.id, 0),
+                'existencia': existencia,
+                'saldo_actual': precio_total,
+                'costo_inicial': acumulador_anterior,
+                'total_inicial': acumulador_ant_ex,
+                'rango_fechas': str(fecha_inicio)+"  AL  "+str(fecha_fin),
+                'costo_final': acumulador,
+                'total_final': acumulador_act_ex,
+            })
+        return lista
@@ -0,0 +1,33 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+# Importación de las notas de los alumnos desde Excel.
+from apps.controlNotas import models as control_m
+from apps.main.importar import Importador
+
+
+class ImportadorNotas(Importador):
+    """Lee el nombre y la nota de cada alumno (primera y segunda columna, sin encabezado) para mostrarlos
+    en la tabla de la evaluación, donde se corrigen antes de guardarlos con :meth:`guardar_notas`.
+    """
+    tipo = 'impacto'
+    modelo = control_m.Notas
+    fila_inicial = 1
+
+    def procesar(self, importacion, errores):
+        self.datos = []
+        super(ImportadorNotas, self).procesar(importacion, errores)
+
+    def crear(self, fila):
+        fila = tuple(fila) + (None,) * (2 - len(fila))
+        self.datos.append({'nombre': fila[0], 'nota': fila[1]})
+        return None
+
+    def guardar_notas(self, evaluacion, datos):
+        """Crea por lotes las :class:`Notas` de `evaluacion` con los nombres y notas de `datos`."""
+        notas = [
+            control_m.Notas(evaluacion=evaluacion, alumno=info['nombre'], nota=info['nota'])
+            for info in datos]
+        for inicio in range(0, len(notas), self.tamano_lote):
+            self.guardar(notas[inicio:inicio + self.tamano_lote])
+        return len(notas)
@@ -2,20 +2,20 @@ from django.shortcuts import render
 from django.views.generic import TemplateView
 from django.views.generic.edit import CreateView, UpdateView, FormView
 from django.urls import reverse_lazy
-from openpyxl import load_workbook
 from django.http import HttpResponse, HttpResponseRedirect
 from rest_framework import views, status
 from rest_framework.response import Response
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
 from braces.views import (
     LoginRequiredMixin, GroupRequiredMixin)
-import os
-from django.conf import settings
-from django.core.files.storage import FileSystemStorage
 import json
 from apps.escuela.models import Escuela
 from apps.controlNotas import models as control_m
 from apps.controlNotas import forms as control_f
+from apps.controlNotas.importar import ImportadorNotas
+from apps.main import importar
+from apps.main.models import Importacion
 from django.db.models import Avg, Count, Min, Sum
 import shutil
 
@@ -27,13 +27,8 @@ class RegistrosExcelAddView(LoginRequiredMixin, TemplateView, GroupRequiredMixin
     template_name = 'controlNotas/cargar_excel.html'
     def post(self,request):
         if request.method == 'POST' and request.FILES['myfile']:
-            file_list =os.listdir(settings.MEDIA_ROOT_EXCEL_IMPACTO)
-            number_file=len(file_list)
-            myfile=request.FILES['myfile']
-            new_name=str('Impacto') + str(number_file+1) +str(".")+str(myfile.name.split(".")[-1])
-            fs=FileSystemStorage(location=settings.MEDIA_ROOT_EXCEL_IMPACTO)
-            filename=fs.save(new_name, myfile)
-            uploaded_file_url=fs.url(filename)
+            importacion = importar.registrar(ImportadorNotas.tipo, request.FILES['myfile'], request.user)
+            uploaded_file_url=importacion.archivo.url
             return render(request, 'controlNotas/cargar_excel.html',{
                 'uploaded_file_url':uploaded_file_url})
         return render(request,'ControlNotas/cargar_excel.html')
@@ -91,26 +86,22 @@ class ResultadoNotasJson(LoginRequiredMixin, views.APIView):
         """ Importar registros de excel con DjangoRestFramework para Bienestar
         """
         def get(self, request):
-            datos_enviar=[]
-            file_list =os.listdir(settings.MEDIA_ROOT_EXCEL_IMPACTO)
-            number_file=len(file_list)
-            name_file =file_list[number_file-1]
-            ruta = str(settings.MEDIA_ROOT_EXCEL_IMPACTO)+str(name_file)
-            listado_datos=[]
-            wb_obj = load_workbook(filename = ruta)
-            sheet_obj = wb_obj.active
-            m_row = sheet_obj.max_row
-            m_col= sheet_obj.max_column
-            for i in range(1, m_row+1):
-                nombre=sheet_obj.cell(row=i, column=1).value
-                nota=sheet_obj.cell(row=i, column=2).value
-                recolectar_datos = {}
-                recolectar_datos["nombre"]=nombre
-                recolectar_datos["nota"]=nota
-                datos_enviar.append(recolectar_datos)
-            os.remove(ruta)
+            importacion = importar.pendiente(ImportadorNotas.tipo, request.user)
+            if importacion is None:
+                return Response(
+                    "No hay ningún archivo pendiente de importar",
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            importador = ImportadorNotas()
+            importacion = importador.importar(importacion)
+            importacion.archivo.delete()
+            if importacion.estado != Importacion.TERMINADA:
+                return Response(
+                    importador.resumen(importacion),
+                    status=status.HTTP_400_BAD_REQUEST
+                )
             return Response(
-                datos_enviar,
+                importador.datos,
                 status=status.HTTP_200_OK
             )
         def post(self, request):
@@ -124,16 +115,10 @@ class ResultadoNotasJson(LoginRequiredMixin, views.APIView):
                 grado=control_m.Grado.objects.get(id=grado),
                 observacion=observacion
             )
-            nueva_evaluacion.save()
-            evaluacion=control_m.Evaluacion.objects.all().last()
             dato =  json.loads(request.data['datos'])
-            for info in dato:
-                nota = control_m.Notas(
-                    evaluacion=evaluacion,
-                    alumno=info["nombre"],
-                    nota=info["nota"]
-                )
-                nota.save()
+            with transaction.atomic():
+                nueva_evaluacion.save()
+                ImportadorNotas().guardar_notas(nueva_evaluacion, dato)
             return Response(
                 "Notas Guardadas Exitosamente",
                 status=status.HTTP_200_OK
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+# Importación del reporte de miembros de Coursera exportado a Excel.
+from collections import Counter
+
+from apps.coursera import models as coursera_m
+from apps.main.importar import FilaInvalida, Importador
+
+ALIADO_FUNSEPA = 'FUNSEPA'
+
+
+class ImportadorCoursera(Importador):
+    """Crea un :class:`Monitoreo` por cada :class:`Aliado` con los totales de las invitaciones del reporte.
+    Los totales se acumulan mientras se lee el archivo, sin guardar cada invitación en :class:`Historial`.
+    Las columnas usadas son el id externo (que indica el aliado), los cursos inscritos, los cursos completados
+    y el estado de la invitación.
+    """
+    tipo = 'coursera'
+    modelo = coursera_m.Monitoreo
+
+    def procesar(self, importacion, errores):
+        self.aliados = {aliado.aliado: aliado for aliado in coursera_m.Aliado.objects.all()}
+        self.totales = {aliado.id: Counter() for aliado in self.aliados.values()}
+        super(ImportadorCoursera, self).procesar(importacion, errores)
+
+    def get_aliado(self, external_id):
+        if not external_id or str(external_id).isdigit() or external_id == 'Funsepa':
+            nombre = ALIADO_FUNSEPA
+        else:
+            nombre = str(external_id).split('-')[0]
+        try:
+            return self.aliados[nombre]
+        except KeyError:
+            raise FilaInvalida('No existe el aliado {}'.format(nombre))
+
+    def crear(self, fila):
+        fila = tuple(fila) + (None,) * (8 - len(fila))
+        aliado = self.get_aliado(fila[2])
+        totales = self.totales[aliado.id]
+        totales['invitaciones'] += 1
+        if fila[7] == 'MEMBER':
+            totales['miembros'] += 1
+        if int(fila[5] or 0) > 0:
+            totales['inscritos'] += 1
+        if int(fila[6] or 0) > 0:
+            totales['graduados'] += 1
+        return None
+
+    def terminar(self):
+        registros = []
+        for aliado in self.aliados.values():
+            totales = self.totales[aliado.id]
+            aceptacion = totales['miembros'] / totales['invitaciones'] * 100 if totales['invitaciones'] else 0
+            registros.append(coursera_m.Monitoreo(
+                aliado=aliado,
+                invitaciones=totales['invitaciones'],
+                miembros=totales['miembros'],
+                aceptacion=round(aceptacion, 2),
+                inscritos=totales['inscritos'],
+                graduados=totales['graduados']))
+        self.guardar(registros)
+        return len(registros)
@@ -1,3 +1,65 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory, TestCase, override_settings
+from openpyxl import Workbook
+
+from apps.coursera import models as coursera_m
+from apps.coursera.importar import ImportadorCoursera
+from apps.coursera.views import ResultadoCourseraJson
+from apps.main import importar
+from apps.main.models import Importacion
+
+
+class ResultadoCourseraTestCase(TestCase):
+    """Pruebas para la importación del reporte de miembros en :class:`ResultadoCourseraJson`"""
+
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        ajustes = override_settings(MEDIA_ROOT=self.media)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        self.addCleanup(shutil.rmtree, self.media)
+        self.usuario = User.objects.create(username='coursera')
+        self.funsepa = coursera_m.Aliado.objects.create(aliado='FUNSEPA')
+        self.aliado = coursera_m.Aliado.objects.create(aliado='Mineduc')
+
+    def get(self):
+        request = RequestFactory().get('/')
+        request.user = self.usuario
+        return ResultadoCourseraJson.as_view()(request)
+
+    def test_importar(self):
+        libro = Workbook(write_only=True)
+        hoja = libro.create_sheet()
+        hoja.append(['Nombre', 'Correo', 'External Id', 'Fecha', 'Programa', 'Inscritos', 'Completados', 'Estado'])
+        hoja.append(['A', 'a@mail.com', None, None, None, 0, 0, 'INVITED'])
+        hoja.append(['B', 'b@mail.com', '1234', None, None, 2, 1, 'MEMBER'])
+        hoja.append(['C', 'c@mail.com', 'Mineduc-01', None, None, 1, 0, 'MEMBER'])
+        hoja.append(['D', 'd@mail.com', 'Mineduc-02', None, None, 0, 0, 'INVITED'])
+        hoja.append(['E', 'e@mail.com', 'Otro-01', None, None, 0, 0, 'INVITED'])
+        archivo = io.BytesIO()
+        libro.save(archivo)
+        importar.registrar(
+            ImportadorCoursera.tipo, SimpleUploadedFile('coursera.xlsx', archivo.getvalue()), self.usuario)
+
+        respuesta = self.get()
+        self.assertEqual(respuesta.status_code, 200)
+        importacion = Importacion.objects.get(tipo=ImportadorCoursera.tipo)
+        self.assertEqual(
+            (importacion.estado, importacion.filas, importacion.creados, importacion.rechazados),
+            (Importacion.TERMINADA, 5, 2, 1))
+        self.assertIn('Otro', importacion.errores)
+
+        monitoreo = coursera_m.Monitoreo.objects.get(aliado=self.funsepa)
+        self.assertEqual(
+            (monitoreo.invitaciones, monitoreo.miembros, monitoreo.inscritos, monitoreo.graduados), (2, 1, 1, 1))
+        self.assertEqual(float(monitoreo.aceptacion), 50)
+        monitoreo = coursera_m.Monitoreo.objects.get(aliado=self.aliado)
+        self.assertEqual((monitoreo.invitaciones, monitoreo.miembros, monitoreo.inscritos), (2, 1, 1))
+
+        # El archivo ya no está pendiente
+        self.assertEqual(self.get().status_code, 400)
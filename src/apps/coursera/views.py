@@ -1,7 +1,4 @@
 from django.shortcuts import render
-import os
-from django.conf import settings
-from django.core.files.storage import FileSystemStorage
 from django.urls import reverse_lazy
 from django.utils import timezone
 from braces.views import (
@@ -11,8 +8,10 @@ from django.views.generic import DetailView, ListView, View, TemplateView
 from django.views.generic.edit import CreateView, UpdateView, FormView
 from apps.coursera import models as coursera_m
 from apps.coursera import forms as coursera_f
+from apps.coursera.importar import ImportadorCoursera
+from apps.main import importar
+from apps.main.models import Importacion
 from django.urls import reverse_lazy
-from openpyxl import load_workbook
 from django.http import HttpResponse, HttpResponseRedirect
 from rest_framework import views, status
 from rest_framework.response import Response
@@ -45,13 +44,9 @@ class CourseraExcelAddView(LoginRequiredMixin, TemplateView):
 
     def post(self,request):
         if request.method == 'POST' and request.FILES['myfile']:
-            file_list =os.listdir(settings.MEDIA_ROOT_EXCEL_COURSERA)
-            myfile=request.FILES['myfile']
-            fs=FileSystemStorage(location=settings.MEDIA_ROOT_EXCEL_COURSERA)
-            filename=fs.save(myfile.name,myfile)
-            uploaded_file_url=fs.url(filename)
+            importacion = importar.registrar(ImportadorCoursera.tipo, request.FILES['myfile'], request.user)
             return render(request, 'coursera/cargar_excel_coursera.html',{
-                'uploaded_file_url':uploaded_file_url
+                'uploaded_file_url':importacion.archivo.url
         })
         return render(request,'bienestar/cargar_excel.html')
 class CourseraListView(LoginRequiredMixin, ListView):
@@ -67,87 +62,17 @@ class ResultadoCourseraJson(LoginRequiredMixin, views.APIView):
         """ Importar registros de excel con DjangoRestFramework para Bienestar
         """
         def get(self, request):
-            file_list =os.listdir(settings.MEDIA_ROOT_EXCEL_COURSERA)
-            number_file=len(file_list)
-            name_file =file_list[number_file-1]
-            #name_file="membership-report.xlsx"
-            ruta = str(settings.MEDIA_ROOT_EXCEL_COURSERA)+str(name_file)
-            listado_datos=[]
-            wb_obj = load_workbook(filename = ruta)
-            sheet_obj = wb_obj.active
-            m_row = sheet_obj.max_row
-            m_col= sheet_obj.max_column
-            for i in range(2, m_row+1):
-                try:
-                    aliado=sheet_obj.cell(row=i, column=3).value
-                except Exception as e:
-                    print("esto no funciona")
-                if sheet_obj.cell(row=i, column=3).value:
-                    external_id=sheet_obj.cell(row=i, column=3).value
-                else:
-                    external_id="FUNSEPA"
-                enrolled_courses=sheet_obj.cell(row=i, column=6).value
-                completed_courses=sheet_obj.cell(row=i, column=7).value
-                member=sheet_obj.cell(row=i, column=8).value
-                if(member=="MEMBER"):
-                    nuevo_miembro = 2
-                else:
-                    nuevo_miembro = 1
-                if aliado:
-                     if str(aliado).isdigit() or aliado == str("Funsepa"):
-                         ingresar_historial=coursera_m.Historial(
-                            aliado=coursera_m.Aliado.objects.get(aliado="FUNSEPA"),
-                            external_id=external_id,
-                            enrolled_courses=enrolled_courses,
-                            completed_courses=completed_courses,
-                            member=nuevo_miembro
-                         )
-                         ingresar_historial.save()
-                     else:
-                         print(i)
-                         new_aliado=aliado.split("-")[0]
-                         ingresar_historial=coursera_m.Historial(
-                           aliado=coursera_m.Aliado.objects.get(aliado=new_aliado),
-                           external_id=external_id,
-                           enrolled_courses=enrolled_courses,
-                           completed_courses=completed_courses,
-                           member=nuevo_miembro
-                         )
-                         ingresar_historial.save()
-                else:
-                    ingresar_historial=coursera_m.Historial(
-                       aliado=coursera_m.Aliado.objects.get(aliado="FUNSEPA"),
-                       external_id=external_id,
-                       enrolled_courses=enrolled_courses,
-                       completed_courses=completed_courses,
-                       member=nuevo_miembro
-                    )
-                    ingresar_historial.save()
-            aliado_buscar = coursera_m.Aliado.objects.all()
-            for nuevo_aliado in aliado_buscar:
-                cuerpo_datos={}
-                numero_invitados=coursera_m.Historial.objects.filter(aliado=nuevo_aliado).count()
-                numero_miembros=coursera_m.Historial.objects.filter(aliado=nuevo_aliado,member=2).count()
-                try:
-                	aceptacion= (numero_miembros / numero_invitados)*100
-                except ZeroDivisionError:
-                    aceptacion=0
-                inscritos=coursera_m.Historial.objects.filter(aliado=nuevo_aliado,enrolled_courses__gt=0).count()
-                graduados=coursera_m.Historial.objects.filter(aliado=nuevo_aliado,completed_courses__gt=0).count()
-                #print("Aliado: "+str(nuevo_aliado)+" Invitaciones: "+str(numero_invitados)+"Miembros: "+str(numero_miembros)+"Porcentaje: "+str(aceptacion)+"Inscritos: "+str(inscritos)+"Graduados: "+str(graduados))
-                nuevo_registro = coursera_m.Monitoreo(
-                    aliado = nuevo_aliado,
-                    invitaciones=numero_invitados,
-                    miembros= numero_miembros,
-                    aceptacion=aceptacion,
-                    inscritos=inscritos,
-                    graduados=graduados
+            importacion = importar.pendiente(ImportadorCoursera.tipo, request.user)
+            if importacion is None:
+                return Response(
+                    "No hay ningún archivo pendiente de importar",
+                    status=status.HTTP_400_BAD_REQUEST
                 )
-                nuevo_registro.save()
-            coursera_m.Historial.objects.all().delete()
+            importador = ImportadorCoursera()
+            importacion = importador.importar(importacion)
             return Response(
-                "Registros ingresados correctamente",
-                status=status.HTTP_200_OK
+                importador.resumen(importacion),
+                status=status.HTTP_200_OK if importacion.estado == Importacion.TERMINADA else status.HTTP_400_BAD_REQUEST
             )
 class ResultadoCourseraMonitoreoJson(LoginRequiredMixin, views.APIView):
         """ Importar registros de excel con DjangoRestFramework para Bienestar
@@ -55,6 +55,8 @@ asignacion_api_add = api_views.AsignacionViewSet.as_view({
     'post': 'create'})
 asignacion_desactivar = api_views.AsignacionViewSet.as_view({
     'post':'desactivar_asignacion'})
+asignacion_api_varios = api_views.AsignacionViewSet.as_view({
+    'post': 'asignar_varios'})
 asignacion_api_detail = api_views.AsignacionViewSet.as_view({
     'get': 'retrieve',
     'put': 'update',
@@ -100,6 +102,7 @@ urlpatterns = [
     url(r'^api/asignacion/add/$', asignacion_api_add, name='asignacion_api_add'),
     url(r'^api/asignacion/(?P<pk>\d+)/$', asignacion_api_detail, name='asignacion_api_detail'),
     url(r'^api/asignacion/desactivar/$', asignacion_desactivar, name='asignacion_desactivar'),
+    url(r'^api/asignacion/varios/$', asignacion_api_varios, name='asignacion_api_varios'),
 
     url(r'^api/participante/list/$', participante_api_list, name='participante_api_list'),
     url(r'^api/participante/(?P<pk>\w+)/$', participante_api_detail, name='participante_api_detail'),
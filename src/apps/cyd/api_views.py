@@ -11,7 +11,7 @@ from datetime import datetime, timedelta
 import json
 import datetime as dt
 
-from apps.main.mixins import APIFilterMixin
+from apps.main.mixins import APIFilterMixin, ProyeccionApiMixin
 from apps.cyd.serializers import (
     SedeSerializer, GrupoSerializer, CalendarioSerializer,
     AsignacionSerializer, ParticipanteSerializer,
@@ -231,7 +231,37 @@ class AsignacionViewSet(CsrfExemptMixin, viewsets.ModelViewSet):
             status=status.HTTP_200_OK
         )
 
-class ParticipanteViewSet(CsrfExemptMixin, viewsets.ModelViewSet):
+    @action(methods=['post'], detail=False)
+    def asignar_varios(self, request, pk=None):
+        """Asigna todos los `participantes` a todos los `grupos` recibidos (listas de ids),
+        creando las asignaciones y sus notas en una sola transacción.
+        """
+        try:
+            listas = {}
+            for nombre in ('participantes', 'grupos'):
+                if hasattr(request.data, 'getlist'):
+                    listas[nombre] = request.data.getlist(nombre)
+                else:
+                    listas[nombre] = request.data.get(nombre) or []
+                listas[nombre] = [int(valor) for valor in listas[nombre]]
+        except (TypeError, ValueError):
+            listas = {}
+        if not listas.get('participantes') or not listas.get('grupos'):
+            return Response(
+                {'mensaje': 'Debe indicar al menos un participante y un grupo'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        asignaciones, omitidas = Asignacion.asignar(listas['participantes'], listas['grupos'])
+        return Response(
+            {
+                'mensaje': '{} asignaciones creadas'.format(len(asignaciones)),
+                'asignaciones': [asignacion.id for asignacion in asignaciones],
+                'omitidas': omitidas
+            },
+            status=status.HTTP_201_CREATED
+        )
+
+class ParticipanteViewSet(CsrfExemptMixin, ProyeccionApiMixin, viewsets.ModelViewSet):
     """Consulta de participantes usando el DPI como primary key.
     """
     class ParticipanteFilter(django_filters.FilterSet):
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-18 16:36
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+from django.db.models import BooleanField, Case, IntegerField, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+
+def actualizar_notas(apps, schema_editor):
+    Asignacion = apps.get_model('cyd', 'Asignacion')
+    NotaAsistencia = apps.get_model('cyd', 'NotaAsistencia')
+    NotaHito = apps.get_model('cyd', 'NotaHito')
+    Grupo = apps.get_model('cyd', 'Grupo')
+    Curso = apps.get_model('cyd', 'Curso')
+
+    def total(modelo):
+        notas = modelo.objects.filter(asignacion=OuterRef('pk')).order_by().values('asignacion').annotate(
+            total=Sum('nota')).values('total')
+        return Coalesce(Subquery(notas, output_field=IntegerField()), 0)
+
+    def condicion(**filtros):
+        return Case(When(then=Value(True), **filtros), default=Value(False), output_field=BooleanField())
+
+    # Sin subconsultas sobre la tabla de asignaciones, que MySQL no permite al actualizarla
+    nota_aprobacion = Subquery(
+        Curso.objects.filter(grupo=OuterRef('grupo')).values('nota_aprobacion')[:1], output_field=IntegerField())
+    Asignacion.objects.update(nota_final=total(NotaAsistencia) + total(NotaHito))
+    Asignacion.objects.update(
+        promediada=condicion(grupo__in=Grupo.objects.filter(curso__porcentaje__gt=0).values('id')),
+        aprobado=condicion(nota_final__gte=nota_aprobacion))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cyd', '0029_sede_fecha_creacion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='asignacion',
+            name='aprobado',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='asignacion',
+            name='nota_final',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='asignacion',
+            name='promediada',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.RunPython(actualizar_notas, migrations.RunPython.noop),
+    ]
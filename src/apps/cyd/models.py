@@ -1,8 +1,10 @@
+from copy import copy
 from random import randint
 from datetime import datetime, timedelta
 from django.utils import timezone
-from django.db import models
-from django.db.models import Count, F
+from django.db import models, transaction
+from django.db.models import BooleanField, Case, Count, F, IntegerField, Min, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
 from django.utils.text import slugify
 from django.core.exceptions import ValidationError
 from django.urls import reverse_lazy
@@ -35,6 +37,11 @@ class Curso(models.Model):
     def get_absolute_url(self):
         return reverse_lazy('curso_detail', kwargs={"pk": self.id})
 
+    def save(self, *args, **kwargs):
+        """La nota de aprobación y el porcentaje cambian el resumen de notas de las asignaciones."""
+        super(Curso, self).save(*args, **kwargs)
+        Asignacion.actualizar_notas(Asignacion.objects.filter(grupo__curso=self))
+
     def get_total_asistencia(self):
         """Obtiene el total de puntos asignados a las asistencias."""
         return sum(x.punteo_max for x in self.asistencias.all())
@@ -126,34 +133,77 @@ class Sede(models.Model):
         super(Sede, self).save(*args, **kwargs)
 
     def get_participantes(self):
-        resultado = {'listado': [], 'resumen': {'roles': {}, 'genero': {}, 'estado': {}}}
-        participantes = Participante.objects.filter(
-            asignaciones__grupo__sede__id=self.id, activo=True).annotate(
-            cursos_sede=Count('asignaciones'))
-        print(participantes)
-        for participante in participantes:
-            asignaciones = participante.asignaciones.filter(grupo__sede=self)
+        """Listado de participantes activos de la sede con su nota, y el resumen por rol, género y estado.
+        El resultado se guarda en el objeto, para que las plantillas y vistas que lo consultan varias
+        veces no repitan las consultas.
+        """
+        if not hasattr(self, '_participantes'):
+            self._participantes = Sede.resumir_participantes([self])[self.id]
+        return self._participantes
+
+    @classmethod
+    def resumir_participantes(cls, sedes):
+        """Calcula :meth:`get_participantes` para varias `sedes` con tres consultas en total,
+        usando el resumen de notas guardado en cada :class:`cyd.Asignacion`.
+
+        La nota de un participante es la suma de sus asignaciones en la sede. Las asignaciones de cursos con
+        porcentaje aportan su nota final multiplicada por el porcentaje; las demás, su nota final
+        dividida entre la cantidad de asignaciones del participante en la sede.
+
+        Returns:
+            dict: el resultado de :meth:`get_participantes` indexado por el id de cada sede.
+        """
+        sedes = {getattr(sede, 'pk', sede) for sede in sedes}
+        filas = Asignacion.objects.filter(grupo__sede__in=sedes, participante__activo=True).order_by().values(
+            'grupo__sede', 'participante').annotate(
+            cursos_sede=Count('id'),
+            primera=Min('id'),
+            total_promediada=Sum(Case(
+                When(promediada=True, then=F('nota_final') * F('grupo__curso__porcentaje')),
+                default=Value(0),
+                output_field=IntegerField())),
+            total_sin_promediar=Sum(Case(
+                When(promediada=False, then=F('nota_final')),
+                default=Value(0),
+                output_field=IntegerField())))
+        filas = sorted(filas, key=lambda fila: (fila['grupo__sede'], fila['participante']))
+        participantes = Participante.objects.select_related('rol', 'genero', 'escuela').in_bulk(
+            {fila['participante'] for fila in filas})
+        grupos = dict(Asignacion.objects.filter(id__in=[fila['primera'] for fila in filas]).values_list(
+            'id', 'grupo__numero'))
+
+        resultados = {sede: {'listado': [], 'resumen': {'roles': {}, 'genero': {}}} for sede in sedes}
+        for fila in filas:
+            resultado = resultados[fila['grupo__sede']]
+            participante = copy(participantes[fila['participante']])
+            participante.cursos_sede = fila['cursos_sede']
             resultado['listado'].append({
                 'participante': participante,
-                'nota': sum(a.get_nota_promediada()['nota'] for a in asignaciones),
-                'grupo': asignaciones.first().grupo.numero})
-        resultado['resumen']['roles'] = participantes.annotate(
-            nombre_rol=F('rol__nombre')).values('nombre_rol').annotate(cantidad=Count('id', distinct=True))
-        resultado['resumen']['genero'] = participantes.annotate(
-            nombre_genero=F('genero__genero')).values('nombre_genero').annotate(cantidad=Count('id', distinct=True))
-        aprobado = sum(1 for nota in resultado['listado'] if nota['nota'] >= 75)
-        nivelar = sum(1 for nota in resultado['listado'] if 70 <= nota['nota'] < 75)
-        reprobado = sum(1 for nota in resultado['listado'] if nota['nota'] < 70)
-        resultado['resumen']['estado']['aprobado'] = {
-            'cantidad': aprobado,
-            'porcentaje': (aprobado * 100 // len(resultado['listado'])) if len(resultado['listado']) > 0 else 0}
-        resultado['resumen']['estado']['nivelar'] = {
-            'cantidad': nivelar,
-            'porcentaje': (nivelar * 100 // len(resultado['listado'])) if len(resultado['listado']) > 0 else 0}
-        resultado['resumen']['estado']['reprobado'] = {
-            'cantidad': reprobado,
-            'porcentaje': (reprobado * 100 // len(resultado['listado'])) if len(resultado['listado']) > 0 else 0}
-        return resultado
+                'nota': fila['total_promediada'] / 100 + fila['total_sin_promediar'] / fila['cursos_sede'],
+                'grupo': grupos[fila['primera']]})
+            # El género es opcional
+            genero = participante.genero.genero if participante.genero_id else None
+            for resumen, nombre in (('roles', participante.rol.nombre), ('genero', genero)):
+                resultado['resumen'][resumen][nombre] = resultado['resumen'][resumen].get(nombre, 0) + 1
+
+        for resultado in resultados.values():
+            resultado['resumen']['roles'] = [
+                {'nombre_rol': nombre, 'cantidad': cantidad}
+                for nombre, cantidad in resultado['resumen']['roles'].items()]
+            resultado['resumen']['genero'] = [
+                {'nombre_genero': nombre, 'cantidad': cantidad}
+                for nombre, cantidad in resultado['resumen']['genero'].items()]
+            notas = [nota['nota'] for nota in resultado['listado']]
+            estados = (
+                ('aprobado', sum(1 for nota in notas if nota >= 75)),
+                ('nivelar', sum(1 for nota in notas if 70 <= nota < 75)),
+                ('reprobado', sum(1 for nota in notas if nota < 70)))
+            resultado['resumen']['estado'] = {
+                estado: {
+                    'cantidad': cantidad,
+                    'porcentaje': (cantidad * 100 // len(notas)) if len(notas) > 0 else 0}
+                for estado, cantidad in estados}
+        return resultados
 
 
 class Asesoria(models.Model):
@@ -200,8 +250,7 @@ class Grupo(models.Model):
         return self.asignados.filter(participante__genero__id=2).count()
 
     def count_aprobados(self):
-        cuenta = sum(1 for asignacion in self.asignados.all() if asignacion.aprobado)
-        return cuenta
+        return self.asignados.filter(aprobado=True).count()
 
     def get_porcentaje_aprobados(self):
         asignados = self.asignados.all().count()
@@ -352,14 +401,21 @@ class Participante(models.Model):
         actual hacia un :class:`cyd.Grupo` especificado. Las notas son generadas
         automáticamente mediante `cyd.Asignacion.asignar_notas()`.
         """
-        self.asignaciones.create(grupo=grupo)
+        Asignacion.asignar([self], [grupo])
 
 
 class Asignacion(models.Model):
-    """Asignación de un :class:`Participante` a un :class:`Grupo`."""
+    """Asignación de un :class:`Participante` a un :class:`Grupo`.
+
+    `nota_final`, `promediada` y `aprobado` resumen las :class:`cyd.NotaAsistencia` y :class:`cyd.NotaHito`
+    de la asignación. Los mantiene :meth:`actualizar_notas` cada vez que se guarda una nota.
+    """
     participante = models.ForeignKey(Participante, related_name='asignaciones', on_delete=models.CASCADE)
     grupo = models.ForeignKey(Grupo, related_name='asignados', on_delete=models.CASCADE)
     abandono=models.BooleanField(default=False, blank=True, verbose_name='Abandono')
+    nota_final = models.IntegerField(default=0, editable=False)
+    promediada = models.BooleanField(default=False, editable=False)
+    aprobado = models.BooleanField(default=False, editable=False)
 
     class Meta:
         verbose_name = "Asignación"
@@ -372,11 +428,127 @@ class Asignacion(models.Model):
     def save(self, *args, **kwargs):
         """Crea todos los registros de notas necesarias en caso de que el objeto actual no tenga `pk`."""
         if not self.pk:
-            super(Asignacion, self).save(*args, **kwargs)
-            self.crear_notas()
+            with transaction.atomic():
+                super(Asignacion, self).save(*args, **kwargs)
+                self.crear_notas()
         else:
             super(Asignacion, self).save(*args, **kwargs)
 
+    @classmethod
+    def asignar(cls, participantes, grupos):
+        """Asigna cada uno de los `participantes` a cada uno de los `grupos` y crea sus notas,
+        usando `bulk_create` dentro de una sola transacción.
+        Se omiten las combinaciones en las que el participante ya tiene asignado el mismo
+        :class:`cyd.Curso` en la misma :class:`cyd.Sede` (ver :meth:`validate_unique`).
+
+        Returns:
+            tuple: la lista de asignaciones creadas y la cantidad de combinaciones omitidas.
+        """
+        participantes = {getattr(participante, 'pk', participante) for participante in participantes}
+        grupos = list(Grupo.objects.filter(id__in={getattr(grupo, 'pk', grupo) for grupo in grupos}))
+        with transaction.atomic():
+            existentes = set(cls.objects.select_for_update().filter(
+                participante__in=participantes,
+                grupo__sede__in={grupo.sede_id for grupo in grupos},
+                grupo__curso__in={grupo.curso_id for grupo in grupos}).values_list(
+                    'participante', 'grupo__sede', 'grupo__curso'))
+            nuevas = []
+            for grupo in grupos:
+                for participante in sorted(participantes):
+                    llave = (participante, grupo.sede_id, grupo.curso_id)
+                    if llave not in existentes:
+                        existentes.add(llave)
+                        nuevas.append(cls(participante_id=participante, grupo=grupo))
+            cls.objects.bulk_create(nuevas)
+            # `bulk_create` no devuelve los ids en todas las bases de datos
+            nuevas = {(nueva.participante_id, nueva.grupo_id) for nueva in nuevas}
+            asignaciones = [
+                asignacion for asignacion in cls.objects.select_related('grupo').filter(
+                    participante__in=participantes, grupo__in=grupos)
+                if (asignacion.participante_id, asignacion.grupo_id) in nuevas]
+            cls.crear_notas_varias(asignaciones)
+            if asignaciones:
+                # `bulk_create` no envía `post_save`, por lo que los indicadores y el tablero se actualizan
+                # al confirmar la transacción
+                sedes = {grupo.sede_id for grupo in grupos}
+                transaction.on_commit(lambda: cls.actualizar_relacionados(sedes, participantes))
+        return asignaciones, len(participantes) * len(grupos) - len(asignaciones)
+
+    @classmethod
+    def actualizar_relacionados(cls, sedes, participantes):
+        """Recalcula el :class:`informe.IndicadorEscuela` de las escuelas de los `participantes` y de las escuelas
+        beneficiadas de las `sedes` (ids) e invalida los widgets del tablero que dependen de las asignaciones,
+        lo mismo que hacen las señales de `post_save` de una sola asignación.
+        """
+        # Importados aquí porque ambos módulos importan este
+        from apps.informe.models import IndicadorEscuela
+        from apps.main import tablero
+
+        escuelas = set(Participante.objects.filter(id__in=participantes).values_list('escuela', flat=True))
+        escuelas.update(Sede.objects.filter(id__in=sedes).values_list('escuela_beneficiada', flat=True))
+        escuelas.discard(None)
+        IndicadorEscuela.reconstruir(escuelas)
+        tablero.invalidar_sedes(tablero.widgets_modelo(cls), sedes)
+
+    @classmethod
+    def crear_notas_varias(cls, asignaciones):
+        """Crea las :class:`cyd.NotaAsistencia` y :class:`cyd.NotaHito` de varias asignaciones
+        con un `bulk_create` para cada modelo.
+        """
+        grupos = {asignacion.grupo_id for asignacion in asignaciones}
+        calendarios = {}
+        for calendario in Calendario.objects.filter(grupo__in=grupos).order_by('id'):
+            calendarios.setdefault(calendario.grupo_id, []).append(calendario)
+        hitos = {}
+        for hito in CrHito.objects.filter(curso__grupo__in=grupos).distinct().order_by('id'):
+            hitos.setdefault(hito.curso_id, []).append(hito)
+        NotaAsistencia.objects.bulk_create(
+            NotaAsistencia(asignacion=asignacion, gr_calendario=calendario)
+            for asignacion in asignaciones
+            for calendario in calendarios.get(asignacion.grupo_id, []))
+        NotaHito.objects.bulk_create(
+            NotaHito(asignacion=asignacion, cr_hito=hito)
+            for asignacion in asignaciones
+            for hito in hitos.get(asignacion.grupo.curso_id, []))
+        cls.actualizar_notas([asignacion.id for asignacion in asignaciones])
+
+    @classmethod
+    def actualizar_notas(cls, asignaciones=None):
+        """Recalcula en la base de datos `nota_final`, `promediada` y `aprobado` de las `asignaciones`
+        (lista de ids o queryset de :class:`cyd.Asignacion`). Si es `None`, se recalculan todas.
+
+        Las condiciones se calculan con subconsultas sobre :class:`cyd.Grupo` y :class:`cyd.Curso`, nunca sobre
+        la misma tabla de asignaciones, porque MySQL no permite actualizar una tabla leyéndola en una subconsulta.
+        """
+        if isinstance(asignaciones, models.QuerySet):
+            queryset = asignaciones
+        else:
+            queryset = cls.objects.all()
+            if asignaciones is not None:
+                queryset = queryset.filter(id__in=asignaciones)
+
+        def total(modelo):
+            notas = modelo.objects.filter(asignacion=OuterRef('pk')).order_by().values('asignacion').annotate(
+                total=Sum('nota')).values('total')
+            return Coalesce(Subquery(notas, output_field=IntegerField()), 0)
+
+        def condicion(**filtros):
+            return Case(When(then=Value(True), **filtros), default=Value(False), output_field=BooleanField())
+
+        nota_aprobacion = Subquery(
+            Curso.objects.filter(grupo=OuterRef('grupo')).values('nota_aprobacion')[:1], output_field=IntegerField())
+        with transaction.atomic():
+            queryset.update(nota_final=total(NotaAsistencia) + total(NotaHito))
+            queryset.update(
+                promediada=condicion(grupo__in=Grupo.objects.filter(curso__porcentaje__gt=0).values('id')),
+                aprobado=condicion(nota_final__gte=nota_aprobacion))
+        # `update` no envía señales, por lo que se invalida el tablero de la página de inicio directamente
+        from apps.main import tablero
+        if asignaciones is None:
+            tablero.invalidar('capacitacion')
+        else:
+            tablero.invalidar_sedes(['capacitacion'], queryset.values('grupo__sede'))
+
     def validate_unique(self, *args, **kwargs):
         """Valida que un :class:`cyd.Participante` no pueda asignarse más
         de una vez al mismo :class:`cyd.Curso` en la misma :class:`cyd.Sede`.
@@ -396,35 +568,26 @@ class Asignacion(models.Model):
         """Crea las notas especificadas en el :class:`cyd.Curso` del :class:`cyd.Grupo`
         relacionado con el objeto actual.
         """
-        for calendario in self.grupo.asistencias.all():
-            self.notas_asistencias.create(gr_calendario=calendario)
-        for hito in self.grupo.curso.hitos.all():
-            self.notas_hitos.create(cr_hito=hito)
+        Asignacion.crear_notas_varias([self])
 
     def get_nota_final(self):
-        notas_asistencias = self.notas_asistencias.all()
-        notas_hitos = self.notas_hitos.all()
-        return sum(nota.nota for nota in notas_asistencias) + sum(nota.nota for nota in notas_hitos)
-    nota_final = property(get_nota_final)
+        return self.nota_final
 
     def get_aprobado(self):
         """Indica si la asignación actual alcanza la nota mínima establecida por el :class:`cyd.Curso`."""
-        return self.get_nota_final() >= self.grupo.curso.nota_aprobacion  # type: boolean
-    aprobado = property(get_aprobado)
+        return self.aprobado
 
     def get_nota_promediada(self):
         """Devuelve la nota final promediada respecto al porcentaje del :class:`cyd.Curso` relacionado.
         En caso de que el curso no tenga un porcentaje, devuelve la nota final real.
         """
-        if self.grupo.curso.porcentaje:
-            nota = self.get_nota_final() * (self.grupo.curso.porcentaje / 100)
-            promediada = True
+        if self.promediada:
+            nota = self.nota_final * (self.grupo.curso.porcentaje / 100)
         else:
             cantidad_asignaciones = Asignacion.objects.filter(
-                grupo__sede=self.grupo.sede, participante=self.participante).count()
-            nota = self.get_nota_final() / cantidad_asignaciones
-            promediada = False
-        return {'nota': nota, 'promediada': promediada}
+                grupo__sede=self.grupo.sede_id, participante=self.participante_id).count()
+            nota = self.nota_final / cantidad_asignaciones
+        return {'nota': nota, 'promediada': self.promediada}
 
 
 class NotaAsistencia(models.Model):
@@ -442,6 +605,12 @@ class NotaAsistencia(models.Model):
     def __str__(self):
         return '{} - {}'.format(self.nota, self.gr_calendario)
 
+    def save(self, *args, **kwargs):
+        """Actualiza el resumen de notas de la :class:`cyd.Asignacion`."""
+        with transaction.atomic():
+            super(NotaAsistencia, self).save(*args, **kwargs)
+            Asignacion.actualizar_notas([self.asignacion_id])
+
     def clean(self):
         """Evita que la nota sobrepase el punteo máximo especificado en :class:`CrAsistencia`
 
@@ -466,6 +635,12 @@ class NotaHito(models.Model):
     def __str__(self):
         return '{} - {}'.format(self.nota, self.cr_hito)
 
+    def save(self, *args, **kwargs):
+        """Actualiza el resumen de notas de la :class:`cyd.Asignacion`."""
+        with transaction.atomic():
+            super(NotaHito, self).save(*args, **kwargs)
+            Asignacion.actualizar_notas([self.asignacion_id])
+
     def clean(self):
         """Evita que la nota sobrepase el punteo máximo especificado en :class:`CrHito`
 
@@ -0,0 +1,86 @@
+import factory
+from django.contrib.auth.models import User
+from apps.cyd import models
+from apps.escuela.tests.factories import EscuelaFactory
+
+
+class UserFactory(factory.django.DjangoModelFactory):
+    """Fábrica para :class:'User'"""
+    class Meta:
+        model = User
+
+    username = factory.Sequence(lambda n: 'capacitador{0}'.format(n))
+    first_name = factory.Faker('first_name')
+    last_name = factory.Faker('last_name')
+
+
+class CursoFactory(factory.django.DjangoModelFactory):
+    """Fábrica para :class:'Curso'"""
+    class Meta:
+        model = models.Curso
+
+    nombre = factory.Sequence(lambda n: 'Curso {0}'.format(n))
+    nota_aprobacion = 70
+
+
+class CrHitoFactory(factory.django.DjangoModelFactory):
+    """Fábrica para :class:'CrHito'"""
+    class Meta:
+        model = models.CrHito
+
+    curso = factory.SubFactory(CursoFactory)
+    nombre = factory.Sequence(lambda n: 'Hito {0}'.format(n))
+    punteo_max = 100
+
+
+class SedeFactory(factory.django.DjangoModelFactory):
+    """Fábrica para :class:'Sede'"""
+    class Meta:
+        model = models.Sede
+
+    nombre = factory.Sequence(lambda n: 'Sede {0}'.format(n))
+    capacitador = factory.SubFactory(UserFactory)
+    direccion = factory.Faker('address')
+    municipio = factory.SelfAttribute('escuela_beneficiada.municipio')
+    escuela_beneficiada = factory.SubFactory(EscuelaFactory)
+
+
+class GrupoFactory(factory.django.DjangoModelFactory):
+    """Fábrica para :class:'Grupo'"""
+    class Meta:
+        model = models.Grupo
+
+    sede = factory.SubFactory(SedeFactory)
+    numero = factory.Sequence(lambda n: n)
+    curso = factory.SubFactory(CursoFactory)
+
+
+class ParGeneroFactory(factory.django.DjangoModelFactory):
+    """Fábrica para :class:'ParGenero'"""
+    class Meta:
+        model = models.ParGenero
+        django_get_or_create = ('id',)
+
+    id = 1
+    genero = factory.LazyAttribute(lambda o: 'Hombre' if o.id == 1 else 'Mujer')
+
+
+class ParRolFactory(factory.django.DjangoModelFactory):
+    """Fábrica para :class:'ParRol'"""
+    class Meta:
+        model = models.ParRol
+
+    nombre = 'Docente'
+
+
+class ParticipanteFactory(factory.django.DjangoModelFactory):
+    """Fábrica para :class:'Participante'"""
+    class Meta:
+        model = models.Participante
+
+    dpi = factory.Sequence(lambda n: '{0:013d}'.format(n))
+    nombre = factory.Faker('first_name')
+    apellido = factory.Faker('last_name')
+    genero = factory.SubFactory(ParGeneroFactory)
+    rol = factory.SubFactory(ParRolFactory)
+    escuela = factory.SubFactory(EscuelaFactory)
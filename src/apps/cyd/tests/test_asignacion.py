@@ -0,0 +1,99 @@
+import json
+from datetime import date
+
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.cyd import models as cyd_m
+from apps.cyd.api_views import AsignacionViewSet
+from apps.cyd.tests import factories
+from apps.cyd.views import ParticipanteJsonCreateView
+from apps.escuela.tests.factories import EscuelaFactory
+from apps.informe.models import IndicadorEscuela
+from apps.main import tablero
+from apps.main import models as main_m
+
+
+class AsignacionMasivaTestCase(TestCase):
+    """Pruebas para la asignación de varios :class:`Participante` a varios :class:`Grupo`"""
+
+    def setUp(self):
+        departamento = main_m.Departamento.objects.create(nombre='Guatemala')
+        self.escuela = EscuelaFactory(
+            municipio=main_m.Municipio.objects.create(departamento=departamento, nombre='Mixco'))
+        self.usuario = factories.UserFactory()
+        self.curso = factories.CursoFactory()
+        for indice in range(3):
+            factories.CrHitoFactory(curso=self.curso)
+        asistencias = [
+            cyd_m.CrAsistencia.objects.create(curso=self.curso, modulo_num=indice, punteo_max=10)
+            for indice in range(4)]
+        self.sede = factories.SedeFactory(escuela_beneficiada=self.escuela)
+        self.grupos = [factories.GrupoFactory(sede=self.sede, curso=self.curso) for _ in range(2)]
+        for grupo in self.grupos:
+            for asistencia in asistencias:
+                cyd_m.Calendario.objects.create(cr_asistencia=asistencia, grupo=grupo)
+        self.participantes = [factories.ParticipanteFactory(escuela=self.escuela) for _ in range(5)]
+
+    def test_asignar(self):
+        # Un participante ya tiene el curso asignado en la sede
+        self.participantes[0].asignar(self.grupos[1])
+        self.assertEqual(self.participantes[0].asignaciones.get().notas_asistencias.count(), 4)
+
+        with self.assertNumQueries(15):
+            asignaciones, omitidas = cyd_m.Asignacion.asignar(self.participantes, self.grupos[:1])
+        self.assertEqual((len(asignaciones), omitidas), (4, 1))
+        self.assertEqual(cyd_m.NotaAsistencia.objects.count(), 5 * 4)
+        self.assertEqual(cyd_m.NotaHito.objects.count(), 5 * 3)
+        for asignacion in asignaciones:
+            self.assertEqual(
+                set(asignacion.notas_asistencias.values_list('gr_calendario__grupo', flat=True)),
+                {self.grupos[0].id})
+
+        # Lo que `asignar` ejecuta al confirmar la transacción
+        cyd_m.Calendario.objects.filter(grupo=self.grupos[0]).update(fecha=date(2020, 3, 1))
+        otro_capacitador = factories.UserFactory()
+        version = tablero.version('capacitacion', 2020, self.sede.capacitador)
+        otra_version = tablero.version('capacitacion', 2020, otro_capacitador)
+        cyd_m.Asignacion.actualizar_relacionados({self.sede.id}, [p.id for p in self.participantes])
+        self.assertEqual(IndicadorEscuela.objects.get(escuela=self.escuela).maestros_capacitados, 5)
+        # Solo cambia la versión de los alcances de la sede
+        self.assertNotEqual(tablero.version('capacitacion', 2020, self.sede.capacitador), version)
+        self.assertEqual(tablero.version('capacitacion', 2020, otro_capacitador), otra_version)
+
+    def test_api(self):
+        otra_sede = factories.GrupoFactory(
+            curso=self.curso, sede=factories.SedeFactory(escuela_beneficiada=self.escuela))
+        datos = {
+            'participantes': [participante.id for participante in self.participantes],
+            'grupos': [self.grupos[0].id, otra_sede.id]}
+        request = APIRequestFactory().post('/', json.dumps(datos), content_type='application/json')
+        force_authenticate(request, user=self.usuario)
+        respuesta = AsignacionViewSet.as_view({'post': 'asignar_varios'})(request)
+        self.assertEqual(respuesta.status_code, 201)
+        self.assertEqual((len(respuesta.data['asignaciones']), respuesta.data['omitidas']), (10, 0))
+
+        request = APIRequestFactory().post('/', {'participantes': [], 'grupos': [self.grupos[0].id]})
+        force_authenticate(request, user=self.usuario)
+        self.assertEqual(AsignacionViewSet.as_view({'post': 'asignar_varios'})(request).status_code, 400)
+
+    def test_importar(self):
+        cyd_m.ParEtnia.objects.create(id=1, nombre='Ladino')
+        cyd_m.ParEscolaridad.objects.create(id=1, nombre='Diversificado')
+        self.participantes[0].asignar(self.grupos[1])
+        fila = {
+            'grupo': self.grupos[0].id, 'udi': self.escuela.codigo, 'nombre': 'Ana', 'apellido': 'López',
+            'genero': '1', 'rol': str(self.participantes[0].rol_id)}
+        filas = [
+            dict(fila, dpi=self.participantes[0].dpi),
+            dict(fila, dpi='9990000000001'),
+            dict(fila, dpi='9990000000002'),
+            dict(fila, dpi='9990000000003', udi='00-00-0000-00')]
+        request = APIRequestFactory().post('/', json.dumps(filas), content_type='application/json')
+        request.user = self.usuario
+        respuesta = ParticipanteJsonCreateView.as_view()(request)
+        datos = json.loads(respuesta.content.decode('utf-8'))
+        # El participante que ya tenía el curso en la sede se informa en lugar de darlo por asignado
+        self.assertEqual(datos['omitidos'], [self.participantes[0].dpi])
+        self.assertEqual((datos['asignados'], datos['errores']), (2, ['9990000000003']))
+        self.assertEqual(cyd_m.Asignacion.objects.filter(grupo=self.grupos[0]).count(), 2)
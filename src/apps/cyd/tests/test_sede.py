@@ -0,0 +1,88 @@
+from django.test import TestCase
+
+from apps.cyd import models as cyd_m
+from apps.cyd.tests import factories
+from apps.escuela.tests.factories import EscuelaFactory
+from apps.main import models as main_m
+
+
+class ResumenNotasTestCase(TestCase):
+    """Pruebas para el resumen de notas de :class:`Asignacion` y los participantes de :class:`Sede`"""
+
+    def setUp(self):
+        departamento = main_m.Departamento.objects.create(nombre='Guatemala')
+        self.escuela = EscuelaFactory(
+            municipio=main_m.Municipio.objects.create(departamento=departamento, nombre='Mixco'))
+        self.sede = factories.SedeFactory(escuela_beneficiada=self.escuela)
+        # Un curso con porcentaje y otro sin porcentaje, cada uno con dos hitos
+        self.cursos = [factories.CursoFactory(porcentaje=60), factories.CursoFactory(porcentaje=None)]
+        self.grupos = []
+        for curso in self.cursos:
+            factories.CrHitoFactory(curso=curso, punteo_max=50)
+            factories.CrHitoFactory(curso=curso, punteo_max=50)
+            self.grupos.append(factories.GrupoFactory(sede=self.sede, curso=curso, numero=len(self.grupos) + 1))
+        self.participantes = [factories.ParticipanteFactory(escuela=self.escuela) for _ in range(3)]
+        cyd_m.Asignacion.asignar(self.participantes, self.grupos[:1])
+        cyd_m.Asignacion.asignar(self.participantes[:2], self.grupos[1:])
+
+    def calificar(self, participante, grupo, *notas):
+        asignacion = participante.asignaciones.get(grupo=grupo)
+        for nota_hito, nota in zip(asignacion.notas_hitos.order_by('id'), notas):
+            nota_hito.nota = nota
+            nota_hito.save()
+        return cyd_m.Asignacion.objects.get(id=asignacion.id)
+
+    def test_resumen_asignacion(self):
+        asignacion = self.calificar(self.participantes[0], self.grupos[0], 40, 45)
+        self.assertEqual((asignacion.nota_final, asignacion.promediada, asignacion.aprobado), (85, True, True))
+        self.assertEqual(asignacion.get_nota_promediada(), {'nota': 51, 'promediada': True})
+
+        asignacion = self.calificar(self.participantes[0], self.grupos[1], 30, 30)
+        self.assertEqual((asignacion.nota_final, asignacion.promediada, asignacion.aprobado), (60, False, False))
+        self.assertEqual(asignacion.get_nota_promediada()['nota'], 30)
+        self.assertEqual(self.grupos[1].count_aprobados(), 0)
+
+        # Cambiar la nota de aprobación del curso actualiza las asignaciones
+        self.cursos[1].nota_aprobacion = 60
+        self.cursos[1].save()
+        self.assertTrue(cyd_m.Asignacion.objects.get(id=asignacion.id).aprobado)
+        self.assertEqual(self.grupos[1].count_aprobados(), 1)
+
+    def test_get_participantes(self):
+        self.calificar(self.participantes[0], self.grupos[0], 50, 50)
+        self.calificar(self.participantes[0], self.grupos[1], 40, 40)
+        self.calificar(self.participantes[1], self.grupos[0], 50, 50)
+        self.calificar(self.participantes[2], self.grupos[0], 50, 50)
+        inactivo = factories.ParticipanteFactory(escuela=self.escuela, activo=False)
+        cyd_m.Asignacion.asignar([inactivo], self.grupos)
+        # Un participante sin género
+        cyd_m.Participante.objects.filter(id=self.participantes[2].id).update(genero=None)
+
+        sede = cyd_m.Sede.objects.get(id=self.sede.id)
+        with self.assertNumQueries(3):
+            resultado = sede.get_participantes()
+        with self.assertNumQueries(0):
+            self.assertIs(sede.get_participantes(), resultado)
+
+        notas = {fila['participante'].id: (fila['nota'], fila['grupo']) for fila in resultado['listado']}
+        # 100 * 60% + 80 / 2 asignaciones, 100 * 60% + 0 / 2 asignaciones y 100 * 60%
+        self.assertEqual(notas, {
+            self.participantes[0].id: (100, 1),
+            self.participantes[1].id: (60, 1),
+            self.participantes[2].id: (60, 1)})
+        self.assertEqual(
+            {fila['participante'].id: fila['participante'].cursos_sede for fila in resultado['listado']},
+            {self.participantes[0].id: 2, self.participantes[1].id: 2, self.participantes[2].id: 1})
+        self.assertEqual(resultado['resumen']['roles'], [{'nombre_rol': 'Docente', 'cantidad': 3}])
+        self.assertEqual(
+            sorted(resultado['resumen']['genero'], key=lambda genero: genero['cantidad']),
+            [{'nombre_genero': None, 'cantidad': 1}, {'nombre_genero': 'Hombre', 'cantidad': 2}])
+        self.assertEqual(resultado['resumen']['estado']['aprobado'], {'cantidad': 1, 'porcentaje': 33})
+        self.assertEqual(resultado['resumen']['estado']['reprobado'], {'cantidad': 2, 'porcentaje': 66})
+
+        # Varias sedes se resumen con las mismas consultas
+        otra_sede = factories.SedeFactory(escuela_beneficiada=self.escuela)
+        with self.assertNumQueries(3):
+            resultados = cyd_m.Sede.resumir_participantes([self.sede, otra_sede])
+        self.assertEqual(len(resultados[self.sede.id]['listado']), 3)
+        self.assertEqual(resultados[otra_sede.id]['listado'], [])
@@ -1,7 +1,7 @@
 
 from django import forms
 from datetime import datetime
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 from django.db.models import Q
 from django.http import HttpResponseRedirect
 from django.views.generic import DetailView, ListView, View, TemplateView
@@ -18,6 +18,7 @@ from braces.views import (LoginRequiredMixin, GroupRequiredMixin, JsonRequestRes
 from apps.cyd import forms as cyd_f
 from apps.cyd import models as cyd_m
 from apps.escuela.models import Escuela
+from apps.main import tablero
 from apps.main.models import Coordenada
 from django.contrib.auth.models import User
 from django.core.files.storage import FileSystemStorage
@@ -345,65 +346,89 @@ class ParticipanteCreateListView(LoginRequiredMixin, GroupRequiredMixin, FormVie
 
 
 class ParticipanteJsonCreateView(LoginRequiredMixin, JsonRequestResponseMixin, CreateView):
+    """Crea o actualiza participantes y los asigna a un grupo.
+    Recibe un participante o, desde la importación, una lista con todos los participantes. Las asignaciones
+    se crean con :meth:`cyd.Asignacion.asignar` una vez por grupo, de modo que los indicadores de las escuelas
+    se recalculan una sola vez por solicitud. La respuesta indica los participantes omitidos porque ya tenían
+    asignado el mismo curso en la sede y las filas que no se pudieron guardar.
+    """
     require_json = True
     model = cyd_m.Participante
     form_class = cyd_f.ParticipanteForm
 
-    def post(self, request, *args, **kwargs):
-        try:
-            if self.request_json['genero'].isdigit():
-                genero = cyd_m.ParGenero.objects.get(id=self.request_json['genero'])
-            else:
-                genero = cyd_m.ParGenero.objects.get(genero=self.request_json['genero'])
+    def guardar_participante(self, fila):
+        if fila['genero'].isdigit():
+            genero = cyd_m.ParGenero.objects.get(id=fila['genero'])
+        else:
+            genero = cyd_m.ParGenero.objects.get(genero=fila['genero'])
 
-            if self.request_json['rol'].isdigit():
-                rol = cyd_m.ParRol.objects.get(id=self.request_json['rol'])
-            else:
-                rol = cyd_m.ParRol.objects.get(nombre=self.request_json['rol'])
+        if fila['rol'].isdigit():
+            rol = cyd_m.ParRol.objects.get(id=fila['rol'])
+        else:
+            rol = cyd_m.ParRol.objects.get(nombre=fila['rol'])
 
-            escuela = Escuela.objects.get(codigo=self.request_json['udi'])
-            grupo = cyd_m.Grupo.objects.get(id=self.request_json['grupo'])
-            etnia = cyd_m.ParEtnia.objects.get(id=self.request_json['etnia'] if 'etnia' in self.request_json else 1)
-            escolaridad = cyd_m.ParEscolaridad.objects.get(id=self.request_json['escolaridad'] if 'escolaridad' in self.request_json else 1)
-
-            participante = cyd_m.Participante.objects.create(
-                dpi=self.request_json['dpi'],
-                nombre=self.request_json['nombre'],
-                apellido=self.request_json['apellido'],
-                genero=genero,
-                rol=rol,
-                mail=self.request_json['mail'] if 'mail' in self.request_json else "",
-                tel_movil=self.request_json['tel_movil'] if 'tel_movil' in self.request_json else "",
-                escuela=escuela,
-                slug=self.request_json['dpi'],
-                activo=True,
-                etnia=etnia,
-                escolaridad=escolaridad)
-            participante.asignar(grupo)
+        escuela = Escuela.objects.get(codigo=fila['udi'])
+        etnia = cyd_m.ParEtnia.objects.get(id=fila['etnia'] if 'etnia' in fila else 1)
+        escolaridad = cyd_m.ParEscolaridad.objects.get(id=fila['escolaridad'] if 'escolaridad' in fila else 1)
+
+        try:
+            with transaction.atomic():
+                return cyd_m.Participante.objects.create(
+                    dpi=fila['dpi'],
+                    nombre=fila['nombre'],
+                    apellido=fila['apellido'],
+                    genero=genero,
+                    rol=rol,
+                    mail=fila['mail'] if 'mail' in fila else "",
+                    tel_movil=fila['tel_movil'] if 'tel_movil' in fila else "",
+                    escuela=escuela,
+                    slug=fila['dpi'],
+                    activo=True,
+                    etnia=etnia,
+                    escolaridad=escolaridad)
         except IntegrityError:
-            participante = cyd_m.Participante.objects.get(slug=self.request_json['dpi'])
+            participante = cyd_m.Participante.objects.get(slug=fila['dpi'])
 
-            participante.nombre = self.request_json['nombre']
-            participante.apellido = self.request_json['apellido']
+            participante.nombre = fila['nombre']
+            participante.apellido = fila['apellido']
             participante.genero = genero
             participante.rol = rol
-            participante.mail = self.request_json['mail'] if 'mail' in self.request_json else ""
-            participante.tel_movil = self.request_json['tel_movil'] if 'tel_movil' in self.request_json else ""
+            participante.mail = fila['mail'] if 'mail' in fila else ""
+            participante.tel_movil = fila['tel_movil'] if 'tel_movil' in fila else ""
             participante.escuela = escuela
             participante.save()
+            return participante
 
-            asignacion_existe = cyd_m.Asignacion.objects.filter(participante=participante, grupo=grupo)
-            if len(asignacion_existe) == 0:
-                asignar_grupo =  cyd_m.Asignacion(
-                    participante=participante,
-                    grupo=grupo
-                )
-                asignar_grupo.save()
-
-            error_dict = {u"message": u"Asignado correctamente", u"status": u"ok"}
-            #return self.render_bad_request_response(error_dict)
-            return self.render_json_response(error_dict)
-        return self.render_json_response({'status': 'ok'})
+    def post(self, request, *args, **kwargs):
+        filas = self.request_json if isinstance(self.request_json, list) else [self.request_json]
+        por_grupo = {}
+        errores = []
+        for fila in filas:
+            try:
+                grupo = cyd_m.Grupo.objects.get(id=fila['grupo'])
+                por_grupo.setdefault(grupo, []).append(self.guardar_participante(fila))
+            except (KeyError, AttributeError, ObjectDoesNotExist):
+                errores.append(fila.get('dpi') if isinstance(fila, dict) else None)
+        if errores and len(errores) == len(filas):
+            return self.render_bad_request_response(
+                {u"message": u"No se pudo guardar ningún participante", u"errores": errores})
+
+        omitidos = []
+        for grupo, participantes in por_grupo.items():
+            asignaciones, _ = cyd_m.Asignacion.asignar(participantes, [grupo])
+            asignados = {asignacion.participante_id for asignacion in asignaciones}
+            omitidos.extend(
+                participante.dpi for participante in participantes if participante.id not in asignados)
+        if omitidos:
+            mensaje = u"Ya tenían asignado el curso en la sede: {}".format(", ".join(omitidos))
+        else:
+            mensaje = u"Asignado correctamente"
+        return self.render_json_response({
+            u"status": u"ok",
+            u"message": mensaje,
+            u"asignados": sum(len(participantes) for participantes in por_grupo.values()) - len(omitidos),
+            u"omitidos": omitidos,
+            u"errores": errores})
 
 
 class ParticipanteDetailView(LoginRequiredMixin, DetailView):
@@ -692,21 +717,10 @@ class InformeCapacitadores(views.APIView):
 
 class CapacitacionListHomeView(CsrfExemptMixin, JsonRequestResponseMixin, View):
     def post(self, request, *args, **kwargs):
-        today = datetime.now()
-        capacitacion_list = {'escuelas': [], 'sedes': []}
-        for i in range(1, 13):
-            if self.request.user.groups.filter(name="cyd_capacitador").exists():
-                sedes_list = self.request.user.sedes.filter(
-                    grupos__asistencias__fecha__year=today.year,
-                    grupos__asistencias__fecha__month=i)
-            else:
-                sedes_list = cyd_m.Sede.objects.filter(
-                    grupos__asistencias__fecha__year=today.year,
-                    grupos__asistencias__fecha__month=i)
-
-            capacitacion_list['sedes'].append(sedes_list.count())
-            capacitacion_list['escuelas'].append(sum(e.get_escuelas().count() for e in sedes_list))
-
+        capacitador = None
+        if self.request.user.groups.filter(name="cyd_capacitador").exists():
+            capacitador = self.request.user
+        capacitacion_list = tablero.obtener('capacitacion_mensual', capacitador=capacitador)
         return self.render_json_response(capacitacion_list)
 
 class InformeEscuelaListView(LoginRequiredMixin, FormView):
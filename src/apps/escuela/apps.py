@@ -2,4 +2,7 @@ from django.apps import AppConfig
 
 
 class EscuelaConfig(AppConfig):
-    name = 'escuela'
+    name = 'apps.escuela'
+
+    def ready(self):
+        from . import signals
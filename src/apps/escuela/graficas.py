@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+# Datos de las gráficas de KA Lite y de impacto (controlNotas) del perfil de la escuela.
+# Se calculan con unas pocas consultas agrupadas y se guardan en caché por escuela junto a un número de
+# versión de la escuela y uno general. Las señales `post_save` y `post_delete` de las visitas, evaluaciones
+# y notas incrementan la versión de su escuela; las de los catálogos (rúbricas, materias y semestres),
+# la versión general. La versión se incrementa al confirmar la transacción que hizo el cambio, para que otro
+# proceso no guarde con la versión nueva unas gráficas calculadas antes de que el cambio fuera visible.
+import time
+from functools import reduce
+
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+from django.db.models import Avg, Min
+
+from apps.controlNotas import models as control_m
+from apps.kalite import models as kalite_m
+
+CLAVE_VERSION = 'escuela:graficas:version:{}'
+
+# Tiempo en segundos que se conserva en caché cada escuela
+CACHE_TIMEOUT = 60 * 60 * 24
+
+# Por cada modelo, la ruta de atributos desde la instancia hasta el id de la escuela.
+# Los modelos sin ruta son catálogos que afectan a todas las escuelas.
+MODELOS = {
+    'kalite.Visita': 'escuela_id',
+    'kalite.Evaluacion': 'visita.escuela_id',
+    'kalite.Punteo': 'evaluacion.visita.escuela_id',
+    'kalite.Rubrica': None,
+    'controlNotas.Visita': 'escuela_id',
+    'controlNotas.Evaluacion': 'visita.escuela_id',
+    'controlNotas.Notas': 'evaluacion.visita.escuela_id',
+    'controlNotas.Materia': None,
+    'controlNotas.Semestre': None,
+}
+
+
+def version(escuela='todas'):
+    """Devuelve la versión actual de las gráficas de `escuela` o, por defecto, la versión general."""
+    return cache.get_or_set(CLAVE_VERSION.format(escuela), int(time.time()), None)
+
+
+def invalidar(escuela='todas'):
+    """Incrementa la versión de las gráficas de `escuela` o, por defecto, la de todas las escuelas."""
+    try:
+        cache.incr(CLAVE_VERSION.format(escuela))
+    except ValueError:
+        cache.set(CLAVE_VERSION.format(escuela), int(time.time()), None)
+
+
+def invalidar_modelo(sender, instance, **kwargs):
+    """Invalida las gráficas de la escuela de `instance` al confirmar la transacción.
+    Se conecta a las señales de los modelos de `MODELOS`.
+    """
+    ruta = MODELOS[sender._meta.label]
+    if ruta is None:
+        escuela = 'todas'
+    else:
+        try:
+            escuela = reduce(getattr, ruta.split('.'), instance)
+        except ObjectDoesNotExist:
+            # Al eliminar en cascada el registro superior ya no existe, pero su propia señal invalida la escuela
+            return
+    transaction.on_commit(lambda: invalidar(escuela))
+
+
+def grafica_kalite(escuela):
+    """Promedio de las :class:`kalite.Evaluacion`es de la escuela por cada :class:`kalite.Rubrica`."""
+    evaluaciones = kalite_m.Evaluacion.objects.filter(visita__escuela=escuela).order_by().values(
+        'rubrica__nombre', 'rubrica__color').annotate(promedio=Avg('nota_promedio'), orden=Min('id'))
+    return [
+        {'nombre': evaluacion['rubrica__nombre'], 'promedio': evaluacion['promedio'], 'color': evaluacion['rubrica__color']}
+        for evaluacion in evaluaciones.order_by('orden')]
+
+
+def grafica_impacto(escuela):
+    """Promedio de las :class:`controlNotas.Notas` de la escuela por cada :class:`controlNotas.Materia`,
+    precedido por el promedio general de todas las materias.
+    """
+    materias = control_m.Notas.objects.filter(evaluacion__visita__escuela=escuela).order_by(
+        'evaluacion__materia__nombre').values(
+        'evaluacion__materia__nombre', 'evaluacion__materia__color').annotate(promedio=Avg('nota'))
+    impacto_list = [
+        {'nombre': materia['evaluacion__materia__nombre'], 'promedio': round(materia['promedio'], 0),
+         'color': materia['evaluacion__materia__color']}
+        for materia in materias]
+    if impacto_list:
+        promedio_general = sum(materia['promedio'] for materia in impacto_list) / len(impacto_list)
+        impacto_list.insert(0, {'nombre': 'Promedio General', 'promedio': promedio_general, 'color': 'red'})
+    return impacto_list
+
+
+def grafica_progreso(escuela):
+    """Promedio de las :class:`controlNotas.Notas` por materia en el semestre de cada :class:`controlNotas.Visita`
+    de la escuela, y el promedio de todas las materias de la visita.
+
+    Returns:
+        tuple: las barras de progreso por visita y materia, y el promedio total de cada visita.
+    """
+    promedios = {}
+    notas = control_m.Notas.objects.filter(evaluacion__visita__escuela=escuela).order_by(
+        'evaluacion__materia__nombre').values(
+        'evaluacion__visita__semestre', 'evaluacion__materia__nombre', 'evaluacion__materia__color').annotate(
+        promedio=Avg('nota'))
+    for nota in notas:
+        promedios.setdefault(nota['evaluacion__visita__semestre'], []).append(nota)
+
+    impacto_progreso_list = []
+    impacto_visita_list = []
+    visitas = control_m.Visita.objects.filter(escuela=escuela).order_by('id').values(
+        'fecha', 'semestre', 'semestre__numero')
+    for visita in visitas:
+        nombre_visita = '{}-{}'.format(visita['fecha'].year, visita['semestre__numero'])
+        materias = promedios.get(visita['semestre'], [])
+        for materia in materias:
+            impacto_progreso_list.append({
+                'visita': nombre_visita,
+                'nombre': materia['evaluacion__materia__nombre'],
+                'promedio': round(materia['promedio'], 0),
+                'color': materia['evaluacion__materia__color']})
+        promedio_total = sum(round(materia['promedio'], 0) for materia in materias) / len(materias) if materias else 0
+        impacto_visita_list.append({'visita': nombre_visita, 'promedio_total': round(promedio_total, 0)})
+    return impacto_progreso_list, impacto_visita_list
+
+
+def calcular(escuela):
+    """Calcula las variables de contexto de las gráficas de `escuela`."""
+    impacto_progreso, impacto_visita = grafica_progreso(escuela)
+    return {
+        'grafica_kalite': grafica_kalite(escuela),
+        'grafica_impacto': grafica_impacto(escuela),
+        'impacto_progreso': impacto_progreso,
+        'impacto_visita': impacto_visita,
+    }
+
+
+def obtener(escuela):
+    """Devuelve las variables de contexto de las gráficas de `escuela` (objeto o id),
+    calculándolas solamente si no están en caché en la versión actual.
+    """
+    escuela = getattr(escuela, 'pk', escuela)
+    clave = 'escuela:graficas:{}:{}:{}'.format(escuela, version(), version(escuela))
+    graficas = cache.get(clave)
+    if graficas is None:
+        graficas = calcular(escuela)
+        cache.set(clave, graficas, CACHE_TIMEOUT)
+    return graficas
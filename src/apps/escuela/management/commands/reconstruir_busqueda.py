@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.escuela.models import EscuelaBusqueda
+
+
+class Command(BaseCommand):
+    help = 'Vuelve a crear el índice de búsqueda de todas las escuelas.'
+
+    def handle(self, *args, **options):
+        cantidad = EscuelaBusqueda.actualizar()
+        self.stdout.write('{} escuelas indexadas'.format(cantidad))
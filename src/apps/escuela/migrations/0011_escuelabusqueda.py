@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-18 16:43
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import OuterRef, Subquery
+
+from apps.main.utils import normalizar
+
+
+def llenar_busqueda(apps, schema_editor):
+    Escuela = apps.get_model('escuela', 'Escuela')
+    EscPoblacion = apps.get_model('escuela', 'EscPoblacion')
+    EscuelaBusqueda = apps.get_model('escuela', 'EscuelaBusqueda')
+    equipadas = set(apps.get_model('tpe', 'Equipamiento').objects.values_list('escuela', flat=True))
+    capacitadas = set(apps.get_model('cyd', 'Participante').objects.values_list('escuela', flat=True))
+    poblaciones = EscPoblacion.objects.filter(escuela=OuterRef('pk')).order_by('-fecha', '-id')
+    filas = Escuela.objects.annotate(poblacion_actual=Subquery(poblaciones.values('total_alumno')[:1])).values_list(
+        'id', 'nombre', 'direccion', 'municipio', 'municipio__departamento', 'nivel', 'sector', 'poblacion_actual')
+    EscuelaBusqueda.objects.bulk_create((
+        EscuelaBusqueda(
+            escuela_id=escuela,
+            nombre=' ' + normalizar(nombre),
+            direccion=' ' + normalizar(direccion),
+            municipio_id=municipio,
+            departamento_id=departamento,
+            nivel_id=nivel,
+            sector_id=sector,
+            poblacion=poblacion,
+            equipada=escuela in equipadas,
+            capacitada=escuela in capacitadas)
+        for escuela, nombre, direccion, municipio, departamento, nivel, sector, poblacion in filas), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0006_notificacion'),
+        ('escuela', '0010_auto_20171117_0807'),
+        ('cyd', '0030_asignacion_notas'),
+        ('tpe', '0021_auto_20180309_1119'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EscuelaBusqueda',
+            fields=[
+                ('escuela', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='busqueda', serialize=False, to='escuela.Escuela')),
+                ('nombre', models.CharField(db_index=True, max_length=260)),
+                ('direccion', models.TextField()),
+                ('poblacion', models.PositiveIntegerField(blank=True, db_index=True, null=True)),
+                ('equipada', models.BooleanField(db_index=True, default=False)),
+                ('capacitada', models.BooleanField(db_index=True, default=False)),
+                ('departamento', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='main.Departamento')),
+                ('municipio', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='main.Municipio')),
+                ('nivel', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='escuela.EscNivel')),
+                ('sector', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='escuela.EscSector')),
+            ],
+            options={
+                'verbose_name': 'Índice de búsqueda de escuela',
+                'verbose_name_plural': 'Índice de búsqueda de escuelas',
+            },
+        ),
+        migrations.RunPython(llenar_busqueda, migrations.RunPython.noop),
+    ]
@@ -1,11 +1,12 @@
 import requests
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Exists, OuterRef, Subquery
 from django.urls import reverse
 from django.utils import timezone
 from django.conf import settings
 
-from apps.main.models import Municipio, Coordenada
-from apps.main.utils import get_telefonica
+from apps.main.models import Departamento, Municipio, Coordenada
+from apps.main.utils import get_telefonica, normalizar
 from apps.legacy import  models as legacy_m
 from django.core import serializers
 
@@ -321,6 +322,122 @@ class EscPoblacion(models.Model):
         return self.escuela.get_absolute_url()
 
 
+class EscuelaBusquedaQuerySet(models.QuerySet):
+    def buscar(self, nombre=None, direccion=None):
+        """Filtra las escuelas cuyo nombre y dirección contengan palabras que empiecen con cada palabra
+        de `nombre` y `direccion`, sin importar tildes ni mayúsculas.
+        """
+        queryset = self
+        for campo, texto in (('nombre', nombre), ('direccion', direccion)):
+            for palabra in normalizar(texto).split():
+                queryset = queryset.filter(**{'{}__contains'.format(campo): ' ' + palabra})
+        return queryset
+
+    def facetas(self):
+        """Cuenta las escuelas por departamento, sector, nivel y si están equipadas o capacitadas.
+
+        Returns:
+            dict: una lista de diccionarios con el valor, el nombre y la cantidad por cada faceta.
+        """
+        facetas = {}
+        for faceta, nombre in (
+                ('departamento', 'departamento__nombre'),
+                ('sector', 'sector__sector'),
+                ('nivel', 'nivel__nivel'),
+                ('equipada', 'equipada'),
+                ('capacitada', 'capacitada')):
+            conteo = self.order_by(nombre).values_list(faceta, nombre).annotate(cantidad=models.Count('pk'))
+            facetas[faceta] = [
+                {'valor': valor, 'nombre': str(nombre), 'cantidad': cantidad} for valor, nombre, cantidad in conteo]
+        return facetas
+
+
+class EscuelaBusqueda(models.Model):
+    """Índice de búsqueda de :class:`Escuela`.
+
+    Guarda el nombre y la dirección normalizados, con un espacio antes de cada palabra para buscar
+    por prefijo, junto a la última población y si la escuela está equipada o capacitada, para que el
+    buscador filtre y liste escuelas sin unir las demás tablas. Se actualiza mediante :meth:`actualizar`
+    con las señales de los modelos de los que depende.
+    """
+    escuela = models.OneToOneField(Escuela, primary_key=True, related_name='busqueda', on_delete=models.CASCADE)
+    nombre = models.CharField(max_length=260, db_index=True)
+    direccion = models.TextField()
+    municipio = models.ForeignKey(Municipio, related_name='+', on_delete=models.CASCADE)
+    departamento = models.ForeignKey(Departamento, related_name='+', on_delete=models.CASCADE)
+    nivel = models.ForeignKey(EscNivel, related_name='+', on_delete=models.CASCADE)
+    sector = models.ForeignKey(EscSector, related_name='+', on_delete=models.CASCADE)
+    poblacion = models.PositiveIntegerField(null=True, blank=True, db_index=True)
+    equipada = models.BooleanField(default=False, db_index=True)
+    capacitada = models.BooleanField(default=False, db_index=True)
+
+    objects = EscuelaBusquedaQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Índice de búsqueda de escuela"
+        verbose_name_plural = "Índice de búsqueda de escuelas"
+
+    def __str__(self):
+        return str(self.escuela)
+
+    @classmethod
+    def actualizar(cls, escuelas=None, crear=True):
+        """Actualiza el índice de las `escuelas` (lista o queryset de ids). Si es `None`, de todas.
+        Con `crear=False` solo se actualizan las escuelas que ya están en el índice, para no volver a agregar
+        una escuela que se está eliminando en cascada.
+        """
+        queryset = Escuela.objects.all()
+        if escuelas is not None:
+            queryset = queryset.filter(id__in=escuelas)
+        poblaciones = EscPoblacion.objects.filter(escuela=OuterRef('pk')).order_by('-fecha', '-id')
+        relacionados = {
+            campo: Escuela._meta.get_field(campo).related_model.objects.filter(escuela=OuterRef('pk'))
+            for campo in ('equipamiento', 'participantes')}
+        filas = queryset.annotate(
+            poblacion_actual=Subquery(poblaciones.values('total_alumno')[:1]),
+            con_equipamiento=Exists(relacionados['equipamiento']),
+            con_participantes=Exists(relacionados['participantes'])).values_list(
+            'id', 'nombre', 'direccion', 'municipio', 'municipio__departamento', 'nivel', 'sector',
+            'poblacion_actual', 'con_equipamiento', 'con_participantes')
+        indices = {
+            escuela: {
+                'nombre': ' ' + normalizar(nombre),
+                'direccion': ' ' + normalizar(direccion),
+                'municipio_id': municipio,
+                'departamento_id': departamento,
+                'nivel_id': nivel,
+                'sector_id': sector,
+                'poblacion': poblacion,
+                'equipada': equipada,
+                'capacitada': capacitada}
+            for escuela, nombre, direccion, municipio, departamento, nivel, sector, poblacion, equipada, capacitada
+            in filas}
+
+        # Los índices existentes se actualizan en lugar de borrarlos y crearlos otra vez, para que dos
+        # actualizaciones simultáneas de la misma escuela no choquen con la llave primaria. Solo se actualizan
+        # los que cambiaron.
+        campos = [campo.attname for campo in cls._meta.concrete_fields if campo.name != 'escuela']
+        with transaction.atomic():
+            anteriores = {
+                anterior['escuela']: anterior
+                for anterior in cls.objects.filter(escuela__in=indices).values('escuela', *campos)}
+            for escuela, anterior in anteriores.items():
+                valores = indices[escuela]
+                if any(anterior[campo] != valor for campo, valor in valores.items()):
+                    cls.objects.filter(escuela=escuela).update(**valores)
+            faltantes = set(indices) - set(anteriores) if crear else set()
+            if faltantes:
+                try:
+                    with transaction.atomic():
+                        cls.objects.bulk_create(
+                            (cls(escuela_id=escuela, **indices[escuela]) for escuela in faltantes), batch_size=500)
+                except IntegrityError:
+                    # Otra transacción creó alguno de los índices al mismo tiempo
+                    for escuela in faltantes:
+                        cls.objects.update_or_create(escuela_id=escuela, defaults=indices[escuela])
+        return len(anteriores) + len(faltantes)
+
+
 class EscMatricula(models.Model):
 
     """Registro histórico de la matrícula de la escuela.
@@ -0,0 +1,27 @@
+from django.db.models.signals import post_delete, post_save
+
+from apps.escuela import graficas
+from apps.escuela.models import Escuela, EscuelaBusqueda
+
+for modelo in graficas.MODELOS:
+    post_save.connect(graficas.invalidar_modelo, sender=modelo)
+    post_delete.connect(graficas.invalidar_modelo, sender=modelo)
+
+
+def actualizar_busqueda_escuela(sender, instance, **kwargs):
+    EscuelaBusqueda.actualizar([instance.pk])
+
+
+def actualizar_busqueda(sender, instance, **kwargs):
+    """Actualiza el índice de búsqueda de la escuela de `instance` al guardar o eliminar
+    una población, un equipamiento o un participante.
+    Al eliminar (`post_delete` no envía `created`) no se crea el índice, porque la escuela
+    puede estarse eliminando en cascada.
+    """
+    EscuelaBusqueda.actualizar([instance.escuela_id], crear='created' in kwargs)
+
+
+post_save.connect(actualizar_busqueda_escuela, sender=Escuela)
+for modelo in ('escuela.EscPoblacion', 'tpe.Equipamiento', 'cyd.Participante'):
+    post_save.connect(actualizar_busqueda, sender=modelo)
+    post_delete.connect(actualizar_busqueda, sender=modelo)
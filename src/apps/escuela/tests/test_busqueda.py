@@ -0,0 +1,117 @@
+import json
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase
+from django.utils.six import StringIO
+
+from apps.cyd.tests.factories import ParticipanteFactory
+from apps.escuela.models import EscPoblacion, EscuelaBusqueda
+from apps.escuela.tests import factories
+from apps.escuela.views import EscuelaBuscar
+from apps.main import models as main_m
+from apps.tpe import models as tpe_m
+
+
+class EscuelaBusquedaTestCase(TestCase):
+    """Pruebas para el índice de búsqueda de escuelas"""
+
+    def setUp(self):
+        self.usuario = User.objects.create(username='buscador')
+        departamento = main_m.Departamento.objects.create(nombre='Chiquimula')
+        self.municipio = main_m.Municipio.objects.create(departamento=departamento, nombre='Jocotán')
+        self.otro_municipio = main_m.Municipio.objects.create(
+            departamento=main_m.Departamento.objects.create(nombre='Zacapa'), nombre='Gualán')
+        self.sector = factories.EscSectorFactory(sector='Oficial')
+        self.escuela = factories.EscuelaFactory(
+            municipio=self.municipio,
+            sector=self.sector,
+            nombre='Escuela Oficial Rural Mixta, Aldea El Jícaro',
+            direccion='Caserío Tizamarté')
+        factories.EscuelaFactory(municipio=self.municipio, sector=self.sector, nombre='EORM Aldea Tunucó Abajo')
+        factories.EscuelaFactory(municipio=self.otro_municipio, nombre='Instituto Básico Gualán')
+
+    def buscar(self, **filtros):
+        request = RequestFactory().post('/', filtros)
+        request.user = self.usuario
+        return json.loads(EscuelaBuscar.as_view()(request).content.decode('utf-8'))
+
+    def test_indice(self):
+        indice = EscuelaBusqueda.objects.get(escuela=self.escuela)
+        self.assertEqual(indice.nombre, ' escuela oficial rural mixta aldea el jicaro')
+        self.assertEqual((indice.departamento, indice.poblacion, indice.equipada, indice.capacitada),
+                         (self.municipio.departamento, None, False, False))
+
+        # La última población, el equipamiento y los participantes se actualizan con señales
+        EscPoblacion.objects.create(escuela=self.escuela, fecha=date(2019, 1, 1), alumno=100)
+        poblacion = EscPoblacion.objects.create(escuela=self.escuela, fecha=date(2020, 1, 1), alumno=80)
+        tpe_m.EquipamientoEstado.objects.create(id=1, estado='Entregado')
+        tpe_m.Equipamiento.objects.create(id=1, escuela=self.escuela)
+        ParticipanteFactory(escuela=self.escuela)
+        indice = EscuelaBusqueda.objects.get(escuela=self.escuela)
+        self.assertEqual((indice.poblacion, indice.equipada, indice.capacitada), (80, True, True))
+        poblacion.delete()
+        self.assertEqual(EscuelaBusqueda.objects.get(escuela=self.escuela).poblacion, 100)
+
+        self.escuela.nombre = 'Escuela Oficial Urbana'
+        self.escuela.save()
+        self.assertEqual(EscuelaBusqueda.objects.get(escuela=self.escuela).nombre, ' escuela oficial urbana')
+
+    def test_eliminar_en_cascada(self):
+        escuela = factories.EscuelaFactory(municipio=self.municipio)
+        EscPoblacion.objects.create(escuela=escuela, alumno=10)
+        escuela.delete()
+        self.assertFalse(EscuelaBusqueda.objects.filter(escuela=escuela.id).exists())
+        self.assertEqual(EscuelaBusqueda.objects.count(), 3)
+
+    def test_actualizar_en_su_lugar(self):
+        EscuelaBusqueda.objects.filter(escuela=self.escuela).delete()
+        self.assertEqual(EscuelaBusqueda.actualizar(crear=False), 2)
+        self.assertFalse(EscuelaBusqueda.objects.filter(escuela=self.escuela).exists())
+        self.assertEqual(EscuelaBusqueda.actualizar(), 3)
+        self.assertTrue(EscuelaBusqueda.objects.filter(escuela=self.escuela).exists())
+
+        # Los índices que no cambiaron no se modifican
+        with self.assertNumQueries(4):
+            self.assertEqual(EscuelaBusqueda.actualizar(), 3)
+
+    def test_buscar(self):
+        def codigos(queryset):
+            return sorted(queryset.values_list('escuela__codigo', flat=True))
+
+        # Sin importar tildes ni mayúsculas, y por prefijo de cada palabra
+        self.assertEqual(codigos(EscuelaBusqueda.objects.buscar(nombre='JICA')), [self.escuela.codigo])
+        self.assertEqual(codigos(EscuelaBusqueda.objects.buscar(nombre='aldea', direccion='tizamarte')), [self.escuela.codigo])
+        self.assertEqual(EscuelaBusqueda.objects.buscar(nombre='icaro').count(), 0)
+        self.assertEqual(EscuelaBusqueda.objects.buscar(nombre='aldea').count(), 2)
+
+        facetas = EscuelaBusqueda.objects.all().facetas()
+        self.assertEqual(
+            [(faceta['nombre'], faceta['cantidad']) for faceta in facetas['departamento']],
+            [('Chiquimula', 2), ('Zacapa', 1)])
+        self.assertEqual(facetas['equipada'], [{'valor': False, 'nombre': 'False', 'cantidad': 3}])
+
+    def test_vista(self):
+        for indice in range(10):
+            factories.EscuelaFactory(municipio=self.municipio, sector=self.sector, nombre='Escuela {}'.format(indice))
+        # El conteo, la página y una consulta por cada faceta, sin importar la cantidad de escuelas
+        with self.assertNumQueries(7):
+            respuesta = self.buscar(departamento=self.municipio.departamento.id, por_pagina=5, pagina=2)
+        self.assertEqual((respuesta['total'], respuesta['pagina'], respuesta['paginas']), (12, 2, 3))
+        self.assertEqual(len(respuesta['resultados']), 5)
+        self.assertEqual(respuesta['facetas']['sector'], [{'valor': self.sector.id, 'nombre': 'Oficial', 'cantidad': 12}])
+
+        respuesta = self.buscar(nombre='jícaro', equipamiento='True')
+        self.assertEqual(respuesta['total'], 1)
+        self.assertEqual(respuesta['resultados'][0]['codigo'], self.escuela.codigo)
+        self.assertEqual(respuesta['resultados'][0]['capacitacion'], {'capacitada': False})
+        self.assertEqual(self.buscar(nombre='jícaro', equipamiento='False')['total'], 0)
+        self.assertEqual(self.buscar(pagina=10)['pagina'], 1)
+
+    def test_comando(self):
+        EscuelaBusqueda.objects.all().delete()
+        salida = StringIO()
+        call_command('reconstruir_busqueda', stdout=salida)
+        self.assertIn('3 escuelas indexadas', salida.getvalue())
+        self.assertEqual(EscuelaBusqueda.objects.count(), 3)
@@ -0,0 +1,121 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TransactionTestCase
+
+from apps.controlNotas import models as control_m
+from apps.escuela import graficas
+from apps.escuela.tests.factories import EscuelaFactory
+from apps.kalite import models as kalite_m
+from apps.main import models as main_m
+
+
+class GraficasTestCase(TransactionTestCase):
+    """Pruebas para las gráficas de KA Lite y de impacto del perfil de la escuela.
+    Las versiones se incrementan al confirmar cada transacción, por lo que no se usa :class:`TestCase`.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.usuario = User.objects.create(username='capacitador')
+        departamento = main_m.Departamento.objects.create(nombre='Guatemala')
+        municipio = main_m.Municipio.objects.create(departamento=departamento, nombre='Mixco')
+        self.escuela = EscuelaFactory(municipio=municipio)
+        self.otra_escuela = EscuelaFactory(municipio=municipio)
+
+        tipo_visita = kalite_m.TipoVisita.objects.create(nombre='Seguimiento')
+        for nombre, color, indicadores in (('Uso', 'aqua', 2), ('Planificación', 'navy', 3)):
+            rubrica = kalite_m.Rubrica.objects.create(nombre=nombre, color=color)
+            for indice in range(indicadores):
+                rubrica.indicadores.create(indicador='Indicador {}'.format(indice))
+            tipo_visita.rubricas.add(rubrica)
+        for numero in (1, 2):
+            kalite_m.Visita.objects.create(
+                escuela=self.escuela, tipo_visita=tipo_visita, fecha=date(2020, numero, 1),
+                capacitador=self.usuario, numero=numero)
+        visita = kalite_m.Visita.objects.get(escuela=self.escuela, numero=1)
+        for rubrica, notas in (('Uso', (5, 4)), ('Planificación', (3, 3, 4))):
+            for punteo, nota in zip(visita.evaluaciones.get(rubrica__nombre=rubrica).notas.order_by('id'), notas):
+                punteo.nota = nota
+                punteo.save()
+
+        semestres = {numero: control_m.Semestre.objects.create(numero=numero) for numero in (1, 2)}
+        materias = {
+            'Matemática': control_m.Materia.objects.create(nombre='Matemática', color='navy'),
+            'Lenguaje': control_m.Materia.objects.create(nombre='Lenguaje', color='aqua')}
+        grado = control_m.Grado.objects.create(nombre_grado='Primero')
+        visitas = (
+            (date(2020, 3, 1), 1, {'Matemática': (80, 90), 'Lenguaje': (70,)}),
+            (date(2020, 8, 1), 2, {'Matemática': (60,)}),
+            (date(2021, 3, 1), 1, {'Lenguaje': (52,)}))
+        for numero, (fecha, semestre, evaluaciones) in enumerate(visitas, 1):
+            visita = control_m.Visita.objects.create(
+                escuela=self.escuela, semestre=semestres[semestre], usuario=self.usuario,
+                numero_visita=numero, fecha=fecha)
+            for materia, notas in evaluaciones.items():
+                evaluacion = control_m.Evaluacion.objects.create(visita=visita, materia=materias[materia], grado=grado)
+                for nota in notas:
+                    control_m.Notas.objects.create(evaluacion=evaluacion, alumno='Alumno', nota=nota)
+
+    def test_calcular(self):
+        with self.assertNumQueries(4):
+            datos = graficas.calcular(self.escuela.pk)
+        self.assertEqual(
+            [(grafica['nombre'], round(grafica['promedio'], 2), grafica['color']) for grafica in datos['grafica_kalite']],
+            [('Uso', 55, 'aqua'), ('Planificación', 43.33, 'navy')])
+        self.assertEqual(
+            [(grafica['nombre'], grafica['promedio']) for grafica in datos['grafica_impacto']],
+            [('Promedio General', 69), ('Lenguaje', 61), ('Matemática', 77)])
+        self.assertEqual(
+            [(grafica['visita'], grafica['nombre'], grafica['promedio']) for grafica in datos['impacto_progreso']],
+            [('2020-1', 'Lenguaje', 61), ('2020-1', 'Matemática', 85), ('2020-2', 'Matemática', 60),
+             ('2021-1', 'Lenguaje', 61), ('2021-1', 'Matemática', 85)])
+        self.assertEqual(
+            datos['impacto_visita'],
+            [{'visita': '2020-1', 'promedio_total': 73}, {'visita': '2020-2', 'promedio_total': 60},
+             {'visita': '2021-1', 'promedio_total': 73}])
+
+        vacia = graficas.calcular(self.otra_escuela.pk)
+        self.assertEqual(vacia, {'grafica_kalite': [], 'grafica_impacto': [], 'impacto_progreso': [], 'impacto_visita': []})
+
+    def test_cache(self):
+        graficas.obtener(self.escuela)
+        graficas.obtener(self.otra_escuela)
+        with self.assertNumQueries(0):
+            self.assertEqual(graficas.obtener(self.escuela.pk)['grafica_impacto'][0]['promedio'], 69)
+
+        # Una nota nueva invalida solamente las gráficas de su escuela
+        control_m.Notas.objects.create(
+            evaluacion=control_m.Evaluacion.objects.get(materia__nombre='Matemática', visita__numero_visita=2),
+            alumno='Alumno', nota=100)
+        with self.assertNumQueries(0):
+            graficas.obtener(self.otra_escuela)
+        self.assertEqual(graficas.obtener(self.escuela)['grafica_impacto'][2]['promedio'], 82)
+
+        punteo = kalite_m.Punteo.objects.filter(evaluacion__visita__numero=2, evaluacion__rubrica__nombre='Uso').first()
+        punteo.nota = 5
+        punteo.save()
+        self.assertEqual(round(graficas.obtener(self.escuela)['grafica_kalite'][0]['promedio'], 2), 75)
+
+        # Los cambios en los catálogos invalidan todas las escuelas
+        control_m.Materia.objects.filter(nombre='Lenguaje').get().save()
+        with self.assertNumQueries(4):
+            graficas.obtener(self.otra_escuela)
+
+        # Al eliminar una visita en cascada también se invalidan sus gráficas
+        control_m.Visita.objects.filter(escuela=self.escuela, numero_visita=3).delete()
+        self.assertEqual(len(graficas.obtener(self.escuela)['impacto_visita']), 2)
+
+    def test_invalidar_al_confirmar(self):
+        graficas.obtener(self.escuela)
+        version = graficas.version(self.escuela.pk)
+        with transaction.atomic():
+            control_m.Notas.objects.create(
+                evaluacion=control_m.Evaluacion.objects.get(materia__nombre='Matemática', visita__numero_visita=2),
+                alumno='Alumno', nota=100)
+            # Hasta que se confirma el cambio se siguen usando las gráficas anteriores
+            self.assertEqual(graficas.version(self.escuela.pk), version)
+        self.assertNotEqual(graficas.version(self.escuela.pk), version)
+        self.assertEqual(graficas.obtener(self.escuela)['grafica_impacto'][2]['promedio'], 82)
@@ -1,5 +1,8 @@
 """Vistas para la gestión de escuelas
 """
+from django.core.paginator import EmptyPage, Paginator
+from django.db.models import Q
+from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, reverse
 from django.views.generic import DetailView
 from django.views.generic.edit import CreateView, UpdateView
@@ -21,12 +24,12 @@ from apps.ie.forms import LaboratorioCreateForm, IEValidacionCreateForm
 from apps.escuela.forms import (
     FormEscuelaCrear, ContactoForm, EscuelaBuscarForm, EscPoblacionForm,
     EscMatriculaForm, EscRendimientoAcademicoForm)
+from apps.escuela import graficas
 from apps.escuela.models import (
     Escuela, EscContacto, EscContactoTelefono, EscContactoMail, EscPoblacion,
-    EscMatricula, EscRendimientoAcademico)
+    EscMatricula, EscRendimientoAcademico, EscuelaBusqueda)
+from apps.main import exportar
 from apps.main.mixins import InformeMixin
-from apps.controlNotas import models as control_m
-from django.db.models import Avg, Count, Min, Sum
 
 
 class EscuelaCrear(LoginRequiredMixin, PermissionRequiredMixin, CreateView):
@@ -105,84 +108,8 @@ class EscuelaDetail(LoginRequiredMixin, DetailView):
                 context['equipamiento_form'] = EquipamientoForm(instance=equipamiento)
                 context['equipamiento_id'] = self.kwargs['id_equipamiento']
 
-        # Obtener gráficas de KA Lite
-        kalite_list = []
-        impacto_list=[]
-        impacto_progreso_list=[]
-        impacto_visita_list=[]
-        evaluacion_list = []
-        values = {}
-        impacto_values={}
-        impacto_values_progreso={}
-        impacto_values_visita={}
-        num_visitas = {}
-        evaluacion_color = {}
-        acumulador_promedio=0
-        contador_materias =0
-        segundo_acumulador=0
-        promedio_general=0
-        numero_materias=0
-        for visita in self.object.visitas_kalite.all():
-            for evaluacion in visita.evaluaciones.all():
-                if evaluacion.rubrica.nombre not in evaluacion_list:
-                    evaluacion_list.append(evaluacion.rubrica.nombre)
-                    values[evaluacion.rubrica.nombre] = 0
-                    num_visitas[evaluacion.rubrica.nombre] = 1
-                else:
-                    num_visitas[evaluacion.rubrica.nombre] += 1
-
-                evaluacion_color[evaluacion.rubrica.nombre] = evaluacion.rubrica.color
-                values[evaluacion.rubrica.nombre] = int(values[evaluacion.rubrica.nombre]) + evaluacion.promedio
-
-        for evaluacion_nombre in evaluacion_list:
-            promedio = values[evaluacion_nombre] / num_visitas[evaluacion_nombre]
-            color = evaluacion_color[evaluacion_nombre]
-            value = {"nombre": evaluacion_nombre, "promedio": promedio, "color": color}
-            kalite_list.append(dict(value))
-
-        context['grafica_kalite'] = kalite_list
-        # Grafica de impacto
-        ordenar=[]
-        materias =control_m.Evaluacion.objects.filter(visita__escuela__id=self.object.pk).distinct().values("materia","materia__nombre","materia__color")
-        for materia in materias:
-            notas = control_m.Notas.objects.filter(evaluacion__visita__escuela__id=self.object.pk,evaluacion__materia__id=materia["materia"]).aggregate(promedio=Avg('nota'))
-            numero_materias = numero_materias +1
-            ordenar.append(materia["materia__nombre"])
-            ordenar=list(dict.fromkeys(ordenar))
-            if numero_materias <= len(ordenar):
-                impacto_values = {"nombre": materia["materia__nombre"], "promedio": round(notas['promedio'],0), "color": materia["materia__color"]}
-                promedio_general = promedio_general + round(notas['promedio'],0)
-                impacto_list.append(dict(impacto_values))
-            else:
-                promedio_general = promedio_general + round(notas['promedio'],0)
-            try:
-                promedio_general_enviar=promedio_general / numero_materias
-            except Exception as e:
-                promedio_general_enviar=0
-            impacto_values = {"nombre": "Promedio General", "promedio": promedio_general_enviar, "color":"red"}
-        impacto_list.append(dict(impacto_values))
-        impacto_list.insert(0, impacto_list.pop())
-        context['grafica_impacto'] = impacto_list        
-        # Graficas de impacto barras de progreso
-        visitas =control_m.Visita.objects.filter(escuela__id=self.object.pk)
-        for visita in visitas:
-            evaluaciones = control_m.Evaluacion.objects.filter(visita__escuela__id=self.object.pk,visita__semestre=visita.semestre).values("visita__semestre","materia","materia__color","materia__nombre").distinct()
-            acumulador_promedio=0
-            contador_materias=0
-            for evaluacion in evaluaciones:
-                contador_materias = contador_materias +1
-                notas = control_m.Notas.objects.filter(evaluacion__visita__semestre=visita.semestre,evaluacion__visita__escuela__id=self.object.pk,evaluacion__materia__id=evaluacion["materia"]).aggregate(promedio=Avg('nota'))
-                impacto_values_progreso = {"visita":str(visita.fecha.year)+"-"+str(visita.semestre),"nombre": evaluacion["materia__nombre"], "promedio": round(notas['promedio'],0), "color": evaluacion["materia__color"]}
-                impacto_progreso_list.append(dict(impacto_values_progreso))
-                acumulador_promedio= acumulador_promedio + round(notas['promedio'],0)
-            try:
-                promedio_total = (acumulador_promedio/contador_materias)
-            except Exception as e:
-                promedio_total =0
-            impacto_values_visita={"visita":str(visita.fecha.year)+"-"+str(visita.semestre),"promedio_total": round(promedio_total,0)}
-            impacto_visita_list.append(dict(impacto_values_visita))
-        context['impacto_progreso']= impacto_progreso_list
-        context['impacto_visita']= impacto_visita_list
+        # Gráficas de KA Lite y de impacto
+        context.update(graficas.obtener(self.object.pk))
         return context
 
 
@@ -302,25 +229,43 @@ class EscContactoEditar(LoginRequiredMixin, UpdateView):
 
 
 class EscuelaBuscar(InformeMixin):
-    """Buscador de escuelas
+    """Buscador de escuelas.
+    Filtra el índice :class:`EscuelaBusqueda` y responde una página de resultados junto
+    con el conteo de cada faceta.
     """
     form_class = EscuelaBuscarForm
     template_name = 'escuela/escuela_buscar.html'
-    queryset = Escuela.objects.distinct()
+    queryset = EscuelaBusqueda.objects.all()
+    columnas = (
+        ('codigo', 'UDI'),
+        ('nombre', 'Nombre'),
+        ('direccion', 'Dirección'),
+        ('departamento', 'Departamento'),
+        ('municipio', 'Municipio'),
+        ('sector', 'Sector'),
+        ('nivel', 'Nivel'),
+        ('poblacion', 'Población'),
+        ('equipada', 'Equipada'),
+        ('capacitacion.capacitada', 'Capacitada'),
+    )
+    nombre_archivo = 'escuelas'
+    por_pagina = 50
+    por_pagina_maximo = 500
     filter_list = {
-        'codigo': 'codigo',
-        'nombre': 'nombre__icontains',
-        'direccion': 'direccion__icontains',
+        'codigo': 'escuela__codigo',
         'municipio': 'municipio',
-        'departamento': 'municipio__departamento',
+        'departamento': 'departamento',
         'nivel': 'nivel',
         'sector': 'sector',
+        'poblacion_min': 'poblacion__gte',
+        'poblacion_max': 'poblacion__lte',
+    }
+    # Filtros que requieren unir otras tablas; se aplican con una subconsulta de :class:`Escuela`
+    escuela_filter_list = {
         'cooperante_mye': 'asignacion_cooperante__in',
         'proyecto_mye': 'asignacion_proyecto__in',
         'fecha_min': 'fecha__gte',
         'fecha_max': 'fecha__lte',
-        'poblacion_min': 'poblaciones__total_alumno__gte',
-        'poblacion_max': 'poblaciones__total_alumno__lte',
         'solicitud_id': 'solicitud__id',
         'validacion_id': 'validacion__id',
         'equipamiento_id': 'equipamiento__id',
@@ -330,48 +275,83 @@ class EscuelaBuscar(InformeMixin):
 
     def get_queryset(self, filtros):
         """Arma el filtro de escuelas.
-        Se modifica en base a `InformeMixin` para parsear los valores `True`/`False`.
+        Se modifica en base a `InformeMixin` para buscar por nombre y dirección en el índice y para
+        parsear los valores `True`/`False`.
 
         Args:
             filtros (dict): Filtros para aplicar al queryset
 
         Returns:
-            QuerySet: Queryset de escuelas filtradas
+            QuerySet: Queryset del índice de las escuelas filtradas
         """
-        queryset = super(EscuelaBuscar, self).get_queryset(filtros)
+        queryset = super(EscuelaBuscar, self).get_queryset(filtros).buscar(
+            nombre=filtros.get('nombre'),
+            direccion=filtros.get('direccion'))
+        filter_clauses = Q()
+        for key, filtro in self.escuela_filter_list.items():
+            if filtros.get(key):
+                filter_clauses &= Q(**{filtro: filtros.get(key)})
         if filtros.get('solicitud', None):
-            queryset = queryset.filter(solicitud__isnull=eval(filtros.get('solicitud')))
+            filter_clauses &= Q(solicitud__isnull=filtros.get('solicitud') == 'True')
         if filtros.get('validacion', None):
-            queryset = queryset.filter(validacion__isnull=eval(filtros.get('validacion')))
+            filter_clauses &= Q(validacion__isnull=filtros.get('validacion') == 'True')
+        if filter_clauses:
+            queryset = queryset.filter(escuela__in=Escuela.objects.filter(filter_clauses).values('id'))
         if filtros.get('equipamiento', None):
-            queryset = queryset.filter(equipamiento__isnull=eval(filtros.get('equipamiento')))
-        return queryset
-
-    def create_response(self, queryset):
-        print(queryset)
-        """Summary
+            queryset = queryset.filter(equipada=filtros.get('equipamiento') == 'False')
+        return queryset.select_related(
+            'escuela', 'municipio', 'departamento', 'sector', 'nivel').order_by('nombre', 'escuela')
+
+    def get_fila(self, busqueda):
+        return {
+            'codigo': busqueda.escuela.codigo,
+            'direccion': busqueda.escuela.direccion,
+            'departamento': busqueda.departamento.nombre,
+            'municipio': busqueda.municipio.nombre,
+            'nombre': busqueda.escuela.nombre,
+            'escuela_url': busqueda.escuela.get_absolute_url(),
+            'sector': str(busqueda.sector),
+            'nivel': str(busqueda.nivel),
+            'poblacion': busqueda.poblacion,
+            'equipada': busqueda.equipada,
+            'capacitacion': {'capacitada': busqueda.capacitada}
+        }
+
+    def create_response(self, queryset, pagina=1, por_pagina=None):
+        """Arma una página de resultados y las facetas de la búsqueda.
 
         Args:
-            queryset (QuerySet): Queryset de escuelas encontradas por los filtros
+            queryset (QuerySet): Queryset del índice de las escuelas encontradas por los filtros
+            pagina (int): Número de la página solicitada
+            por_pagina (int): Cantidad de escuelas por página
 
         Returns:
-            list: Lista de escuelas para formatear con JSON
+            dict: Página de escuelas y facetas para formatear con JSON
         """
-        return [
-            {
-                'codigo': escuela.codigo,
-                'direccion': escuela.direccion,
-                'departamento': escuela.municipio.departamento.nombre,
-                'municipio': escuela.municipio.nombre,
-                'nombre': escuela.nombre,
-                'escuela_url': escuela.get_absolute_url(),
-                'sector': str(escuela.sector),
-                'nivel': str(escuela.nivel),
-                'poblacion': escuela.poblacion,
-                'equipada': escuela.equipada,
-                'capacitacion': escuela.capacitacion
-            } for escuela in queryset
-        ]
+        paginator = Paginator(queryset, min(por_pagina or self.por_pagina, self.por_pagina_maximo))
+        try:
+            page = paginator.page(max(pagina, 1))
+        except EmptyPage:
+            page = paginator.page(paginator.num_pages)
+        return {
+            'total': paginator.count,
+            'pagina': page.number,
+            'paginas': paginator.num_pages,
+            'facetas': queryset.facetas(),
+            'resultados': [self.get_fila(busqueda) for busqueda in page]
+        }
+
+    def post(self, request, *args, **kwargs):
+        if self.request.POST.get('formato') in exportar.FORMATOS:
+            # La descarga incluye todas las escuelas encontradas, no solo una página
+            return super(EscuelaBuscar, self).post(request, *args, **kwargs)
+        try:
+            pagina = int(self.request.POST.get('pagina', 1))
+            por_pagina = int(self.request.POST.get('por_pagina', self.por_pagina))
+        except ValueError:
+            return JsonResponse({'error': 'Página inválida'}, status=400)
+        queryset = self.get_queryset(self.request.POST)
+        return JsonResponse(self.create_response(queryset, pagina, por_pagina))
 
 
 class EscPoblacionCreateView(LoginRequiredMixin, PermissionRequiredMixin, CreateView):
@@ -2,4 +2,7 @@ from django.apps import AppConfig
 
 
 class InformeConfig(AppConfig):
-    name = 'informe'
+    name = 'apps.informe'
+
+    def ready(self):
+        from . import signals
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from apps.informe import models as informe_m
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye la tabla de indicadores por escuela que utiliza el informe de escuelas.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'escuelas',
+            nargs='*',
+            type=int,
+            help='IDs de las escuelas a recalcular. Si no se indica ninguna, se recalculan todas.')
+
+    def handle(self, *args, **options):
+        creados = informe_m.IndicadorEscuela.reconstruir(options['escuelas'] or None)
+        self.stdout.write('{} indicadores de escuela reconstruidos'.format(creados))
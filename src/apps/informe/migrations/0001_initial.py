@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-18 15:57
+from __future__ import unicode_literals
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('cyd', '0029_sede_fecha_creacion'),
+        ('mye', '0014_usuariocooperante'),
+        ('escuela', '0010_auto_20171117_0807'),
+        ('tpe', '0021_auto_20180309_1119'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndicadorEscuela',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ninos_beneficiados', models.PositiveIntegerField(default=0)),
+                ('docentes', models.PositiveIntegerField(default=0)),
+                ('equipada', models.BooleanField(default=False)),
+                ('fecha_equipamiento', models.DateField(blank=True, null=True)),
+                ('equipo_entregado', models.IntegerField(default=0)),
+                ('capacitada', models.BooleanField(default=False)),
+                ('fecha_capacitacion', models.DateField(blank=True, null=True)),
+                ('maestros_capacitados', models.PositiveIntegerField(default=0)),
+                ('maestros_promovidos', models.PositiveIntegerField(default=0)),
+                ('maestros_desertores', models.PositiveIntegerField(default=0)),
+                ('actualizado', models.DateTimeField(auto_now=True)),
+                ('capacitador', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('cooperante', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='mye.Cooperante')),
+                ('equipamiento', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='tpe.Equipamiento')),
+                ('escuela', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='indicador', to='escuela.Escuela')),
+                ('proyecto', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='mye.Proyecto')),
+                ('sede', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='cyd.Sede')),
+            ],
+            options={
+                'verbose_name': 'Indicador de escuela',
+                'verbose_name_plural': 'Indicadores de escuela',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='indicadorescuela',
+            index=models.Index(fields=['equipada', 'capacitada'], name='informe_ind_equipad_b24277_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='indicadorescuela',
+            index=models.Index(fields=['fecha_equipamiento'], name='informe_ind_fecha_e_b5066e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='indicadorescuela',
+            index=models.Index(fields=['fecha_capacitacion'], name='informe_ind_fecha_c_8f41c1_idx'),
+        ),
+    ]
@@ -1,3 +1,315 @@
-from django.db import models
+from collections import Counter, defaultdict
 
-# Create your models here.
+from django.contrib.auth.models import User
+from django.db import IntegrityError, models, transaction
+from django.db.models import Case, F, IntegerField, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.cyd import models as cyd_m
+from apps.escuela import models as escuela_m
+from apps.mye import models as mye_m
+from apps.tpe import models as tpe_m
+
+# Cantidad de escuelas que se recalculan por iteración en `IndicadorEscuela.reconstruir`
+TAMANO_LOTE = 500
+
+# El informe no muestra los datos de capacitación de las escuelas cuyo último equipamiento es de este proyecto
+PROYECTO_SIN_CAPACITACION = 'NA´AT'
+
+
+class IndicadorEscuelaQuerySet(models.QuerySet):
+
+    # Filtros aceptados por la API del informe y el campo del indicador al que corresponden
+    FILTROS = {
+        'codigo': 'escuela__codigo',
+        'nombre': 'escuela__nombre__icontains',
+        'municipio': 'escuela__municipio',
+        'departamento': 'escuela__municipio__departamento',
+        'fecha_min': 'fecha_equipamiento__gte',
+        'fecha_max': 'fecha_equipamiento__lte',
+        'capacitador': 'capacitador',
+        'cooperante_tpe': 'cooperante',
+        'proyecto_tpe': 'proyecto',
+        'fecha_min_capacitacion': 'fecha_capacitacion__gte',
+        'fecha_max_capacitacion': 'fecha_capacitacion__lte',
+    }
+    # Filtros que pueden tener los valores `'True'` o `'False'`
+    FILTROS_BOOLEANOS = ('equipada', 'capacitada')
+
+    def filtrar(self, filtros):
+        """Aplica los filtros recibidos desde el formulario del informe.
+        Si no se recibe ningún filtro, no devuelve ningún registro.
+        """
+        filter_clauses = Q()
+        for key, filtro in self.FILTROS.items():
+            if filtros.get(key):
+                filter_clauses &= Q(**{filtro: filtros.get(key)})
+        for key in self.FILTROS_BOOLEANOS:
+            if filtros.get(key) in ('True', 'False'):
+                filter_clauses &= Q(**{key: filtros.get(key) == 'True'})
+        if not filter_clauses:
+            return self.none()
+        return self.filter(filter_clauses).select_related(
+            'escuela__municipio__departamento',
+            'cooperante',
+            'proyecto',
+            'capacitador')
+
+
+class IndicadorEscuela(models.Model):
+
+    """Resumen de los indicadores de población, equipamiento y capacitación de una :class:`escuela.Escuela`.
+    Es una tabla desnormalizada para el informe de escuelas, que se mantiene actualizada desde `signals.py`
+    y se puede reconstruir por completo con el comando `reconstruir_indicadores`.
+    """
+
+    escuela = models.OneToOneField(escuela_m.Escuela, on_delete=models.CASCADE, related_name='indicador')
+    # Población
+    ninos_beneficiados = models.PositiveIntegerField(default=0)
+    docentes = models.PositiveIntegerField(default=0)
+    # Equipamiento
+    equipada = models.BooleanField(default=False)
+    equipamiento = models.ForeignKey(
+        tpe_m.Equipamiento,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='+')
+    fecha_equipamiento = models.DateField(null=True, blank=True)
+    equipo_entregado = models.IntegerField(default=0)
+    cooperante = models.ForeignKey(
+        mye_m.Cooperante,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='+')
+    proyecto = models.ForeignKey(
+        mye_m.Proyecto,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='+')
+    # Capacitación
+    capacitada = models.BooleanField(default=False)
+    sede = models.ForeignKey(cyd_m.Sede, null=True, blank=True, on_delete=models.SET_NULL, related_name='+')
+    fecha_capacitacion = models.DateField(null=True, blank=True)
+    capacitador = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL, related_name='+')
+    maestros_capacitados = models.PositiveIntegerField(default=0)
+    maestros_promovidos = models.PositiveIntegerField(default=0)
+    maestros_desertores = models.PositiveIntegerField(default=0)
+
+    actualizado = models.DateTimeField(auto_now=True)
+
+    objects = IndicadorEscuelaQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Indicador de escuela"
+        verbose_name_plural = "Indicadores de escuela"
+        indexes = [
+            models.Index(fields=['equipada', 'capacitada']),
+            models.Index(fields=['fecha_equipamiento']),
+            models.Index(fields=['fecha_capacitacion']),
+        ]
+
+    def __str__(self):
+        return str(self.escuela)
+
+    @property
+    def maestros_no_promovidos(self):
+        return self.maestros_capacitados - self.maestros_promovidos
+
+    def como_fila(self):
+        """Devuelve el registro con el formato de la API del informe de escuelas."""
+        escuela = self.escuela
+        fila = {
+            "Udi": escuela.codigo,
+            "Nombre": escuela.nombre,
+            "Direccion": escuela.direccion,
+            "Departamento": escuela.municipio.departamento.nombre,
+            "Municipio": escuela.municipio.nombre,
+            "escuela_url": reverse('escuela_detail', kwargs={'pk': self.escuela_id}),
+            "Ninos_beneficiados": self.ninos_beneficiados,
+            "Docentes": self.docentes,
+            "Equipada": self.equipada,
+            "Capacitada": self.capacitada,
+        }
+        if self.equipada:
+            fila.update({
+                "Fecha_equipamiento": self.fecha_equipamiento,
+                "No_equipamiento": str(self.equipamiento_id),
+                "Donante": str(self.cooperante),
+                "Proyecto": str(self.proyecto),
+                "Equipo_entregado": self.equipo_entregado,
+            })
+        else:
+            fila.update({
+                "Fecha_equipamiento": "No tiene",
+                "No_equipamiento": 0,
+                "Donante": 0,
+                "Proyecto": 0,
+                "Equipo_entregado": 0,
+            })
+        if self.capacitada and str(self.proyecto) != PROYECTO_SIN_CAPACITACION:
+            fila.update({
+                "Capacitador": self.capacitador.get_full_name() if self.capacitador else "No tiene",
+                "Fecha_capacitacion": self.fecha_capacitacion,
+                "Maestros_capacitados": self.maestros_capacitados,
+                "Maestros_promovidos": self.maestros_promovidos,
+                "Maestros_no_promovidos": self.maestros_no_promovidos,
+                "Maestros_desertores": self.maestros_desertores,
+            })
+        else:
+            fila.update({
+                "Capacitador": "No tiene",
+                "Fecha_capacitacion": "No tiene",
+                "Maestros_capacitados": 0,
+                "Maestros_promovidos": 0,
+                "Maestros_no_promovidos": 0,
+                "Maestros_desertores": 0,
+            })
+        return fila
+
+    @classmethod
+    def reconstruir(cls, escuelas=None, crear=True):
+        """Recalcula los indicadores de las escuelas indicadas, o de todas si `escuelas` es `None`.
+        El cálculo se hace por lotes de `TAMANO_LOTE` escuelas con una cantidad fija de consultas por lote.
+
+        Args:
+            escuelas (iterable): ids de :class:`escuela.Escuela`.
+            crear (bool): si es `False`, solo se recalculan las escuelas que ya tienen indicador.
+
+        Returns:
+            int: cantidad de indicadores recalculados.
+        """
+        if escuelas is None:
+            escuelas = escuela_m.Escuela.objects.order_by('id').values_list('id', flat=True).iterator()
+        recalculados = 0
+        lote = []
+        for escuela_id in escuelas:
+            lote.append(escuela_id)
+            if len(lote) == TAMANO_LOTE:
+                recalculados += cls._reconstruir_lote(lote, crear)
+                lote = []
+        if lote:
+            recalculados += cls._reconstruir_lote(lote, crear)
+        return recalculados
+
+    @classmethod
+    def _reconstruir_lote(cls, escuelas, crear=True):
+        escuelas = set(escuelas)
+        indicadores = {escuela_id: cls(escuela_id=escuela_id) for escuela_id in escuelas}
+
+        # Población: el último registro de cada escuela
+        poblaciones = escuela_m.EscPoblacion.objects.filter(escuela__in=escuelas).order_by('escuela', 'fecha', 'id')
+        for poblacion in poblaciones.values('escuela', 'total_alumno', 'total_maestro'):
+            indicador = indicadores[poblacion['escuela']]
+            indicador.ninos_beneficiados = poblacion['total_alumno'] or 0
+            indicador.docentes = poblacion['total_maestro'] or 0
+
+        # Equipamiento: el último equipamiento de cada escuela, igual que `Escuela.datos_equipamiento`
+        equipamientos = {}
+        for equipamiento in tpe_m.Equipamiento.objects.filter(escuela__in=escuelas).order_by('escuela', 'id').values(
+                'id', 'escuela', 'fecha', 'cantidad_equipo'):
+            equipamientos[equipamiento['escuela']] = equipamiento
+        cooperantes = dict(
+            tpe_m.Equipamiento.cooperante.through.objects.filter(
+                equipamiento__in=[e['id'] for e in equipamientos.values()]).order_by(
+                'equipamiento', 'cooperante').values_list('equipamiento', 'cooperante'))
+        proyectos = dict(
+            tpe_m.Equipamiento.proyecto.through.objects.filter(
+                equipamiento__in=[e['id'] for e in equipamientos.values()]).order_by(
+                'equipamiento', 'proyecto').values_list('equipamiento', 'proyecto'))
+        for escuela_id, equipamiento in equipamientos.items():
+            indicador = indicadores[escuela_id]
+            indicador.equipada = True
+            indicador.equipamiento_id = equipamiento['id']
+            indicador.fecha_equipamiento = equipamiento['fecha']
+            indicador.equipo_entregado = equipamiento['cantidad_equipo']
+            indicador.cooperante_id = cooperantes.get(equipamiento['id'])
+            indicador.proyecto_id = proyectos.get(equipamiento['id'])
+
+        # Capacitación: las sedes de la escuela, igual que `Escuela.get_sedes`
+        sedes_escuela = defaultdict(set)
+        for escuela_id, sede_id in cyd_m.Sede.objects.filter(
+                escuela_beneficiada__in=escuelas).values_list('escuela_beneficiada', 'id'):
+            sedes_escuela[escuela_id].add(sede_id)
+        for escuela_id, sede_id in cyd_m.Asignacion.objects.filter(
+                participante__escuela__in=escuelas).values_list('participante__escuela', 'grupo__sede').distinct():
+            sedes_escuela[escuela_id].add(sede_id)
+        todas_sedes = set().union(*sedes_escuela.values())
+        if todas_sedes:
+            sedes = {
+                sede['id']: sede
+                for sede in cyd_m.Sede.objects.filter(id__in=todas_sedes).values('id', 'capacitador', 'fecha_creacion')}
+            resumen_sedes = {
+                resumen['grupo__sede']: resumen
+                for resumen in cyd_m.Asignacion.objects.filter(grupo__sede__in=todas_sedes).values(
+                    'grupo__sede').annotate(
+                    capacitados=Sum(Case(
+                        When(participante__genero__in=[1, 2], then=Value(1)),
+                        default=Value(0),
+                        output_field=IntegerField())),
+                    desertores=Sum(Case(
+                        When(abandono=True, then=Value(1)),
+                        default=Value(0),
+                        output_field=IntegerField()))).order_by()}
+            promovidos = Counter(cls._asignaciones_aprobadas(todas_sedes).values_list('grupo__sede', flat=True))
+        for escuela_id, sedes_id in sedes_escuela.items():
+            indicador = indicadores[escuela_id]
+            sede = sedes[max(sedes_id)]
+            indicador.capacitada = True
+            indicador.sede_id = sede['id']
+            indicador.capacitador_id = sede['capacitador']
+            indicador.fecha_capacitacion = sede['fecha_creacion'].date() if sede['fecha_creacion'] else None
+            for sede_id in sedes_id:
+                resumen = resumen_sedes.get(sede_id, {})
+                indicador.maestros_capacitados += resumen.get('capacitados') or 0
+                indicador.maestros_desertores += resumen.get('desertores') or 0
+                indicador.maestros_promovidos += promovidos[sede_id]
+
+        # Los indicadores existentes se actualizan en lugar de borrarlos y crearlos otra vez, para que dos
+        # reconstrucciones simultáneas de la misma escuela no choquen con la llave única. Solo se actualizan
+        # los que cambiaron.
+        campos = [
+            campo.attname for campo in cls._meta.concrete_fields
+            if campo.name not in ('id', 'escuela', 'actualizado')]
+        with transaction.atomic():
+            anteriores = {
+                anterior['escuela']: anterior
+                for anterior in cls.objects.filter(escuela__in=escuelas).values('id', 'escuela', *campos)}
+            for escuela_id, anterior in anteriores.items():
+                valores = {campo: getattr(indicadores[escuela_id], campo) for campo in campos}
+                if any(anterior[campo] != valor for campo, valor in valores.items()):
+                    cls.objects.filter(id=anterior['id']).update(actualizado=timezone.now(), **valores)
+            # Las escuelas que ya no existen no se vuelven a crear
+            faltantes = set()
+            if crear:
+                faltantes = set(escuela_m.Escuela.objects.filter(id__in=escuelas).exclude(
+                    id__in=anteriores).values_list('id', flat=True))
+            if faltantes:
+                try:
+                    with transaction.atomic():
+                        cls.objects.bulk_create(indicadores[escuela_id] for escuela_id in faltantes)
+                except IntegrityError:
+                    # Otra transacción creó alguno de los indicadores al mismo tiempo
+                    for escuela_id in faltantes:
+                        cls.objects.update_or_create(
+                            escuela_id=escuela_id,
+                            defaults={campo: getattr(indicadores[escuela_id], campo) for campo in campos})
+        return len(anteriores) + len(faltantes)
+
+    @staticmethod
+    def _asignaciones_aprobadas(sedes):
+        """Asignaciones de las `sedes` cuya nota final alcanza la nota de aprobación del curso,
+        calculado igual que `cyd.Asignacion.aprobado` pero en la base de datos.
+        """
+        notas_asistencias = cyd_m.NotaAsistencia.objects.filter(asignacion=OuterRef('pk')).values(
+            'asignacion').annotate(total=Sum('nota')).values('total')
+        notas_hitos = cyd_m.NotaHito.objects.filter(asignacion=OuterRef('pk')).values(
+            'asignacion').annotate(total=Sum('nota')).values('total')
+        return cyd_m.Asignacion.objects.filter(grupo__sede__in=sedes).annotate(
+            nota_calculada=Coalesce(Subquery(notas_asistencias, output_field=IntegerField()), 0) +
+            Coalesce(Subquery(notas_hitos, output_field=IntegerField()), 0)).filter(
+            nota_calculada__gte=F('grupo__curso__nota_aprobacion'))
@@ -0,0 +1,43 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from apps.cyd import models as cyd_m
+from apps.escuela import models as escuela_m
+from apps.informe import models as informe_m
+from apps.tpe import models as tpe_m
+
+
+@receiver([post_save, post_delete], sender=escuela_m.EscPoblacion)
+@receiver([post_save, post_delete], sender=tpe_m.Equipamiento)
+def actualizar_indicador_escuela(sender, instance, **kwargs):
+    """Recalcula el :class:`IndicadorEscuela` de la escuela de una población o un equipamiento.
+    Al eliminar (`post_delete` no envía `created`) no se crea el indicador, porque la escuela
+    puede estarse eliminando en cascada.
+    """
+    informe_m.IndicadorEscuela.reconstruir([instance.escuela_id], crear='created' in kwargs)
+
+
+@receiver(m2m_changed, sender=tpe_m.Equipamiento.cooperante.through)
+@receiver(m2m_changed, sender=tpe_m.Equipamiento.proyecto.through)
+def actualizar_indicador_cooperante(sender, instance, action, reverse, pk_set, **kwargs):
+    """Actualiza el cooperante y el proyecto del indicador cuando cambian los del equipamiento."""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        escuelas = tpe_m.Equipamiento.objects.filter(id__in=pk_set or []).values_list('escuela', flat=True)
+    else:
+        escuelas = [instance.escuela_id]
+    informe_m.IndicadorEscuela.reconstruir(set(escuelas))
+
+
+@receiver([post_save, post_delete], sender=cyd_m.Asignacion)
+def actualizar_indicador_asignacion(sender, instance, **kwargs):
+    """Recalcula los indicadores de la escuela del participante y de la escuela beneficiada de la sede.
+    Las demás escuelas con participantes en la sede también suman sus totales, pero no se recalculan en cada
+    asignación; las actualiza la reconstrucción diaria de `reconstruir_indicadores`.
+    """
+    escuelas = set(cyd_m.Participante.objects.filter(
+        id=instance.participante_id).exclude(escuela=None).values_list('escuela', flat=True))
+    escuelas.update(cyd_m.Sede.objects.filter(
+        grupos=instance.grupo_id).exclude(escuela_beneficiada=None).values_list('escuela_beneficiada', flat=True))
+    informe_m.IndicadorEscuela.reconstruir(escuelas, crear='created' in kwargs)
@@ -0,0 +1,124 @@
+import csv
+import io
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.six import StringIO
+from rest_framework.test import APIRequestFactory
+
+from apps.cyd.tests import factories as cyd_f
+from apps.escuela import models as escuela_m
+from apps.escuela.tests.factories import EscuelaFactory
+from apps.informe import models as informe_m
+from apps.informe import views as informe_v
+from apps.main import models as main_m
+from apps.mye import models as mye_m
+from apps.tpe import models as tpe_m
+
+
+class IndicadorEscuelaTestCase(TestCase):
+    """Pruebas para la tabla de indicadores del informe de escuelas"""
+
+    def setUp(self):
+        departamento = main_m.Departamento.objects.create(nombre='Guatemala')
+        municipio = main_m.Municipio.objects.create(departamento=departamento, nombre='Mixco')
+        self.escuela = EscuelaFactory(municipio=municipio)
+        self.vecina = EscuelaFactory(municipio=municipio)
+        self.sin_datos = EscuelaFactory(municipio=municipio)
+
+        escuela_m.EscPoblacion.objects.create(escuela=self.escuela, total_alumno=100, total_maestro=5)
+        escuela_m.EscPoblacion.objects.create(escuela=self.escuela, total_alumno=120, total_maestro=6)
+        self.cooperante = mye_m.Cooperante.objects.create(nombre='Cooperante')
+        estado = tpe_m.EquipamientoEstado.objects.create(estado='Entregado')
+        self.equipamiento = tpe_m.Equipamiento.objects.create(
+            id=1, escuela=self.escuela, estado=estado, cantidad_equipo=15)
+        self.equipamiento.cooperante.add(self.cooperante)
+
+        # Dos hombres y una mujer; uno de los participantes es de otra escuela
+        hito = cyd_f.CrHitoFactory()
+        grupo = cyd_f.GrupoFactory(sede__escuela_beneficiada=self.escuela, curso=hito.curso)
+        mujer = cyd_f.ParGeneroFactory(id=2)
+        aprobado = cyd_f.ParticipanteFactory(escuela=self.escuela).asignaciones.create(grupo=grupo)
+        cyd_f.ParticipanteFactory(escuela=self.escuela, genero=mujer).asignaciones.create(grupo=grupo, abandono=True)
+        cyd_f.ParticipanteFactory(escuela=self.vecina).asignaciones.create(grupo=grupo)
+        aprobado.notas_hitos.update(nota=80)
+        informe_m.IndicadorEscuela.reconstruir([self.escuela.id])
+
+    def test_indicador(self):
+        indicador = self.escuela.indicador
+        self.assertEqual(indicador.ninos_beneficiados, 120)
+        self.assertEqual(indicador.docentes, 6)
+        self.assertTrue(indicador.equipada)
+        self.assertEqual(indicador.equipo_entregado, 15)
+        self.assertEqual(indicador.cooperante, self.cooperante)
+        self.assertTrue(indicador.capacitada)
+        self.assertEqual(indicador.maestros_capacitados, 3)
+        self.assertEqual(indicador.maestros_promovidos, 1)
+        self.assertEqual(indicador.maestros_desertores, 1)
+        # La escuela vecina comparte la sede por medio de su participante
+        self.assertTrue(self.vecina.indicador.capacitada)
+        self.assertFalse(self.vecina.indicador.equipada)
+
+    def test_signals(self):
+        escuela_m.EscPoblacion.objects.create(escuela=self.escuela, total_alumno=150, total_maestro=7)
+        self.assertEqual(informe_m.IndicadorEscuela.objects.get(escuela=self.escuela).ninos_beneficiados, 150)
+        self.equipamiento.delete()
+        self.assertFalse(informe_m.IndicadorEscuela.objects.get(escuela=self.escuela).equipada)
+        cyd_f.ParticipanteFactory(escuela=self.sin_datos).asignaciones.create(
+            grupo=self.escuela.escuela_beneficiada.first().grupos.first())
+        self.assertEqual(informe_m.IndicadorEscuela.objects.get(escuela=self.escuela).maestros_capacitados, 4)
+        self.assertTrue(informe_m.IndicadorEscuela.objects.get(escuela=self.sin_datos).capacitada)
+        # Las demás escuelas de la sede se actualizan con la reconstrucción diaria
+        self.assertEqual(informe_m.IndicadorEscuela.objects.get(escuela=self.vecina).maestros_capacitados, 3)
+        informe_m.IndicadorEscuela.reconstruir()
+        self.assertEqual(informe_m.IndicadorEscuela.objects.get(escuela=self.vecina).maestros_capacitados, 4)
+
+    def test_reconstruir_actualiza(self):
+        anterior = informe_m.IndicadorEscuela.objects.get(escuela=self.escuela)
+        self.assertEqual(informe_m.IndicadorEscuela.reconstruir([self.escuela.id, self.sin_datos.id]), 2)
+        # Los indicadores sin cambios no se vuelven a guardar
+        indicador = informe_m.IndicadorEscuela.objects.get(escuela=self.escuela)
+        self.assertEqual((indicador.id, indicador.actualizado), (anterior.id, anterior.actualizado))
+        escuela_m.EscPoblacion.objects.filter(escuela=self.escuela).update(total_alumno=200)
+        informe_m.IndicadorEscuela.reconstruir([self.escuela.id])
+        indicador = informe_m.IndicadorEscuela.objects.get(escuela=self.escuela)
+        self.assertEqual((indicador.id, indicador.ninos_beneficiados), (anterior.id, 200))
+
+    def test_proyecto_sin_capacitacion(self):
+        self.equipamiento.proyecto.add(mye_m.Proyecto.objects.create(nombre=informe_m.PROYECTO_SIN_CAPACITACION))
+        fila = informe_m.IndicadorEscuela.objects.get(escuela=self.escuela).como_fila()
+        self.assertEqual(fila['Proyecto'], informe_m.PROYECTO_SIN_CAPACITACION)
+        self.assertEqual((fila['Capacitador'], fila['Maestros_capacitados']), ('No tiene', 0))
+
+    def test_comando(self):
+        informe_m.IndicadorEscuela.objects.all().delete()
+        call_command('reconstruir_indicadores', stdout=StringIO())
+        self.assertEqual(informe_m.IndicadorEscuela.objects.count(), escuela_m.Escuela.objects.count())
+        self.assertEqual(informe_m.IndicadorEscuela.objects.get(escuela=self.escuela).maestros_promovidos, 1)
+
+    def test_api_una_consulta(self):
+        call_command('reconstruir_indicadores', stdout=StringIO())
+        request = APIRequestFactory().get(reverse('consulta_escuela'), {'equipada': 'True', 'capacitada': 'True'})
+        with self.assertNumQueries(1):
+            response = informe_v.ConsultaEscuelaApi.as_view()(request)
+        self.assertEqual([fila['Udi'] for fila in response.data], [self.escuela.codigo])
+        fila = response.data[0]
+        self.assertEqual(fila['Donante'], str(self.cooperante))
+        self.assertEqual(fila['Maestros_no_promovidos'], 2)
+
+    def test_api_sin_filtros(self):
+        request = APIRequestFactory().get(reverse('consulta_escuela'), {'equipada': 'No importa'})
+        response = informe_v.ConsultaEscuelaApi.as_view()(request)
+        self.assertEqual(response.data, [])
+
+    def test_api_exportar(self):
+        call_command('reconstruir_indicadores', stdout=StringIO())
+        request = APIRequestFactory().get(reverse('consulta_escuela'), {'equipada': 'True', 'formato': 'csv'})
+        with self.assertNumQueries(1):
+            response = informe_v.ConsultaEscuelaApi.as_view()(request)
+            contenido = b''.join(response.streaming_content).decode('utf-8-sig')
+        lineas = list(csv.reader(io.StringIO(contenido)))
+        self.assertEqual(lineas[0][:2], ['UDI', 'Nombre'])
+        self.assertEqual([linea[0] for linea in lineas[1:]], [self.escuela.codigo])
+        self.assertEqual(lineas[1][10], str(self.cooperante))
@@ -6,6 +6,7 @@ from .models import Dispositivo, Tarima, Sector, SalidaInventario
 from apps.tpe import models as tpe
 from apps.conta import models as conta_m
 from apps.inventario import models as inv_m
+from apps.inventario import qr
 
 for model in apps.get_app_config('inventario').models.values():
 	if model.__name__ not in ("Dispositivo","Tarima","Sector","SalidaInventario"):
@@ -95,14 +96,8 @@ class DispositivoAdmin(admin.ModelAdmin):
 		return my_urls + urls
 
 	def set_qr(self, request):
-		dispositivos = self.model.objects.all().filter(valido=True)
-		if len(dispositivos) > 0:
-			for dispositivo in dispositivos:
-				if not dispositivo.codigo_qr:
-					dispositivo.crear_qrcode()
-					dispositivo.save()
-		else:
-			print("No hay")
+		generados = qr.generar_pendientes(self.model.objects.all().filter(valido=True))
+		self.message_user(request, 'Códigos QR generados: {}'.format(generados))
 		return HttpResponseRedirect("../")
 
 	def set_ingreso_conta(self, request):
@@ -159,14 +154,8 @@ class TarimaAdmin(admin.ModelAdmin):
 		return my_urls + urls
 
 	def set_qr(self, request):
-		tarimas = self.model.objects.all()
-		if len(tarimas) > 0:
-			for tarima in tarimas:
-				if not tarima.codigo_qr:
-					tarima.crear_qrcode()
-					tarima.save()
-		else:
-			print("No hay")
+		generados = qr.generar_pendientes(self.model.objects.all())
+		self.message_user(request, 'Códigos QR generados: {}'.format(generados))
 		return HttpResponseRedirect("../")
 
 @admin.register(Sector)
@@ -185,12 +174,6 @@ class SectorAdmin(admin.ModelAdmin):
 		return my_urls + urls
 
 	def set_qr(self, request):
-		sectores = self.model.objects.all()
-		if len(sectores) > 0:
-			for sector in sectores:
-				if not sector.codigo_qr:
-					sector.crear_qrcode()
-					sector.save()
-		else:
-			print("No hay")
+		generados = qr.generar_pendientes(self.model.objects.all())
+		self.message_user(request, 'Códigos QR generados: {}'.format(generados))
 		return HttpResponseRedirect("../")
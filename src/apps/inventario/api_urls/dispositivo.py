@@ -1,3 +1,4 @@
+from django.conf.urls import url
 from rest_framework import routers
 from apps.inventario import api_views
 
@@ -29,5 +30,12 @@ dispositivo_router.register(
     base_name='api_solicitudmovimiento'
 
 )
-dispositivo_urlpatterns = []
+dispositivo_urlpatterns = [
+    # Antes de las rutas del router, que tomarían `exportar` como la llave de un dispositivo
+    url(
+        r'^dispositivo/exportar/$',
+        api_views.DispositivoExportarApi.as_view(),
+        name='api_dispositivo_exportar'
+    ),
+]
 dispositivo_urlpatterns += dispositivo_router.urls
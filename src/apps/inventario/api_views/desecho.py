@@ -5,10 +5,12 @@ from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from braces.views import LoginRequiredMixin
+from django.core.exceptions import ValidationError
 from apps.conta import models as conta_m
 from apps.inventario import (
     serializers as inv_s,
-    models as inv_m
+    models as inv_m,
+    transacciones
 )
 
 
@@ -135,50 +137,18 @@ class DesechoDispositivoViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_401_UNAUTHORIZED
             )
         else:
-            id_desecho = request.data["id"]
-            desecho = inv_m.DesechoSalida.objects.get(id=id_desecho)
-            detalles = inv_m.DesechoDetalle.objects.filter(desecho=id_desecho).count()
-            detalles_aprobados = inv_m.DesechoDetalle.objects.filter(desecho=id_desecho, aprobado=True).count()
-            dispositivos = inv_m.DesechoDispositivo.objects.filter(desecho=id_desecho).count()
-            dispositivos_aprobados = inv_m.DesechoDispositivo.objects.filter(desecho=id_desecho, aprobado=True).count()
-            aprobar_dispositivos = inv_m.DesechoDispositivo.objects.filter(desecho=id_desecho)
-            if detalles_aprobados == detalles:
-                if dispositivos_aprobados == dispositivos:
-                    periodo_actual = conta_m.PeriodoFiscal.objects.get(actual=True)                    
-                    for aprobar in aprobar_dispositivos:
-                        precio = conta_m.PrecioDispositivo.objects.get(dispositivo = aprobar.dispositivo, activo= True)
-                        aprobar.dispositivo.etapa = inv_m.DispositivoEtapa.objects.get(id=inv_m.DispositivoEtapa.DS)
-                        aprobar.dispositivo.valido = False
-                        aprobar.dispositivo.save()
+            desecho = inv_m.DesechoSalida.objects.get(id=request.data["id"])
+            simular = str(request.data.get("simular", "")).lower() in ('true', '1')
+            try:
+                resultado = transacciones.finalizar_desecho(desecho, simular=simular)
+            except ValidationError as e:
+                return Response({'mensaje': ' '.join(e.messages)}, status=status.HTTP_400_BAD_REQUEST)
+            except conta_m.PeriodoFiscal.DoesNotExist:
+                return Response({'mensaje': 'No hay un periodo fiscal actual'}, status=status.HTTP_400_BAD_REQUEST)
+            resultado['simulacion'] = simular
+            resultado['mensaje'] = 'Salida de Desecho Simulada' if simular else 'Salida de Desecho Finalizada'
+            return Response(resultado, status=status.HTTP_200_OK)
 
-                        # Generar movimiento de salida
-                        movimiento = conta_m.MovimientoDispositivo(
-                            fecha=desecho.fecha,
-                            dispositivo=aprobar.dispositivo,
-                            periodo_fiscal=periodo_actual,
-                            tipo_movimiento=conta_m.MovimientoDispositivo.BAJA,
-                            referencia='Salida Desecho{}'.format(desecho.id),
-                            precio=precio.precio)
-                        movimiento.save()
-
-                    desecho.en_creacion = False
-                    desecho.save()
-                    return Response(
-                            {
-                                'mensaje': 'Salida de Desecho Finalizada'
-                            },
-                            status=status.HTTP_200_OK
-                        )
-                else:
-                    return Response(
-                        {'mensaje': 'Faltan dispositivos por aprobar'},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-            else:
-                return Response(
-                    {'mensaje': 'Faltan detalles de desecho por aprobar'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
 
 class DesechoSalidaFilter(filters.FilterSet):
     """ Filtros para generar informe de  Salida
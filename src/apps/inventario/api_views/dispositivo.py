@@ -1,26 +1,77 @@
 import django_filters
 from django_filters import rest_framework as filters
-from rest_framework import status, viewsets
+from rest_framework import generics, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.core.exceptions import ObjectDoesNotExist
-from django.core.mail import send_mail
+from django.db import OperationalError
 from datetime import datetime
 from django.http import JsonResponse
 from django.utils.datastructures import MultiValueDictKeyError
-from django.conf import settings
-from django.template import loader
 import time
 from braces.views import LoginRequiredMixin
 from apps.inventario import (
     serializers as inv_s,
-    models as inv_m
+    models as inv_m,
+    catalogos,
+    transacciones
 )
-from django.contrib.auth.models import User
 from apps.kardex import models as kax_m
-from django.db.models import Count
+from apps.main import notificaciones
+from apps.main.mixins import ExportarApiMixin, ProyeccionApiMixin
+from django.db.models import Count, IntegerField, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
 import json
 
+# Para cada tipo de paquete: modelo de los dispositivos, campos que muestra el grid y el catálogo
+# de :mod:`apps.inventario.catalogos` que llena cada lista del grid
+GRID_PAQUETES = {
+    'MOUSE': (
+        inv_m.Mouse,
+        ('triage', 'marca', 'modelo', 'serie', 'tarima', 'puerto', 'tipo_mouse', 'caja', 'clase'),
+        {'tipo': 'tipos_mouse', 'puertos': 'puertos'}),
+    'TECLADO': (
+        inv_m.Teclado,
+        ('triage', 'marca', 'modelo', 'serie', 'tarima', 'puerto', 'caja', 'clase'),
+        {'marcas': 'marcas', 'puertos': 'puertos'}),
+    'MONITOR': (
+        inv_m.Monitor,
+        ('triage', 'marca', 'modelo', 'serie', 'tarima', 'tipo_monitor', 'puerto', 'pulgadas', 'clase'),
+        {'marcas': 'marcas', 'tipo': 'tipos_monitor', 'puertos': 'puertos'}),
+    'CPU': (
+        inv_m.CPU,
+        ('triage', 'marca', 'modelo', 'serie', 'tarima', 'procesador', 'version_sistema', 'disco_duro__triage',
+         'ram', 'ram_medida', 'servidor', 'all_in_one', 'clase'),
+        {'marcas': 'marcas', 'puertos': 'puertos', 'medida': 'medidas', 'sistemas': 'sistemas',
+         'procesador': 'procesadores'}),
+    'TABLET': (
+        inv_m.Tablet,
+        ('triage', 'marca', 'modelo', 'serie', 'tarima', 'procesador', 'version_sistema', 'so_id',
+         'almacenamiento', 'medida_almacenamiento', 'ram', 'medida_ram', 'almacenamiento_externo', 'pulgadas',
+         'clase'),
+        {'marcas': 'marcas', 'medida': 'medidas', 'sistemas': 'sistemas', 'procesador': 'procesadores',
+         'os': 'software'}),
+    'LAPTOP': (
+        inv_m.Laptop,
+        ('triage', 'marca', 'modelo', 'serie', 'tarima', 'procesador', 'version_sistema', 'disco_duro__triage',
+         'ram', 'ram_medida', 'pulgadas', 'clase'),
+        {'marcas': 'marcas', 'medida': 'medidas', 'sistemas': 'sistemas', 'procesador': 'procesadores'}),
+    'HDD': (
+        inv_m.HDD,
+        ('triage', 'marca', 'modelo', 'serie', 'tarima', 'puerto', 'capacidad', 'medida', 'clase'),
+        {'marcas': 'marcas', 'puertos': 'puertos', 'medida': 'medidas'}),
+    'SWITCH': (
+        inv_m.DispositivoRed,
+        ('triage', 'marca', 'modelo', 'serie', 'tarima', 'puerto', 'cantidad_puertos', 'velocidad',
+         'velocidad_medida', 'clase'),
+        {'marcas': 'marcas', 'puertos': 'puertos', 'medida': 'medidas'}),
+    'ACCESS POINT': (
+        inv_m.AccessPoint,
+        ('triage', 'marca', 'modelo', 'serie', 'tarima', 'puerto', 'cantidad_puertos', 'velocidad',
+         'velocidad_medida', 'clase'),
+        {'marcas': 'marcas', 'puertos': 'puertos', 'medida': 'medidas'}),
+}
+
 
 class DispositivoFilter(filters.FilterSet):
     """Filtros para el ViewSet de Dispositivo"""
@@ -38,12 +89,22 @@ class DispositivoFilter(filters.FilterSet):
         return qs.annotate(asignaciones=Count('asignacion')).filter(asignaciones=value)
 
 
-class DispositivoViewSet(viewsets.ModelViewSet):
+class DispositivoViewSet(ProyeccionApiMixin, viewsets.ModelViewSet):
     """ ViewSet para generar informes de :class:`Dispositivo`
     """
     serializer_class = inv_s.DispositivoSerializer
     filter_class = DispositivoFilter
     ordering = ('entrada')
+    # La llave primaria es un UUID, el cursor usa el triage que es único e indexado
+    cursor_ordering = 'triage'
+    # Columnas de texto para ordenar y buscar en las tablas de DataTables en modo server-side
+    datatables_columnas = {
+        'tipo': 'tipo__tipo',
+        'marca': 'marca__marca',
+        'clase': 'clase__clase',
+        'estado': 'estado__estado',
+        'etapa': 'etapa__proceso',
+    }
 
     def get_queryset(self):
         """ Este queryset se encarga de filtrar los dispositivo que se van a mostrar en lista
@@ -127,237 +188,66 @@ class DispositivoViewSet(viewsets.ModelViewSet):
 
     @action(methods=['post'], detail=False)
     def grid_paquetes(self, request, pk=None):
-        """ Este se conecta con el grid para editar la informacion de los dipositivos y guardarlos
+        """ Este se conecta con el grid para editar la informacion de los dipositivos y guardarlos.
+        Los catálogos no se incluyen en la respuesta: `catalogos` indica qué catálogo corresponde a cada
+        lista del grid y `version_catalogos` permite obtenerlos de :meth:`catalogos` una sola vez por sesión.
         """
-        paquete = request.data['paquete']
-        newtipo = inv_m.DispositivoPaquete.objects.filter(paquete=paquete)
-        paquetes = inv_m.DispositivoPaquete.objects.filter(paquete=paquete).values('dispositivo__triage')
-        tipo = newtipo.first().paquete.tipo_paquete
-        tipos = inv_m.DispositivoMarca.objects.all().values()
-        puertos = inv_m.DispositivoPuerto.objects.all().values()
-        medida = inv_m.DispositivoMedida.objects.all().values()
-        version_sis = inv_m.VersionSistema.objects.all().values()
-        procesador = inv_m.Procesador.objects.all().values()
-        os = inv_m.Software.objects.all().values()
-        disco = inv_m.HDD.objects.filter(
-            estado=inv_m.DispositivoEstado.PD,
-            etapa=inv_m.DispositivoEtapa.AB).values('triage')
-        if str(tipo) == "MOUSE":
-            tipos_mouse = inv_m.MouseTipo.objects.all().values()
-            data = inv_m.Mouse.objects.filter(
-                triage__in=paquetes
-            ).values(
-                'triage',                
-                'marca',
-                'modelo',
-                'serie',
-                'tarima',
-                'puerto',               
-                'tipo_mouse',
-                'caja',
-                'clase').order_by('triage')
-            return JsonResponse({
-                'data': list(data),
-                'tipo': list(tipos_mouse),
-                'puertos': list(puertos),
-                'dispositivo': str(tipo)
-                })
-        elif str(tipo) == "TECLADO":
-            data = inv_m.Teclado.objects.filter(
-                triage__in=paquetes
-            ).values(
-                'triage',
-                'marca',
-                'modelo',
-                'serie',
-                'tarima',
-                'puerto',
-                'caja',
-                'clase'
-                ).order_by('triage')
-            return JsonResponse({
-                'data': list(data),
-                'marcas': list(tipos),
-                'puertos': list(puertos),
-                'dispositivo': tipo.nombre,
-                })
-        elif str(tipo) == "MONITOR":
-            tipos_monitor = inv_m.MonitorTipo.objects.all().values()
-            data = inv_m.Monitor.objects.filter(
-                triage__in=paquetes
-            ).values(
-                'triage',
-                'marca',
-                'modelo',
-                'serie',
-                'tarima',
-                'tipo_monitor',
-                'puerto',
-                'pulgadas',
-                'clase'
-                ).order_by('triage')
-            return JsonResponse({
-                'data': list(data),
-                'marcas': list(tipos),
-                'tipo': list(tipos_monitor),
-                'puertos': list(puertos),
-                'dispositivo': str(tipo)
-                })
-        elif str(tipo) == "CPU":
-            data = inv_m.CPU.objects.filter(
-                triage__in=paquetes
-            ).values(
-                'triage',
-                'marca',
-                'modelo',
-                'serie',
-                'tarima',
-                'procesador',
-                'version_sistema',
-                'disco_duro__triage',
-                'ram',
-                'ram_medida',
-                'servidor',
-                'all_in_one',
-                'clase'
-                ).order_by('triage')
-            return JsonResponse({
-                'data': list(data),
-                'marcas': list(tipos),
-                'puertos': list(puertos),
-                'medida': list(medida),
-                'dispositivo': str(tipo),
-                'sistemas': list(version_sis),
-                'procesador': list(procesador),
-                'hdd': list(disco)
-                })
-        elif str(tipo) == "TABLET":
-            data = inv_m.Tablet.objects.filter(
-                triage__in=paquetes
-            ).values(
-                'triage',
-                'marca',
-                'modelo',
-                'serie',
-                'tarima',
-                'procesador',
-                'version_sistema',
-                'so_id',
-                'almacenamiento',
-                'medida_almacenamiento',
-                'ram',
-                'medida_ram',
-                'almacenamiento_externo',
-                'pulgadas',
-                'clase'
-                ).order_by('triage')
-            return JsonResponse({
-                'data': list(data),
-                'marcas': list(tipos),
-                'medida': list(medida),
-                'dispositivo': str(tipo),
-                'sistemas': list(version_sis),
-                'procesador': list(procesador),
-                'hdd': list(disco),
-                'os': list(os)
-                })
-        elif str(tipo) == "LAPTOP":
-            data = inv_m.Laptop.objects.filter(
-                triage__in=paquetes
-            ).values(
-                'triage',
-                'marca',
-                'modelo',
-                'serie',
-                'tarima',
-                'procesador',
-                'version_sistema',
-                'disco_duro__triage',
-                'ram',
-                'ram_medida',
-                'pulgadas',
-                'clase'
-                ).order_by('triage')
-            return JsonResponse({
-                'data': list(data),
-                'marcas': list(tipos),
-                'medida': list(medida),
-                'dispositivo': str(tipo),
-                'sistemas': list(version_sis),
-                'procesador': list(procesador),
-                'hdd': list(disco)
-                })
-        elif str(tipo) == "HDD":
-            data = inv_m.HDD.objects.filter(
-                triage__in=paquetes
-            ).values(
-                'triage',
-                'marca',
-                'modelo',
-                'serie',
-                'tarima',
-                'puerto',
-                'capacidad',
-                'medida',
-                'clase'
-                ).order_by('triage')
-            return JsonResponse({
-                'data': list(data),
-                'marcas': list(tipos),
-                'puertos': list(puertos),
-                'medida': list(medida),
-                'dispositivo': str(tipo)
-                })
-        elif str(tipo) == "SWITCH":
-            data = inv_m.DispositivoRed.objects.filter(
-                triage__in=paquetes
-            ).values(
-                'triage',
-                'marca',
-                'modelo',
-                'serie',
-                'tarima',
-                'puerto',
-                'cantidad_puertos',
-                'velocidad',
-                'velocidad_medida',
-                'clase'
-                ).order_by('triage')
-            return JsonResponse({
-                'data': list(data),
-                'marcas': list(tipos),
-                'puertos': list(puertos),
-                'medida': list(medida),
-                'dispositivo': str(tipo)
-                })
-
-        elif str(tipo) == "ACCESS POINT":
-            data = inv_m.AccessPoint.objects.filter(
-                triage__in=paquetes
-            ).values(
-                'triage',
-                'marca',
-                'modelo',
-                'serie',
-                'tarima',
-                'puerto',
-                'cantidad_puertos',
-                'velocidad',
-                'velocidad_medida',
-                'clase'
-                ).order_by('triage')
-            return JsonResponse({
-                'data': list(data),
-                'marcas': list(tipos),
-                'puertos': list(puertos),
-                'medida': list(medida),
-                'dispositivo': str(tipo)
-                })
+        try:
+            paquete = inv_m.Paquete.objects.select_related('tipo_paquete').get(id=request.data['paquete'])
+        except (inv_m.Paquete.DoesNotExist, ValueError):
+            return Response(
+                {'mensaje': 'El paquete no existe'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        tipo = str(paquete.tipo_paquete)
+        if tipo not in GRID_PAQUETES:
+            return Response(
+                {'mensaje': 'Solicitud Recibida'},
+                status=status.HTTP_200_OK
+            )
+        modelo, campos, listas = GRID_PAQUETES[tipo]
+        # Los campos de modelos relacionados (`disco_duro__triage`) se obtienen con un JOIN en la misma consulta
+        data = modelo.objects.filter(
+            asignacion__paquete=paquete
+        ).values(*campos).distinct().order_by('triage')
+        respuesta = {
+            'data': list(data),
+            'dispositivo': tipo,
+            'catalogos': listas,
+            'version_catalogos': catalogos.version(),
+        }
+        if modelo in (inv_m.CPU, inv_m.Laptop, inv_m.Tablet):
+            respuesta['hdd'] = list(inv_m.HDD.objects.filter(
+                estado=inv_m.DispositivoEstado.PD,
+                etapa=inv_m.DispositivoEtapa.AB).values('triage'))
+        return JsonResponse(respuesta)
 
-        return Response(
-            {'mensaje': 'Solicitud Recibida'},
-            status=status.HTTP_200_OK
-        )
+    @action(methods=['get'], detail=False)
+    def catalogos(self, request, pk=None):
+        """Devuelve los catálogos del inventario indicados en `nombres` (separados por comas), o todos.
+        La respuesta incluye un ETag que cambia al modificar cualquier catálogo, por lo que el navegador
+        recibe un 304 mientras su copia siga vigente.
+        """
+        nombres = request.query_params.get('nombres')
+        nombres = sorted(set(nombres.split(','))) if nombres else sorted(catalogos.CATALOGOS)
+        invalidos = [nombre for nombre in nombres if nombre not in catalogos.CATALOGOS]
+        if invalidos:
+            return Response(
+                {'mensaje': 'Catálogos no válidos: {}'.format(', '.join(invalidos))},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        version = catalogos.version()
+        etag = catalogos.etag(nombres, version)
+        if request.META.get('HTTP_IF_NONE_MATCH') == etag:
+            respuesta = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            respuesta = Response({
+                'version': version,
+                'catalogos': catalogos.obtener(nombres, version),
+            })
+        respuesta['ETag'] = etag
+        respuesta['Cache-Control'] = 'private, no-cache'
+        return respuesta
 
     @action(methods=['post'], detail=False)
     def solicitud(self, request, pk=None):
@@ -379,6 +269,7 @@ class DispositivoViewSet(viewsets.ModelViewSet):
         # Enviar correo de notificación
         motivo = ''
         lista_enviar_correos = []
+        grupo = None
         usuario_completo = ''
         if solicitudes_movimiento.devolucion:
             motivo = "SUNI - Devolución Recibida: "+ str(id)
@@ -388,11 +279,10 @@ class DispositivoViewSet(viewsets.ModelViewSet):
         else:
             motivo = "SUNI - Solicitud Recibida: "+ str(id)
             usuario_completo = str(solicitudes_movimiento.creada_por.first_name) +" "+ str(solicitudes_movimiento.creada_por.last_name)
-            usuarios_bodega = User.objects.filter(groups=21)
-            for lista_correos  in usuarios_bodega:
-                lista_enviar_correos.append(lista_correos.email)
+            grupo = inv_m.SolicitudMovimiento.grupo_bodega()
 
-        html_message = loader.render_to_string(
+        notificaciones.encolar(
+            motivo,
             'inventario/email/email_solicitud.html',
             {
                 'solicitud_id': str(id),
@@ -401,17 +291,9 @@ class DispositivoViewSet(viewsets.ModelViewSet):
                 'usuario': usuario_completo,
                 'estado': 'Recibida',
                 'url': "https://suni.funsepa.org" + str(solicitudes_movimiento.get_absolute_url()),
-            })
-
-        # Enviar Correo
-        """send_mail(
-            motivo,
-            'mensaje',
-            settings.EMAIL_HOST_USER,
-            lista_enviar_correos,
-            fail_silently=True,
-            html_message = html_message
-        )"""
+            },
+            destinatarios=lista_enviar_correos,
+            grupo=grupo)
 
         return Response(
             {'mensaje': 'Solicitud Recibida'},
@@ -516,7 +398,8 @@ class DispositivoViewSet(viewsets.ModelViewSet):
             # Enviar correo de notificación
             usuario_completo = str(self.request.user.first_name) +" "+ str(self.request.user.last_name)
 
-            html_message = loader.render_to_string(
+            notificaciones.encolar(
+                motivo,
                 'inventario/email/email_solicitud.html',
                 {
                     'solicitud_id': str(id),
@@ -526,18 +409,8 @@ class DispositivoViewSet(viewsets.ModelViewSet):
                     'estado': 'Aprobada Kardex',
                     'usuario': usuario_completo,
                     'url': "https://suni.funsepa.org" + str(solicitudes_movimiento.get_absolute_url()),
-                })
-
-            
-            # Enviar Correo
-            """send_mail(
-                motivo,
-                'mensaje',
-                settings.EMAIL_HOST_USER,
-                [solicitudes_movimiento.creada_por.email],
-                fail_silently=True,
-                html_message = html_message
-            )"""
+                },
+                destinatarios=[solicitudes_movimiento.creada_por.email])
             return Response(
                 {'mensaje': nuevo_detalle.id, 'existencia': cantidad_kardex.existencia},
                 status=status.HTTP_200_OK)
@@ -562,7 +435,9 @@ class DispositivoViewSet(viewsets.ModelViewSet):
             # Enviar correo de notificación
             usuario_completo = str(self.request.user.first_name) +" "+ str(self.request.user.last_name)
 
-            html_message = loader.render_to_string(
+            motivo = "SUNI - Solicitud Rechazada: "+ str(id)
+            notificaciones.encolar(
+                motivo,
                 'inventario/email/email_solicitud.html',
                 {
                     'solicitud_id': str(id),
@@ -572,18 +447,8 @@ class DispositivoViewSet(viewsets.ModelViewSet):
                     'estado': 'Rechazada',
                     'usuario': usuario_completo,
                     'url': "https://suni.funsepa.org" + str(solicitudes_movimiento.get_absolute_url()),
-                })
-
-            motivo = "SUNI - Solicitud Rechazada: "+ str(id)
-            # Enviar Correo
-            """send_mail(
-                motivo,
-                'mensaje',
-                settings.EMAIL_HOST_USER,
-                [solicitudes_movimiento.creada_por.email],
-                fail_silently=True,
-                html_message = html_message
-            )"""
+                },
+                destinatarios=[solicitudes_movimiento.creada_por.email])
             
             return Response(
                 {'mensaje': 'Solicitud Rechazada'},
@@ -621,6 +486,32 @@ class DispositivoViewSet(viewsets.ModelViewSet):
         )
 
 
+class DispositivoExportarApi(ExportarApiMixin, generics.GenericAPIView):
+    """Descarga en CSV o XLSX el listado de :class:`DispositivoViewSet` con los mismos filtros.
+    La tabla del listado pagina en el servidor, por lo que no puede exportar más que la página actual.
+    """
+    filter_class = DispositivoFilter
+    columnas = (
+        ('triage', 'Triage'),
+        ('tipo__tipo', 'Tipo'),
+        ('marca__marca', 'Marca'),
+        ('modelo', 'Modelo'),
+        ('serie', 'Serie'),
+        ('clase__clase', 'Clase'),
+        ('tarima', 'Tarima'),
+        ('estado__estado', 'Estado'),
+        ('etapa__proceso', 'Etapa'),
+    )
+    nombre_archivo = 'dispositivos'
+
+    def get_queryset(self):
+        return DispositivoViewSet.get_queryset(self)
+
+    def get_filas(self, request):
+        queryset = self.filter_queryset(self.get_queryset()).order_by('triage')
+        return queryset.values(*(ruta for ruta, _ in self.columnas)).iterator()
+
+
 class PaquetesFilter(filters.FilterSet):
     """ Filtros par el ViewSet de Paquete
     """
@@ -652,7 +543,26 @@ class PaquetesViewSet(viewsets.ModelViewSet):
     """
 
     serializer_class = inv_s.PaqueteSerializer
-    queryset = inv_m.Paquete.objects.all()
+    queryset = inv_m.Paquete.objects.select_related(
+        'salida__tipo_salida',
+        'tipo_paquete__tipo_dispositivo',
+    ).annotate(
+        cantidad_asignaciones=Coalesce(Subquery(
+            inv_m.DispositivoPaquete.objects.filter(paquete=OuterRef('pk')).order_by().values('paquete').annotate(
+                total=Count('id')).values('total'),
+            output_field=IntegerField()), 0),
+    ).prefetch_related(
+        # Para los dispositivos que muestra el campo `asignacion`
+        Prefetch(
+            'asignacion',
+            queryset=inv_m.DispositivoPaquete.objects.select_related(
+                'dispositivo__tipo',
+                'dispositivo__estado',
+                'dispositivo__etapa',
+                'dispositivo__marca',
+                'dispositivo__clase',
+            ).prefetch_related('dispositivo__desecho_rechazado')),
+    )
     filter_class = PaquetesFilter
 
 class DispositivoPaqueteViewset(viewsets.ModelViewSet):
@@ -770,401 +680,27 @@ class DispositivosPaquetesViewSet(viewsets.ModelViewSet):
 
     @action(methods=['post'], detail=False)
     def actualizar_dispositivos(self, request, pk=None):
-        """ Metodo para actualizar nuevos dispositivos mediante el grid
+        """ Metodo para actualizar nuevos dispositivos mediante el grid.
+        El modelo se obtiene a partir del :class:`DispositivoTipo` y los cambios se guardan por lotes;
+        si alguna fila no es válida se devuelven los errores de cada fila sin actualizar ninguna.
         """
         dispositivos = json.loads(request.data["datos_actualizar"])
-        tipo = request.data["dispositivo"]
-        if tipo == "TECLADO":
-            for datos in dispositivos:
-                new_dispositivo = inv_m.Teclado.objects.get(triage=datos['triage'])
-                try:
-                    new_dispositivo.marca = inv_m.DispositivoMarca.objects.get(id=datos['marca'])
-                except ObjectDoesNotExist as e:
-                    print("Marca no necesita actualizar")
-                try:
-                    new_dispositivo.modelo = datos['modelo']
-                except ObjectDoesNotExist as e:
-                    print("Modelo no necesita actualizacion")
-                try:
-                    new_dispositivo.serie = datos['serie']
-                except ObjectDoesNotExist as e:
-                    print("Serie no necesita actualizacion")
-                try:
-                    new_dispositivo.tarima = inv_m.Tarima.objects.get(id=datos['tarima'])
-                except ObjectDoesNotExist as e:
-                    print("Tarima no necesita actualizacion")
-                try:
-                    new_dispositivo.puerto = inv_m.DispositivoPuerto.objects.get(id=datos['puerto'])
-                except ObjectDoesNotExist as e:
-                    print("Puerto no necesita actualizacion")
-                try:
-                    new_dispositivo.caja = datos['caja']
-                except ObjectDoesNotExist as e:
-                    print("Caja no necesita actualizacion")
-                try:
-                    new_dispositivo.clase = inv_m.DispositivoClase.objects.get(id=datos['clase'])
-                except ObjectDoesNotExist as e:
-                    print("Clase no necesita actualizacion")
-                new_dispositivo.save()
-        elif tipo == "MOUSE":
-            for datos in dispositivos:
-                new_dispositivo = inv_m.Mouse.objects.get(triage=datos['triage'])
-                try:
-                    new_dispositivo.marca = inv_m.DispositivoMarca.objects.get(id=datos['marca'])
-                except ObjectDoesNotExist as e:
-                    print("Marca no necesita actualizar")
-                try:
-                    new_dispositivo.modelo = datos['modelo']
-                except ObjectDoesNotExist as e:
-                    print("Modelo no necesita actualizacion")
-                try:
-                    new_dispositivo.serie = datos['serie']
-                except ObjectDoesNotExist as e:
-                    print("Serie no necesita actualizacion")
-                try:
-                    new_dispositivo.tarima = inv_m.Tarima.objects.get(id=datos['tarima'])
-                except ObjectDoesNotExist as e:
-                    print("Tarima no necesita actualizacion")
-                try:
-                    new_dispositivo.puerto = inv_m.DispositivoPuerto.objects.get(id=datos['puerto'])
-                except ObjectDoesNotExist as e:
-                    print("Puerto no necesita actualizacion")
-                try:
-                    new_dispositivo.caja = datos['caja']
-                except ObjectDoesNotExist as e:
-                    print("Caja no necesita actualizacion")
-                try:
-                    new_dispositivo.clase = inv_m.DispositivoClase.objects.get(id=datos['clase'])
-                except ObjectDoesNotExist as e:
-                    print("Clase no necesita actualizacion")
-                new_dispositivo.save()
-        elif tipo == "HDD":
-            for datos in dispositivos:
-                new_dispositivo = inv_m.HDD.objects.get(triage=datos['triage'])
-                try:
-                    new_dispositivo.marca = inv_m.DispositivoMarca.objects.get(id=datos['marca'])
-                except ObjectDoesNotExist as e:
-                    print("Marca no necesita actualizar")
-                try:
-                    new_dispositivo.modelo = datos['modelo']
-                except ObjectDoesNotExist as e:
-                    print("Modelo no necesita actualizacion")
-                try:
-                    new_dispositivo.serie = datos['serie']
-                except ObjectDoesNotExist as e:
-                    print("Serie no necesita actualizacion")
-                try:
-                    new_dispositivo.tarima = inv_m.Tarima.objects.get(id=datos['tarima'])
-                except ObjectDoesNotExist as e:
-                    print("Tarima no necesita actualizacion")
-                try:
-                    new_dispositivo.puerto = inv_m.DispositivoPuerto.objects.get(id=datos['puerto'])
-                except ObjectDoesNotExist as e:
-                    print("Puerto no necesita actualizacion")
-                try:
-                    new_dispositivo.capacidad = datos['capacidad']
-                except ObjectDoesNotExist as e:
-                    print("Capacidad no necesita actualizacion")
-                try:
-                    new_dispositivo.medida = inv_m.DispositivoMedida.objects.get(id=datos['medida'])
-                except ObjectDoesNotExist as e:
-                    print("Medida no necesita actualizacion")
-                try:
-                    new_dispositivo.clase = inv_m.DispositivoClase.objects.get(id=datos['clase'])
-                except ObjectDoesNotExist as e:
-                    print("Clase no necesita actualizacion")
-                new_dispositivo.save()
-        elif tipo == "MONITOR":
-            for datos in dispositivos:
-                new_dispositivo = inv_m.Monitor.objects.get(triage=datos['triage'])
-                try:
-                    new_dispositivo.marca = inv_m.DispositivoMarca.objects.get(id=datos['marca'])
-                except ObjectDoesNotExist as e:
-                    print("Marca no necesita actualizar")
-                try:
-                    new_dispositivo.modelo = datos['modelo']
-                except ObjectDoesNotExist as e:
-                    print("Modelo no necesita actualizacion")
-                try:
-                    new_dispositivo.serie = datos['serie']
-                except ObjectDoesNotExist as e:
-                    print("Serie no necesita actualizacion")
-                try:
-                    new_dispositivo.tarima = inv_m.Tarima.objects.get(id=datos['tarima'])
-                except ObjectDoesNotExist as e:
-                    print("Tarima no necesita actualizacion")
-                try:
-                    new_dispositivo.puerto = inv_m.DispositivoPuerto.objects.get(id=datos['puerto'])
-                except ObjectDoesNotExist as e:
-                    print("Puerto no necesita actualizacion")
-                try:
-                    new_dispositivo.pulgadas = datos['pulgadas']
-                except ObjectDoesNotExist as e:
-                    print("Pulgadas del monitor no necesita actualizacion")
-                try:
-                    new_dispositivo.tipo_monitor = inv_m.MonitorTipo.objects.get(id=datos['tipo_monitor'])
-                except ObjectDoesNotExist as e:
-                    print("Tipo monitor no necesita actualizacion")
-                try:
-                    new_dispositivo.clase = inv_m.DispositivoClase.objects.get(id=datos['clase'])
-                except ObjectDoesNotExist as e:
-                    print("Clase no necesita actualizacion")
-                new_dispositivo.save()
-        elif tipo == "CPU":
-            for datos in dispositivos:
-                new_dispositivo = inv_m.CPU.objects.get(triage=datos['triage'])
-                try:
-                    new_dispositivo.marca = inv_m.DispositivoMarca.objects.get(id=datos['marca'])
-                except ObjectDoesNotExist as e:
-                    print("Marca no necesita actualizar")
-                try:
-                    new_dispositivo.modelo = datos['modelo']
-                except ObjectDoesNotExist as e:
-                    print("Modelo no necesita actualizacion")
-                try:
-                    new_dispositivo.serie = datos['serie']
-                except ObjectDoesNotExist as e:
-                    print("Serie no necesita actualizacion")
-                try:
-                    new_dispositivo.tarima = inv_m.Tarima.objects.get(id=datos['tarima'])
-                except ObjectDoesNotExist as e:
-                    print("Tarima no necesita actualizacion")
-                try:
-                    new_dispositivo.procesador = inv_m.Procesador.objects.get(id=datos['procesador'])
-                except ObjectDoesNotExist as e:
-                    print("Procesador no necesita actualizacion")
-                try:
-                    new_dispositivo.version_sistema = inv_m.VersionSistema.objects.get(id=datos['version_sistema'])
-                except ObjectDoesNotExist as e:
-                    print("La version del sistema no necisita actualizacion")
-                try:
-                    new_dispositivo.disco_duro = inv_m.HDD.objects.get(triage=datos['disco_duro__triage'])
-                except ObjectDoesNotExist as e:
-                    print("El disco duro no necesita actualizacion")
-                try:
-                    new_dispositivo.ram = datos['ram']
-                except ObjectDoesNotExist as e:
-                    print("Memoria ram no necesita actualizacion")
-                try:
-                    new_dispositivo.ram_medida = inv_m.DispositivoMedida.objects.get(id=datos['ram_medida'])
-                except ObjectDoesNotExist as e:
-                    print("Medidad de ram no necesita actualizacion")
-                # Datos del checkbox
-                try:
-                    new_dispositivo.servidor = bool(datos['servidor'])
-                except ObjectDoesNotExist as e:
-                    print("El campo servidor no necesita actualizacion")
-                try:
-                    new_dispositivo.all_in_one = bool(datos['all_in_one'])
-                except ObjectDoesNotExist as e:
-                    print("el campor all in one no necesita actualizacion")
-                try:
-                    new_dispositivo.clase = inv_m.DispositivoClase.objects.get(id=datos['clase'])
-                except ObjectDoesNotExist as e:
-                    print("Clase no necesita actualizacion")
-                new_dispositivo.save()
-        elif tipo == "TABLET":
-            for datos in dispositivos:
-                new_dispositivo = inv_m.Tablet.objects.get(triage=datos['triage'])
-                try:
-                    new_dispositivo.marca = inv_m.DispositivoMarca.objects.get(id=datos['marca'])
-                except ObjectDoesNotExist as e:
-                    print("Marca no necesita actualizar")
-                try:
-                    new_dispositivo.modelo = datos['modelo']
-                except ObjectDoesNotExist as e:
-                    print("Modelo no necesita actualizacion")
-                try:
-                    new_dispositivo.serie = datos['serie']
-                except ObjectDoesNotExist as e:
-                    print("Serie no necesita actualizacion")
-                try:
-                    new_dispositivo.tarima = inv_m.Tarima.objects.get(id=datos['tarima'])
-                except ObjectDoesNotExist as e:
-                    print("Tarima no necesita actualizacion")
-                try:
-                    new_dispositivo.procesador = inv_m.Procesador.objects.get(id=datos['procesador'])
-                except ObjectDoesNotExist as e:
-                    print("Procesador no necesita actualizacion")
-                try:
-                    new_dispositivo.version_sistema = inv_m.VersionSistema.objects.get(id=datos['version_sistema'])
-                except ObjectDoesNotExist as e:
-                    print("La version del sistema no necisita actualizacion")
-                try:
-                    new_dispositivo.ram = datos['ram']
-                except ObjectDoesNotExist as e:
-                    print("Memoria ram no necesita actualizacion")
-                try:
-                    new_dispositivo.medida_ram = inv_m.DispositivoMedida.objects.get(id=datos['medida_ram'])
-                except ObjectDoesNotExist as e:
-                    print("Medidad de ram no necesita actualizacion")
-                try:
-                    new_dispositivo.so_id = inv_m.Software.objects.get(id=datos['so_id'])
-                except ObjectDoesNotExist as e:
-                    print("Sistema operativo no necesita actualizacion")
-                try:
-                    new_dispositivo.pulgadas = datos['pulgadas']
-                except ObjectDoesNotExist as e:
-                    print("Pulgadas del monitor no necesita actualizacion")
-                try:
-                    new_dispositivo.almacenamiento = datos['almacenamiento']
-                except ObjectDoesNotExist as e:
-                    print("Almacenamiento no necesita actualizacion")
-                try:
-                    new_dispositivo.medida_almacenamiento = inv_m.DispositivoMedida.objects.get(
-                        id=datos['medida_almacenamiento']
-                        )
-                except ObjectDoesNotExist as e:
-                    print("Medida de almacenamiento no necesita actualizacion")
-                # Datos del checkbox
-                try:
-                    if(str(datos['almacenamiento_externo']) == "false"):
-                        new_dispositivo.almacenamiento_externo = False
-                    else:
-                        new_dispositivo.almacenamiento_externo = True
-                except ObjectDoesNotExist as e:
-                    print("almacenamiento externo no necesita actualizacion")
-                try:
-                    new_dispositivo.clase = inv_m.DispositivoClase.objects.get(id=datos['clase'])
-                except ObjectDoesNotExist as e:
-                    print("Clase no necesita actualizacion")
-                new_dispositivo.save()
-        elif tipo == "LAPTOP":
-            for datos in dispositivos:
-                new_dispositivo = inv_m.Laptop.objects.get(triage=datos['triage'])
-                try:
-                    new_dispositivo.marca = inv_m.DispositivoMarca.objects.get(id=datos['marca'])
-                except ObjectDoesNotExist as e:
-                    print("Marca no necesita actualizar")
-                try:
-                    new_dispositivo.modelo = datos['modelo']
-                except ObjectDoesNotExist as e:
-                    print("Modelo no necesita actualizacion")
-                try:
-                    new_dispositivo.serie = datos['serie']
-                except ObjectDoesNotExist as e:
-                    print("Serie no necesita actualizacion")
-                try:
-                    new_dispositivo.tarima = inv_m.Tarima.objects.get(id=datos['tarima'])
-                except ObjectDoesNotExist as e:
-                    print("Tarima no necesita actualizacion")
-                try:
-                    new_dispositivo.procesador = inv_m.Procesador.objects.get(id=datos['procesador'])
-                except ObjectDoesNotExist as e:
-                    print("Procesador no necesita actualizacion")
-                try:
-                    new_dispositivo.version_sistema = inv_m.VersionSistema.objects.get(id=datos['version_sistema'])
-                except ObjectDoesNotExist as e:
-                    print("La version del sistema no necisita actualizacion")
-                try:
-                    new_dispositivo.disco_duro = inv_m.HDD.objects.get(triage=datos['disco_duro__triage'])
-                except ObjectDoesNotExist as e:
-                    print("El disco duro no necesita actualizacion")
-                try:
-                    new_dispositivo.ram = datos['ram']
-                except ObjectDoesNotExist as e:
-                    print("Memoria ram no necesita actualizacion")
-                try:
-                    new_dispositivo.ram_medida = inv_m.DispositivoMedida.objects.get(id=datos['ram_medida'])
-                except ObjectDoesNotExist as e:
-                    print("Medidad de ram no necesita actualizacion")
-                try:
-                    new_dispositivo.pulgadas = datos['pulgadas']
-                except ObjectDoesNotExist as e:
-                    print("Pulgadas del monitor no necesita actualizacion")
-                try:
-                    new_dispositivo.clase = inv_m.DispositivoClase.objects.get(id=datos['clase'])
-                except ObjectDoesNotExist as e:
-                    print("Clase no necesita actualizacion")
-                new_dispositivo.save()
-        elif tipo == "SWITCH":
-            for datos in dispositivos:
-                new_dispositivo = inv_m.DispositivoRed.objects.get(triage=datos['triage'])
-                try:
-                    new_dispositivo.marca = inv_m.DispositivoMarca.objects.get(id=datos['marca'])
-                except ObjectDoesNotExist as e:
-                    print("Marca no necesita actualizar")
-                try:
-                    new_dispositivo.modelo = datos['modelo']
-                except ObjectDoesNotExist as e:
-                    print("Modelo no necesita actualizacion")
-                try:
-                    new_dispositivo.serie = datos['serie']
-                except ObjectDoesNotExist as e:
-                    print("Serie no necesita actualizacion")
-                try:
-                    new_dispositivo.tarima = inv_m.Tarima.objects.get(id=datos['tarima'])
-                except ObjectDoesNotExist as e:
-                    print("Tarima no necesita actualizacion")
-                try:
-                    new_dispositivo.puerto = inv_m.DispositivoPuerto.objects.get(id=datos['puerto'])
-                except ObjectDoesNotExist as e:
-                    print("Puerto no necesita actualizacion")
-                try:
-                    new_dispositivo.cantidad_puertos = datos['cantidad_puertos']
-                except ObjectDoesNotExist as e:
-                    print("Cantidad de puerto no necesita actualizacion")
-                try:
-                    new_dispositivo.velocidad = datos['velocidad']
-                except ObjectDoesNotExist as e:
-                    print("Velocidad de trasmicon no necesita actualizacion")
-                try:
-                    new_dispositivo.velocidad_medida = inv_m.DispositivoMedida.objects.get(id=datos['velocidad_medida'])
-                except ObjectDoesNotExist as e:
-                    print("Velocidad medida no necesita actualizacion")
-                try:
-                    new_dispositivo.clase = inv_m.DispositivoClase.objects.get(id=datos['clase'])
-                except ObjectDoesNotExist as e:
-                    print("Clase no necesita actualizacion")
-                new_dispositivo.save()
-        elif tipo == "ACCESS POINT":
-            for datos in dispositivos:
-                new_dispositivo = inv_m.AccessPoint.objects.get(triage=datos['triage'])
-                try:
-                    new_dispositivo.marca = inv_m.DispositivoMarca.objects.get(id=datos['marca'])
-                except ObjectDoesNotExist as e:
-                    print("Marca no necesita actualizar")
-                try:
-                    new_dispositivo.modelo = datos['modelo']
-                except ObjectDoesNotExist as e:
-                    print("Modelo no necesita actualizacion")
-                try:
-                    new_dispositivo.serie = datos['serie']
-                except ObjectDoesNotExist as e:
-                    print("Serie no necesita actualizacion")
-                try:
-                    new_dispositivo.tarima = inv_m.Tarima.objects.get(id=datos['tarima'])
-                except ObjectDoesNotExist as e:
-                    print("Tarima no necesita actualizacion")
-                try:
-                    new_dispositivo.puerto = inv_m.DispositivoPuerto.objects.get(id=datos['puerto'])
-                except ObjectDoesNotExist as e:
-                    print("Puerto no necesita actualizacion")
-                try:
-                    new_dispositivo.cantidad_puertos = datos['cantidad_puertos']
-                except ObjectDoesNotExist as e:
-                    print("Cantidad de puerto no necesita actualizacion")
-                try:
-                    new_dispositivo.velocidad = datos['velocidad']
-                except ObjectDoesNotExist as e:
-                    print("Velocidad de trasmicon no necesita actualizacion")
-                try:
-                    new_dispositivo.velocidad_medida = inv_m.DispositivoMedida.objects.get(id=datos['velocidad_medida'])
-                except ObjectDoesNotExist as e:
-                    print("Velocidad medida no necesita actualizacion")
-                try:
-                    new_dispositivo.clase = inv_m.DispositivoClase.objects.get(id=datos['clase'])
-                except ObjectDoesNotExist as e:
-                    print("Clase no necesita actualizacion")
-                new_dispositivo.save()
-        else:
-            for datos in dispositivos:
-                new_dispositivo = inv_m.Dispositivo.objects.get(triage=datos['triage'])
-                new_dispositivo.serie = datos['serie']
-                new_dispositivo.save()
+        tipo = inv_m.DispositivoTipo.objects.filter(tipo=request.data["dispositivo"]).first()
+        try:
+            modelo = inv_m.Dispositivo.obtener_modelo_hijo(tipo) if tipo else inv_m.Dispositivo
+        except OperationalError:
+            modelo = inv_m.Dispositivo
+        actualizados, errores = transacciones.actualizar_dispositivos(modelo, dispositivos)
+        if errores:
+            return Response({
+                'mensaje': 'No se actualizó ningún dispositivo',
+                'errores': errores
+            },
+                status=status.HTTP_400_BAD_REQUEST)
 
         return Response({
-            'mensaje': 'Actualizados'
+            'mensaje': 'Actualizados',
+            'actualizados': actualizados
         },
             status=status.HTTP_200_OK)
 
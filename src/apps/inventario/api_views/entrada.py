@@ -4,12 +4,12 @@ import django_filters
 from django_filters import rest_framework as filters
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
+from rest_framework.filters import OrderingFilter
 from rest_framework.response import Response
 from datetime import datetime
 from braces.views import LoginRequiredMixin
 from django.http import JsonResponse, HttpResponse
 from django.db.models import Q
-from django.db.models import Sum
 from apps.inventario import (
     serializers as inv_s,
     models as inv_m
@@ -36,17 +36,25 @@ class DetalleInformeFilter(filters.FilterSet):
         return qs.filter(entrada=value, tipo_dispositivo__in=tipo_dis)
 
     def filter_desecho(self, qs, name, value):
-        queryset = qs.filter(entrada__fecha__gte='2019-01-01')
-        queryset = [obj for obj in queryset if obj.existencia_desecho > value]
-        return queryset
+        # `EntradaDetalleViewSet` agrega `existencia_desecho` con `con_existencia_desecho`
+        return qs.filter(entrada__fecha__gte='2019-01-01', existencia_desecho__gt=value)
 
 
 class EntradaDetalleViewSet(viewsets.ModelViewSet):
     """ ViewSet para generar las tablas de la :class:'EntradaDetalle'
     """
     serializer_class = inv_s.EntradaDetalleSerializer
-    queryset = inv_m.EntradaDetalle.objects.all()
+    queryset = inv_m.EntradaDetalle.objects.select_related(
+        'entrada__tipo',
+        'tipo_dispositivo',
+        'creado_por',
+    ).prefetch_related(
+        'entrada__inventario',
+        'detalle_entrada_rechazar',
+    ).con_existencia_desecho()
     filter_class = DetalleInformeFilter
+    filter_backends = (filters.DjangoFilterBackend, OrderingFilter)
+    ordering_fields = ('id', 'entrada', 'tipo_dispositivo', 'desecho', 'existencia_desecho')
 
     def perform_create(self, serializer):
         serializer.save(creado_por=self.request.user)
@@ -313,21 +321,7 @@ class EntradaDetalleViewSet(viewsets.ModelViewSet):
 
         if no_salida != "":
             if(validar_dispositivos.kardex):
-                sum_solicitudes = sum_devoluciones = sum_paquetes = 0
-                solicitudes = inv_m.SolicitudMovimiento.objects.filter(no_salida=no_salida, tipo_dispositivo=validar_dispositivos, terminada=True, recibida=True, devolucion=False).aggregate(Sum('cantidad'))
-                devoluciones = inv_m.SolicitudMovimiento.objects.filter(no_salida=no_salida, tipo_dispositivo=validar_dispositivos, terminada=True, recibida=True, devolucion=True).aggregate(Sum('cantidad'))
-                paquetes = inv_m.Paquete.objects.filter(salida=no_salida, tipo_paquete__tipo_dispositivo=validar_dispositivos, desactivado=False).aggregate(Sum('cantidad'))
-
-                if solicitudes['cantidad__sum'] is not None:
-                    sum_solicitudes = solicitudes['cantidad__sum']
-
-                if devoluciones['cantidad__sum'] is not None:
-                    sum_devoluciones = devoluciones['cantidad__sum']
-
-                if paquetes['cantidad__sum'] is not None:
-                    sum_paquetes = paquetes['cantidad__sum']
-        
-                numero_dispositivos = sum_solicitudes - sum_devoluciones - sum_paquetes
+                numero_dispositivos = inv_m.ExistenciaSalida.consultar(no_salida, validar_dispositivos)
             else:
                 dispositivos_salida = inv_m.CambioEtapa.objects.filter(solicitud__no_salida=no_salida, etapa_final=etapa).values('dispositivo')
                 numero_dispositivos = inv_m.Dispositivo.objects.filter(
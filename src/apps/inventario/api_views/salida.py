@@ -1,6 +1,7 @@
+import time
 import django_filters
 from django.db.utils import OperationalError
-from django.core.exceptions import ObjectDoesNotExist
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
 from datetime import datetime
 from django.contrib.auth.models import User
 
@@ -11,11 +12,13 @@ from rest_framework.response import Response
 from braces.views import LoginRequiredMixin
 from apps.inventario import (
     serializers as inv_s,
-    models as inv_m
+    models as inv_m,
+    transacciones
 )
 from apps.conta import models as conta_m
 from apps.escuela import models as escuela_m
 from apps.crm import models as crm_m
+from apps.main.mixins import ProyeccionApiMixin
 from django.db.models import Count, Sum
 from decimal import Decimal
 
@@ -41,11 +44,16 @@ class SalidaInventarioFilter(filters.FilterSet):
         return queryset
 
 
-class SalidaInventarioViewSet(viewsets.ModelViewSet):
+class SalidaInventarioViewSet(ProyeccionApiMixin, viewsets.ModelViewSet):
     """ ViewSet para generar informe de la :class: `SalidaInventario`.
     """
     serializer_class = inv_s.SalidaInventarioSerializer
-    queryset = inv_m.SalidaInventario.objects.all().order_by('fecha')
+    queryset = inv_m.SalidaInventario.objects.select_related(
+        'tipo_salida',
+        'beneficiario',
+        'estado',
+        'escuela',
+    ).order_by('fecha')
     #filter_fields = ('id','tipo_salida','estado')
     filter_class = SalidaInventarioFilter
 
@@ -57,33 +65,8 @@ class SalidaInventarioViewSet(viewsets.ModelViewSet):
         salida = request.data['salida']
         validar_dispositivo = inv_m.PaqueteTipo.objects.get(id=tipo_dispositivo)
 
-        if validar_dispositivo.tipo_dispositivo:
-                altas = inv_m.SolicitudMovimiento.objects.filter(
-                    recibida=True,
-                    devolucion=False,
-                    no_salida=salida,
-                    tipo_dispositivo__tipo=validar_dispositivo).aggregate(altas_cantidad=Sum('cantidad'))
-                if altas['altas_cantidad'] is None:
-                    altas['altas_cantidad'] = 0
-                
-                bajas = inv_m.SolicitudMovimiento.objects.filter(
-                    recibida=True,
-                    devolucion=True,
-                    no_salida=salida,
-                    tipo_dispositivo__tipo=validar_dispositivo).aggregate(bajas_cantidad=Sum('cantidad'))
-                if bajas['bajas_cantidad'] is None:
-                    bajas['bajas_cantidad'] = 0
-                
-                salidas = inv_m.Paquete.objects.filter(
-                    tipo_paquete=validar_dispositivo,
-                    desactivado=False,
-                    salida=salida
-                ).aggregate(salidas_cantidad=Sum('cantidad'))
-                if salidas['salidas_cantidad'] is None:
-                    salidas['salidas_cantidad'] = 0
-                
-                total = altas['altas_cantidad'] - (bajas['bajas_cantidad'] + salidas['salidas_cantidad'])
-                
+        if validar_dispositivo.tipo_dispositivo_id:
+                total = inv_m.ExistenciaSalida.consultar(salida, validar_dispositivo.tipo_dispositivo_id)
                 return Response(
                     {'mensaje': total},
                     status=status.HTTP_200_OK
@@ -97,41 +80,16 @@ class SalidaInventarioViewSet(viewsets.ModelViewSet):
     @action(methods=['post'], detail=True)
     def stock_paquete(self, request, pk=None):
         salida = request.data['salida']
-        tipo_paquete = inv_m.PaqueteTipo.objects.all()
+        existencias = {
+            existencia.tipo_dispositivo_id: existencia.existencia
+            for existencia in inv_m.ExistenciaSalida.objects.filter(salida=salida)}
         lista = []
 
-        for tipo in tipo_paquete:
+        for tipo in inv_m.PaqueteTipo.objects.all():
             paquete_salida = {}
-
-            altas = inv_m.SolicitudMovimiento.objects.filter(
-                recibida=True,
-                devolucion=False,
-                no_salida=salida,
-                tipo_dispositivo__tipo=tipo).aggregate(altas_cantidad=Sum('cantidad'))
-            if altas['altas_cantidad'] is None:
-                altas['altas_cantidad'] = 0
-            
-            bajas = inv_m.SolicitudMovimiento.objects.filter(
-                recibida=True,
-                devolucion=True,
-                no_salida=salida,
-                tipo_dispositivo__tipo=tipo).aggregate(bajas_cantidad=Sum('cantidad'))
-            if bajas['bajas_cantidad'] is None:
-                bajas['bajas_cantidad'] = 0
-            
-            salidas = inv_m.Paquete.objects.filter(
-                tipo_paquete=tipo,
-                desactivado=False,
-                salida=salida
-                ).aggregate(salidas_cantidad=Sum('cantidad'))
-            if salidas['salidas_cantidad'] is None:
-                salidas['salidas_cantidad'] = 0
-            
-            total = altas['altas_cantidad'] - (bajas['bajas_cantidad'] + salidas['salidas_cantidad'])
-
             paquete_salida['id'] = tipo.id
             paquete_salida['nombre'] = tipo.nombre
-            paquete_salida['existencia'] = total
+            paquete_salida['existencia'] = existencias.get(tipo.tipo_dispositivo_id, 0)
             lista.append(paquete_salida)
 
         return Response(lista)
@@ -347,61 +305,30 @@ class RevisionSalidaViewSet(viewsets.ModelViewSet):
     """ViewSet para generar  informe de la :class: `RevisionSalida`.
     """
     serializer_class = inv_s.RevisionSalidaSerializer
-    queryset = inv_m.RevisionSalida.objects.all()
+    queryset = inv_m.RevisionSalida.objects.select_related(
+        'revisado_por',
+        'salida__estado',
+        'salida__escuela',
+        'salida__tipo_salida',
+        'salida__beneficiario',
+    )
     filter_class = RevisionSalidaFilter
 
     @action(methods=['post'], detail=True)
     def aprobado(self, request, pk=None):
         """ Metodo para aprobar la salida
         """
-
-        id_salida = request.data["salida"]
-        finalizar_salida = inv_m.SalidaInventario.objects.get(id=id_salida)
-        salida = inv_m.RevisionSalida.objects.get(salida=id_salida)
-        paquetes = inv_m.Paquete.objects.filter(salida=id_salida,
-                                                aprobado=True).exclude(tipo_paquete__tipo_dispositivo__usa_triage=False)
-
-        for paquete in paquetes:
-            dispositivosPaquetes = inv_m.DispositivoPaquete.objects.filter(paquete=paquete.id,
-                                                                           aprobado=True)
-
-            for dispositivos in dispositivosPaquetes:
-                dispositivos.dispositivo.etapa = inv_m.DispositivoEtapa.objects.get(id=inv_m.DispositivoEtapa.EN)
-                dispositivos.dispositivo.valido = False
-                dispositivos.dispositivo.save()
-                try:
-                    cambios_etapa = inv_m.CambioEtapa.objects.filter(dispositivo__triage=dispositivos.dispositivo).order_by('-id')[0]
-                    cambios_etapa.etapa_final = inv_m.DispositivoEtapa.objects.get(id=inv_m.DispositivoEtapa.EN)
-                    cambios_etapa.creado_por = request.user
-                    cambios_etapa.save()
-                except ObjectDoesNotExist as e:
-                    print("EL DISPOSITIVO NO EXISTE")
-                """ Metodo para movimiento de dispositivos
-                """
-                periodo_actual = conta_m.PeriodoFiscal.objects.get(actual=True)
-                salida = dispositivos.paquete.salida
-                triage = dispositivos.dispositivo
-                precio_dispositivo = conta_m.PrecioDispositivo.objects.get(dispositivo__triage=triage, activo=True)
-                movimiento_dispositivo = conta_m.MovimientoDispositivo.objects.filter(dispositivo__triage = triage, tipo_movimiento = conta_m.MovimientoDispositivo.BAJA)
-                if len(movimiento_dispositivo) == 0:
-                    movimiento = conta_m.MovimientoDispositivo(
-                        dispositivo=dispositivos.dispositivo,
-                        periodo_fiscal=periodo_actual,
-                        tipo_movimiento=conta_m.MovimientoDispositivo.BAJA,
-                        referencia='Salida {}'.format(salida),
-                        precio=precio_dispositivo.precio,
-                        fecha = finalizar_salida.fecha)
-                    movimiento.save()
-        salida.aprobada = True
-        salida.save()
-        finalizar_salida.en_creacion = False
-        finalizar_salida.necesita_revision = False
-        finalizar_salida.save()
-        return Response(
-            {
-                'mensaje': 'El estatus a sido Aprobado'
-            }
-        )
+        inicio = time.time()
+        finalizar_salida = inv_m.SalidaInventario.objects.get(id=request.data["salida"])
+        try:
+            resultado = transacciones.aprobar_salida(finalizar_salida, request.user)
+        except ValidationError as e:
+            return Response({'mensaje': ' '.join(e.messages)}, status=status.HTTP_400_BAD_REQUEST)
+        except conta_m.PeriodoFiscal.DoesNotExist:
+            return Response({'mensaje': 'No hay un periodo fiscal actual'}, status=status.HTTP_400_BAD_REQUEST)
+        resultado['mensaje'] = 'El estatus a sido Aprobado'
+        resultado['segundos'] = round(time.time() - inicio, 3)
+        return Response(resultado)
 
     @action(methods=['post'], detail=True)
     def rechazar_dispositivo(self, request, pk=None):
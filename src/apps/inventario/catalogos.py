@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+# Catálogos del inventario (marcas, puertos, medidas, etc.) que usan los grids para llenar sus listas.
+# Como cambian muy poco, se guardan en caché junto a un número de versión. Las señales `post_save` y
+# `post_delete` de cada modelo incrementan la versión, lo que invalida todas las copias anteriores y
+# cambia el ETag con el que la API responde a los navegadores.
+import hashlib
+import time
+
+from django.core.cache import cache
+
+from apps.inventario import models as inv_m
+
+CLAVE_VERSION = 'inventario:catalogos:version'
+
+# Tiempo en segundos que se conserva en caché cada catálogo
+CACHE_TIMEOUT = 60 * 60 * 24
+
+CATALOGOS = {
+    'marcas': inv_m.DispositivoMarca,
+    'puertos': inv_m.DispositivoPuerto,
+    'medidas': inv_m.DispositivoMedida,
+    'sistemas': inv_m.VersionSistema,
+    'procesadores': inv_m.Procesador,
+    'software': inv_m.Software,
+    'tipos_mouse': inv_m.MouseTipo,
+    'tipos_monitor': inv_m.MonitorTipo,
+}
+
+
+def version():
+    """Devuelve la versión actual de los catálogos.
+    Si aún no existe en caché, se inicia con la hora actual para no repetir una versión anterior
+    después de que la caché se reinicie.
+    """
+    return cache.get_or_set(CLAVE_VERSION, int(time.time()), None)
+
+
+def invalidar(**kwargs):
+    """Incrementa la versión de los catálogos. Se conecta a las señales de los modelos de `CATALOGOS`."""
+    try:
+        cache.incr(CLAVE_VERSION)
+    except ValueError:
+        cache.set(CLAVE_VERSION, int(time.time()), None)
+
+
+def obtener(nombres=None, version_actual=None):
+    """Devuelve un diccionario con el contenido de cada catálogo de `nombres` (por defecto, todos).
+    Solo se consulta la base de datos para los catálogos que no estén en caché en la versión actual.
+
+    Raises:
+        KeyError: si alguno de los nombres no es un catálogo válido.
+    """
+    nombres = sorted(CATALOGOS) if nombres is None else list(nombres)
+    version_actual = version_actual or version()
+    claves = {nombre: 'inventario:catalogo:{}:{}'.format(nombre, version_actual) for nombre in nombres}
+    catalogos = cache.get_many(claves.values())
+    resultado = {}
+    for nombre in nombres:
+        if claves[nombre] not in catalogos:
+            catalogos[claves[nombre]] = list(CATALOGOS[nombre].objects.values())
+            cache.set(claves[nombre], catalogos[claves[nombre]], CACHE_TIMEOUT)
+        resultado[nombre] = catalogos[claves[nombre]]
+    return resultado
+
+
+def etag(nombres, version_actual=None):
+    """Genera el ETag de la combinación de catálogos `nombres` en la versión actual."""
+    contenido = '{}:{}'.format(version_actual or version(), ','.join(sorted(nombres)))
+    return '"{}"'.format(hashlib.md5(contenido.encode('utf-8')).hexdigest())
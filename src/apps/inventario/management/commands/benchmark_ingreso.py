@@ -0,0 +1,68 @@
+import shutil
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from apps.inventario import models as inv_m
+from apps.inventario import transacciones
+
+
+class Command(BaseCommand):
+    help = 'Mide el tiempo por unidad del ingreso de dispositivos según el tamaño del lote. No guarda cambios.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('entrada_detalle', type=int, help='ID del detalle de entrada a utilizar')
+        parser.add_argument(
+            '--lotes',
+            nargs='+',
+            type=int,
+            default=[1, 10, 50, 100, 500],
+            help='Tamaños de lote a medir')
+        parser.add_argument(
+            '--individual',
+            action='store_true',
+            help='Compara contra el ingreso de un dispositivo a la vez')
+
+    def medir(self, funcion):
+        """Ejecuta `funcion` dentro de una transacción que siempre se revierte.
+
+        Returns:
+            tuple: duración en segundos y cantidad de consultas ejecutadas.
+        """
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as consultas:
+                inicio = time.perf_counter()
+                funcion()
+                duracion = time.perf_counter() - inicio
+            transaction.set_rollback(True)
+        return duracion, len(consultas)
+
+    def handle(self, *args, **options):
+        detalle = inv_m.EntradaDetalle.objects.get(pk=options['entrada_detalle'])
+        modelo = inv_m.Dispositivo.obtener_modelo_hijo(detalle.tipo_dispositivo)
+        datos = {
+            'entrada': detalle.entrada,
+            'modelo': modelo,
+            'tipo': detalle.tipo_dispositivo,
+            'entrada_detalle': detalle,
+            'precio': detalle.precio_unitario,
+        }
+        media_temporal = tempfile.mkdtemp()
+        self.stdout.write('{:>8} {:>12} {:>14} {:>12} {:>14}'.format(
+            'Lote', 'Consultas', 'ms/unidad', 'Cons. ind.', 'ms/u ind.'))
+        try:
+            with override_settings(MEDIA_ROOT=media_temporal):
+                for lote in options['lotes']:
+                    duracion, consultas = self.medir(
+                        lambda: transacciones.ingresar_dispositivos(cantidad=lote, **datos))
+                    fila = '{:>8} {:>12} {:>14.2f}'.format(lote, consultas, duracion * 1000 / lote)
+                    if options['individual']:
+                        duracion, consultas = self.medir(
+                            lambda: [transacciones.ingresar_dispositivo(**datos) for _ in range(lote)])
+                        fila += ' {:>12} {:>14.2f}'.format(consultas, duracion * 1000 / lote)
+                    self.stdout.write(fila)
+        finally:
+            shutil.rmtree(media_temporal, ignore_errors=True)
@@ -0,0 +1,46 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from apps.inventario import models as inv_m
+from apps.inventario import qr
+
+# Modelos con código QR y las relaciones necesarias para generar sus datos
+MODELOS = {
+    'dispositivo': (inv_m.Dispositivo, ['tipo']),
+    'repuesto': (inv_m.Repuesto, ['tipo']),
+    'sector': (inv_m.Sector, []),
+    'tarima': (inv_m.Tarima, []),
+    'desecho': (inv_m.DesechoSalida, []),
+}
+
+
+class Command(BaseCommand):
+    help = 'Genera por lotes las imágenes de los códigos QR que aún no han sido creadas.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--modelos',
+            nargs='+',
+            choices=sorted(MODELOS),
+            default=sorted(MODELOS),
+            help='Modelos a procesar')
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=200,
+            help='Cantidad de registros que se actualizan por consulta')
+        parser.add_argument(
+            '--procesos',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Cantidad de procesos que generan las imágenes')
+
+    def handle(self, *args, **options):
+        for nombre in options['modelos']:
+            modelo, relaciones = MODELOS[nombre]
+            generados = qr.generar_pendientes(
+                modelo.objects.select_related(*relaciones),
+                tamano_lote=options['lote'],
+                procesos=options['procesos'])
+            self.stdout.write('{}: {} códigos generados'.format(nombre, generados))
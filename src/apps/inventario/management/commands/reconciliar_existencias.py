@@ -0,0 +1,13 @@
+from apps.inventario import models as inv_m
+from apps.main.saldos import ReconciliarCommand
+
+
+class Command(ReconciliarCommand):
+    help = (
+        'Reconstruye las existencias por salida a partir de las solicitudes de movimiento y los paquetes, '
+        'e informa las diferencias encontradas.')
+    modelo = inv_m.ExistenciaSalida
+    argumento = 'salidas'
+    ayuda_argumento = 'IDs de las salidas a reconciliar. Si no se indica ninguna, se reconcilian todas.'
+    formato_diferencia = 'Salida {} tipo {} {}: {} != {}'
+    mensaje_coinciden = 'Las existencias coinciden con las solicitudes y paquetes'
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-18 16:18
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Sum
+
+
+def llenar_existencias(apps, schema_editor):
+    SolicitudMovimiento = apps.get_model('inventario', 'SolicitudMovimiento')
+    Paquete = apps.get_model('inventario', 'Paquete')
+    ExistenciaSalida = apps.get_model('inventario', 'ExistenciaSalida')
+    solicitudes = SolicitudMovimiento.objects.filter(recibida=True, no_salida__isnull=False)
+    consultas = (
+        ('altas', solicitudes.filter(devolucion=False), 'no_salida', 'tipo_dispositivo'),
+        ('bajas', solicitudes.filter(devolucion=True), 'no_salida', 'tipo_dispositivo'),
+        ('empaquetados',
+         Paquete.objects.filter(desactivado=False, tipo_paquete__tipo_dispositivo__isnull=False),
+         'salida',
+         'tipo_paquete__tipo_dispositivo'))
+    existencias = {}
+    for campo, queryset, campo_salida, campo_tipo in consultas:
+        totales = queryset.order_by().values_list(campo_salida, campo_tipo).annotate(total=Sum('cantidad'))
+        for salida, tipo, total in totales:
+            existencias.setdefault((salida, tipo), {})[campo] = total
+    ExistenciaSalida.objects.bulk_create(
+        ExistenciaSalida(salida_id=salida, tipo_dispositivo_id=tipo, **valores)
+        for (salida, tipo), valores in existencias.items())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0079_secuenciatriage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExistenciaSalida',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('altas', models.IntegerField(default=0)),
+                ('bajas', models.IntegerField(default=0)),
+                ('empaquetados', models.IntegerField(default=0)),
+                ('salida', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='existencias', to='inventario.SalidaInventario')),
+                ('tipo_dispositivo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='existencias_salida', to='inventario.DispositivoTipo')),
+            ],
+            options={
+                'verbose_name': 'Existencia de salida',
+                'verbose_name_plural': 'Existencias de salidas',
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='existenciasalida',
+            unique_together=set([('salida', 'tipo_dispositivo')]),
+        ),
+        migrations.RunPython(llenar_existencias, migrations.RunPython.noop),
+    ]
@@ -2,26 +2,63 @@
 # -*- coding: UTF-8 -*-
 
 import uuid
-import qrcode
-import json
 import sys
-from io import BytesIO
-from django.db import models
-from django.db.utils import OperationalError
+from django.db import models, transaction
+from django.db.models import ExpressionWrapper, F, Max, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.db.utils import IntegrityError, OperationalError
 from django.urls import reverse_lazy, reverse
 from django.utils import timezone
-from django.contrib.auth.models import User
-from django.core.exceptions import ValidationError
-from django.core.files.uploadedfile import InMemoryUploadedFile
+from django.contrib.auth.models import Group, User
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
 from django.utils.translation import gettext_lazy as _
 
 from easy_thumbnails import fields as et_fields
 
-from apps.inventario import transacciones
+from apps.inventario import qr, transacciones
 from apps.crm import models as crm_m
 from apps.tpe import models as tpe_m
 from apps.escuela import models as escuela_m
 from apps.mye import models as mye
+from apps.main import saldos
+
+
+class CodigoQR(object):
+
+    """Funcionalidad común de los modelos que tienen un campo `codigo_qr`.
+    La imagen no se genera al guardar el registro, sino por lotes desde el comando `generar_qr`.
+    Cada modelo define el `PREFIJO_QR` del nombre de archivo y, si contiene más que su tipo e id, los datos del
+    código en `datos_qr`.
+    """
+
+    PREFIJO_QR = None
+
+    def datos_qr(self):
+        return {
+            'tipo': self._meta.model_name,
+            'id': self.id
+        }
+
+    def archivo_qr(self):
+        return '{}-{}.png'.format(self.PREFIJO_QR, self.id)
+
+    def crear_qrcode(self, save=True):
+        """Genera el código QR del registro.
+        Con `save=False` únicamente se guarda la imagen, sin actualizar el registro.
+        """
+        qr.guardar_archivo(self, qr.renderizar(self.datos_qr()))
+        if save:
+            type(self).objects.filter(pk=self.pk).update(codigo_qr=self.codigo_qr.name)
+
+
+class AporteExistencia(saldos.MovimientoSaldo):
+
+    """Funcionalidad común de los modelos que modifican la :class:`ExistenciaSalida`.
+    Cada modelo define `aporte_saldo` con la llave `(salida_id, tipo_dispositivo_id)`, o `None` si el registro
+    no modifica la existencia de ninguna salida.
+    """
+
+    MODELO_SALDO = 'inventario.ExistenciaSalida'
 
 
 class EntradaTipo(models.Model):
@@ -137,6 +174,21 @@ class DispositivoTipo(models.Model):
         super(DispositivoTipo, self).save(*args, **kwargs)
 
 
+class EntradaDetalleQuerySet(models.QuerySet):
+    """QuerySet de :class:`EntradaDetalle` con los cálculos de existencia hechos en la base de datos."""
+
+    def con_existencia_desecho(self):
+        """Agrega `existencia_desecho`: la cantidad de `desecho` del detalle menos la suma de las cantidades
+        de sus :class:`DesechoDetalle`. Permite filtrar y ordenar por ese valor.
+        """
+        desechados = DesechoDetalle.objects.filter(
+            entrada_detalle=OuterRef('pk')).order_by().values('entrada_detalle').annotate(
+            total=Sum('cantidad')).values('total')
+        return self.annotate(existencia_desecho=ExpressionWrapper(
+            F('desecho') - Coalesce(Subquery(desechados, output_field=models.IntegerField()), 0),
+            output_field=models.IntegerField()))
+
+
 class EntradaDetalle(models.Model):
 
     """Detalle que indica la cantidad de cada tipo de equipo que ingresa en la :class:`Entrada`.
@@ -195,6 +247,8 @@ class EntradaDetalle(models.Model):
         null=True,
         related_name='tipo_entrada_kardex')
 
+    objects = EntradaDetalleQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Detalle de entrada"
         verbose_name_plural = "Detalles de entrada"
@@ -210,8 +264,15 @@ class EntradaDetalle(models.Model):
 
     @property
     def existencia_desecho(self):
+        """Si el detalle se obtuvo con `con_existencia_desecho`, se usa el valor calculado en la consulta."""
+        if hasattr(self, '_existencia_desecho'):
+            return self._existencia_desecho
         return self.desecho - self.inventario_desecho()
 
+    @existencia_desecho.setter
+    def existencia_desecho(self, valor):
+        self._existencia_desecho = valor
+
     def save(self, *args, **kwargs):
         """Se debe validar que el detalle de una entrada que involucre precio, por ejemplo, una compra,
         incluya el precio total.
@@ -233,21 +294,19 @@ class EntradaDetalle(models.Model):
             util = self.util
         # Busca el modelo del `tipo_dispositivo` del objeto actual
         modelo = Dispositivo.obtener_modelo_hijo(self.tipo_dispositivo)
-        creados = 0
-        errores = 0
-        for _ in range(0, util):
-            try:
-                transacciones.ingresar_dispositivo(
-                    entrada=self.entrada,
-                    modelo=modelo,
-                    tipo=self.tipo_dispositivo,
-                    entrada_detalle=self,
-                    precio=self.precio_unitario
-                    )
-                creados = creados + 1
-            except OperationalError:
-                errores = errores + 1
-        return {'creados': creados, 'errores': errores}
+        try:
+            nuevos = transacciones.ingresar_dispositivos(
+                entrada=self.entrada,
+                modelo=modelo,
+                tipo=self.tipo_dispositivo,
+                entrada_detalle=self,
+                cantidad=util,
+                precio=self.precio_unitario
+            )
+        except OperationalError:
+            # El ingreso es atómico: si falla, no se crea ningún dispositivo del lote
+            return {'creados': 0, 'errores': util}
+        return {'creados': len(nuevos), 'errores': 0}
 
     def crear_repuestos(self, repuesto=None):
         if repuesto is None:
@@ -398,47 +457,21 @@ class Nivel(models.Model):
         return Tarima.objects.filter(sector__nivel=self)
 
 
-class Sector(models.Model):
+class Sector(CodigoQR, models.Model):
     sector = models.IntegerField(null=False)
     nivel = models.ForeignKey(Nivel, related_name='sectores')
     codigo_qr = et_fields.ThumbnailerImageField(upload_to='qr_sector', blank=True, null=True, editable=False)
 
+    PREFIJO_QR = 'sector'
+
     def __str__(self):
         return '{nivel}-{sector}'.format(nivel=self.nivel, sector=self.sector)
 
     def get_absolute_url(self):
         return reverse_lazy('sector_update', kwargs={'pk': self.id})
 
-    def save(self, *args, **kwargs):
-        super(Sector, self).save(*args, **kwargs)
-        if not self.codigo_qr:
-            self.crear_qrcode()
-            super(Sector, self).save(*args, **kwargs)
-
-    def crear_qrcode(self):
-        """Genera le código QR para apuntar a la id del sector
-        """
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=6,
-            border=1,
-        )
-        data_qr = {
-            'tipo': 'sector',
-            'id': self.id
-        }
-        qr.add_data(json.dumps(data_qr, ensure_ascii=False))
-        qr.make(fit=True)
-        img = qr.make_image()
-        buffer = BytesIO()
-        img.save(buffer)
-        filename = 'sector-{}.png'.format(self.id)
-        filebuffer = InMemoryUploadedFile(buffer, None, filename, 'image/png', buffer.getbuffer().nbytes, None)
-        self.codigo_qr.save(filename, filebuffer)
-
 
-class Tarima(models.Model):
+class Tarima(CodigoQR, models.Model):
     sector = models.ForeignKey(
         Sector,
         on_delete=models.PROTECT,
@@ -448,37 +481,11 @@ class Tarima(models.Model):
     )
     codigo_qr = et_fields.ThumbnailerImageField(upload_to='qr_tarima', blank=True, null=True)
 
+    PREFIJO_QR = 'tarima'
+
     def __str__(self):
         return str(self.id)
 
-    def save(self, *args, **kwargs):
-        super(Tarima, self).save(*args, **kwargs)
-        if not self.codigo_qr:
-            self.crear_qrcode()
-            super(Tarima, self).save(*args, **kwargs)
-
-    def crear_qrcode(self):
-        """Genera le código QR para apuntar a la id de la tarima
-        """
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=6,
-            border=1,
-        )
-        data_qr = {
-            'tipo': 'tarima',
-            'id': self.id
-        }
-        qr.add_data(json.dumps(data_qr, ensure_ascii=False))
-        qr.make(fit=True)
-        img = qr.make_image()
-        buffer = BytesIO()
-        img.save(buffer)
-        filename = 'tarima-{}.png'.format(self.id)
-        filebuffer = InMemoryUploadedFile(buffer, None, filename, 'image/png', buffer.getbuffer().nbytes, None)
-        self.codigo_qr.save(filename, filebuffer)
-
 
 class DispositivoClase(models.Model):
     """ Genera el tipo de clase de una :class`Dispositivo`
@@ -496,7 +503,31 @@ class DispositivoClase(models.Model):
         return self.clase
 
 
-class Dispositivo(models.Model):
+class DispositivoQuerySet(models.QuerySet):
+    """QuerySet de :class:`Dispositivo` que permite obtener cada objeto como su modelo hijo."""
+
+    def como_hijos(self, *relacionados):
+        """Devuelve una lista con los dispositivos de este queryset como instancias de su modelo hijo,
+        en el mismo orden. Se hace una consulta para obtener los ids y una por cada modelo hijo presente.
+        Los campos de `relacionados` se cargan con `select_related` en los modelos que los tengan.
+        """
+        ids = list(self.values_list('pk', 'tipo__slug'))
+        por_modelo = {}
+        for pk, slug in ids:
+            por_modelo.setdefault(slug, []).append(pk)
+        hijos = {}
+        for slug, pks in por_modelo.items():
+            modelo = Dispositivo.modelos_hijos().get(slug)
+            if modelo is None:
+                continue
+            campos = {campo.name for campo in modelo._meta.get_fields()}
+            queryset = modelo.objects.filter(pk__in=pks).select_related(
+                *[relacionado for relacionado in relacionados if relacionado.split('__')[0] in campos])
+            hijos.update((hijo.pk, hijo) for hijo in queryset)
+        return [hijos[pk] for pk, slug in ids if pk in hijos]
+
+
+class Dispositivo(CodigoQR, models.Model):
 
     """Cualquier elemento almacenado en la base de datos de inventario que puede ser entregado a una escuela.
     No debe existir una instancia de este modelo sin un objeto heredado del mismo.
@@ -536,6 +567,14 @@ class Dispositivo(models.Model):
     valido = models.BooleanField(default=True, blank=True, verbose_name='Válido')
     descripcion = models.TextField(null=True, blank=True)
 
+    PREFIJO_QR = 'dispositivo'
+    # Campos que se pueden modificar desde el grid de dispositivos
+    CAMPOS_COMUNES = ('marca', 'modelo', 'serie', 'tarima', 'clase')
+    CAMPOS_ACTUALIZABLES = ('serie',)
+
+    objects = DispositivoQuerySet.as_manager()
+    _modelos_hijos = None
+
     class Meta:
         verbose_name = "Dispositivo"
         verbose_name_plural = "Dispositivos"
@@ -546,69 +585,111 @@ class Dispositivo(models.Model):
     def __str__(self):
         return str(self.triage)
 
-    def save(self, *args, **kwargs):
-        super(Dispositivo, self).save(*args, **kwargs)
-        if not self.codigo_qr:
-            self.crear_qrcode()
-            super(Dispositivo, self).save(*args, **kwargs)
-
     def get_absolute_url(self):
-        cast = self.cast()
-        if cast:
-            return cast.get_absolute_url()
-        else:
+        modelo = self.modelo_hijo()
+        if modelo is None:
             return ''
+        # Las URL de los modelos hijos solo dependen del triage, por lo que no es necesario cargar el hijo
+        return modelo.get_absolute_url(self)
+    # Campos que lee, para recortar las columnas con `fields=` en la API (ver :func:`apps.main.mixins.proyectar`)
+    get_absolute_url.columnas = ('triage', 'tipo')
+
+    def modelo_hijo(self):
+        """Devuelve el modelo que ha heredado este objeto sin consultar la base de datos.
+        El slug del tipo se obtiene del triage (SLUG-indice) y, si no corresponde a ningún modelo, del `tipo`.
+        """
+        if type(self) is not Dispositivo:
+            return type(self)
+        modelos = Dispositivo.modelos_hijos()
+        slug = (self.triage or '').rsplit('-', 1)[0]
+        if slug not in modelos and self.tipo_id:
+            slug = self.tipo.slug
+        return modelos.get(slug)
 
     def cast(self):
         """Se encarga de obtener el dispositivo del modelo que ha heredado este objeto.
         Por ejemplo, el CPU-1, M-3, etc.
         """
-        for name in dir(self):
-            try:
-                attr = getattr(self, name)
-                if isinstance(attr, self.__class__) and type(attr) != type(self):
-                    return attr
-            except:
-                print("Error al cargar el modelo de {}".format(self.tipo))
-
-    def crear_qrcode(self):
-        """Genera le código QR para apuntar a la id del dispositivo
-        """
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=6,
-            border=1,
-        )
-        data_qr = {
+        modelo = self.modelo_hijo()
+        if modelo is None or isinstance(self, modelo):
+            return self if modelo else None
+        try:
+            return getattr(self, modelo._meta.model_name)
+        except ObjectDoesNotExist:
+            return None
+
+    def datos_qr(self):
+        return {
             'id': str(self.id),
             'triage': self.triage,
             'tipo': str(self.tipo)
         }
-        qr.add_data(json.dumps(data_qr, ensure_ascii=False))
-        qr.make(fit=True)
-        img = qr.make_image()
-        buffer = BytesIO()
-        img.save(buffer)
-        filename = 'dispositivo-{}.png'.format(self.id)
-        filebuffer = InMemoryUploadedFile(buffer, None, filename, 'image/png', buffer.getbuffer().nbytes, None)
-        self.codigo_qr.save(filename, filebuffer)
+
+    @classmethod
+    def modelos_hijos(cls):
+        """Devuelve un diccionario con los modelos hijos de `Dispositivo` indexados por su `SLUG_TIPO`.
+        Se construye una sola vez por proceso.
+        """
+        if Dispositivo._modelos_hijos is None:
+            Dispositivo._modelos_hijos = {modelo.SLUG_TIPO: modelo for modelo in Dispositivo.__subclasses__()}
+        return Dispositivo._modelos_hijos
 
     @classmethod
     def obtener_modelo_hijo(cls, tipo_dispositivo):
-        """Obtiene el modelo hijo de `Dispositivo` a partir de un `DispositivoTipo`"""
-        modelo = next(
-            (
-                f.related_model for f in cls._meta.get_fields()
-                if f.one_to_one and f.related_model.SLUG_TIPO == tipo_dispositivo.slug
-            ),
-            None
-        )
+        """Obtiene el modelo hijo de `Dispositivo` a partir de un `DispositivoTipo` o de su slug"""
+        modelo = cls.modelos_hijos().get(getattr(tipo_dispositivo, 'slug', tipo_dispositivo))
         if modelo is None:
             raise OperationalError('No es un dispositivo')
         return modelo
 
 
+class SecuenciaTriage(models.Model):
+
+    """Último `indice` entregado para cada modelo que hereda de :class:`Dispositivo`, identificado
+    por el `slug` de su :class:`DispositivoTipo`. Permite reservar índices de triage de forma atómica
+    sin tener que contar los registros en cada inserción.
+    """
+
+    slug = models.SlugField(unique=True)
+    ultimo = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Secuencia de triage"
+        verbose_name_plural = "Secuencias de triage"
+
+    def __str__(self):
+        return '{}-{}'.format(self.slug, self.ultimo)
+
+    @classmethod
+    def inicializar(cls, modelo):
+        """Crea la secuencia de `modelo` a partir del último `indice` registrado.
+        Si otro proceso la crea al mismo tiempo, se conserva la que ya existe.
+        """
+        ultimo = modelo.objects.aggregate(ultimo=Max('indice'))['ultimo'] or 0
+        try:
+            with transaction.atomic():
+                cls.objects.create(slug=modelo.SLUG_TIPO, ultimo=ultimo)
+        except IntegrityError:
+            pass
+
+    @classmethod
+    def reservar(cls, modelo, cantidad=1):
+        """Reserva `cantidad` índices consecutivos para `modelo`.
+        El incremento se hace en la base de datos, por lo que la fila queda bloqueada hasta que termine
+        la transacción y dos solicitudes nunca reciben el mismo índice.
+
+        Returns:
+            range: los índices reservados.
+        """
+        with transaction.atomic():
+            secuencia = cls.objects.filter(slug=modelo.SLUG_TIPO)
+            if not secuencia.update(ultimo=F('ultimo') + cantidad):
+                cls.inicializar(modelo)
+                secuencia.update(ultimo=F('ultimo') + cantidad)
+            ultimo = secuencia.values_list('ultimo', flat=True).get()
+        return range(ultimo - cantidad + 1, ultimo + 1)
+
+
 class DispositivoFalla(models.Model):
     dispositivo = models.ForeignKey(Dispositivo, on_delete=models.CASCADE, related_name='fallas')
     descripcion_falla = models.TextField(verbose_name='Descripción de la falla')
@@ -735,6 +816,7 @@ class DispositivoMedida(models.Model):
 
 class Teclado(Dispositivo):
     SLUG_TIPO = 'T'
+    CAMPOS_ACTUALIZABLES = Dispositivo.CAMPOS_COMUNES + ('puerto', 'caja')
     indice = models.PositiveIntegerField(editable=False, unique=True)
     puerto = models.ForeignKey(
         DispositivoPuerto,
@@ -777,6 +859,7 @@ class MouseTipo(models.Model):
 
 class Mouse(Dispositivo):
     SLUG_TIPO = 'S'
+    CAMPOS_ACTUALIZABLES = Dispositivo.CAMPOS_COMUNES + ('puerto', 'caja')
     indice = models.PositiveIntegerField(editable=False, unique=True)
     puerto = models.ForeignKey(
         DispositivoPuerto,
@@ -805,6 +888,7 @@ class Mouse(Dispositivo):
 
 class HDD(Dispositivo):
     SLUG_TIPO = 'HDD'
+    CAMPOS_ACTUALIZABLES = Dispositivo.CAMPOS_COMUNES + ('puerto', 'capacidad', 'medida')
     indice = models.PositiveIntegerField(editable=False, unique=True)
     puerto = models.ForeignKey(
         DispositivoPuerto,
@@ -854,6 +938,9 @@ class Procesador(models.Model):
 
 class Tablet(Dispositivo):
     SLUG_TIPO = 'B'
+    CAMPOS_ACTUALIZABLES = Dispositivo.CAMPOS_COMUNES + (
+        'procesador', 'version_sistema', 'ram', 'medida_ram', 'so_id', 'pulgadas', 'almacenamiento',
+        'medida_almacenamiento', 'almacenamiento_externo')
     indice = models.PositiveIntegerField(editable=False, unique=True)
     version_sistema = models.ForeignKey(VersionSistema, related_name='versiones_tablets', null=True, blank=True)
     so_id = models.ForeignKey(Software, related_name='so_tablets', null=True, blank=True)
@@ -902,6 +989,7 @@ class MonitorTipo(models.Model):
 
 class Monitor(Dispositivo):
     SLUG_TIPO = 'M'
+    CAMPOS_ACTUALIZABLES = Dispositivo.CAMPOS_COMUNES + ('puerto', 'pulgadas', 'tipo_monitor')
     indice = models.PositiveIntegerField(editable=False, unique=True)
     tipo_monitor = models.ForeignKey(MonitorTipo, on_delete=models.PROTECT, null=True, blank=True)
     puerto = models.ForeignKey(
@@ -930,6 +1018,8 @@ class Monitor(Dispositivo):
 
 class CPU(Dispositivo):
     SLUG_TIPO = 'CPU'
+    CAMPOS_ACTUALIZABLES = Dispositivo.CAMPOS_COMUNES + (
+        'procesador', 'version_sistema', 'disco_duro', 'ram', 'ram_medida', 'servidor', 'all_in_one')
     indice = models.PositiveIntegerField(editable=False, unique=True)
     procesador = models.ForeignKey(Procesador, on_delete=models.PROTECT, null=True, blank=True)
     version_sistema = models.ForeignKey(VersionSistema, on_delete=models.PROTECT, null=True, blank=True)
@@ -957,6 +1047,8 @@ class CPU(Dispositivo):
 
 class Laptop(Dispositivo):
     SLUG_TIPO = 'L'
+    CAMPOS_ACTUALIZABLES = Dispositivo.CAMPOS_COMUNES + (
+        'procesador', 'version_sistema', 'disco_duro', 'ram', 'ram_medida', 'pulgadas')
     indice = models.PositiveIntegerField(editable=False, unique=True)
     procesador = models.ForeignKey(Procesador, on_delete=models.PROTECT, null=True, blank=True)
     version_sistema = models.ForeignKey(VersionSistema, on_delete=models.PROTECT, null=True, blank=True)
@@ -995,6 +1087,8 @@ class TipoRed(models.Model):
 class DispositivoRed(Dispositivo):
     # Switch
     SLUG_TIPO = 'R'
+    CAMPOS_ACTUALIZABLES = Dispositivo.CAMPOS_COMUNES + (
+        'puerto', 'cantidad_puertos', 'velocidad', 'velocidad_medida')
     indice = models.PositiveIntegerField(editable=False, unique=True)
     cantidad_puertos = models.PositiveIntegerField(null=True, blank=True)
     puerto = models.ForeignKey(DispositivoPuerto, null=True, blank=True)
@@ -1014,6 +1108,8 @@ class DispositivoRed(Dispositivo):
 
 class AccessPoint(Dispositivo):
     SLUG_TIPO = 'AP'
+    CAMPOS_ACTUALIZABLES = Dispositivo.CAMPOS_COMUNES + (
+        'puerto', 'cantidad_puertos', 'velocidad', 'velocidad_medida')
     indice = models.PositiveIntegerField(editable=False, unique=True)
     cantidad_puertos = models.PositiveIntegerField(null=True, blank=True)
     puerto = models.ForeignKey(DispositivoPuerto, null=True, blank=True)
@@ -1049,7 +1145,7 @@ class RepuestoEstado(models.Model):
         return self.nombre
 
 
-class Repuesto(models.Model):
+class Repuesto(CodigoQR, models.Model):
     entrada = models.ForeignKey(Entrada, on_delete=models.CASCADE, related_name='repuestos')
     entrada_detalle = models.ForeignKey(
         EntradaDetalle,
@@ -1067,6 +1163,8 @@ class Repuesto(models.Model):
     marca = models.ForeignKey(DispositivoMarca, on_delete=models.CASCADE, null=True, blank=True)
     modelo = models.CharField(max_length=80, null=True, blank=True)
 
+    PREFIJO_QR = 'repuesto'
+
     class Meta:
         verbose_name = "Repuesto"
         verbose_name_plural = "Repuestos"
@@ -1074,37 +1172,14 @@ class Repuesto(models.Model):
     def __str__(self):
         return 'R-{}'.format(self.id)
 
-    def save(self, *args, **kwargs):
-        print('Salvar')
-        super(Repuesto, self).save(*args, **kwargs)
-        if not self.codigo_qr:
-            self.crear_qrcode()
-            super(Repuesto, self).save(*args, **kwargs)
-
     def get_absolute_url(self):
         return reverse_lazy('repuesto_detail', kwargs={'pk': self.id})
 
-    def crear_qrcode(self):
-        """Genera le código QR para apuntar a la id del repuesto
-        """
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=6,
-            border=1,
-        )
-        data_qr = {
+    def datos_qr(self):
+        return {
             'id': str(self.id),
             'tipo': str(self.tipo),
         }
-        qr.add_data(json.dumps(data_qr, ensure_ascii=False))
-        qr.make(fit=True)
-        img = qr.make_image()
-        buffer = BytesIO()
-        img.save(buffer)
-        filename = 'repuesto-{}.png'.format(self.id)
-        filebuffer = InMemoryUploadedFile(buffer, None, filename, 'image/png', buffer.getbuffer().nbytes, None)
-        self.codigo_qr.save(filename, filebuffer)
 
 
 class DispositivoRepuesto(models.Model):
@@ -1153,7 +1228,7 @@ class DesechoEmpresa(models.Model):
         return reverse_lazy('desechoempresa_update', kwargs={'pk': self.id})
 
 
-class DesechoSalida(models.Model):
+class DesechoSalida(CodigoQR, models.Model):
     fecha = models.DateField(default=timezone.now)
     empresa = models.ForeignKey(DesechoEmpresa, on_delete=models.PROTECT, related_name='salidas')
     precio_total = models.DecimalField(max_digits=12, decimal_places=2, default=0.0)   
@@ -1165,6 +1240,8 @@ class DesechoSalida(models.Model):
     codigo_qr = et_fields.ThumbnailerImageField(upload_to='qr_desecho', blank=True, null=True)
     url = models.TextField(null=True, blank=True)
 
+    PREFIJO_QR = 'Desecho'
+
     class Meta:
         verbose_name = "Salida de desecho"
         verbose_name_plural = "Salidas de desecho"
@@ -1174,34 +1251,12 @@ class DesechoSalida(models.Model):
 
     def get_absolute_url(self):
         return reverse_lazy('desechosalida_update', kwargs={'pk': self.id})
-    
-    def save(self, *args, **kwargs):
-        super(DesechoSalida, self).save(*args, **kwargs)
-        if not self.codigo_qr:
-            self.crear_qrcode()
-            super(DesechoSalida, self).save(*args, *kwargs)
-    
-    def crear_qrcode(self):
-        """Genera el código QR para apuntar al url de imagenes de desecho
-        """
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=6,
-            border=1,
-        )
-        data_qr = {
+
+    def datos_qr(self):
+        return {
             'tipo': 'desecho',
             'url': 'url'
         }
-        qr.add_data(json.dumps(data_qr, ensure_ascii=False))
-        qr.make(fit=True)
-        img = qr.make_image()
-        buffer = BytesIO()
-        img.save(buffer)
-        filename = 'Desecho-{}.png'.format(self.id)
-        filebuffer = InMemoryUploadedFile(buffer, None, filename, 'image/png', buffer.getbuffer().nbytes, None)
-        self.codigo_qr.save(filename, filebuffer)
 
 
 class DesechoDetalle(models.Model):
@@ -1428,7 +1483,7 @@ class PaqueteTipo(models.Model):
         return self.nombre
 
 
-class Paquete(models.Model):
+class Paquete(AporteExistencia, models.Model):
     """Un conjunto de :class:`Dispositivo` que se descargan del inventario.
     Por default, debería ser una computadora que contenga Mouse, Monitor, CPU, etc.
     Puede ser cualquier otro tipo de paquetes de dispositivos. Por ejemplo, un servidor
@@ -1458,6 +1513,11 @@ class Paquete(models.Model):
         return 'P{salida}-{indice}'.format(salida=self.salida, indice=self.indice)
         #return 'P{salida}'
 
+    def aporte_saldo(self):
+        if self.desactivado or not self.tipo_paquete_id or not self.tipo_paquete.tipo_dispositivo_id:
+            return None
+        return ((self.salida_id, self.tipo_paquete.tipo_dispositivo_id), 'empaquetados', self.cantidad)
+
     def aprobar(self, usuario):
         for paquete in self.asignacion.all():
             paquete.aprobado = True
@@ -1548,7 +1608,7 @@ class RevisionComentario(models.Model):
         return '{}'.format(self.comentario[15:])
 
 
-class SolicitudMovimiento(models.Model):
+class SolicitudMovimiento(AporteExistencia, models.Model):
     """Solicitud de un técnico de área para cambiar cierta cantidad de dispositivos de la etapa. Por ejemplo:
     Un técnico solicitua cambiar 5 monitores de 'Almacenaje en bodega' a 'Tránsito'"""
 
@@ -1584,6 +1644,9 @@ class SolicitudMovimiento(models.Model):
     observaciones = models.TextField(null=True, blank=True)
     no_salida = models.ForeignKey(SalidaInventario, on_delete=models.PROTECT, related_name='salida_inventario', null=True)
 
+    # Nombre del grupo de usuarios de bodega que recibe las notificaciones de las solicitudes
+    GRUPO_BODEGA = 'inv_bodega'
+
     class Meta:
         verbose_name = 'Solicitud de movimiento'
         verbose_name_plural = 'Solicitudes de movimiento'
@@ -1594,6 +1657,16 @@ class SolicitudMovimiento(models.Model):
     def get_absolute_url(self):
         return reverse_lazy('solicitudmovimiento_detail', kwargs={'pk': self.id})
 
+    @classmethod
+    def grupo_bodega(cls):
+        """Devuelve el grupo de usuarios de bodega, o `None` si no existe."""
+        return Group.objects.filter(name=cls.GRUPO_BODEGA).first()
+
+    def aporte_saldo(self):
+        if not self.recibida or not self.no_salida_id:
+            return None
+        return ((self.no_salida_id, self.tipo_dispositivo_id), 'bajas' if self.devolucion else 'altas', self.cantidad)
+
     def cambiar_etapa(self, lista_dispositivos, usuario):
         """Cambia el campo `etapa` de la lista de dispositivos recibida.
         En caso de que la solicitud ya haya sido terminada, no se puede volver a realizar esta operación.
@@ -1623,6 +1696,54 @@ class SolicitudMovimiento(models.Model):
             raise OperationalError('La solicitud ya fue terminada')
 
 
+class ExistenciaSalida(saldos.Saldo):
+    """Cantidad de cada :class:`DispositivoTipo` disponible para empaquetar en una :class:`SalidaInventario`.
+    `altas` y `bajas` suman las :class:`SolicitudMovimiento` recibidas y las devoluciones recibidas de la salida,
+    y `empaquetados` la cantidad de sus :class:`Paquete` activos. Se actualiza al guardar esos registros y se
+    puede reconstruir con el comando `reconciliar_existencias`.
+    """
+    salida = models.ForeignKey(SalidaInventario, on_delete=models.CASCADE, related_name='existencias')
+    tipo_dispositivo = models.ForeignKey(DispositivoTipo, on_delete=models.CASCADE, related_name='existencias_salida')
+    altas = models.IntegerField(default=0)
+    bajas = models.IntegerField(default=0)
+    empaquetados = models.IntegerField(default=0)
+
+    LLAVE = ('salida_id', 'tipo_dispositivo_id')
+    CAMPOS = ('altas', 'bajas', 'empaquetados')
+
+    class Meta:
+        verbose_name = 'Existencia de salida'
+        verbose_name_plural = 'Existencias de salidas'
+        unique_together = ('salida', 'tipo_dispositivo')
+
+    def __str__(self):
+        return '{} - {}: {}'.format(self.salida_id, self.tipo_dispositivo_id, self.existencia)
+
+    @property
+    def existencia(self):
+        return self.altas - self.bajas - self.empaquetados
+
+    @classmethod
+    def consultar(cls, salida, tipo_dispositivo):
+        """Devuelve la existencia de `tipo_dispositivo` en la `salida` (objetos o ids)."""
+        existencia = cls.objects.filter(salida=salida, tipo_dispositivo=tipo_dispositivo).first()
+        return existencia.existencia if existencia else 0
+
+    @classmethod
+    def consultas(cls, salidas):
+        solicitudes = SolicitudMovimiento.objects.filter(recibida=True, no_salida__isnull=False)
+        paquetes = Paquete.objects.filter(desactivado=False, tipo_paquete__tipo_dispositivo__isnull=False)
+        if salidas is not None:
+            solicitudes = solicitudes.filter(no_salida__in=salidas)
+            paquetes = paquetes.filter(salida__in=salidas)
+        consultas = (
+            ('altas', solicitudes.filter(devolucion=False), 'no_salida', 'tipo_dispositivo'),
+            ('bajas', solicitudes.filter(devolucion=True), 'no_salida', 'tipo_dispositivo'),
+            ('empaquetados', paquetes, 'salida', 'tipo_paquete__tipo_dispositivo'))
+        for campo, queryset, campo_salida, campo_tipo in consultas:
+            yield campo, queryset.order_by().values_list(campo_salida, campo_tipo).annotate(total=Sum('cantidad'))
+
+
 class CambioEtapa(models.Model):
     """Registra un movimiento de cambio de etapa en un :class:`Dispositivo`"""
     solicitud = models.ForeignKey(SolicitudMovimiento, on_delete=models.PROTECT, related_name='cambios')
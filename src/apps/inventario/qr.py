@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+# Generación de los códigos QR del inventario.
+# Las imágenes ya no se crean al guardar cada registro: el comando `generar_qr` busca los registros
+# sin `codigo_qr` y los genera por lotes. Mientras tanto, las vistas de impresión usan `qr_url`,
+# que crea la imagen al momento y la guarda en caché.
+import base64
+import json
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+import qrcode
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db.models import Case, CharField, Q, Value, When
+
+# Tiempo en segundos que se conserva en caché una imagen generada al momento
+CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def renderizar(datos):
+    """Genera la imagen PNG del código QR que contiene `datos` serializado como JSON.
+    Es una función de módulo para que pueda ejecutarse dentro de un `ProcessPoolExecutor`.
+
+    Returns:
+        bytes: el contenido del archivo PNG.
+    """
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        box_size=6,
+        border=1,
+    )
+    qr.add_data(json.dumps(datos, ensure_ascii=False))
+    qr.make(fit=True)
+    img = qr.make_image()
+    buffer = BytesIO()
+    img.save(buffer)
+    return buffer.getvalue()
+
+
+def guardar_archivo(objeto, contenido):
+    """Escribe la imagen en el storage del campo `codigo_qr` y la asigna al objeto sin guardarlo.
+    Se escribe directo al storage para no registrar la fuente en la caché de easy_thumbnails,
+    ya que se crea por sí sola al generar la primera miniatura.
+    """
+    campo = objeto._meta.get_field('codigo_qr')
+    objeto.codigo_qr = campo.storage.save(
+        campo.generate_filename(objeto, objeto.archivo_qr()),
+        ContentFile(contenido))
+    return objeto.codigo_qr.name
+
+
+def pendientes(queryset):
+    """Filtra los registros de `queryset` que aún no tienen imagen de código QR."""
+    return queryset.filter(Q(codigo_qr='') | Q(codigo_qr__isnull=True))
+
+
+def generar_pendientes(queryset, tamano_lote=200, procesos=1):
+    """Genera las imágenes de todos los registros de `queryset` que no tienen `codigo_qr`.
+    Las imágenes de cada lote se generan en paralelo con `procesos` procesos y se guardan
+    en la base de datos con un solo `UPDATE` por lote.
+
+    Returns:
+        int: la cantidad de códigos generados.
+    """
+    # En los modelos heredados de `Dispositivo` el campo pertenece a la tabla padre
+    modelo = queryset.model._meta.get_field('codigo_qr').model
+    queryset = pendientes(queryset).order_by('pk')
+    generados = 0
+    ultimo = None
+    executor = ProcessPoolExecutor(max_workers=procesos) if procesos > 1 else None
+    try:
+        while True:
+            lote = queryset if ultimo is None else queryset.filter(pk__gt=ultimo)
+            objetos = list(lote[:tamano_lote])
+            if not objetos:
+                break
+            datos = [objeto.datos_qr() for objeto in objetos]
+            imagenes = executor.map(renderizar, datos) if executor else map(renderizar, datos)
+            nombres = [
+                When(pk=objeto.pk, then=Value(guardar_archivo(objeto, imagen)))
+                for objeto, imagen in zip(objetos, imagenes)]
+            modelo.objects.filter(pk__in=[objeto.pk for objeto in objetos]).update(
+                codigo_qr=Case(*nombres, output_field=CharField()))
+            generados += len(objetos)
+            ultimo = objetos[-1].pk
+    finally:
+        if executor:
+            executor.shutdown()
+    return generados
+
+
+def qr_url(objeto):
+    """URL de la imagen del código QR de `objeto`.
+    Si la imagen aún no ha sido generada, se crea al momento y se devuelve como `data:` URI,
+    guardándola en caché para las siguientes impresiones.
+    """
+    if objeto.codigo_qr:
+        return objeto.codigo_qr.url
+    llave = 'qr-{}-{}'.format(objeto._meta.label_lower, objeto.pk)
+    url = cache.get(llave)
+    if url is None:
+        contenido = base64.b64encode(renderizar(objeto.datos_qr())).decode('ascii')
+        url = 'data:image/png;base64,{}'.format(contenido)
+        cache.set(llave, url, CACHE_TIMEOUT)
+    return url
@@ -1,10 +1,11 @@
 from rest_framework import serializers
 from django.urls import reverse_lazy
 from apps.inventario import models as inv_m
+from apps.main.serializers import DynamicFieldsModelSerializer
 from .repuesto import RepuestoInventarioSerializer
 
 
-class DispositivoSerializer(serializers.ModelSerializer):
+class DispositivoSerializer(DynamicFieldsModelSerializer):
     """Serializer para generar los datos que se consumiran en la app de la :class:`Dispositivo`
     """
     tipo = serializers.StringRelatedField(allow_null=True)
@@ -35,11 +36,10 @@ class DispositivoSerializer(serializers.ModelSerializer):
             'fecha_desecho']
 
     def get_fecha_desecho(self, obj):
-         fecha = inv_m.DesechoComentario.objects.filter(dispositivo=obj.id).last()        
-         if fecha is None:
+        comentarios = obj.desecho_rechazado.all()
+        if len(comentarios) == 0:
             return ""
-         else:        
-            return fecha.fecha_revision.date()
+        return max(comentarios, key=lambda comentario: comentario.id).fecha_revision.date()
 
 
 class TarimaSerializer(serializers.ModelSerializer):
@@ -67,8 +67,10 @@ class PaqueteSerializer(serializers.ModelSerializer):
             )
 
     def get_cantidad_dispositivos(self, obj, pk=None):
-        numero_dispositivos = inv_m.DispositivoPaquete.objects.filter(paquete=obj).count()
-        return numero_dispositivos
+        # `PaquetesViewSet` calcula la cantidad en su consulta
+        if hasattr(obj, 'cantidad_asignaciones'):
+            return obj.cantidad_asignaciones
+        return obj.asignacion.count()
 
     def get_url_detail(self, obj):
         return reverse_lazy('dispositivo_asignados', kwargs={'pk': obj.id})
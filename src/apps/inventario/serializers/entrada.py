@@ -1,9 +1,7 @@
 from rest_framework import serializers
 from django.urls import reverse_lazy
-from django.core.exceptions import ObjectDoesNotExist
 
 from apps.inventario import models as inv_m
-from apps.kardex import models as kax_m
 
 
 class EntradaDetalleSerializer(serializers.ModelSerializer):
@@ -28,7 +26,7 @@ class EntradaDetalleSerializer(serializers.ModelSerializer):
     es_kardex = serializers.StringRelatedField(source='tipo_dispositivo.kardex')
     url_kardex = serializers.SerializerMethodField(read_only=True)
     # Desecho
-    existencia_desecho = serializers.IntegerField(read_only=True)    
+    existencia_desecho = serializers.IntegerField(read_only=True)
     fecha_desecho = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
@@ -77,37 +75,32 @@ class EntradaDetalleSerializer(serializers.ModelSerializer):
         return reverse_lazy('entradadetalle_update', kwargs={'pk': object.id})
 
     def get_dispositivo_qr(self, object):
-        return reverse_lazy('imprimir_qr', kwargs={'pk': object.entrada, 'detalle': object.id})
+        return reverse_lazy('imprimir_qr', kwargs={'pk': object.entrada_id, 'detalle': object.id})
 
     def get_repuesto_qr(self, object):
-        return reverse_lazy('imprimir_repuesto', kwargs={'pk': object.entrada, 'detalle': object.id})
+        return reverse_lazy('imprimir_repuesto', kwargs={'pk': object.entrada_id, 'detalle': object.id})
 
     def get_dispositivo_list(self, object):
-        return reverse_lazy('detalles_dispositivos', kwargs={'pk': object.entrada, 'detalle': object.id})
+        return reverse_lazy('detalles_dispositivos', kwargs={'pk': object.entrada_id, 'detalle': object.id})
 
     def get_repuesto_list(self, object):
-        return reverse_lazy('detalles_repuesto', kwargs={'pk': object.entrada, 'detalle': object.id})
+        return reverse_lazy('detalles_repuesto', kwargs={'pk': object.entrada_id, 'detalle': object.id})
 
     def get_url_kardex(self, object):
-        try:
-            detalle_kardex = kax_m.Entrada.objects.get(inventario_entrada=object.entrada)
-            if(object.tipo_dispositivo.usa_triage is False):
-                return reverse_lazy('kardex_entrada_detail', kwargs={'pk': detalle_kardex.id})
-            else:
-                return ""
-        except ObjectDoesNotExist as e:
-            print("Aun no se a creado el detalle")
-
-    def get_existencia_desecho(self, obj):
-        inventario_desecho = obj.existencia_desecho.all()
-        return inventario_desecho
-    
+        # `EntradaDetalleViewSet` precarga las entradas de kardex de cada entrada
+        entradas_kardex = object.entrada.inventario.all()
+        if len(entradas_kardex) == 0:
+            return None
+        if(object.tipo_dispositivo.usa_triage is False):
+            return reverse_lazy('kardex_entrada_detail', kwargs={'pk': entradas_kardex[0].id})
+        else:
+            return ""
+
     def get_fecha_desecho(self, obj):
-         fecha = inv_m.DesechoComentario.objects.filter(entrada_detalle=obj.id).last()        
-         if fecha is None:
+        comentarios = obj.detalle_entrada_rechazar.all()
+        if len(comentarios) == 0:
             return ""
-         else:        
-            return fecha.fecha_revision.date()
+        return max(comentarios, key=lambda comentario: comentario.id).fecha_revision.date()
 
 
 
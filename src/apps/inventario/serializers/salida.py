@@ -1,9 +1,10 @@
 from rest_framework import serializers
 from django.urls import reverse_lazy
 from apps.inventario import models as inv_m
+from apps.main.serializers import DynamicFieldsModelSerializer
 
 
-class SalidaInventarioSerializer(serializers.ModelSerializer):
+class SalidaInventarioSerializer(DynamicFieldsModelSerializer):
     """Serializer para la :class: `SalidaInventario`"""
     tipo_salida = serializers.StringRelatedField()
     beneficiario = serializers.StringRelatedField()
@@ -1,11 +1,8 @@
-from django.db import IntegrityError
-from django.db.models.signals import pre_save, post_save
+from django.db.models.signals import pre_save, post_save, post_delete
 from datetime import datetime
-from django.core.mail import send_mail
-from django.contrib.auth.models import User
 from apps.inventario import models as inventario_m
-from django.conf import settings
-from django.template import loader
+from apps.inventario import catalogos
+from apps.main import notificaciones, saldos
 
 # Para dispositivos
 
@@ -13,17 +10,11 @@ def calcular_triage(sender, instance, **kwargs):
     """Se encarga de calcular el triage para los :class:`Dispositivo`.
     El triage sigue el formato SLUG-indice de cada modelo. Por ejemplo,
     el Monitor con `indice` 854 tiene un triage `M-854`.
+    El `indice` se reserva desde :class:`SecuenciaTriage` para evitar duplicados.
     """
     if not instance.pk:
-        if sender.objects.all().count() == 0:
-            instance.indice = 1
-        else:
-            ultimo = sender.objects.only('indice').latest('indice')
-            instance.indice = ultimo.indice + 1
-        try:
-            instance.triage = '{}-{}'.format(instance.tipo.slug, instance.indice)
-        except IntegrityError:
-            instance.triage = '{}-{}'.format(instance.tipo.slug, instance.indice + 1)
+        instance.indice = inventario_m.SecuenciaTriage.reservar(sender)[0]
+        instance.triage = '{}-{}'.format(instance.tipo.slug, instance.indice)
 
 
 for dispositivo in inventario_m.Dispositivo.__subclasses__():
@@ -117,7 +108,7 @@ def crear_bitacora(sender, instance, created, **kwargs):
         nueva_bitacora.save()
 
         # Armar mensaje a enviar por correo electrónico
-        usuario = User.objects.get(username=instance.creada_por)
+        usuario = instance.creada_por
         usuario_completo = str(usuario.first_name) +" "+ str(usuario.last_name)
         devolucion = False
         desecho = False
@@ -127,7 +118,10 @@ def crear_bitacora(sender, instance, created, **kwargs):
             if instance.desecho:
                 desecho = True
 
-        html_message = loader.render_to_string(
+        motivo = "SUNI - Solicitud Creada: "+ str(instance.id)
+        # Enviar correo a los usuarios de bodega
+        notificaciones.encolar(
+            motivo,
             'inventario/email/email_solicitud.html',
             {
                 'solicitud_id': str(instance.id),
@@ -140,23 +134,8 @@ def crear_bitacora(sender, instance, created, **kwargs):
                 'estado': 'Creada',
                 'usuario': usuario_completo,
                 'url': "https://suni.funsepa.org" + str(instance.get_absolute_url()),
-            })
-
-        usuarios_bodega = User.objects.filter(groups=21)
-        lista_enviar_correos=[]
-        for lista_correos  in usuarios_bodega:            
-            lista_enviar_correos.append(lista_correos.email)
-
-        motivo = "SUNI - Solicitud Creada: "+ str(instance.id)
-        # Enviar Correo
-        """send_mail(
-            motivo,
-            'mensaje',
-            settings.EMAIL_HOST_USER,
-            lista_enviar_correos,
-            fail_silently=True,
-            html_message = html_message
-        )"""
+            },
+            grupo=inventario_m.SolicitudMovimiento.grupo_bodega())
 
     else:
         if instance.rechazar is  False:
@@ -173,25 +152,22 @@ def crear_bitacora(sender, instance, created, **kwargs):
                 # Armar información del correo
 
                 # Obtener lista de Destinatarios
-                lista_enviar_correos=[]
-                usuario_completo = ''
+                lista_enviar_correos = []
+                grupo = None
                 if instance.devolucion:
-                    usuario = User.objects.get(username=instance.creada_por)
-                    usuario_completo = str(usuario.first_name) +" "+ str(usuario.last_name)
-                    usuarios_bodega = User.objects.filter(groups=21)
-                    for lista_correos  in usuarios_bodega:            
-                        lista_enviar_correos.append(lista_correos.email)
+                    usuario = instance.creada_por
+                    grupo = inventario_m.SolicitudMovimiento.grupo_bodega()
                 else:
-                    usuario = User.objects.get(username=instance.autorizada_por)
-                    usuario_completo = str(usuario.first_name) +" "+ str(usuario.last_name)
+                    usuario = instance.autorizada_por
                     lista_enviar_correos.append(instance.creada_por.email)
-              
-                dispositivos = inventario_m.CambioEtapa.objects.filter(solicitud=instance.id)
-                lista_dispositivos=[]
-                for nuevo_dipositivo in dispositivos:
-                    lista_dispositivos.append(nuevo_dipositivo.dispositivo.triage)
+                usuario_completo = str(usuario.first_name) +" "+ str(usuario.last_name)
+
+                lista_dispositivos = list(inventario_m.CambioEtapa.objects.filter(
+                    solicitud=instance.id).values_list('dispositivo__triage', flat=True))
 
-                html_message = loader.render_to_string(
+                motivo = "SUNI - Dispositivos Entregados: "+ str(instance.id)
+                notificaciones.encolar(
+                    motivo,
                     'inventario/email/email_solicitud.html',
                     {
                     'solicitud_id': str(instance.id),
@@ -201,17 +177,21 @@ def crear_bitacora(sender, instance, created, **kwargs):
                     'estado': 'Entregada',
                     'usuario': usuario_completo,
                     'url': "https://suni.funsepa.org" + str(instance.get_absolute_url()),
-                    })
-
-                motivo = "SUNI - Dispositivos Entregados: "+ str(instance.id)
-                # Enviar Correo
-                """send_mail(
-                    motivo,
-                    'mensaje',
-                    settings.EMAIL_HOST_USER,
-                    lista_enviar_correos,
-                    fail_silently=True,
-                    html_message = html_message
-                )"""
+                    },
+                    destinatarios=lista_enviar_correos,
+                    grupo=grupo)
 
 post_save.connect(crear_bitacora, sender=inventario_m.SolicitudMovimiento)
+
+
+# Para existencias de salidas
+
+post_delete.connect(saldos.restar_aporte, sender=inventario_m.Paquete)
+post_delete.connect(saldos.restar_aporte, sender=inventario_m.SolicitudMovimiento)
+
+
+# Para catálogos
+
+for catalogo in catalogos.CATALOGOS.values():
+    post_save.connect(catalogos.invalidar, sender=catalogo)
+    post_delete.connect(catalogos.invalidar, sender=catalogo)
@@ -1,9 +1,16 @@
 from django import template
 from django.contrib.auth.models import Group 
 
+from apps.inventario import qr
+
 register = template.Library()
 
 @register.filter(name='has_group')
 def has_group(user, group_name): 
     group = Group.objects.get(name=group_name) 
-    return True if group in user.groups.all() else False
\ No newline at end of file
+    return True if group in user.groups.all() else False
+
+@register.filter(name='qr_url')
+def qr_url(objeto):
+    """URL del código QR de `objeto`; si aún no ha sido generado se crea al momento."""
+    return qr.qr_url(objeto)
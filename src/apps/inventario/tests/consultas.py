@@ -0,0 +1,38 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+
+class ConsultasConstantesMixin(object):
+    """Funciones de ayuda para los `TestCase` que revisan que un listado de la API no haga una consulta
+    por cada registro. Requiere el atributo `usuario` con el que se autentican las solicitudes.
+    """
+
+    def listar(self, viewset, **parametros):
+        """Obtiene el listado de `viewset` y devuelve la respuesta y la cantidad de consultas realizadas."""
+        request = APIRequestFactory().get('/', parametros)
+        force_authenticate(request, user=self.usuario)
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = viewset.as_view({'get': 'list'})(request)
+            respuesta.render()
+        self.assertEqual(respuesta.status_code, 200)
+        return respuesta, len(consultas)
+
+    def assertConsultasConstantes(self, viewset, crear, cantidades=(2, 6), **parametros):
+        """Verifica que el listado de `viewset` haga las mismas consultas sin importar cuántos registros
+        devuelva. `crear(cantidad)` debe agregar `cantidad` registros nuevos al listado.
+        """
+        # La primera solicitud llena cachés como la de los tipos de contenido
+        self.listar(viewset, **parametros)
+        totales = []
+        creados = 0
+        for cantidad in cantidades:
+            crear(cantidad - creados)
+            creados = cantidad
+            respuesta, total = self.listar(viewset, **parametros)
+            self.assertEqual(len(respuesta.data), cantidad)
+            totales.append(total)
+        self.assertEqual(
+            len(set(totales)), 1,
+            'El listado de {} hizo {} consultas para {} registros'.format(viewset.__name__, totales, cantidades))
+        return totales[0]
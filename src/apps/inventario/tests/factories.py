@@ -0,0 +1,68 @@
+import factory
+from django.utils import timezone
+from apps.crm import models as crm_m
+from apps.inventario import models
+from apps.users.tests.factories import UserFactory
+
+
+class DonanteTipoFactory(factory.django.DjangoModelFactory):
+    """Fábrica para :class:'DonanteTipo'"""
+    class Meta:
+        model = crm_m.DonanteTipo
+
+    tipo = factory.Sequence(lambda n: "Tipo %03d" % n)
+
+
+class DonanteFactory(factory.django.DjangoModelFactory):
+    """Fábrica para :class:'Donante'"""
+    class Meta:
+        model = crm_m.Donante
+
+    nombre = factory.Sequence(lambda n: "Donante %03d" % n)
+    tipo_donante = factory.SubFactory(DonanteTipoFactory)
+
+
+class EntradaTipoFactory(factory.django.DjangoModelFactory):
+    """Fábrica para :class:'EntradaTipo'"""
+    class Meta:
+        model = models.EntradaTipo
+
+    nombre = factory.Sequence(lambda n: "Tipo %03d" % n)
+
+
+class EntradaFactory(factory.django.DjangoModelFactory):
+    """Fábrica para :class:'Entrada'"""
+    class Meta:
+        model = models.Entrada
+
+    tipo = factory.SubFactory(EntradaTipoFactory)
+    fecha = factory.LazyFunction(lambda: timezone.now().date())
+    creada_por = factory.SubFactory(UserFactory)
+    recibida_por = factory.SelfAttribute('creada_por')
+    proveedor = factory.SubFactory(DonanteFactory)
+
+
+class DispositivoTipoFactory(factory.django.DjangoModelFactory):
+    """Fábrica para :class:'DispositivoTipo'. Por defecto crea el tipo de los :class:'Monitor'"""
+    class Meta:
+        model = models.DispositivoTipo
+        django_get_or_create = ('slug',)
+
+    tipo = 'MONITOR'
+    slug = models.Monitor.SLUG_TIPO
+    usa_triage = True
+    conta = True
+
+
+class EntradaDetalleFactory(factory.django.DjangoModelFactory):
+    """Fábrica para :class:'EntradaDetalle'"""
+    class Meta:
+        model = models.EntradaDetalle
+
+    entrada = factory.SubFactory(EntradaFactory)
+    tipo_dispositivo = factory.SubFactory(DispositivoTipoFactory)
+    util = 10
+    total = factory.SelfAttribute('util')
+    descripcion = factory.Sequence(lambda n: "Detalle %03d" % n)
+    creado_por = factory.SelfAttribute('entrada.creada_por')
+    precio_unitario = 100
@@ -0,0 +1,102 @@
+import json
+from decimal import Decimal
+
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory
+
+from apps.inventario import models as inv_m
+from apps.inventario import transacciones
+from apps.inventario.api_views.dispositivo import DispositivosPaquetesViewSet
+from apps.inventario.tests import factories
+
+
+class ActualizarDispositivosTestCase(TestCase):
+    """Pruebas para la actualización por lotes de dispositivos desde el grid"""
+
+    fixtures = ['dispositivo_estado', 'dispositivo_etapa']
+
+    def setUp(self):
+        self.entrada = factories.EntradaFactory()
+        self.tipo_monitor = factories.DispositivoTipoFactory()
+        self.monitores = [
+            inv_m.Monitor.objects.create(tipo=self.tipo_monitor, entrada=self.entrada) for _ in range(20)]
+        self.marca = inv_m.DispositivoMarca.objects.create(marca='Dell')
+        self.medida = inv_m.MonitorTipo.objects.create(tipo='LCD')
+
+    def actualizar(self, tipo, filas):
+        request = APIRequestFactory().post('/', {'datos_actualizar': json.dumps(filas), 'dispositivo': tipo})
+        return DispositivosPaquetesViewSet.as_view({'post': 'actualizar_dispositivos'})(request)
+
+    def filas_monitor(self, monitores):
+        return [
+            {
+                'triage': monitor.triage,
+                'marca': self.marca.id,
+                'modelo': 'P{}'.format(monitor.indice),
+                'serie': 'S{}'.format(monitor.indice),
+                'pulgadas': '19.5',
+                'tipo_monitor': self.medida.id,
+                'tarima': '',
+            }
+            for monitor in monitores
+        ]
+
+    def test_actualiza_lote(self):
+        respuesta = self.actualizar('MONITOR', self.filas_monitor(self.monitores))
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.data['actualizados'], 20)
+        monitor = inv_m.Monitor.objects.get(pk=self.monitores[4].pk)
+        self.assertEqual(monitor.marca, self.marca)
+        self.assertEqual(monitor.modelo, 'P5')
+        self.assertEqual(monitor.serie, 'S5')
+        self.assertEqual(monitor.pulgadas, Decimal('19.5'))
+        self.assertEqual(monitor.tipo_monitor, self.medida)
+        self.assertIsNone(monitor.tarima)
+
+    def test_consultas_constantes(self):
+        # Dispositivos, una consulta por cada modelo relacionado y un UPDATE por tabla dentro de la transacción
+        with self.assertNumQueries(7):
+            transacciones.actualizar_dispositivos(inv_m.Monitor, self.filas_monitor(self.monitores[:3]))
+        with self.assertNumQueries(7):
+            transacciones.actualizar_dispositivos(inv_m.Monitor, self.filas_monitor(self.monitores))
+
+    def test_errores_por_fila(self):
+        filas = self.filas_monitor(self.monitores[:4])
+        filas[1]['marca'] = 999
+        filas[2]['pulgadas'] = 'grande'
+        filas[3]['triage'] = 'M-999'
+        respuesta = self.actualizar('MONITOR', filas)
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertEqual([error['fila'] for error in respuesta.data['errores']], [1, 2, 3])
+        self.assertIn('marca', respuesta.data['errores'][0]['errores'])
+        self.assertIn('pulgadas', respuesta.data['errores'][1]['errores'])
+        self.assertIn('triage', respuesta.data['errores'][2]['errores'])
+        # Ninguna fila se guarda si alguna tiene errores
+        self.assertFalse(inv_m.Monitor.objects.filter(marca=self.marca).exists())
+
+    def test_cpu(self):
+        tipo_hdd = factories.DispositivoTipoFactory(tipo='HDD', slug=inv_m.HDD.SLUG_TIPO)
+        tipo_cpu = factories.DispositivoTipoFactory(tipo='CPU', slug=inv_m.CPU.SLUG_TIPO)
+        disco = inv_m.HDD.objects.create(tipo=tipo_hdd, entrada=self.entrada)
+        cpu = inv_m.CPU.objects.create(tipo=tipo_cpu, entrada=self.entrada, servidor=True)
+        respuesta = self.actualizar('CPU', [{
+            'triage': cpu.triage,
+            'disco_duro__triage': disco.triage,
+            'ram': 4,
+            'servidor': 'false',
+            'all_in_one': True,
+            'caja': 'no aplica',
+        }])
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertTrue(inv_m.CPU.objects.filter(pk=cpu.pk, disco_duro=disco).exists())
+        cpu.refresh_from_db()
+        self.assertEqual(cpu.ram, 4)
+        self.assertFalse(cpu.servidor)
+        self.assertTrue(cpu.all_in_one)
+
+    def test_tipo_sin_modelo(self):
+        respuesta = self.actualizar('OTRO', [{'triage': self.monitores[0].triage, 'serie': 'X1', 'modelo': 'no'}])
+        self.assertEqual(respuesta.status_code, 200)
+        monitor = inv_m.Monitor.objects.get(pk=self.monitores[0].pk)
+        self.assertEqual(monitor.serie, 'X1')
+        self.assertIsNone(monitor.modelo)
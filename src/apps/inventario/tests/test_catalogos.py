@@ -0,0 +1,84 @@
+import json
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.inventario import catalogos
+from apps.inventario import models as inv_m
+from apps.inventario.api_views.dispositivo import DispositivoViewSet
+from apps.inventario.tests import factories
+
+
+class CatalogosTestCase(TestCase):
+    """Pruebas para la caché de catálogos y el payload de `grid_paquetes`"""
+
+    fixtures = ['dispositivo_estado', 'dispositivo_etapa']
+
+    def setUp(self):
+        cache.clear()
+        self.usuario = factories.UserFactory()
+        self.marca = inv_m.DispositivoMarca.objects.create(marca='Dell')
+        inv_m.MonitorTipo.objects.create(tipo='LCD')
+        entrada = factories.EntradaFactory()
+        tipo_monitor = factories.DispositivoTipoFactory()
+        salida = inv_m.SalidaInventario.objects.create(
+            tipo_salida=inv_m.SalidaTipo.objects.create(nombre='Entrega', slug='E'),
+            creada_por=self.usuario)
+        self.paquete = inv_m.Paquete.objects.create(
+            salida=salida,
+            creado_por=self.usuario,
+            indice=1,
+            tipo_paquete=inv_m.PaqueteTipo.objects.create(nombre='MONITOR', tipo_dispositivo=tipo_monitor))
+        for _ in range(5):
+            inv_m.DispositivoPaquete.objects.create(
+                dispositivo=inv_m.Monitor.objects.create(tipo=tipo_monitor, entrada=entrada, marca=self.marca),
+                paquete=self.paquete,
+                asignado_por=self.usuario)
+        inv_m.Monitor.objects.create(tipo=tipo_monitor, entrada=entrada)
+
+    def grid(self, paquete):
+        request = APIRequestFactory().post('/', {'paquete': paquete})
+        force_authenticate(request, user=self.usuario)
+        return DispositivoViewSet.as_view({'post': 'grid_paquetes'})(request)
+
+    def consultar(self, nombres='', **headers):
+        request = APIRequestFactory().get('/', {'nombres': nombres}, **headers)
+        force_authenticate(request, user=self.usuario)
+        return DispositivoViewSet.as_view({'get': 'catalogos'})(request)
+
+    def test_grid_paquetes(self):
+        catalogos.version()
+        # El paquete con su tipo y los dispositivos, sin consultar los catálogos
+        with self.assertNumQueries(2):
+            respuesta = self.grid(self.paquete.id)
+        datos = json.loads(respuesta.content.decode('utf-8'))
+        self.assertEqual(datos['dispositivo'], 'MONITOR')
+        self.assertEqual(len(datos['data']), 5)
+        self.assertEqual(datos['data'][0]['marca'], self.marca.id)
+        self.assertEqual(datos['catalogos'], {'marcas': 'marcas', 'tipo': 'tipos_monitor', 'puertos': 'puertos'})
+        self.assertEqual(datos['version_catalogos'], catalogos.version())
+        self.assertEqual(self.grid(0).status_code, 404)
+
+    def test_etag(self):
+        respuesta = self.consultar('marcas,tipos_monitor')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.data['catalogos']['marcas'][0]['marca'], 'Dell')
+        etag = respuesta['ETag']
+        with self.assertNumQueries(0):
+            respuesta = self.consultar('tipos_monitor,marcas', HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(respuesta.status_code, 304)
+            self.assertEqual(self.consultar('marcas').status_code, 200)
+
+        # Cualquier cambio en un catálogo invalida la versión anterior
+        inv_m.DispositivoMarca.objects.create(marca='HP')
+        respuesta = self.consultar('marcas,tipos_monitor', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertNotEqual(respuesta['ETag'], etag)
+        self.assertEqual(len(respuesta.data['catalogos']['marcas']), 2)
+        inv_m.DispositivoMarca.objects.get(marca='HP').delete()
+        self.assertEqual(len(self.consultar('marcas').data['catalogos']['marcas']), 1)
+
+    def test_catalogo_invalido(self):
+        self.assertEqual(self.consultar('marcas,otro').status_code, 400)
+        self.assertEqual(len(self.consultar().data['catalogos']), len(catalogos.CATALOGOS))
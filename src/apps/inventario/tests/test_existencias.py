@@ -0,0 +1,120 @@
+from django.contrib.auth.models import Group
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.utils.six import StringIO
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.inventario import models as inv_m
+from apps.inventario.api_views.salida import SalidaInventarioViewSet
+from apps.inventario.tests import factories
+from apps.main.models import Notificacion
+
+
+class ExistenciaSalidaTestCase(TestCase):
+    """Pruebas para las existencias por salida que usan `stock_paquete` y `stock_kardex`"""
+
+    fixtures = ['dispositivo_estado', 'dispositivo_etapa']
+
+    def setUp(self):
+        self.usuario = factories.UserFactory()
+        for accion, estado in enumerate(('Solicitud Creada', 'Dispositivos Entregados', 'Dispositivos Recibidos'), 1):
+            inv_m.AccionBitacora.objects.create(id=accion, estado=estado)
+        Group.objects.create(name=inv_m.SolicitudMovimiento.GRUPO_BODEGA)
+        self.tipo_monitor = factories.DispositivoTipoFactory()
+        self.tipo_mouse = factories.DispositivoTipoFactory(tipo='MOUSE', slug=inv_m.Mouse.SLUG_TIPO)
+        self.salida = inv_m.SalidaInventario.objects.create(
+            tipo_salida=inv_m.SalidaTipo.objects.create(nombre='Entrega', slug='E'),
+            creada_por=self.usuario)
+        self.paquete_monitor = inv_m.PaqueteTipo.objects.create(nombre='MONITOR', tipo_dispositivo=self.tipo_monitor)
+        self.paquete_mouse = inv_m.PaqueteTipo.objects.create(nombre='MOUSE', tipo_dispositivo=self.tipo_mouse)
+        self.paquete_otro = inv_m.PaqueteTipo.objects.create(nombre='OTRO')
+
+    def solicitud(self, tipo, cantidad, devolucion=False, recibida=True):
+        etapa = inv_m.DispositivoEtapa.objects.get(id=inv_m.DispositivoEtapa.AB)
+        return inv_m.SolicitudMovimiento.objects.create(
+            etapa_inicial=etapa,
+            etapa_final=etapa,
+            creada_por=self.usuario,
+            autorizada_por=self.usuario,
+            tipo_dispositivo=tipo,
+            cantidad=cantidad,
+            devolucion=devolucion,
+            recibida=recibida,
+            no_salida=self.salida)
+
+    def paquete(self, tipo_paquete, cantidad, indice):
+        return inv_m.Paquete.objects.create(
+            salida=self.salida,
+            creado_por=self.usuario,
+            indice=indice,
+            cantidad=cantidad,
+            tipo_paquete=tipo_paquete)
+
+    def consultar(self, accion, **datos):
+        datos['salida'] = self.salida.id
+        request = APIRequestFactory().post('/', datos)
+        force_authenticate(request, user=self.usuario)
+        return SalidaInventarioViewSet.as_view({'post': accion})(request, pk=self.salida.id)
+
+    def existencia(self, tipo):
+        return inv_m.ExistenciaSalida.consultar(self.salida, tipo)
+
+    def test_movimientos(self):
+        pendiente = self.solicitud(self.tipo_monitor, 10, recibida=False)
+        self.assertEqual(self.existencia(self.tipo_monitor), 0)
+        # La notificación de la solicitud se envía al grupo de bodega, buscado por su nombre
+        self.assertEqual(
+            Notificacion.objects.get().grupo, Group.objects.get(name=inv_m.SolicitudMovimiento.GRUPO_BODEGA))
+        pendiente.recibida = True
+        pendiente.save()
+        self.solicitud(self.tipo_monitor, 2, devolucion=True)
+        self.assertEqual(self.existencia(self.tipo_monitor), 8)
+
+        paquete = self.paquete(self.paquete_monitor, 3, 1)
+        self.assertEqual(self.existencia(self.tipo_monitor), 5)
+        paquete.cantidad = 4
+        paquete.save()
+        self.assertEqual(self.existencia(self.tipo_monitor), 4)
+        paquete.desactivado = True
+        paquete.save()
+        self.assertEqual(self.existencia(self.tipo_monitor), 8)
+
+        # Los paquetes sin tipo de dispositivo no modifican ninguna existencia
+        self.paquete(self.paquete_otro, 5, 2)
+        self.paquete(self.paquete_mouse, 1, 3).delete()
+        self.assertEqual(self.existencia(self.tipo_mouse), 0)
+        self.assertEqual(inv_m.ExistenciaSalida.reconstruir(), [])
+
+    def test_stock(self):
+        self.solicitud(self.tipo_monitor, 10)
+        self.solicitud(self.tipo_mouse, 4)
+        self.paquete(self.paquete_monitor, 3, 1)
+        # Las existencias de la salida y los tipos de paquete
+        with self.assertNumQueries(2):
+            respuesta = self.consultar('stock_paquete')
+        self.assertEqual(
+            {tipo['nombre']: tipo['existencia'] for tipo in respuesta.data},
+            {'MONITOR': 7, 'MOUSE': 4, 'OTRO': 0})
+        respuesta = self.consultar('stock_kardex', tipo_dispositivo=self.paquete_mouse.id)
+        self.assertEqual(respuesta.data['mensaje'], 4)
+        respuesta = self.consultar('stock_kardex', tipo_dispositivo=self.paquete_otro.id)
+        self.assertEqual(respuesta.status_code, 400)
+
+    def test_reconciliar(self):
+        self.solicitud(self.tipo_monitor, 10)
+        self.paquete(self.paquete_monitor, 3, 1)
+        existencia = inv_m.ExistenciaSalida.objects.get(tipo_dispositivo=self.tipo_monitor)
+        inv_m.ExistenciaSalida.objects.filter(pk=existencia.pk).update(altas=6, empaquetados=0)
+
+        with self.assertRaises(CommandError):
+            call_command('reconciliar_existencias', '--verificar', stdout=StringIO())
+        self.assertEqual(self.existencia(self.tipo_monitor), 6)
+
+        salida = StringIO()
+        call_command('reconciliar_existencias', str(self.salida.id), stdout=salida)
+        self.assertIn('2 diferencias corregidas', salida.getvalue())
+        self.assertEqual(self.existencia(self.tipo_monitor), 7)
+        # Las existencias se corrigen en su lugar, sin volver a crearlas
+        self.assertEqual(inv_m.ExistenciaSalida.objects.get(tipo_dispositivo=self.tipo_monitor).pk, existencia.pk)
+        call_command('reconciliar_existencias', '--verificar', stdout=StringIO())
@@ -0,0 +1,69 @@
+from django.db.utils import OperationalError
+from django.test import TestCase
+
+from apps.inventario import models as inv_m
+from apps.inventario.tests import factories
+from apps.inventario.views.salida import dispositivos_paquetes
+
+
+class DispositivoPolimorficoTestCase(TestCase):
+    """Pruebas para obtener los :class:`Dispositivo` como instancias de su modelo hijo"""
+
+    fixtures = ['dispositivo_estado', 'dispositivo_etapa']
+
+    def setUp(self):
+        self.entrada = factories.EntradaFactory()
+        self.tipo_monitor = factories.DispositivoTipoFactory()
+        self.tipo_cpu = factories.DispositivoTipoFactory(tipo='CPU', slug=inv_m.CPU.SLUG_TIPO)
+        self.dispositivos = []
+        for indice in range(6):
+            if indice % 2:
+                dispositivo = inv_m.CPU.objects.create(tipo=self.tipo_cpu, entrada=self.entrada, servidor=indice == 3)
+            else:
+                dispositivo = inv_m.Monitor.objects.create(tipo=self.tipo_monitor, entrada=self.entrada)
+            self.dispositivos.append(dispositivo)
+
+    def test_obtener_modelo_hijo(self):
+        self.assertEqual(inv_m.Dispositivo.obtener_modelo_hijo(self.tipo_cpu), inv_m.CPU)
+        self.assertEqual(inv_m.Dispositivo.obtener_modelo_hijo('M'), inv_m.Monitor)
+        self.assertEqual(len(inv_m.Dispositivo.modelos_hijos()), len(inv_m.Dispositivo.__subclasses__()))
+        with self.assertRaises(OperationalError):
+            inv_m.Dispositivo.obtener_modelo_hijo('X')
+
+    def test_url_sin_consultas(self):
+        dispositivos = list(inv_m.Dispositivo.objects.order_by('triage'))
+        with self.assertNumQueries(0):
+            urls = [str(dispositivo.get_absolute_url()) for dispositivo in dispositivos]
+        self.assertEqual(
+            urls,
+            [str(hijo.get_absolute_url()) for hijo in sorted(self.dispositivos, key=lambda d: d.triage)])
+
+    def test_cast(self):
+        dispositivo = inv_m.Dispositivo.objects.get(pk=self.dispositivos[1].pk)
+        with self.assertNumQueries(1):
+            cpu = dispositivo.cast()
+        self.assertIsInstance(cpu, inv_m.CPU)
+        self.assertIs(cpu.cast(), cpu)
+
+    def test_como_hijos(self):
+        queryset = inv_m.Dispositivo.objects.order_by('-triage')
+        # Los ids y una consulta por cada modelo hijo
+        with self.assertNumQueries(3):
+            hijos = queryset.como_hijos('disco_duro', 'tipo_monitor')
+        self.assertEqual([hijo.pk for hijo in hijos], list(queryset.values_list('pk', flat=True)))
+        self.assertEqual({type(hijo) for hijo in hijos}, {inv_m.CPU, inv_m.Monitor})
+
+    def test_dispositivos_paquetes(self):
+        usuario = factories.UserFactory()
+        salida = inv_m.SalidaInventario.objects.create(
+            tipo_salida=inv_m.SalidaTipo.objects.create(nombre='Entrega', slug='E'),
+            creada_por=usuario)
+        tipo_paquete = inv_m.PaqueteTipo.objects.create(nombre='CPU', tipo_dispositivo=self.tipo_cpu)
+        paquete = inv_m.Paquete.objects.create(
+            salida=salida, creado_por=usuario, indice=1, tipo_paquete=tipo_paquete)
+        for dispositivo in self.dispositivos[1::2]:
+            inv_m.DispositivoPaquete.objects.create(dispositivo=dispositivo, paquete=paquete, asignado_por=usuario)
+        with self.assertNumQueries(2):
+            cpus = dispositivos_paquetes(
+                salida, tipo_paquete, 'marca', 'procesador', 'version_sistema', 'disco_duro__medida', 'ram_medida')
+            self.assertEqual([cpu.servidor for cpu in cpus], [False, True, False])
@@ -0,0 +1,64 @@
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils.six import StringIO
+
+from apps.conta.tests.factories import PeriodoFiscalFactory
+from apps.inventario import models as inv_m
+from apps.inventario import qr
+from apps.inventario.tests import factories
+
+MEDIA_TEMPORAL = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_TEMPORAL)
+class GenerarQrTestCase(TestCase):
+    """Pruebas para la generación por lotes de los códigos QR"""
+
+    fixtures = ['dispositivo_estado', 'dispositivo_etapa']
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_TEMPORAL, ignore_errors=True)
+        super(GenerarQrTestCase, cls).tearDownClass()
+
+    def setUp(self):
+        PeriodoFiscalFactory()
+        factories.EntradaDetalleFactory(util=7).crear_dispositivos()
+
+    def test_genera_pendientes(self):
+        self.assertEqual(qr.pendientes(inv_m.Dispositivo.objects.all()).count(), 7)
+        generados = qr.generar_pendientes(inv_m.Monitor.objects.select_related('tipo'), tamano_lote=3)
+        self.assertEqual(generados, 7)
+        self.assertEqual(qr.pendientes(inv_m.Dispositivo.objects.all()).count(), 0)
+        monitor = inv_m.Monitor.objects.get(indice=1)
+        self.assertEqual(monitor.codigo_qr.name, 'qr_dispositivo/dispositivo-{}.png'.format(monitor.id))
+        with monitor.codigo_qr.storage.open(monitor.codigo_qr.name) as archivo:
+            self.assertEqual(archivo.read(), qr.renderizar(monitor.datos_qr()))
+        # Una segunda ejecución no tiene nada pendiente
+        self.assertEqual(qr.generar_pendientes(inv_m.Monitor.objects.all()), 0)
+
+    def test_consultas_por_lote(self):
+        # Una consulta para leer cada lote, una para actualizarlo y una última que no encuentra registros
+        with self.assertNumQueries(7):
+            qr.generar_pendientes(inv_m.Dispositivo.objects.select_related('tipo'), tamano_lote=3)
+
+    def test_comando(self):
+        salida = StringIO()
+        call_command('generar_qr', modelos=['dispositivo'], procesos=2, stdout=salida)
+        self.assertIn('dispositivo: 7', salida.getvalue())
+        self.assertEqual(qr.pendientes(inv_m.Dispositivo.objects.all()).count(), 0)
+
+    def test_url_sin_imagen(self):
+        cache.clear()
+        monitor = inv_m.Monitor.objects.get(indice=1)
+        url = qr.qr_url(monitor)
+        self.assertTrue(url.startswith('data:image/png;base64,'))
+        with self.assertNumQueries(0):
+            self.assertEqual(qr.qr_url(monitor), url)
+        monitor.crear_qrcode()
+        monitor.refresh_from_db()
+        self.assertEqual(qr.qr_url(monitor), monitor.codigo_qr.url)
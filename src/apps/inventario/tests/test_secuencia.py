@@ -0,0 +1,104 @@
+import shutil
+import tempfile
+import threading
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from apps.conta.tests.factories import PeriodoFiscalFactory
+from apps.inventario import models as inv_m
+from apps.inventario import transacciones
+from apps.inventario.tests import factories
+
+MEDIA_TEMPORAL = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_TEMPORAL)
+class SecuenciaTriageTestCase(TestCase):
+    """Pruebas para la reserva de índices de :class:`SecuenciaTriage`"""
+
+    fixtures = ['dispositivo_estado', 'dispositivo_etapa']
+
+    def test_inicializa_desde_indice(self):
+        detalle = factories.EntradaDetalleFactory()
+        inv_m.Monitor(entrada=detalle.entrada, tipo=detalle.tipo_dispositivo).save()
+        self.assertEqual(inv_m.Monitor.objects.get().triage, 'M-1')
+        # Datos registrados antes de que existiera la secuencia
+        inv_m.Monitor.objects.update(indice=41)
+        inv_m.SecuenciaTriage.objects.all().delete()
+        self.assertEqual(list(inv_m.SecuenciaTriage.reservar(inv_m.Monitor, 3)), [42, 43, 44])
+        self.assertEqual(list(inv_m.SecuenciaTriage.reservar(inv_m.Monitor)), [45])
+        self.assertEqual(inv_m.SecuenciaTriage.objects.get(slug='M').ultimo, 45)
+
+    def test_sin_conteo(self):
+        inv_m.SecuenciaTriage.reservar(inv_m.Monitor)
+        with self.assertNumQueries(4):
+            inv_m.SecuenciaTriage.reservar(inv_m.Monitor, 10)
+
+
+@skipUnless(
+    connection.features.has_select_for_update,
+    'SQLite serializa las transacciones completas, por lo que la carrera no se puede reproducir; '
+    'ejecutar con src.settings_test_mysql')
+@override_settings(MEDIA_ROOT=MEDIA_TEMPORAL)
+class SecuenciaTriageConcurrenciaTestCase(TransactionTestCase):
+    """Ingresa dispositivos desde varios hilos al mismo tiempo y valida que no se repita ningún triage.
+    Necesita una base de datos que bloquee filas, como MySQL en producción.
+    """
+
+    fixtures = ['dispositivo_estado', 'dispositivo_etapa']
+
+    hilos = 8
+    repeticiones = 5
+    lote = 20
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_TEMPORAL, ignore_errors=True)
+        super(SecuenciaTriageConcurrenciaTestCase, cls).tearDownClass()
+
+    def setUp(self):
+        PeriodoFiscalFactory()
+        self.detalle = factories.EntradaDetalleFactory()
+
+    def ingresar(self, numero, barrera, errores):
+        try:
+            barrera.wait()
+            for _ in range(self.repeticiones):
+                if numero % 2:
+                    inv_m.Monitor(
+                        entrada=self.detalle.entrada,
+                        tipo=self.detalle.tipo_dispositivo,
+                        entrada_detalle=self.detalle).save()
+                else:
+                    transacciones.ingresar_dispositivos(
+                        entrada=self.detalle.entrada,
+                        modelo=inv_m.Monitor,
+                        tipo=self.detalle.tipo_dispositivo,
+                        entrada_detalle=self.detalle,
+                        cantidad=self.lote,
+                        precio=10)
+        except Exception as e:
+            errores.append(e)
+        finally:
+            connection.close()
+
+    def test_sin_duplicados(self):
+        barrera = threading.Barrier(self.hilos)
+        errores = []
+        hilos = [
+            threading.Thread(target=self.ingresar, args=(numero, barrera, errores))
+            for numero in range(self.hilos)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        self.assertEqual(errores, [])
+
+        individuales = self.hilos // 2 * self.repeticiones
+        esperados = individuales + (self.hilos - self.hilos // 2) * self.repeticiones * self.lote
+        indices = list(inv_m.Monitor.objects.values_list('indice', flat=True))
+        self.assertEqual(len(indices), esperados)
+        self.assertEqual(sorted(indices), list(range(1, esperados + 1)))
+        self.assertEqual(inv_m.Monitor.objects.values('triage').distinct().count(), esperados)
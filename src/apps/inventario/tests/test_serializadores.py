@@ -0,0 +1,125 @@
+import csv
+import io
+
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.conta.tests.factories import PeriodoFiscalFactory
+from apps.escuela.tests.factories import EscuelaFactory
+from apps.inventario import models as inv_m
+from apps.inventario.api_views.dispositivo import DispositivoExportarApi, PaquetesViewSet
+from apps.inventario.api_views.entrada import EntradaDetalleViewSet
+from apps.inventario.api_views.salida import RevisionSalidaViewSet, SalidaInventarioViewSet
+from apps.inventario.tests import factories
+from apps.inventario.tests.consultas import ConsultasConstantesMixin
+from apps.main import models as main_m
+
+
+class ListadosTestCase(ConsultasConstantesMixin, TestCase):
+    """Pruebas para que los listados de la API no hagan consultas por cada registro"""
+
+    fixtures = ['dispositivo_estado', 'dispositivo_etapa']
+
+    def setUp(self):
+        self.usuario = factories.UserFactory()
+        self.tipo_salida = inv_m.SalidaTipo.objects.create(nombre='Entrega', slug='E')
+        self.estado = inv_m.SalidaEstado.objects.create(nombre='Entregada')
+        departamento = main_m.Departamento.objects.create(nombre='Guatemala')
+        self.escuela = EscuelaFactory(
+            municipio=main_m.Municipio.objects.create(departamento=departamento, nombre='Mixco'))
+        self.beneficiario = factories.DonanteFactory()
+
+    def crear_salidas(self, cantidad):
+        return [
+            inv_m.SalidaInventario.objects.create(
+                tipo_salida=self.tipo_salida,
+                creada_por=self.usuario,
+                escuela=self.escuela,
+                beneficiario=self.beneficiario,
+                estado=self.estado)
+            for _ in range(cantidad)]
+
+    def test_salidas(self):
+        self.assertConsultasConstantes(SalidaInventarioViewSet, self.crear_salidas)
+
+    def test_revisiones(self):
+        def crear(cantidad):
+            for salida in self.crear_salidas(cantidad):
+                inv_m.RevisionSalida.objects.create(salida=salida, revisado_por=self.usuario)
+        self.assertConsultasConstantes(RevisionSalidaViewSet, crear)
+
+    def test_paquetes(self):
+        salida = self.crear_salidas(1)[0]
+        entrada = factories.EntradaFactory()
+        tipo_monitor = factories.DispositivoTipoFactory(usa_triage=True)
+        tipo_paquete = inv_m.PaqueteTipo.objects.create(nombre='MONITOR', tipo_dispositivo=tipo_monitor)
+
+        def crear(cantidad):
+            for _ in range(cantidad):
+                paquete = inv_m.Paquete.objects.create(
+                    salida=salida,
+                    creado_por=self.usuario,
+                    indice=inv_m.Paquete.objects.count() + 1,
+                    tipo_paquete=tipo_paquete)
+                for _ in range(2):
+                    inv_m.DispositivoPaquete.objects.create(
+                        dispositivo=inv_m.Monitor.objects.create(tipo=tipo_monitor, entrada=entrada),
+                        paquete=paquete,
+                        asignado_por=self.usuario)
+        self.assertConsultasConstantes(PaquetesViewSet, crear)
+        self.assertEqual(self.listar(PaquetesViewSet)[0].data[0]['cantidad_dispositivos'], 2)
+
+    def test_detalles_entrada(self):
+        PeriodoFiscalFactory()
+        entrada = factories.EntradaFactory()
+
+        def crear(cantidad):
+            for _ in range(cantidad):
+                factories.EntradaDetalleFactory(entrada=entrada, desecho=3)
+        self.assertConsultasConstantes(EntradaDetalleViewSet, crear)
+        self.assertEqual(self.listar(EntradaDetalleViewSet)[0].data[0]['existencia_desecho'], 3)
+
+    def test_filtro_desecho(self):
+        PeriodoFiscalFactory()
+        entrada = factories.EntradaFactory()
+        desecho = inv_m.DesechoSalida.objects.create(
+            empresa=inv_m.DesechoEmpresa.objects.create(nombre='Reciclaje', encargado='Encargado', telefono=1, dpi='1'),
+            creado_por=self.usuario)
+        detalles = []
+        for cantidad, desechados in ((5, [2, 3]), (4, [1]), (2, [])):
+            detalle = factories.EntradaDetalleFactory(entrada=entrada, desecho=cantidad)
+            for desechado in desechados:
+                inv_m.DesechoDetalle.objects.create(
+                    desecho=desecho,
+                    entrada_detalle=detalle,
+                    cantidad=desechado,
+                    tipo_dispositivo=detalle.tipo_dispositivo)
+            detalles.append(detalle)
+
+        existencias = dict(
+            inv_m.EntradaDetalle.objects.con_existencia_desecho().values_list('id', 'existencia_desecho'))
+        self.assertEqual(existencias, {detalle.id: detalle.existencia_desecho for detalle in detalles})
+        self.assertEqual([existencias[detalle.id] for detalle in detalles], [0, 3, 2])
+
+        respuesta, _ = self.listar(EntradaDetalleViewSet, desecho=0, ordering='-existencia_desecho')
+        self.assertEqual(
+            [(fila['id'], fila['existencia_desecho']) for fila in respuesta.data],
+            [(detalles[1].id, 3), (detalles[2].id, 2)])
+
+    def test_exportar_dispositivos(self):
+        entrada = factories.EntradaFactory()
+        tipo_monitor = factories.DispositivoTipoFactory()
+        for marca in ('Dell', 'HP'):
+            inv_m.Monitor.objects.create(
+                tipo=tipo_monitor, entrada=entrada, marca=inv_m.DispositivoMarca.objects.create(marca=marca))
+        inv_m.AsignacionTecnico.objects.create(usuario=self.usuario).tipos.add(tipo_monitor)
+        request = APIRequestFactory().get('/', {'etapa': inv_m.DispositivoEtapa.AB, 'formato': 'csv'})
+        force_authenticate(request, user=self.usuario)
+        # La validación del filtro y todos los dispositivos en una consulta, no solo la página de la tabla
+        with self.assertNumQueries(2):
+            respuesta = DispositivoExportarApi.as_view()(request)
+            contenido = b''.join(respuesta.streaming_content).decode('utf-8-sig')
+        lineas = list(csv.reader(io.StringIO(contenido)))
+        self.assertEqual(lineas[0][:3], ['Triage', 'Tipo', 'Marca'])
+        self.assertEqual([linea[2] for linea in lineas[1:]], ['Dell', 'HP'])
+        self.assertEqual({linea[1] for linea in lineas[1:]}, {'MONITOR'})
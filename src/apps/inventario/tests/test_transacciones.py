@@ -0,0 +1,243 @@
+import shutil
+import tempfile
+
+from django.core.exceptions import ValidationError
+from django.test import TestCase, override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.conta import models as conta_m
+from apps.conta.tests.factories import PeriodoFiscalFactory
+from apps.inventario import models as inv_m
+from apps.inventario import transacciones
+from apps.inventario.api_views.desecho import DesechoDispositivoViewSet
+from apps.inventario.tests import factories
+
+MEDIA_TEMPORAL = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_TEMPORAL)
+class IngresarDispositivosTestCase(TestCase):
+    """Pruebas para el ingreso por lotes de :class:`Dispositivo`"""
+
+    fixtures = ['dispositivo_estado', 'dispositivo_etapa']
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_TEMPORAL, ignore_errors=True)
+        super(IngresarDispositivosTestCase, cls).tearDownClass()
+
+    def setUp(self):
+        self.periodo = PeriodoFiscalFactory()
+        self.detalle = factories.EntradaDetalleFactory(util=25)
+
+    def test_crea_lote(self):
+        resultado = self.detalle.crear_dispositivos()
+        self.assertEqual(resultado, {'creados': 25, 'errores': 0})
+        self.assertEqual(inv_m.Monitor.objects.count(), 25)
+        self.assertEqual(
+            conta_m.PrecioDispositivo.objects.filter(periodo=self.periodo, precio=100).count(), 25)
+        self.assertEqual(
+            conta_m.MovimientoDispositivo.objects.filter(
+                tipo_movimiento=conta_m.MovimientoDispositivo.ALTA).count(), 25)
+        monitor = inv_m.Monitor.objects.get(indice=25)
+        self.assertEqual(monitor.triage, 'M-25')
+        # El código QR se genera después con el comando `generar_qr`
+        self.assertFalse(monitor.codigo_qr)
+
+    def test_continua_indice(self):
+        transacciones.ingresar_dispositivo(
+            entrada=self.detalle.entrada,
+            modelo=inv_m.Monitor,
+            tipo=self.detalle.tipo_dispositivo,
+            entrada_detalle=self.detalle,
+            precio=10)
+        self.detalle.crear_dispositivos(util=3)
+        self.assertEqual(
+            list(inv_m.Monitor.objects.values_list('triage', flat=True)),
+            ['M-1', 'M-2', 'M-3', 'M-4'])
+
+    def test_consultas_constantes(self):
+        inv_m.SecuenciaTriage.inicializar(inv_m.Monitor)
+        with self.assertNumQueries(11):
+            transacciones.ingresar_dispositivos(
+                entrada=self.detalle.entrada,
+                modelo=inv_m.Monitor,
+                tipo=self.detalle.tipo_dispositivo,
+                entrada_detalle=self.detalle,
+                cantidad=50,
+                precio=10)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_TEMPORAL)
+class AprobarSalidaTestCase(TestCase):
+    """Pruebas para la aprobación por lotes de una :class:`SalidaInventario`"""
+
+    fixtures = ['dispositivo_estado', 'dispositivo_etapa']
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_TEMPORAL, ignore_errors=True)
+        super(AprobarSalidaTestCase, cls).tearDownClass()
+
+    def setUp(self):
+        PeriodoFiscalFactory()
+        self.usuario = factories.UserFactory()
+        self.detalle = factories.EntradaDetalleFactory(util=12)
+        self.detalle.crear_dispositivos()
+        self.salida = inv_m.SalidaInventario.objects.create(
+            tipo_salida=inv_m.SalidaTipo.objects.create(nombre='Entrega', slug='E'),
+            creada_por=self.usuario,
+            necesita_revision=True)
+        self.revision = inv_m.RevisionSalida.objects.create(salida=self.salida, revisado_por=self.usuario)
+        self.tipo_paquete = inv_m.PaqueteTipo.objects.create(
+            nombre='MONITOR',
+            tipo_dispositivo=self.detalle.tipo_dispositivo)
+        self.monitores = list(inv_m.Monitor.objects.order_by('indice'))
+
+    def empaquetar(self, monitores, indice, aprobado=True):
+        paquete = inv_m.Paquete.objects.create(
+            salida=self.salida,
+            creado_por=self.usuario,
+            indice=indice,
+            cantidad=len(monitores),
+            tipo_paquete=self.tipo_paquete,
+            aprobado=True)
+        for monitor in monitores:
+            inv_m.DispositivoPaquete.objects.create(
+                dispositivo=monitor,
+                paquete=paquete,
+                asignado_por=self.usuario,
+                aprobado=aprobado)
+
+    def cambiar_etapa(self, monitor):
+        etapas = inv_m.DispositivoEtapa.objects.in_bulk([inv_m.DispositivoEtapa.AB, inv_m.DispositivoEtapa.TR])
+        # Con `bulk_create` no se crean la bitácora ni las notificaciones de la solicitud
+        inv_m.SolicitudMovimiento.objects.bulk_create([inv_m.SolicitudMovimiento(
+            etapa_inicial=etapas[inv_m.DispositivoEtapa.AB],
+            etapa_final=etapas[inv_m.DispositivoEtapa.TR],
+            creada_por=self.usuario,
+            tipo_dispositivo=self.detalle.tipo_dispositivo,
+            cantidad=1)])
+        return inv_m.CambioEtapa.objects.create(
+            solicitud=inv_m.SolicitudMovimiento.objects.latest('id'),
+            dispositivo=monitor,
+            etapa_inicial=etapas[inv_m.DispositivoEtapa.AB],
+            etapa_final=etapas[inv_m.DispositivoEtapa.TR],
+            creado_por=self.usuario)
+
+    def test_aprobar(self):
+        self.empaquetar(self.monitores[:4], 1)
+        self.empaquetar(self.monitores[4:6], 2, aprobado=False)
+        cambio = self.cambiar_etapa(self.monitores[0])
+        conta_m.MovimientoDispositivo.objects.create(
+            dispositivo=self.monitores[1],
+            periodo_fiscal=conta_m.PeriodoFiscal.objects.get(actual=True),
+            tipo_movimiento=conta_m.MovimientoDispositivo.BAJA)
+
+        resultado = transacciones.aprobar_salida(self.salida, self.usuario)
+        self.assertEqual(resultado, {'dispositivos': 4, 'cambios_etapa': 1, 'movimientos': 3})
+        entregados = inv_m.Dispositivo.objects.filter(etapa=inv_m.DispositivoEtapa.EN, valido=False)
+        self.assertEqual(
+            set(entregados.values_list('triage', flat=True)),
+            {monitor.triage for monitor in self.monitores[:4]})
+        cambio.refresh_from_db()
+        self.assertEqual(cambio.etapa_final_id, inv_m.DispositivoEtapa.EN)
+        bajas = conta_m.MovimientoDispositivo.objects.filter(
+            tipo_movimiento=conta_m.MovimientoDispositivo.BAJA,
+            referencia='Salida {}'.format(self.salida))
+        self.assertEqual(bajas.count(), 3)
+        self.assertEqual(set(bajas.values_list('precio', flat=True)), {100})
+        self.revision.refresh_from_db()
+        self.salida.refresh_from_db()
+        self.assertTrue(self.revision.aprobada)
+        self.assertFalse(self.salida.necesita_revision)
+
+    def test_consultas_constantes(self):
+        self.empaquetar(self.monitores, 1)
+        for monitor in self.monitores[:6]:
+            self.cambiar_etapa(monitor)
+        # Las consultas no dependen de la cantidad de dispositivos
+        with self.assertNumQueries(15):
+            resultado = transacciones.aprobar_salida(self.salida, self.usuario)
+        self.assertEqual(resultado['movimientos'], 12)
+
+    def test_sin_precio(self):
+        self.empaquetar(self.monitores[:3], 1)
+        conta_m.PrecioDispositivo.objects.filter(dispositivo=self.monitores[2]).update(activo=False)
+        with self.assertRaises(ValidationError):
+            transacciones.aprobar_salida(self.salida, self.usuario)
+        # La transacción no deja cambios parciales
+        self.assertFalse(inv_m.Dispositivo.objects.filter(etapa=inv_m.DispositivoEtapa.EN).exists())
+        self.assertFalse(conta_m.MovimientoDispositivo.objects.filter(
+            tipo_movimiento=conta_m.MovimientoDispositivo.BAJA).exists())
+
+
+@override_settings(MEDIA_ROOT=MEDIA_TEMPORAL)
+class FinalizarDesechoTestCase(TestCase):
+    """Pruebas para la finalización por lotes de una :class:`DesechoSalida`"""
+
+    fixtures = ['dispositivo_estado', 'dispositivo_etapa']
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_TEMPORAL, ignore_errors=True)
+        super(FinalizarDesechoTestCase, cls).tearDownClass()
+
+    def setUp(self):
+        PeriodoFiscalFactory()
+        self.usuario = factories.UserFactory()
+        detalle = factories.EntradaDetalleFactory(util=10)
+        detalle.crear_dispositivos()
+        self.desecho = inv_m.DesechoSalida.objects.create(
+            empresa=inv_m.DesechoEmpresa.objects.create(nombre='Reciclaje', encargado='Encargado', telefono=1, dpi='1'),
+            creado_por=self.usuario)
+        self.detalle = inv_m.DesechoDetalle.objects.create(
+            desecho=self.desecho,
+            entrada_detalle=detalle,
+            cantidad=10,
+            tipo_dispositivo=detalle.tipo_dispositivo,
+            aprobado=True)
+        inv_m.DesechoDispositivo.objects.bulk_create(
+            inv_m.DesechoDispositivo(desecho=self.desecho, dispositivo=monitor, aprobado=True)
+            for monitor in inv_m.Monitor.objects.all())
+
+    def finalizar(self, **datos):
+        datos['id'] = self.desecho.id
+        request = APIRequestFactory().post('/', datos)
+        force_authenticate(request, user=self.usuario)
+        return DesechoDispositivoViewSet.as_view({'post': 'finalizar_desecho'})(request)
+
+    def test_simular(self):
+        respuesta = self.finalizar(simular=True)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertTrue(respuesta.data['simulacion'])
+        self.assertEqual(respuesta.data['dispositivos'], 10)
+        self.assertEqual(respuesta.data['precio_total'], 1000)
+        self.assertFalse(inv_m.Dispositivo.objects.filter(etapa=inv_m.DispositivoEtapa.DS).exists())
+        self.desecho.refresh_from_db()
+        self.assertTrue(self.desecho.en_creacion)
+
+    def test_finalizar(self):
+        # La revisión de aprobación, los dispositivos, sus precios, el período, la etapa, los movimientos,
+        # los cierres invalidados, el desecho y el savepoint de la transacción
+        with self.assertNumQueries(10):
+            resultado = transacciones.finalizar_desecho(self.desecho)
+        self.assertEqual(resultado, {'detalles': 1, 'dispositivos': 10, 'precio_total': 1000})
+        self.assertEqual(
+            inv_m.Dispositivo.objects.filter(etapa=inv_m.DispositivoEtapa.DS, valido=False).count(), 10)
+        self.assertEqual(
+            conta_m.MovimientoDispositivo.objects.filter(
+                tipo_movimiento=conta_m.MovimientoDispositivo.BAJA,
+                referencia='Salida Desecho{}'.format(self.desecho.id)).count(), 10)
+        self.desecho.refresh_from_db()
+        self.assertFalse(self.desecho.en_creacion)
+
+    def test_pendientes(self):
+        inv_m.DesechoDispositivo.objects.filter(pk=inv_m.DesechoDispositivo.objects.first().pk).update(aprobado=False)
+        respuesta = self.finalizar()
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertEqual(respuesta.data['mensaje'], 'Faltan dispositivos por aprobar')
+        inv_m.DesechoDetalle.objects.filter(pk=self.detalle.pk).update(aprobado=False)
+        self.assertEqual(self.finalizar().data['mensaje'], 'Faltan detalles de desecho por aprobar')
+        self.assertFalse(conta_m.MovimientoDispositivo.objects.filter(
+            tipo_movimiento=conta_m.MovimientoDispositivo.BAJA).exists())
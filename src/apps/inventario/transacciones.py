@@ -4,10 +4,19 @@
 # Este archivo contiene transacciones generales para utilizar en los distintos inventarios
 # el propósito principal de tener las transacciones separadas es poder garantizar que sean realizadas
 # de forma atómica.
-from django.db import transaction
+from collections import defaultdict
 
+from django.core.exceptions import ValidationError
+from django.db import connections, router, transaction
+from django.db.models import BooleanField, Case, Count, F, IntegerField, Max, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+
+from apps.conta import informes as conta_informes
 from apps.conta import models as conta_m
 
+# Cantidad de filas por cada `INSERT` en los ingresos por lote
+TAMANO_LOTE = 250
+
 
 def ingresar_dispositivo(entrada, modelo, tipo, entrada_detalle, precio=None):
     with transaction.atomic():
@@ -37,6 +46,95 @@ def ingresar_dispositivo(entrada, modelo, tipo, entrada_detalle, precio=None):
         movimiento.save()
 
 
+def insertar_herencia(modelo, objetos, batch_size=TAMANO_LOTE, using=None):
+    """Inserta por lotes objetos de un modelo con herencia multi-tabla.
+    `bulk_create` no admite este tipo de modelos porque no puede conocer la llave primaria de la tabla
+    padre, pero :class:`Dispositivo` usa un `UUIDField` generado en Python. Por eso se insertan primero
+    las filas de la tabla padre con `bulk_create` del modelo padre y luego las de la tabla hija, con la
+    misma llave en el campo del puntero, con un `INSERT` por lote.
+    """
+    using = using or router.db_for_write(modelo)
+    connection = connections[using]
+    ptr = modelo._meta.pk
+    padre = ptr.remote_field.model
+    campos_padre = padre._meta.concrete_fields
+    padre.objects.using(using).bulk_create(
+        [padre(**{campo.attname: getattr(objeto, campo.attname) for campo in campos_padre}) for objeto in objetos],
+        batch_size=batch_size)
+    for objeto in objetos:
+        setattr(objeto, ptr.attname, getattr(objeto, ptr.target_field.attname))
+
+    campos = modelo._meta.local_concrete_fields
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        connection.ops.quote_name(modelo._meta.db_table),
+        ', '.join(connection.ops.quote_name(campo.column) for campo in campos),
+        ', '.join(['%s'] * len(campos)))
+    with connection.cursor() as cursor:
+        for inicio in range(0, len(objetos), batch_size):
+            cursor.executemany(sql, [
+                [campo.get_db_prep_save(campo.pre_save(objeto, True), connection=connection) for campo in campos]
+                for objeto in objetos[inicio:inicio + batch_size]])
+    for objeto in objetos:
+        objeto._state.adding = False
+        objeto._state.db = using
+    return objetos
+
+
+def ingresar_dispositivos(entrada, modelo, tipo, entrada_detalle, cantidad, precio=None, batch_size=TAMANO_LOTE):
+    """Versión por lotes de `ingresar_dispositivo`.
+    Reserva un bloque de índices de triage y crea los dispositivos, sus precios y sus movimientos
+    contables con `bulk_create` dentro de una sola transacción.
+
+    Returns:
+        list: los dispositivos creados.
+    """
+    # Importado aquí porque `models` importa este módulo
+    from apps.inventario.models import SecuenciaTriage
+
+    if cantidad <= 0:
+        return []
+    with transaction.atomic():
+        periodo_actual = conta_m.PeriodoFiscal.objects.get(actual=True)
+        if not precio or precio == 0.0:
+            precio_estandar = conta_m.PrecioEstandar.objects.get(
+                tipo_dispositivo=tipo,
+                periodo=periodo_actual,
+                inventario=conta_m.PrecioEstandar.DISPOSITIVO)
+            precio = precio_estandar.precio
+        nuevos_dispositivos = []
+        for indice in SecuenciaTriage.reservar(modelo, cantidad):
+            nuevo_dispositivo = modelo(
+                entrada=entrada,
+                tipo=tipo,
+                entrada_detalle=entrada_detalle,
+                indice=indice,
+                triage='{}-{}'.format(tipo.slug, indice))
+            nuevos_dispositivos.append(nuevo_dispositivo)
+        insertar_herencia(modelo, nuevos_dispositivos, batch_size=batch_size)
+        # Generar registros contables
+        conta_m.PrecioDispositivo.objects.bulk_create(
+            [
+                conta_m.PrecioDispositivo(
+                    dispositivo=nuevo_dispositivo,
+                    periodo=periodo_actual,
+                    precio=precio)
+                for nuevo_dispositivo in nuevos_dispositivos
+            ],
+            batch_size=batch_size)
+        conta_m.MovimientoDispositivo.objects.bulk_create(
+            [
+                conta_m.MovimientoDispositivo(
+                    dispositivo=nuevo_dispositivo,
+                    periodo_fiscal=periodo_actual,
+                    tipo_movimiento=conta_m.MovimientoDispositivo.ALTA,
+                    referencia='Entrada {}'.format(entrada),
+                    precio=precio)
+                for nuevo_dispositivo in nuevos_dispositivos
+            ],
+            batch_size=batch_size)
+    return nuevos_dispositivos
+
+
 def ingresar_repuesto(entrada, modelo_repuesto, estado, tipo, entrada_detalle, precio=None):
     with transaction.atomic():
         periodo_actual = conta_m.PeriodoFiscal.objects.get(actual=True)
@@ -69,3 +167,272 @@ def ingresar_repuesto(entrada, modelo_repuesto, estado, tipo, entrada_detalle, p
             referencia='Entrada {}'.format(entrada)
         )
         movimiento.save()
+
+
+def _valor_booleano(valor):
+    """Interpreta los valores de las casillas del grid, que pueden llegar como texto."""
+    if isinstance(valor, str):
+        return valor.strip().lower() in ('true', 't', '1', 'on')
+    return bool(valor)
+
+
+def actualizar_dispositivos(modelo, filas, batch_size=TAMANO_LOTE):
+    """Actualiza por lotes los `CAMPOS_ACTUALIZABLES` de los dispositivos de `modelo`.
+    Cada fila es un diccionario con el `triage` del dispositivo y los valores a modificar. Las llaves
+    foráneas se envían con su id, excepto las que apuntan a otro :class:`Dispositivo`, que se envían con
+    su triage como `<campo>__triage`. Los campos ausentes o relaciones vacías no se modifican.
+
+    Todas las filas se validan antes de escribir. Los registros relacionados se consultan una sola vez por
+    modelo y los cambios se guardan con un `UPDATE` por tabla y lote dentro de una transacción.
+
+    Returns:
+        tuple: cantidad de dispositivos actualizados y lista de errores por fila. Si hay errores no se
+        actualiza ningún dispositivo.
+    """
+    # Importado aquí porque `models` importa este módulo
+    from apps.inventario.models import Dispositivo
+
+    campos = [modelo._meta.get_field(nombre) for nombre in modelo.CAMPOS_ACTUALIZABLES]
+
+    def por_triage(campo):
+        return campo.is_relation and issubclass(campo.related_model, Dispositivo)
+
+    def llave(campo):
+        return '{}__triage'.format(campo.name) if por_triage(campo) else campo.name
+
+    def busqueda(campo):
+        opciones = campo.related_model._meta
+        return opciones.get_field('triage') if por_triage(campo) else opciones.pk
+
+    errores = defaultdict(dict)
+
+    def agregar_error(indice, nombre, mensajes):
+        errores[indice].setdefault(nombre, []).extend(mensajes)
+
+    # Convertir los valores recibidos y reunir las llaves a consultar
+    convertidas = []
+    referencias = defaultdict(set)
+    for indice, datos in enumerate(filas):
+        valores = {}
+        for campo in campos:
+            nombre = llave(campo)
+            if nombre not in datos:
+                continue
+            valor = datos[nombre]
+            try:
+                if campo.is_relation:
+                    if valor in (None, ''):
+                        continue
+                    campo_busqueda = busqueda(campo)
+                    valor = campo_busqueda.to_python(valor)
+                    referencias[(campo.related_model, campo_busqueda.name)].add(valor)
+                elif isinstance(campo, BooleanField):
+                    valor = _valor_booleano(valor)
+                else:
+                    if valor == '' and not campo.empty_strings_allowed:
+                        valor = None
+                    valor = campo.clean(valor, None)
+            except ValidationError as e:
+                agregar_error(indice, nombre, e.messages)
+                continue
+            valores[campo] = valor
+        convertidas.append((indice, str(datos.get('triage')), valores))
+
+    relacionados = {
+        (relacionado, nombre): dict(
+            relacionado._base_manager.filter(**{'{}__in'.format(nombre): valores}).values_list(nombre, 'pk'))
+        for (relacionado, nombre), valores in referencias.items()
+    }
+    dispositivos = dict(
+        modelo._base_manager.filter(
+            triage__in=[triage for _, triage, _ in convertidas]).values_list('triage', 'pk'))
+
+    cambios = {}
+    for indice, triage, valores in convertidas:
+        pk = dispositivos.get(triage)
+        if pk is None:
+            agregar_error(indice, 'triage', ['No existe el dispositivo {}'.format(triage)])
+        for campo, valor in valores.items():
+            if campo.is_relation:
+                valores[campo] = relacionados[(campo.related_model, busqueda(campo).name)].get(valor)
+                if valores[campo] is None:
+                    agregar_error(indice, llave(campo), ['No existe {} {}'.format(
+                        campo.related_model._meta.verbose_name, valor)])
+        if indice not in errores:
+            cambios.setdefault(pk, {}).update(valores)
+
+    if errores:
+        return 0, [
+            {'fila': indice, 'triage': filas[indice].get('triage'), 'errores': errores[indice]}
+            for indice in sorted(errores)
+        ]
+
+    # Los campos heredados se guardan en la tabla de `Dispositivo` y el resto en la del modelo hijo
+    tablas = defaultdict(list)
+    for campo in campos:
+        tablas[campo.model].append(campo)
+    llaves = list(cambios)
+    with transaction.atomic():
+        for inicio in range(0, len(llaves), batch_size):
+            lote = llaves[inicio:inicio + batch_size]
+            for tabla, campos_tabla in tablas.items():
+                asignaciones = {}
+                for campo in campos_tabla:
+                    salida = campo.target_field if campo.is_relation else campo
+                    casos = [
+                        When(pk=pk, then=Value(cambios[pk][campo], output_field=salida))
+                        for pk in lote if campo in cambios[pk]
+                    ]
+                    if casos:
+                        asignaciones[campo.name] = Case(*casos, default=F(campo.name), output_field=salida)
+                if asignaciones:
+                    tabla._base_manager.filter(pk__in=lote).update(**asignaciones)
+    return len(cambios), []
+
+
+def aprobar_salida(salida, usuario, batch_size=TAMANO_LOTE):
+    """Aprueba la :class:`SalidaInventario` y da de baja los dispositivos aprobados de sus paquetes.
+    Los dispositivos pasan a la etapa de entregado y dejan de ser válidos, se cierra el último
+    :class:`CambioEtapa` de cada uno y se crean los movimientos de baja con su precio activo. Cada paso se
+    hace con una consulta para todos los dispositivos, dentro de una sola transacción.
+
+    Raises:
+        ValidationError: si algún dispositivo que necesita movimiento de baja no tiene precio activo.
+
+    Returns:
+        dict: cantidad de dispositivos, cambios de etapa y movimientos actualizados o creados.
+    """
+    # Importado aquí porque `models` importa este módulo
+    from apps.inventario import models as inv_m
+
+    with transaction.atomic():
+        asignaciones = inv_m.DispositivoPaquete.objects.filter(
+            paquete__salida=salida,
+            paquete__aprobado=True,
+            aprobado=True).exclude(paquete__tipo_paquete__tipo_dispositivo__usa_triage=False)
+        dispositivos = list(asignaciones.values_list('dispositivo_id', flat=True).distinct())
+        inv_m.Dispositivo.objects.filter(pk__in=dispositivos).update(
+            etapa_id=inv_m.DispositivoEtapa.EN,
+            valido=False)
+
+        ultimos = inv_m.CambioEtapa.objects.filter(
+            dispositivo__in=dispositivos).order_by().values('dispositivo').annotate(ultimo=Max('id'))
+        cambios = inv_m.CambioEtapa.objects.filter(
+            id__in=[cambio['ultimo'] for cambio in ultimos]).exclude(etapa_inicial=inv_m.DispositivoEtapa.EN)
+        cerrados = dict(cambios.values_list('dispositivo_id', 'solicitud__desecho'))
+        cambios.update(etapa_final=inv_m.DispositivoEtapa.EN, creado_por=usuario)
+        # Al cerrar el cambio de etapa el dispositivo sale de su tarima, como en `CambioEtapa.save`
+        inv_m.Dispositivo.objects.filter(pk__in=list(cerrados)).update(tarima=None)
+        inv_m.Dispositivo.objects.filter(
+            pk__in=[dispositivo for dispositivo, desecho in cerrados.items() if desecho]).update(
+            estado_id=inv_m.DispositivoEstado.DS)
+
+        con_baja = set(conta_m.MovimientoDispositivo.objects.filter(
+            dispositivo__in=dispositivos,
+            tipo_movimiento=conta_m.MovimientoDispositivo.BAJA).values_list('dispositivo_id', flat=True))
+        pendientes = [dispositivo for dispositivo in dispositivos if dispositivo not in con_baja]
+        precios = dict(conta_m.PrecioDispositivo.objects.filter(
+            dispositivo__in=pendientes,
+            activo=True).values_list('dispositivo_id', 'precio'))
+        sin_precio = [dispositivo for dispositivo in pendientes if dispositivo not in precios]
+        if sin_precio:
+            triages = inv_m.Dispositivo.objects.filter(pk__in=sin_precio).values_list('triage', flat=True)
+            raise ValidationError('Los dispositivos {} no tienen precio activo'.format(', '.join(sorted(triages))))
+        periodo_actual = conta_m.PeriodoFiscal.objects.get(actual=True) if pendientes else None
+        conta_m.MovimientoDispositivo.objects.bulk_create(
+            [
+                conta_m.MovimientoDispositivo(
+                    dispositivo_id=dispositivo,
+                    periodo_fiscal=periodo_actual,
+                    tipo_movimiento=conta_m.MovimientoDispositivo.BAJA,
+                    referencia='Salida {}'.format(salida),
+                    precio=precios[dispositivo],
+                    fecha=salida.fecha)
+                for dispositivo in pendientes
+            ],
+            batch_size=batch_size)
+        # `bulk_create` no envía señales y la salida puede tener fecha de un período cerrado
+        conta_informes.invalidar_cierres(salida.fecha)
+
+        inv_m.RevisionSalida.objects.filter(salida=salida).update(aprobada=True)
+        salida.en_creacion = False
+        salida.necesita_revision = False
+        salida.save()
+    return {
+        'dispositivos': len(dispositivos),
+        'cambios_etapa': len(cerrados),
+        'movimientos': len(pendientes),
+    }
+
+
+def finalizar_desecho(desecho, simular=False, batch_size=TAMANO_LOTE):
+    """Finaliza la :class:`DesechoSalida` dando de baja todos sus dispositivos.
+    El estado de aprobación de los detalles y dispositivos se revisa con una sola consulta. Luego los
+    dispositivos pasan a la etapa de desecho con un `UPDATE` y sus movimientos de baja se crean con
+    `bulk_create`, todo dentro de una transacción.
+    Con `simular=True` únicamente se calculan los totales, sin modificar ningún registro.
+
+    Raises:
+        ValidationError: si hay detalles o dispositivos sin aprobar, o dispositivos sin precio activo.
+
+    Returns:
+        dict: cantidad de detalles y dispositivos y el precio total de los dispositivos dados de baja.
+    """
+    # Importado aquí porque `models` importa este módulo
+    from apps.inventario import models as inv_m
+
+    with transaction.atomic():
+        # Cada conteo es una subconsulta para no multiplicar los detalles por los dispositivos en un solo `JOIN`
+        def contar(modelo, **filtros):
+            conteo = modelo.objects.filter(desecho=OuterRef('pk'), **filtros).order_by().values('desecho').annotate(
+                total=Count('id')).values('total')
+            return Coalesce(Subquery(conteo, output_field=IntegerField()), 0)
+
+        estado = inv_m.DesechoSalida.objects.filter(pk=desecho.pk).annotate(
+            detalles_total=contar(inv_m.DesechoDetalle),
+            detalles_pendientes=contar(inv_m.DesechoDetalle, aprobado=False),
+            dispositivos_pendientes=contar(inv_m.DesechoDispositivo, aprobado=False)).values(
+                'detalles_total', 'detalles_pendientes', 'dispositivos_pendientes').get()
+        if estado['detalles_pendientes']:
+            raise ValidationError('Faltan detalles de desecho por aprobar')
+        if estado['dispositivos_pendientes']:
+            raise ValidationError('Faltan dispositivos por aprobar')
+
+        dispositivos = list(
+            inv_m.DesechoDispositivo.objects.filter(desecho=desecho).values_list('dispositivo_id', flat=True))
+        precios = dict(conta_m.PrecioDispositivo.objects.filter(
+            dispositivo__in=dispositivos,
+            activo=True).values_list('dispositivo_id', 'precio'))
+        sin_precio = [dispositivo for dispositivo in dispositivos if dispositivo not in precios]
+        if sin_precio:
+            triages = inv_m.Dispositivo.objects.filter(pk__in=sin_precio).values_list('triage', flat=True)
+            raise ValidationError('Los dispositivos {} no tienen precio activo'.format(', '.join(sorted(triages))))
+        resultado = {
+            'detalles': estado['detalles_total'],
+            'dispositivos': len(dispositivos),
+            'precio_total': sum(precios[dispositivo] for dispositivo in dispositivos),
+        }
+        if simular:
+            return resultado
+
+        periodo_actual = conta_m.PeriodoFiscal.objects.get(actual=True)
+        inv_m.Dispositivo.objects.filter(pk__in=dispositivos).update(
+            etapa_id=inv_m.DispositivoEtapa.DS,
+            valido=False)
+        conta_m.MovimientoDispositivo.objects.bulk_create(
+            [
+                conta_m.MovimientoDispositivo(
+                    fecha=desecho.fecha,
+                    dispositivo_id=dispositivo,
+                    periodo_fiscal=periodo_actual,
+                    tipo_movimiento=conta_m.MovimientoDispositivo.BAJA,
+                    referencia='Salida Desecho{}'.format(desecho.id),
+                    precio=precios[dispositivo])
+                for dispositivo in dispositivos
+            ],
+            batch_size=batch_size)
+        # `bulk_create` no envía señales y el desecho puede tener fecha de un período cerrado
+        conta_informes.invalidar_cierres(desecho.fecha)
+        desecho.en_creacion = False
+        desecho.save()
+    return resultado
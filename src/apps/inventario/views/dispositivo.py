@@ -9,7 +9,6 @@ from django.contrib import messages
 from django.shortcuts import reverse
 from django.views.generic import DetailView, UpdateView, CreateView, ListView, FormView
 from django.db.models import Q
-from django.db.models import Sum
 from braces.views import (
     LoginRequiredMixin, PermissionRequiredMixin, GroupRequiredMixin
 )
@@ -159,21 +158,7 @@ class DevolucionCreateView(LoginRequiredMixin, CreateView):
         validar_dispositivos = inv_m.DispositivoTipo.objects.get(tipo=tipo_dispositivo)
 
         if(validar_dispositivos.kardex):
-            sum_solicitudes = sum_devoluciones = sum_paquetes = 0
-            solicitudes = inv_m.SolicitudMovimiento.objects.filter(no_salida=no_salida, tipo_dispositivo=validar_dispositivos, terminada=True, recibida=True, devolucion=False).aggregate(Sum('cantidad'))
-            devoluciones = inv_m.SolicitudMovimiento.objects.filter(no_salida=no_salida, tipo_dispositivo=validar_dispositivos, terminada=True, recibida=True, devolucion=True).aggregate(Sum('cantidad'))
-            paquetes = inv_m.Paquete.objects.filter(salida=no_salida, tipo_paquete__tipo_dispositivo=validar_dispositivos, desactivado=False).aggregate(Sum('cantidad'))
-
-            if solicitudes['cantidad__sum'] is not None:
-                sum_solicitudes = solicitudes['cantidad__sum']
-
-            if devoluciones['cantidad__sum'] is not None:
-                sum_devoluciones = devoluciones['cantidad__sum']
-
-            if paquetes['cantidad__sum'] is not None:
-                sum_paquetes = paquetes['cantidad__sum']
-        
-            numero_dispositivos = sum_solicitudes - sum_devoluciones - sum_paquetes
+            numero_dispositivos = inv_m.ExistenciaSalida.consultar(no_salida, validar_dispositivos)
         else:
             dispositivos_salida = inv_m.CambioEtapa.objects.filter(solicitud__no_salida=no_salida, etapa_final=etapa).values('dispositivo')
             numero_dispositivos = inv_m.Dispositivo.objects.filter(id__in=dispositivos_salida, tipo=validar_dispositivos, etapa=etapa, estado=estado).count()
@@ -640,7 +625,7 @@ class DispositivosTarimaQr(LoginRequiredMixin, DetailView):
             tarima=tarima,
             tipo=tipo,
             estado=inv_m.DispositivoEstado.PD,
-            etapa=inv_m.DispositivoEtapa.AB).order_by('triage')
+            etapa=inv_m.DispositivoEtapa.AB).select_related('tipo').order_by('triage')
 
         context = super(DispositivosTarimaQr, self).get_context_data(**kwargs)
         context['dispositivo_qr'] = tarima_print
@@ -179,7 +179,7 @@ class ImprimirQr(LoginRequiredMixin, GroupRequiredMixin, DetailView):
     def get_context_data(self, **kwargs):
         context = super(ImprimirQr, self).get_context_data(**kwargs)
         imprimir_qr = inv_m.Dispositivo.objects.filter(entrada=self.object.id,
-                                                       entrada_detalle=self.kwargs['detalle']).order_by('triage')
+                                                       entrada_detalle=self.kwargs['detalle']).select_related('tipo').order_by('triage')
         for dispositivo in imprimir_qr:
             dispositivo.impreso = True
             dispositivo.save()
@@ -197,7 +197,7 @@ class ReporteRepuestosQr(LoginRequiredMixin, GroupRequiredMixin, DetailView):
     def get_context_data(self, **kwargs):
         context = super(ReporteRepuestosQr, self).get_context_data(**kwargs)
         imprimir_qr = inv_m.Repuesto.objects.filter(entrada=self.object.id,
-                                                    entrada_detalle=self.kwargs['detalle']).order_by('id')
+                                                    entrada_detalle=self.kwargs['detalle']).select_related('tipo').order_by('id')
         context['dispositivo_qr'] = imprimir_qr
         return context
 
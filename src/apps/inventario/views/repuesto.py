@@ -83,5 +83,5 @@ class RepuestosQRprintList(LoginRequiredMixin, DetailView):
                 tarima_print = tarima_print.filter(modelo=modelo).order_by('id')
 
         context = super(RepuestosQRprintList, self).get_context_data(**kwargs)
-        context['dispositivo_qr'] = tarima_print
+        context['dispositivo_qr'] = tarima_print.select_related('tipo')
         return context
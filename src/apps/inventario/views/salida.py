@@ -17,6 +17,15 @@ from django import forms
 from dateutil.relativedelta import relativedelta
 
 
+def dispositivos_paquetes(salida, tipo_paquete, *relacionados):
+    """Devuelve los dispositivos asignados a los paquetes de `tipo_paquete` en la `salida` como instancias
+    de su modelo hijo, con una consulta por cada modelo en lugar de una por dispositivo.
+    """
+    return inv_m.Dispositivo.objects.filter(
+        asignacion__paquete__salida=salida,
+        asignacion__paquete__tipo_paquete=tipo_paquete).order_by('asignacion__id').como_hijos(*relacionados)
+
+
 class SalidaInventarioCreateView(LoginRequiredMixin, GroupRequiredMixin, CreateView):
     """Vista   para obtener los datos de Salida mediante una :class:`SalidaInventario`
     Funciona  para recibir los datos de un  'SalidaInventarioForm' mediante el metodo  POST.  y
@@ -403,10 +412,6 @@ class GarantiaPrintView(LoginRequiredMixin, GroupRequiredMixin, DetailView):
         CPU = inv_m.PaqueteTipo.objects.get(nombre="CPU")
         Laptop = inv_m.PaqueteTipo.objects.get(nombre="Laptop")
         Tablet = inv_m.PaqueteTipo.objects.get(nombre="Tablet")
-        total_cpu = inv_m.DispositivoPaquete.objects.filter(
-            paquete__salida__id=self.object.id,
-            paquete__tipo_paquete=CPU,
-            )
         Total_Cpu = inv_m.Paquete.objects.filter(
             salida__id=self.object.id,
             tipo_paquete=CPU).aggregate(total_cpu=Sum('cantidad'))
@@ -416,13 +421,9 @@ class GarantiaPrintView(LoginRequiredMixin, GroupRequiredMixin, DetailView):
         Total_Tablet = inv_m.Paquete.objects.filter(
             salida__id=self.object.id,
             tipo_paquete=Tablet).aggregate(total_tablet=Sum('cantidad'))
-        for triage_cpu in total_cpu:
-            nuevo_cpu = inv_m.Dispositivo.objects.get(triage=triage_cpu.dispositivo).cast()
-            try:
-                if nuevo_cpu.servidor is True:
-                    cpu_servidor = cpu_servidor + 1
-            except Exception as e:
-                print(e)
+        for nuevo_cpu in dispositivos_paquetes(self.object, CPU):
+            if getattr(nuevo_cpu, 'servidor', False) is True:
+                cpu_servidor = cpu_servidor + 1
         if Total_Cpu['total_cpu'] is None:
             Total_Cpu['total_cpu'] = 0
         if Total_Laptop['total_laptop'] is None:
@@ -450,30 +451,17 @@ class LaptopPrintView(LoginRequiredMixin, GroupRequiredMixin, DetailView):
 
     def get_context_data(self, **kwargs):
         context = super(LaptopPrintView, self).get_context_data(**kwargs)
-        nuevas_laptops = []
         cpu_servidor = ""
         Laptop = inv_m.PaqueteTipo.objects.get(nombre="Laptop")
         cpu = inv_m.PaqueteTipo.objects.get(nombre="CPU")
-        Total_Laptop = inv_m.DispositivoPaquete.objects.filter(
-            paquete__salida__id=self.object.id,
-            paquete__tipo_paquete=Laptop)
-        total_cpu = inv_m.DispositivoPaquete.objects.filter(
-            paquete__salida__id=self.object.id,
-            paquete__tipo_paquete=cpu,
-            )
         cantidad_total = inv_m.DispositivoPaquete.objects.filter(
             paquete__salida__id=self.object.id,
             paquete__tipo_paquete=Laptop).count()
-        for triage_cpu in total_cpu:
-            nuevo_cpu = inv_m.Dispositivo.objects.get(triage=triage_cpu.dispositivo).cast()
-            try:
-                if nuevo_cpu.servidor is True:
-                    cpu_servidor = str(nuevo_cpu.version_sistema)
-            except Exception as e:
-                print(e)
-        for triage in Total_Laptop:
-            nuevo_laptop = inv_m.Dispositivo.objects.get(triage=triage.dispositivo).cast()
-            nuevas_laptops.append(nuevo_laptop)
+        for nuevo_cpu in dispositivos_paquetes(self.object, cpu, 'version_sistema'):
+            if getattr(nuevo_cpu, 'servidor', False) is True:
+                cpu_servidor = str(nuevo_cpu.version_sistema)
+        nuevas_laptops = dispositivos_paquetes(
+            self.object, Laptop, 'marca', 'procesador', 'version_sistema', 'disco_duro__medida', 'ram_medida')
         escuela = inv_m.SalidaInventario.objects.get(id=self.object.id)
         try:
             encargado = escuela_m.EscContacto.objects.get(escuela=escuela.escuela, rol=5)
@@ -496,7 +484,6 @@ class TabletPrintView(LoginRequiredMixin, GroupRequiredMixin, DetailView):
 
     def get_context_data(self, **kwargs):
         context = super(TabletPrintView, self).get_context_data(**kwargs)
-        nuevas_tablets = []
         Tablet = inv_m.PaqueteTipo.objects.get(nombre="Tablet")
         Cargador = inv_m.PaqueteTipo.objects.get(nombre="Cargadores")
 
@@ -506,9 +493,9 @@ class TabletPrintView(LoginRequiredMixin, GroupRequiredMixin, DetailView):
         Total_Cargador = inv_m.Paquete.objects.filter(
             salida__id=self.object.id,
             tipo_paquete=Cargador).aggregate(cargadores=Sum('cantidad'))
-        for triage in Total_Tablet:
-            nueva_tablet = inv_m.Dispositivo.objects.get(triage=triage.dispositivo).cast()
-            nuevas_tablets.append(nueva_tablet)
+        nuevas_tablets = dispositivos_paquetes(
+            self.object, Tablet, 'marca', 'procesador', 'version_sistema', 'so_id', 'medida_almacenamiento',
+            'medida_ram')
         escuela = inv_m.SalidaInventario.objects.get(id=self.object.id)
         try:
             encargado = escuela_m.EscContacto.objects.get(escuela=escuela.escuela, rol=5)
@@ -534,10 +521,6 @@ class TpePrintView(LoginRequiredMixin, GroupRequiredMixin, DetailView):
     def get_context_data(self, **kwargs):
         context = super(TpePrintView, self).get_context_data(**kwargs)
         cpu_servidor = ""
-        nuevos_cpus = []
-        nuevos_teclados = []
-        nuevos_monitores = []
-        nuevos_mouse = []
         cpu = inv_m.PaqueteTipo.objects.get(nombre="CPU")
         monitor = inv_m.PaqueteTipo.objects.get(nombre="MONITOR")
         mouse = inv_m.PaqueteTipo.objects.get(nombre="MOUSE")
@@ -595,40 +578,19 @@ class TpePrintView(LoginRequiredMixin, GroupRequiredMixin, DetailView):
             paquete__salida__id=self.object.id,
             paquete__tipo_paquete=cpu,
             )
-        total_monitor = inv_m.DispositivoPaquete.objects.filter(
-            paquete__salida__id=self.object.id,
-            paquete__tipo_paquete=monitor,
-            )
-        total_teclado = inv_m.DispositivoPaquete.objects.filter(
-            paquete__salida__id=self.object.id,
-            paquete__tipo_paquete=teclado,
-            )
-        total_mouse = inv_m.DispositivoPaquete.objects.filter(
-            paquete__salida__id=self.object.id,
-            paquete__tipo_paquete=mouse,
-            )
         total_cables_vga = inv_m.Paquete.objects.filter(
             salida=self.object.id,
             tipo_paquete=cables_vga,
             desactivado=False
             ).aggregate(total_cables_vga=Sum('cantidad'))
-        for triage in total_cpu:
-            nueva_cpu = inv_m.Dispositivo.objects.get(triage=triage.dispositivo).cast()
-            nuevos_cpus.append(nueva_cpu)
-            try:
-                if nueva_cpu.servidor is True:
-                    cpu_servidor = str(nueva_cpu.version_sistema)
-            except Exception as e:
-                print(e)
-        for triage_monitor in total_monitor:
-            nuevo_monitor = inv_m.Dispositivo.objects.get(triage=triage_monitor.dispositivo).cast()
-            nuevos_monitores.append(nuevo_monitor)
-        for triage_teclado in total_teclado:
-            nuevo_teclado = inv_m.Dispositivo.objects.get(triage=triage_teclado.dispositivo).cast()
-            nuevos_teclados.append(nuevo_teclado)
-        for triage_mouse in total_mouse:
-            nuevo_mouse = inv_m.Dispositivo.objects.get(triage=triage_mouse.dispositivo).cast()
-            nuevos_mouse.append(nuevo_mouse)
+        nuevos_cpus = dispositivos_paquetes(
+            self.object, cpu, 'marca', 'procesador', 'version_sistema', 'disco_duro__medida', 'ram_medida')
+        for nueva_cpu in nuevos_cpus:
+            if getattr(nueva_cpu, 'servidor', False) is True:
+                cpu_servidor = str(nueva_cpu.version_sistema)
+        nuevos_monitores = dispositivos_paquetes(self.object, monitor, 'marca', 'tipo')
+        nuevos_teclados = dispositivos_paquetes(self.object, teclado, 'marca')
+        nuevos_mouse = dispositivos_paquetes(self.object, mouse, 'marca')
         escuela = inv_m.SalidaInventario.objects.get(id=self.object.id)
         try:
             encargado = escuela_m.EscContacto.objects.filter(escuela=escuela.escuela, rol=5).reverse()[0]
@@ -678,21 +640,13 @@ class MineducPrintView(LoginRequiredMixin, GroupRequiredMixin, DetailView):
 
     def get_context_data(self, **kwargs):
         context = super(MineducPrintView, self).get_context_data(**kwargs)
-        nuevos_cpus = []
         cpu_servidor = ""
         cpu = inv_m.PaqueteTipo.objects.get(nombre="CPU")
-        total_cpu = inv_m.DispositivoPaquete.objects.filter(
-            paquete__salida__id=self.object.id,
-            paquete__tipo_paquete=cpu,
-            )
-        for triage in total_cpu:
-            nueva_cpu = inv_m.Dispositivo.objects.get(triage=triage.dispositivo).cast()
-            nuevos_cpus.append(nueva_cpu)
-            try:
-                if nueva_cpu.servidor is True:
-                    cpu_servidor = str(nueva_cpu.version_sistema)
-            except Exception as e:
-                print(e)
+        nuevos_cpus = dispositivos_paquetes(
+            self.object, cpu, 'marca', 'procesador', 'version_sistema', 'disco_duro__medida', 'ram_medida')
+        for nueva_cpu in nuevos_cpus:
+            if getattr(nueva_cpu, 'servidor', False) is True:
+                cpu_servidor = str(nueva_cpu.version_sistema)
         escuela = inv_m.SalidaInventario.objects.get(id=self.object.id)
         try:
             encargado = escuela_m.EscContacto.objects.get(escuela=escuela.escuela, rol=5)
@@ -703,7 +657,7 @@ class MineducPrintView(LoginRequiredMixin, GroupRequiredMixin, DetailView):
             context['Jornada'] = "No tiene Jornada"
             context['Encargado'] = "No Tiene Encargado"
         context['CPUs'] = nuevos_cpus
-        context['Total'] = total_cpu.count()
+        context['Total'] = len(nuevos_cpus)
         context['Servidor'] = cpu_servidor
         return context
 
@@ -725,8 +679,9 @@ class PrestamoCartaPrintView(LoginRequiredMixin, GroupRequiredMixin, DetailView)
         Total_Servidor = inv_m.DispositivoPaquete.objects.filter(
             paquete__salida__id=self.object.id,
             dispositivo__tipo=CPU2)
-        for nuevos in Total_Servidor:
-            if nuevos.dispositivo.cast().servidor is True:
+        for nuevo_cpu in inv_m.Dispositivo.objects.filter(
+                asignacion__in=Total_Servidor).order_by('asignacion__id').como_hijos():
+            if getattr(nuevo_cpu, 'servidor', False) is True:
                 cpu_servidor = cpu_servidor + 1
         Total_Cpu = inv_m.Paquete.objects.filter(
             salida__id=self.object.id,
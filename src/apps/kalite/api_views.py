@@ -1,5 +1,5 @@
 import django_filters
-from django.db.models import Count, Avg
+from django.db.models import Count, Max, Min, OuterRef, Subquery
 from django_filters import rest_framework as filters
 from rest_framework import viewsets
 
@@ -12,6 +12,7 @@ from apps.kalite.models import (
     Punteo, Evaluacion, Visita, Grado, EjerciciosGrado)
 
 from apps.escuela.models import Escuela
+from apps.main.mixins import ProyeccionApiMixin
 
 
 class PunteoViewSet(viewsets.ModelViewSet):
@@ -40,9 +41,13 @@ class VisitaFilter(filters.FilterSet):
         fields = ['capacitador', 'fecha_min', 'fecha_max']
 
 
-class VisitaViewSet(viewsets.ModelViewSet):
+class VisitaViewSet(ProyeccionApiMixin, viewsets.ModelViewSet):
     serializer_class = VisitaSerializer
-    queryset = Visita.objects.all()
+    queryset = Visita.objects.select_related(
+        'escuela__municipio__departamento',
+        'escuela__resumen_kalite',
+        'capacitador',
+        'tipo_visita').con_poblacion()
     filter_class = VisitaFilter
 
 
@@ -89,8 +94,12 @@ class EscuelaVisitaViewSet(viewsets.ModelViewSet):
     """
     serializer_class = EscuelaVisitadaSerializer
     queryset = Escuela.objects\
+        .select_related('municipio__departamento')\
         .annotate(
             cantidad=Count('visitas_kalite'),
-            promedio=Avg('visitas_kalite__evaluaciones__notas__nota')
+            fecha_primera_visita=Min('visitas_kalite__fecha'),
+            fecha_ultima_visita=Max('visitas_kalite__fecha'),
+            promedio=Subquery(
+                Visita.objects.filter(escuela=OuterRef('pk')).order_by('-fecha', '-id').values('nota_promedio')[:1])
         ).filter(cantidad__gt=0)
     filter_class = EscuelaVisitaFilter
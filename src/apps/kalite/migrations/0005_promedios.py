@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-18 16:32
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Avg, Count, FloatField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def calcular_promedios(apps, schema_editor):
+    Punteo = apps.get_model('kalite', 'Punteo')
+    Evaluacion = apps.get_model('kalite', 'Evaluacion')
+    Visita = apps.get_model('kalite', 'Visita')
+    ResumenEscuela = apps.get_model('kalite', 'ResumenEscuela')
+
+    def promedio(queryset, campo, agrupar):
+        queryset = queryset.order_by().values(agrupar).annotate(promedio=Avg(campo)).values('promedio')
+        return Coalesce(Subquery(queryset, output_field=FloatField()), 0)
+
+    Evaluacion.objects.update(
+        nota_promedio=promedio(Punteo.objects.filter(evaluacion=OuterRef('pk')), 'nota', 'evaluacion') * 20)
+    Visita.objects.update(
+        nota_promedio=promedio(Evaluacion.objects.filter(visita=OuterRef('pk')), 'nota_promedio', 'visita'))
+    totales = Visita.objects.order_by().values_list('escuela').annotate(
+        cantidad=Count('id'),
+        promedio=Avg('nota_promedio'))
+    ResumenEscuela.objects.bulk_create(
+        ResumenEscuela(escuela_id=escuela, visitas=cantidad, nota_promedio=promedio)
+        for escuela, cantidad, promedio in totales)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('escuela', '0010_auto_20171117_0807'),
+        ('kalite', '0004_auto_20171111_0757'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenEscuela',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('visitas', models.PositiveIntegerField(default=0)),
+                ('nota_promedio', models.FloatField(default=0)),
+                ('escuela', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='resumen_kalite', to='escuela.Escuela')),
+            ],
+            options={
+                'verbose_name': 'Resumen de KA Lite',
+                'verbose_name_plural': 'Resúmenes de KA Lite',
+            },
+        ),
+        migrations.AddField(
+            model_name='evaluacion',
+            name='nota_promedio',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='visita',
+            name='nota_promedio',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.RunPython(calcular_promedios, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,10 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Avg, Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.urls import reverse_lazy
 
 from django.contrib.auth.models import User
-from apps.escuela.models import Escuela
+from apps.escuela.models import Escuela, EscPoblacion
 
 
 class Rubrica(models.Model):
@@ -51,9 +53,29 @@ class TipoVisita(models.Model):
         return self.nombre
 
 
+def promedio_subconsulta(queryset, campo, agrupar):
+    """Subconsulta con el promedio de `campo` en `queryset`, agrupado por `agrupar`."""
+    queryset = queryset.order_by().values(agrupar).annotate(promedio=Avg(campo)).values('promedio')
+    return Coalesce(Subquery(queryset, output_field=models.FloatField()), 0)
+
+
+class VisitaQuerySet(models.QuerySet):
+    def con_poblacion(self):
+        """Agrega la cantidad de maestros (`total_maestro`) y alumnos (`total_alumno`) de la última
+        :class:`EscPoblacion` registrada para la escuela de cada visita.
+        """
+        poblaciones = EscPoblacion.objects.filter(escuela=OuterRef('escuela')).order_by('-id')
+        return self.annotate(
+            total_maestro=Subquery(poblaciones.values('total_maestro')[:1]),
+            total_alumno=Subquery(poblaciones.values('total_alumno')[:1]))
+
+
 class Visita(models.Model):
     """Visita de seguimiento de KA Lite después de que la escuela ha
     recibido la capacitación.
+
+    `nota_promedio` guarda el promedio de sus :class:`kalite.Evaluacion`es y se actualiza mediante
+    :meth:`actualizar_promedios` cada vez que cambia un :class:`kalite.Punteo`.
     """
 
     escuela = models.ForeignKey(Escuela, related_name='visitas_kalite', on_delete=models.CASCADE)
@@ -64,6 +86,9 @@ class Visita(models.Model):
     capacitador = models.ForeignKey(User, related_name='visitas_kalite', on_delete=models.CASCADE)
     numero = models.PositiveIntegerField(default=1)
     observaciones = models.TextField(null=True, blank=True)
+    nota_promedio = models.FloatField(default=0, editable=False)
+
+    objects = VisitaQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Visita de KA Lite"
@@ -80,45 +105,68 @@ class Visita(models.Model):
         """Al registrar este objeto en la base de datos, crea las
         :class:`kalite.Evaluacion`es indicadas en `tipo_visita`.
         """
-        if not self.pk:
-            super(Visita, self).save(*args, **kwargs)
-            self.crear_evaluaciones()
-        else:
-            super(Visita, self).save(*args, **kwargs)
+        with transaction.atomic():
+            if not self.pk:
+                super(Visita, self).save(*args, **kwargs)
+                self.crear_evaluaciones()
+            else:
+                super(Visita, self).save(*args, **kwargs)
+            Visita.actualizar_promedios([self.pk])
+
+    def delete(self, *args, **kwargs):
+        escuela = self.escuela_id
+        resultado = super(Visita, self).delete(*args, **kwargs)
+        ResumenEscuela.actualizar([escuela])
+        return resultado
 
     def crear_evaluaciones(self):
         """Crea las :class:`kalite.Evaluacion`s indicadas por el
         :class:`kalite.TipoVisita` de este objeto.
         """
-        for rubrica in self.tipo_visita.rubricas.all():
-            self.evaluaciones.create(rubrica=rubrica)
+        Evaluacion.objects.bulk_create(
+            Evaluacion(visita=self, rubrica=rubrica) for rubrica in self.tipo_visita.rubricas.all())
+        # `bulk_create` no devuelve los ids en todas las bases de datos
+        Evaluacion.crear_notas_varias(self.evaluaciones.all())
+
+    @classmethod
+    def actualizar_promedios(cls, visitas=None, escuelas=None):
+        """Recalcula en la base de datos el promedio de las :class:`kalite.Evaluacion`es de `visitas`,
+        el de cada visita y el :class:`kalite.ResumenEscuela` de sus escuelas.
+        `visitas` es una lista de ids; no debe ser un queryset de :class:`kalite.Evaluacion` porque MySQL no
+        permite actualizar una tabla con una subconsulta sobre la misma tabla. Si es `None`, se recalculan todas.
+        """
+        evaluaciones = Evaluacion.objects.all()
+        queryset = cls.objects.all()
+        if visitas is not None:
+            evaluaciones = evaluaciones.filter(visita__in=visitas)
+            queryset = queryset.filter(id__in=visitas)
+            if escuelas is None:
+                escuelas = list(queryset.order_by().values_list('escuela', flat=True).distinct())
+        with transaction.atomic():
+            evaluaciones.update(nota_promedio=promedio_subconsulta(
+                Punteo.objects.filter(evaluacion=OuterRef('pk')), 'nota', 'evaluacion') * Punteo.MULTIPLICADOR)
+            queryset.update(nota_promedio=promedio_subconsulta(
+                Evaluacion.objects.filter(visita=OuterRef('pk')), 'nota_promedio', 'visita'))
+            ResumenEscuela.actualizar(escuelas)
 
     @property
     def promedio(self):
-        evaluaciones_count = self.evaluaciones.count()
-        if evaluaciones_count > 0:
-            promedio = sum(e.promedio for e in self.evaluaciones.all()) / self.evaluaciones.count()
-        else:
-            promedio = 0
-        return round(promedio, 2)
+        return round(self.nota_promedio, 2)
 
     @property
-    def promedio_escuela(self):
-        visitas_list = Visita.objects.filter(escuela = self.escuela)
-        promedio_total = 0
-        for visita in visitas_list:
-            evaluaciones_count = visita.evaluaciones.count()
-            promedio = 0
-            if evaluaciones_count > 0:
-                promedio = sum(e.promedio for e in visita.evaluaciones.all()) / visita.evaluaciones.count()
-            promedio_total += promedio
+    def resumen_escuela(self):
+        try:
+            return self.escuela.resumen_kalite
+        except ResumenEscuela.DoesNotExist:
+            return ResumenEscuela(escuela=self.escuela)
 
-        return round(promedio_total / visitas_list.count(), 2)
+    @property
+    def promedio_escuela(self):
+        return round(self.resumen_escuela.nota_promedio, 2)
 
     @property
     def visitas_escuela(self):
-        visitas_list = Visita.objects.filter(escuela = self.escuela)
-        return  visitas_list.count()
+        return self.resumen_escuela.visitas
 
     @property
     def estado(self):
@@ -131,6 +179,53 @@ class Visita(models.Model):
             return {'alcance': 'Bajo', 'color': 'red'}
 
 
+class ResumenEscuela(models.Model):
+    """Cantidad de :class:`kalite.Visita`s de una escuela y el promedio de sus notas.
+    Lo mantiene :meth:`kalite.Visita.actualizar_promedios`.
+    """
+
+    escuela = models.OneToOneField(Escuela, related_name='resumen_kalite', on_delete=models.CASCADE)
+    visitas = models.PositiveIntegerField(default=0)
+    nota_promedio = models.FloatField(default=0)
+
+    class Meta:
+        verbose_name = "Resumen de KA Lite"
+        verbose_name_plural = "Resúmenes de KA Lite"
+
+    def __str__(self):
+        return '{} - {}'.format(self.escuela, round(self.nota_promedio, 2))
+
+    @classmethod
+    def actualizar(cls, escuelas=None):
+        """Recalcula en la base de datos los resúmenes de `escuelas` (por defecto, todas) desde sus visitas.
+        Los resúmenes existentes se actualizan con subconsultas en lugar de borrarlos y crearlos otra vez,
+        para que dos actualizaciones simultáneas de la misma escuela no choquen con la llave única.
+        """
+        visitas = Visita.objects.all()
+        resumenes = cls.objects.all()
+        if escuelas is not None:
+            escuelas = list(escuelas)
+            visitas = visitas.filter(escuela__in=escuelas)
+            resumenes = resumenes.filter(escuela__in=escuelas)
+        with transaction.atomic():
+            faltantes = set(visitas.filter(escuela__resumen_kalite__isnull=True).order_by().values_list(
+                'escuela', flat=True).distinct())
+            if faltantes:
+                try:
+                    with transaction.atomic():
+                        cls.objects.bulk_create(cls(escuela_id=escuela) for escuela in faltantes)
+                except IntegrityError:
+                    # Otra transacción creó alguno de los resúmenes al mismo tiempo
+                    for escuela in faltantes:
+                        cls.objects.get_or_create(escuela_id=escuela)
+            cantidad = Visita.objects.filter(escuela=OuterRef('escuela')).order_by().values(
+                'escuela').annotate(cantidad=Count('id')).values('cantidad')
+            resumenes.update(
+                visitas=Coalesce(Subquery(cantidad, output_field=models.PositiveIntegerField()), 0),
+                nota_promedio=promedio_subconsulta(
+                    Visita.objects.filter(escuela=OuterRef('escuela')), 'nota_promedio', 'escuela'))
+
+
 class Indicador(models.Model):
     """Indicador a evaluar de la :class:`kalite.Rubrica`."""
     rubrica = models.ForeignKey(Rubrica, related_name='indicadores', on_delete=models.CASCADE)
@@ -155,6 +250,7 @@ class Evaluacion(models.Model):
     visita = models.ForeignKey(Visita, related_name='evaluaciones', on_delete=models.CASCADE)
     rubrica = models.ForeignKey(Rubrica, on_delete=models.CASCADE)
     observaciones = models.TextField(null=True, blank=True)
+    nota_promedio = models.FloatField(default=0, editable=False)
 
     class Meta:
         verbose_name = "Evaluación"
@@ -174,24 +270,37 @@ class Evaluacion(models.Model):
         if not self.pk:
             super(Evaluacion, self).save(*args, **kwargs)
             self.crear_notas()
+            Visita.actualizar_promedios([self.visita_id])
         else:
             super(Evaluacion, self).save(*args, **kwargs)
 
+    def delete(self, *args, **kwargs):
+        visita = self.visita_id
+        resultado = super(Evaluacion, self).delete(*args, **kwargs)
+        Visita.actualizar_promedios([visita])
+        return resultado
+
     def crear_notas(self):
         """Crea los registros de :class:`kalite.Punteo` asociados a la
         :class:`kalite.Rubrica` de este objeto en particular.
         """
-        for indicador in self.rubrica.indicadores.all():
-            self.notas.create(indicador=indicador)
+        Evaluacion.crear_notas_varias([self])
+
+    @classmethod
+    def crear_notas_varias(cls, evaluaciones):
+        """Crea con un solo `bulk_create` los :class:`kalite.Punteo`s de varias evaluaciones."""
+        evaluaciones = list(evaluaciones)
+        indicadores = {}
+        for indicador in Indicador.objects.filter(rubrica__in={e.rubrica_id for e in evaluaciones}).order_by('id'):
+            indicadores.setdefault(indicador.rubrica_id, []).append(indicador)
+        Punteo.objects.bulk_create(
+            Punteo(evaluacion=evaluacion, indicador=indicador)
+            for evaluacion in evaluaciones
+            for indicador in indicadores.get(evaluacion.rubrica_id, []))
 
     @property
     def promedio(self):
-        notas_count = self.notas.count()
-        if notas_count > 0:
-            promedio = sum(n.nota for n in self.notas.all()) / notas_count
-        else:
-            promedio = 0
-        return round(20 * promedio, 2)
+        return round(self.nota_promedio, 2)
 
 
 class Punteo(models.Model):
@@ -228,6 +337,17 @@ class Punteo(models.Model):
             indicador=str(self.indicador)[:15],
             porcentaje=self.nota * self.MULTIPLICADOR)
 
+    def save(self, *args, **kwargs):
+        """Al registrar o modificar la nota se actualizan los promedios de la :class:`kalite.Visita`."""
+        super(Punteo, self).save(*args, **kwargs)
+        Visita.actualizar_promedios([self.evaluacion.visita_id])
+
+    def delete(self, *args, **kwargs):
+        visitas = list(Evaluacion.objects.filter(id=self.evaluacion_id).values_list('visita', flat=True))
+        resultado = super(Punteo, self).delete(*args, **kwargs)
+        Visita.actualizar_promedios(visitas)
+        return resultado
+
     @property
     def multiplicador(self):
         return self.MULTIPLICADOR
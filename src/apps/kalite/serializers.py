@@ -1,6 +1,5 @@
 from datetime import datetime
 from rest_framework import serializers
-from django.db.models import Avg
 from apps.main.serializers import DynamicFieldsModelSerializer
 from apps.escuela.serializers import EscuelaSerializer
 
@@ -44,10 +43,14 @@ class VisitaSerializer(DynamicFieldsModelSerializer):
         read_only_fields = ('id', 'escuela')
 
     def get_poblacion(self, obj):
+        if hasattr(obj, 'total_maestro'):
+            return obj.total_maestro or 0
         poblacion = obj.escuela.poblaciones.last()
         return poblacion.total_maestro if poblacion else 0
 
     def get_estudiantes(self, obj):
+        if hasattr(obj, 'total_alumno'):
+            return obj.total_alumno or 0
         estudiantes = obj.escuela.poblaciones.last()
         return estudiantes.total_alumno if estudiantes else 0
 
@@ -114,9 +117,9 @@ class EscuelaVisitadaSerializer(DynamicFieldsModelSerializer):
     municipio = serializers.StringRelatedField(source='municipio.nombre')
     departamento = serializers.StringRelatedField(source='municipio.departamento')
     url = serializers.URLField(source='get_absolute_url')
-    fecha_primera_visita = serializers.SerializerMethodField()
-    fecha_ultima_visita = serializers.SerializerMethodField()
-    cantidad = serializers.IntegerField(source='visitas_kalite.count')
+    fecha_primera_visita = serializers.DateField()
+    fecha_ultima_visita = serializers.DateField()
+    cantidad = serializers.IntegerField()
     lapso = serializers.SerializerMethodField()
     promedio = serializers.SerializerMethodField()
 
@@ -135,17 +138,10 @@ class EscuelaVisitadaSerializer(DynamicFieldsModelSerializer):
             'promedio'
         )
 
-    def get_fecha_primera_visita(self, obj):
-        return obj.visitas_kalite.order_by('fecha').first().fecha
-
-    def get_fecha_ultima_visita(self, obj):
-        return obj.visitas_kalite.order_by('fecha').last().fecha
-
     def get_lapso(self, obj):
-        ultima = obj.visitas_kalite.order_by('fecha').last().fecha
-        primera =obj.visitas_kalite.order_by('fecha').first().fecha
+        ultima = obj.fecha_ultima_visita
+        primera = obj.fecha_primera_visita
         return (ultima.year - primera.year) * 12 + (ultima.month - primera.month)
 
     def get_promedio(self, obj):
-        resultado = obj.visitas_kalite.order_by('fecha').last()
-        return round(resultado.promedio, 2)
+        return round(obj.promedio, 2)
@@ -1,3 +1,95 @@
+from datetime import date
+
+from django.contrib.auth.models import User
 from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.escuela.models import EscPoblacion
+from apps.escuela.tests.factories import EscuelaFactory
+from apps.kalite import models as kalite_m
+from apps.kalite.api_views import EscuelaVisitaViewSet, VisitaViewSet
+from apps.main import models as main_m
+
+
+class PromediosTestCase(TestCase):
+    """Pruebas para los promedios guardados de :class:`Visita`, :class:`Evaluacion` y :class:`ResumenEscuela`"""
+
+    def setUp(self):
+        self.usuario = User.objects.create(username='capacitador')
+        departamento = main_m.Departamento.objects.create(nombre='Guatemala')
+        municipio = main_m.Municipio.objects.create(departamento=departamento, nombre='Mixco')
+        self.escuela = EscuelaFactory(municipio=municipio)
+        self.otra_escuela = EscuelaFactory(municipio=municipio)
+        self.tipo_visita = kalite_m.TipoVisita.objects.create(nombre='Seguimiento')
+        for nombre, indicadores in (('Uso', 2), ('Planificación', 3)):
+            rubrica = kalite_m.Rubrica.objects.create(nombre=nombre)
+            for indice in range(indicadores):
+                rubrica.indicadores.create(indicador='Indicador {}'.format(indice))
+            self.tipo_visita.rubricas.add(rubrica)
+
+    def visita(self, escuela, numero, fecha=date(2020, 5, 1)):
+        return kalite_m.Visita.objects.create(
+            escuela=escuela, tipo_visita=self.tipo_visita, fecha=fecha, capacitador=self.usuario, numero=numero)
+
+    def calificar(self, visita, rubrica, *notas):
+        for punteo, nota in zip(visita.evaluaciones.get(rubrica__nombre=rubrica).notas.order_by('id'), notas):
+            punteo.nota = nota
+            punteo.save()
+
+    def test_promedios(self):
+        visita = self.visita(self.escuela, 1)
+        # Los punteos se crean con la nota mínima
+        self.assertEqual(kalite_m.Visita.objects.get(id=visita.id).promedio, 20)
+        self.calificar(visita, 'Uso', 5, 4)
+        self.calificar(visita, 'Planificación', 3, 3, 4)
+        visita = kalite_m.Visita.objects.get(id=visita.id)
+        self.assertEqual(visita.evaluaciones.get(rubrica__nombre='Uso').promedio, 90)
+        self.assertEqual(visita.evaluaciones.get(rubrica__nombre='Planificación').promedio, 66.67)
+        self.assertEqual(visita.promedio, 78.33)
+        self.assertEqual(visita.estado['alcance'], 'Alto')
+
+        resumen = kalite_m.ResumenEscuela.objects.get(escuela=self.escuela)
+        segunda = self.visita(self.escuela, 2)
+        segunda = kalite_m.Visita.objects.get(id=segunda.id)
+        self.assertEqual((segunda.visitas_escuela, segunda.promedio_escuela), (2, 49.17))
+        # El resumen existente se actualiza en lugar de borrarlo y crearlo otra vez
+        self.assertEqual(kalite_m.ResumenEscuela.objects.get(escuela=self.escuela).id, resumen.id)
+
+        segunda.delete()
+        visita = kalite_m.Visita.objects.get(id=visita.id)
+        self.assertEqual((visita.visitas_escuela, visita.promedio_escuela), (1, 78.33))
+
+        # Recalcular todo desde los punteos no cambia los valores guardados
+        kalite_m.Visita.actualizar_promedios()
+        self.assertEqual(kalite_m.Visita.objects.get(id=visita.id).nota_promedio, visita.nota_promedio)
+
+    def test_listados(self):
+        for numero in range(1, 4):
+            self.visita(self.escuela, numero, date(2020, numero, 1))
+            self.visita(self.otra_escuela, numero)
+        self.calificar(kalite_m.Visita.objects.get(escuela=self.escuela, numero=3), 'Uso', 5, 5)
+        EscPoblacion.objects.create(escuela=self.escuela, alumno=10, maestro=1)
+        EscPoblacion.objects.create(escuela=self.escuela, alumno=30, maestro=2)
+
+        request = APIRequestFactory().get('/')
+        force_authenticate(request, user=self.usuario)
+        with self.assertNumQueries(1):
+            visitas = VisitaViewSet.as_view({'get': 'list'})(request).data
+        visitas = [visita for visita in visitas if visita['escuela']['codigo'] == self.escuela.codigo]
+        self.assertEqual(len(visitas), 3)
+        self.assertEqual({(visita['poblacion'], visita['estudiantes']) for visita in visitas}, {(2, 30)})
+        self.assertEqual({visita['promedio_escuela'] for visita in visitas}, {33.33})
+
+        with self.assertNumQueries(1):
+            escuelas = EscuelaVisitaViewSet.as_view({'get': 'list'})(request).data
+        escuela = [escuela for escuela in escuelas if escuela['codigo'] == self.escuela.codigo][0]
+        self.assertEqual((escuela['cantidad'], escuela['lapso'], escuela['promedio']), (3, 2, 60))
 
-# Create your tests here.
+    def test_crear_evaluaciones(self):
+        # La visita, sus evaluaciones y punteos, y los promedios con un número fijo de consultas
+        with self.assertNumQueries(20):
+            visita = self.visita(self.escuela, 1)
+        self.assertEqual(visita.evaluaciones.count(), 2)
+        self.assertEqual(kalite_m.Punteo.objects.filter(evaluacion__visita=visita).count(), 5)
+        self.assertEqual(
+            sorted(visita.evaluaciones.values_list('rubrica__nombre', flat=True)), ['Planificación', 'Uso'])
@@ -51,6 +51,12 @@ class EquipoViewSet(viewsets.ModelViewSet):
     queryset = Equipo.objects.all()
     filter_class = EquipoFilter
 
+    def get_queryset(self):
+        """Calcula los totales del rango de fechas en la misma consulta del listado."""
+        return self.queryset.con_movimientos(
+            fecha_inicio=self.request.query_params.get('fecha_inicio') or None,
+            fecha_fin=self.request.query_params.get('fecha_fin') or None)
+
     def get_serializer_context(self):
         """Obtiene los parámetros enviados para filtrar la fecha
 
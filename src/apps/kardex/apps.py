@@ -4,4 +4,7 @@ from django.apps import AppConfig
 
 
 class KardexConfig(AppConfig):
-    name = 'kardex'
+    name = 'apps.kardex'
+
+    def ready(self):
+        from . import signals
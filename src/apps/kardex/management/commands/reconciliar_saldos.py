@@ -0,0 +1,13 @@
+from apps.kardex import models as kax_m
+from apps.main.saldos import ReconciliarCommand
+
+
+class Command(ReconciliarCommand):
+    help = (
+        'Compara los saldos del kardex con los calculados a partir de todos los detalles de entrada y salida, '
+        'y corrige las diferencias encontradas.')
+    modelo = kax_m.SaldoEquipo
+    argumento = 'equipos'
+    ayuda_argumento = 'IDs de los equipos a reconciliar. Si no se indica ninguno, se reconcilian todos.'
+    formato_diferencia = 'Equipo {} {}: {} != {}'
+    mensaje_coinciden = 'Los saldos coinciden con los detalles de entrada y salida'
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-18 16:29
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Sum
+
+
+def llenar_saldos(apps, schema_editor):
+    EntradaDetalle = apps.get_model('kardex', 'EntradaDetalle')
+    SalidaDetalle = apps.get_model('kardex', 'SalidaDetalle')
+    SaldoEquipo = apps.get_model('kardex', 'SaldoEquipo')
+    saldos = {}
+    for campo, modelo in (('entradas', EntradaDetalle), ('salidas', SalidaDetalle)):
+        for equipo, total in modelo.objects.order_by().values_list('equipo').annotate(total=Sum('cantidad')):
+            saldos.setdefault(equipo, {})[campo] = total
+    SaldoEquipo.objects.bulk_create(
+        SaldoEquipo(equipo_id=equipo, **valores) for equipo, valores in saldos.items())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kardex', '0018_auto_20200504_0859'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SaldoEquipo',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entradas', models.IntegerField(default=0)),
+                ('salidas', models.IntegerField(default=0)),
+                ('equipo', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='saldo', to='kardex.Equipo')),
+            ],
+            options={
+                'verbose_name': 'Saldo de equipo',
+                'verbose_name_plural': 'Saldos de equipo',
+            },
+        ),
+        migrations.RunPython(llenar_saldos, migrations.RunPython.noop),
+    ]
@@ -1,15 +1,50 @@
 from django.core.exceptions import ValidationError
 
 from django.db import models
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.urls import reverse_lazy
 from django.contrib.auth.models import User
 from apps.inventario.models import Entrada as EntradaInventario
+from apps.main import saldos
 from apps.inventario.models import SolicitudMovimiento as SolicitudMovimiento
 
 
+class EquipoQuerySet(models.QuerySet):
+    """QuerySet de :class:`Equipo` con los totales de entradas y salidas calculados en la base de datos."""
+
+    def con_movimientos(self, fecha_inicio=None, fecha_fin=None):
+        """Agrega a cada equipo la cantidad de detalles (`detalles_entrada_periodo`, `detalles_salida_periodo`)
+        y de unidades (`entradas_periodo`, `salidas_periodo`) de las entradas y salidas entre `fecha_inicio`
+        y `fecha_fin`, además de la existencia actual según su :class:`SaldoEquipo` (`existencia_saldo`).
+        """
+        entradas = EntradaDetalle.objects.filter(equipo=OuterRef('pk'))
+        salidas = SalidaDetalle.objects.filter(equipo=OuterRef('pk'))
+        if fecha_inicio is not None:
+            entradas = entradas.filter(entrada__fecha__gte=fecha_inicio)
+            salidas = salidas.filter(salida__fecha__gte=fecha_inicio)
+        if fecha_fin is not None:
+            entradas = entradas.filter(entrada__fecha__lte=fecha_fin)
+            salidas = salidas.filter(salida__fecha__lte=fecha_fin)
+
+        def total(queryset, agregado):
+            queryset = queryset.order_by().values('equipo').annotate(total=agregado).values('total')
+            return Coalesce(Subquery(queryset, output_field=models.IntegerField()), 0)
+
+        return self.annotate(
+            detalles_entrada_periodo=total(entradas, Count('id')),
+            detalles_salida_periodo=total(salidas, Count('id')),
+            entradas_periodo=total(entradas, Sum('cantidad')),
+            salidas_periodo=total(salidas, Sum('cantidad')),
+            existencia_saldo=Coalesce(
+                F('saldo__entradas') - F('saldo__salidas'), 0, output_field=models.IntegerField()))
+
+
 class Equipo(models.Model):
     nombre = models.CharField(max_length=70)
 
+    objects = EquipoQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'Equipo'
         verbose_name_plural = 'Equipo'
@@ -60,7 +95,53 @@ class Equipo(models.Model):
 
     @property
     def existencia(self):
-        return self.inventario_entrada() - self.inventario_salida()
+        """Existencia actual según el :class:`SaldoEquipo`."""
+        if hasattr(self, 'existencia_saldo'):
+            return self.existencia_saldo
+        try:
+            return self.saldo.existencia
+        except SaldoEquipo.DoesNotExist:
+            return 0
+
+
+class SaldoEquipo(saldos.Saldo):
+    """Total de unidades que han entrado y salido del kardex para un :class:`Equipo`.
+    Se actualiza en la misma transacción en que se guarda o elimina cada :class:`EntradaDetalle` y
+    :class:`SalidaDetalle`, y se puede reconstruir con el comando `reconciliar_saldos`.
+    """
+    equipo = models.OneToOneField(Equipo, on_delete=models.CASCADE, related_name='saldo')
+    entradas = models.IntegerField(default=0)
+    salidas = models.IntegerField(default=0)
+
+    LLAVE = ('equipo_id',)
+    CAMPOS = ('entradas', 'salidas')
+
+    class Meta:
+        verbose_name = 'Saldo de equipo'
+        verbose_name_plural = 'Saldos de equipo'
+
+    def __str__(self):
+        return '{}: {}'.format(self.equipo_id, self.existencia)
+
+    @property
+    def existencia(self):
+        return self.entradas - self.salidas
+
+    @classmethod
+    def consultas(cls, equipos):
+        for campo, modelo in (('entradas', EntradaDetalle), ('salidas', SalidaDetalle)):
+            queryset = modelo.objects.all()
+            if equipos is not None:
+                queryset = queryset.filter(equipo__in=equipos)
+            yield campo, queryset.order_by().values_list('equipo').annotate(total=Sum('cantidad'))
+
+
+class MovimientoSaldo(saldos.MovimientoSaldo):
+
+    """Detalle que modifica el :class:`SaldoEquipo` de su equipo en el campo `CAMPO_SALDO`."""
+
+    MODELO_SALDO = SaldoEquipo
+    LLAVE_SALDO = ('equipo_id',)
 
 
 class TipoProveedor(models.Model):
@@ -167,12 +248,14 @@ class Entrada(models.Model):
         return sum(d.cantidad for d in self.detalles.all())
 
 
-class EntradaDetalle(models.Model):
+class EntradaDetalle(MovimientoSaldo, models.Model):
     entrada = models.ForeignKey(Entrada, related_name='detalles', on_delete=models.CASCADE)
     equipo = models.ForeignKey(Equipo, related_name='detalles_entrada', on_delete=models.CASCADE)
     cantidad = models.PositiveIntegerField()
     precio = models.DecimalField(max_digits=9, decimal_places=2, null=True, blank=True, default=0.0)
 
+    CAMPO_SALDO = 'entradas'
+
     class Meta:
         verbose_name = 'Detalle de entrada'
         verbose_name_plural = 'Detalles de entrada'
@@ -216,11 +299,13 @@ class Salida(models.Model):
         return reverse_lazy('kardex_salida_print', kwargs={'pk': self.id})
 
 
-class SalidaDetalle(models.Model):
+class SalidaDetalle(MovimientoSaldo, models.Model):
     salida = models.ForeignKey(Salida, related_name='detalles', null=True, on_delete=models.CASCADE)
     equipo = models.ForeignKey(Equipo, on_delete=models.PROTECT, related_name='detalles_salida')
     cantidad = models.PositiveIntegerField()
 
+    CAMPO_SALDO = 'salidas'
+
     class Meta:
         verbose_name = 'Detalle de salida'
         verbose_name_plural = 'Detalles de salida'
@@ -10,12 +10,23 @@ class EquipoSerializer(DynamicFieldsModelSerializer, serializers.ModelSerializer
     cantidad_salida = serializers.SerializerMethodField()
     inventario_entrada = serializers.SerializerMethodField()
     inventario_salida = serializers.SerializerMethodField()
-    existencia = serializers.IntegerField()
+    existencia = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Equipo
         fields = '__all__'
 
+    def periodo(self):
+        return {'fecha_inicio': self.context.get('fecha_inicio'), 'fecha_fin': self.context.get('fecha_fin')}
+
+    def anotado(self, obj, campo):
+        """Obtiene el total `campo` calculado por :meth:`EquipoQuerySet.con_movimientos`.
+        Si el objeto no viene de ese queryset (por ejemplo, al crearlo), se calcula con una consulta.
+        """
+        if not hasattr(obj, campo):
+            obj = Equipo.objects.con_movimientos(**self.periodo()).get(pk=obj.pk)
+        return getattr(obj, campo)
+
     def get_cantidad_entrada(self, obj):
         """Para obtener la cantidad de :model:`kardex.EntradaDetalle`
         en el rango de fechas seleccionado. Depende del contexto
@@ -25,12 +36,7 @@ class EquipoSerializer(DynamicFieldsModelSerializer, serializers.ModelSerializer
         Returns:
             TYPE: int
         """
-        queryset = obj.detalles_entrada.all()
-        if self.context['fecha_inicio']:
-            queryset = queryset.filter(entrada__fecha__gte=self.context['fecha_inicio'])
-        if self.context['fecha_fin']:
-            queryset = queryset.filter(entrada__fecha__lte=self.context['fecha_fin'])
-        return queryset.count()
+        return self.anotado(obj, 'detalles_entrada_periodo')
 
     def get_cantidad_salida(self, obj):
         """Para obtener la cantidad de :model:`kardex.SalidaDetalle`
@@ -41,12 +47,7 @@ class EquipoSerializer(DynamicFieldsModelSerializer, serializers.ModelSerializer
         Returns:
             TYPE: int
         """
-        queryset = obj.detalles_salida.all()
-        if self.context['fecha_inicio']:
-            queryset = queryset.filter(salida__fecha__gte=self.context['fecha_inicio'])
-        if self.context['fecha_fin']:
-            queryset = queryset.filter(salida__fecha__lte=self.context['fecha_fin'])
-        return queryset.count()
+        return self.anotado(obj, 'detalles_salida_periodo')
 
     def get_inventario_entrada(self, obj):
         """Para obtener la cantidad de equipo ingresado por medio
@@ -57,12 +58,7 @@ class EquipoSerializer(DynamicFieldsModelSerializer, serializers.ModelSerializer
         Returns:
             TYPE: int
         """
-        queryset = obj.detalles_entrada.all()
-        if self.context['fecha_inicio']:
-            queryset = queryset.filter(entrada__fecha__gte=self.context['fecha_inicio'])
-        if self.context['fecha_fin']:
-            queryset = queryset.filter(entrada__fecha__lte=self.context['fecha_fin'])
-        return sum(detalle.cantidad for detalle in queryset)
+        return self.anotado(obj, 'entradas_periodo')
 
     def get_inventario_salida(self, obj):
         """Para obtener la cantidad de equipo que ha salido por medio
@@ -73,12 +69,7 @@ class EquipoSerializer(DynamicFieldsModelSerializer, serializers.ModelSerializer
         Returns:
             TYPE: int
         """
-        queryset = obj.detalles_salida.all()
-        if self.context['fecha_inicio']:
-            queryset = queryset.filter(salida__fecha__gte=self.context['fecha_inicio'])
-        if self.context['fecha_fin']:
-            queryset = queryset.filter(salida__fecha__lte=self.context['fecha_fin'])
-        return sum(detalle.cantidad for detalle in queryset)
+        return self.anotado(obj, 'salidas_periodo')
 
 
 class EntradaSerializer(DynamicFieldsModelSerializer, serializers.ModelSerializer):
@@ -0,0 +1,8 @@
+from django.db.models.signals import post_delete
+
+from apps.kardex import models as kardex_m
+from apps.main import saldos
+
+
+post_delete.connect(saldos.restar_aporte, sender=kardex_m.EntradaDetalle)
+post_delete.connect(saldos.restar_aporte, sender=kardex_m.SalidaDetalle)
@@ -0,0 +1,97 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.utils.six import StringIO
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.kardex import models as kax_m
+from apps.kardex.api_views import EquipoViewSet
+
+
+class SaldoEquipoTestCase(TestCase):
+    """Pruebas para los saldos del kardex y los totales por rango de fechas de :class:`Equipo`"""
+
+    def setUp(self):
+        self.usuario = User.objects.create(username='kardex')
+        self.proveedor = kax_m.Proveedor.objects.create(
+            nombre='Proveedor', tipo=kax_m.TipoProveedor.objects.create(tipo='Donante'))
+        self.estado = kax_m.EstadoEquipo.objects.create(estado='Nuevo')
+        self.tipo_entrada = kax_m.TipoEntrada.objects.create(tipo='Compra')
+        self.tipo_salida = kax_m.TipoSalida.objects.create(tipo='Uso')
+        self.cable = kax_m.Equipo.objects.create(nombre='Cable')
+        self.disco = kax_m.Equipo.objects.create(nombre='Disco')
+
+    def entrada(self, fecha, *detalles):
+        entrada = kax_m.Entrada.objects.create(
+            estado=self.estado, proveedor=self.proveedor, tipo=self.tipo_entrada, fecha=fecha, terminada=True)
+        for equipo, cantidad in detalles:
+            kax_m.EntradaDetalle.objects.create(entrada=entrada, equipo=equipo, cantidad=cantidad)
+        return entrada
+
+    def salida(self, fecha, *detalles):
+        salida = kax_m.Salida.objects.create(tecnico=self.usuario, fecha=fecha, tipo=self.tipo_salida, terminada=True)
+        for equipo, cantidad in detalles:
+            kax_m.SalidaDetalle.objects.create(salida=salida, equipo=equipo, cantidad=cantidad)
+        return salida
+
+    def existencias(self):
+        return {equipo.nombre: equipo.existencia for equipo in kax_m.Equipo.objects.all()}
+
+    def test_saldos(self):
+        self.assertEqual(self.existencias(), {'Cable': 0, 'Disco': 0})
+        entrada = self.entrada(date(2020, 1, 10), (self.cable, 10), (self.disco, 4))
+        self.entrada(date(2020, 3, 1), (self.cable, 5))
+        salida = self.salida(date(2020, 2, 1), (self.disco, 1))
+        self.assertEqual(self.existencias(), {'Cable': 15, 'Disco': 3})
+
+        # Los cambios de cantidad y de equipo mueven el saldo
+        detalle = salida.detalles.get(equipo=self.disco)
+        detalle.cantidad = 2
+        detalle.save()
+        detalle.equipo = self.cable
+        detalle.save()
+        self.assertEqual(self.existencias(), {'Cable': 13, 'Disco': 4})
+
+        # Las eliminaciones en cascada también se restan
+        entrada.delete()
+        self.assertEqual(self.existencias(), {'Cable': 3, 'Disco': 0})
+        self.assertEqual(kax_m.SaldoEquipo.reconstruir(guardar=False), [])
+
+    def test_con_movimientos(self):
+        self.entrada(date(2020, 1, 10), (self.cable, 10), (self.disco, 4))
+        self.entrada(date(2020, 3, 1), (self.cable, 5))
+        self.entrada(date(2020, 3, 2), (self.cable, 1))
+        self.salida(date(2020, 2, 1), (self.cable, 3))
+        with self.assertNumQueries(1):
+            equipos = {
+                equipo.nombre: equipo
+                for equipo in kax_m.Equipo.objects.con_movimientos(fecha_inicio=date(2020, 2, 1))}
+            cable = equipos['Cable']
+            self.assertEqual(
+                (cable.detalles_entrada_periodo, cable.entradas_periodo, cable.salidas_periodo, cable.existencia),
+                (2, 6, 3, 13))
+            self.assertEqual((equipos['Disco'].entradas_periodo, equipos['Disco'].existencia), (0, 4))
+
+        request = APIRequestFactory().get('/', {'fecha_fin': '2020-01-31'})
+        force_authenticate(request, user=self.usuario)
+        with self.assertNumQueries(1):
+            respuesta = EquipoViewSet.as_view({'get': 'list'})(request)
+        datos = {equipo['nombre']: equipo for equipo in respuesta.data}
+        self.assertEqual(datos['Cable']['inventario_entrada'], 10)
+        self.assertEqual(datos['Cable']['cantidad_salida'], 0)
+        self.assertEqual(datos['Cable']['existencia'], 13)
+
+    def test_comando(self):
+        self.entrada(date(2020, 1, 10), (self.cable, 10))
+        kax_m.SaldoEquipo.objects.filter(equipo=self.cable).update(entradas=7)
+        kax_m.SaldoEquipo.objects.filter(equipo=self.disco).delete()
+        with self.assertRaises(CommandError):
+            call_command('reconciliar_saldos', verificar=True, stdout=StringIO())
+        salida = StringIO()
+        call_command('reconciliar_saldos', stdout=salida)
+        self.assertIn('1 diferencias corregidas', salida.getvalue())
+        self.assertEqual(kax_m.SaldoEquipo.objects.get(equipo=self.cable).existencia, 10)
+        call_command('reconciliar_saldos', verificar=True, stdout=StringIO())
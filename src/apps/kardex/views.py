@@ -18,6 +18,7 @@ class EquipoListView(LoginRequiredMixin, GroupRequiredMixin, ListView):
     raise_exception = True
     template_name = 'kardex/equipo_list.html'
     model = Equipo
+    queryset = Equipo.objects.con_movimientos()
 
     def get_context_data(self, **kwargs):
         context = super(EquipoListView, self).get_context_data(**kwargs)
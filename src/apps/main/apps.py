@@ -1,5 +1,8 @@
 from django.apps import AppConfig
 
 
-class CoreConfig(AppConfig):
-    name = 'core'
+class MainConfig(AppConfig):
+    name = 'apps.main'
+
+    def ready(self):
+        from . import signals
@@ -11,3 +11,23 @@ def backup_cron():
 def generar_archivos_fijos():
     for archivo in ArchivoGenerado.objects.filter(activo=True):
         archivo.generar()
+
+
+def generar_qr_cron():
+    management.call_command('generar_qr')
+
+
+def reconstruir_indicadores_cron():
+    management.call_command('reconstruir_indicadores')
+
+
+def cerrar_periodos_cron():
+    management.call_command('cerrar_periodos')
+
+
+def enviar_notificaciones_cron():
+    management.call_command('enviar_notificaciones')
+
+
+def calentar_tablero_cron():
+    management.call_command('calentar_tablero')
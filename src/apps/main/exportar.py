@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+# Descarga de informes en CSV o XLSX generados en el servidor.
+# Las vistas declaran `columnas`, una lista de pares `(ruta, título)` donde la ruta son las llaves separadas
+# por puntos dentro de cada fila de la respuesta JSON; así las dos salidas usan las mismas filas. Las filas se
+# escriben a medida que se leen: el CSV se envía con `StreamingHttpResponse` y el XLSX se escribe con un libro
+# de openpyxl en modo `write_only` sobre un archivo temporal, de modo que ninguno guarda el informe completo
+# en memoria.
+import csv
+import tempfile
+from datetime import datetime
+
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.html import strip_tags
+from openpyxl import Workbook
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+CSV = 'csv'
+XLSX = 'xlsx'
+FORMATOS = (CSV, XLSX)
+
+TIPO_XLSX = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+def resolver(valor, llaves):
+    """Obtiene el valor de la ruta `llaves` dentro de `valor`, recorriendo diccionarios y listas."""
+    if not llaves:
+        return valor
+    if isinstance(valor, (list, tuple)):
+        return [resolver(elemento, llaves) for elemento in valor]
+    if isinstance(valor, dict):
+        return resolver(valor.get(llaves[0]), llaves[1:])
+    return None
+
+
+def formatear(valor):
+    """Prepara `valor` para una celda. Los textos pierden las etiquetas HTML de los enlaces, las listas
+    se unen con comas y los booleanos se muestran como Sí o No. Las fechas y números se conservan.
+    """
+    if valor is None:
+        return ''
+    if isinstance(valor, bool):
+        return 'Sí' if valor else 'No'
+    if isinstance(valor, list):
+        return ', '.join(str(formatear(elemento)) for elemento in valor)
+    if isinstance(valor, datetime) and timezone.is_aware(valor):
+        return timezone.localtime(valor).replace(tzinfo=None)
+    if isinstance(valor, str):
+        return strip_tags(valor).strip()
+    return valor
+
+
+def valor_celda(fila, ruta):
+    """Devuelve el valor de la columna `ruta` de `fila` listo para una celda."""
+    return formatear(resolver(fila, ruta.split('.')))
+
+
+def nombre_archivo(nombre, formato):
+    return '{}_{}.{}'.format(nombre, datetime.now().strftime('%Y%m%d'), formato)
+
+
+class Eco(object):
+    """Archivo falso para `csv.writer` que devuelve cada línea en lugar de guardarla."""
+
+    def write(self, valor):
+        return valor
+
+
+def exportar_csv(nombre, columnas, filas):
+    """Respuesta que envía `filas` como CSV a medida que se generan."""
+    escritor = csv.writer(Eco())
+
+    def generar():
+        # El BOM permite que Excel reconozca el archivo como UTF-8
+        yield '\ufeff'
+        yield escritor.writerow([titulo for ruta, titulo in columnas])
+        for fila in filas:
+            yield escritor.writerow([valor_celda(fila, ruta) for ruta, titulo in columnas])
+
+    respuesta = StreamingHttpResponse(generar(), content_type='text/csv; charset=utf-8')
+    respuesta['Content-Disposition'] = 'attachment; filename="{}"'.format(nombre_archivo(nombre, CSV))
+    return respuesta
+
+
+def exportar_xlsx(nombre, columnas, filas):
+    """Respuesta con `filas` en un libro de Excel escrito fila por fila en un archivo temporal."""
+    libro = Workbook(write_only=True)
+    hoja = libro.create_sheet(title=nombre[:31])
+    hoja.append([titulo for ruta, titulo in columnas])
+    for fila in filas:
+        celdas = []
+        for ruta, titulo in columnas:
+            valor = valor_celda(fila, ruta)
+            celdas.append(ILLEGAL_CHARACTERS_RE.sub('', valor) if isinstance(valor, str) else valor)
+        hoja.append(celdas)
+    archivo = tempfile.TemporaryFile()
+    libro.save(archivo)
+    archivo.seek(0)
+    respuesta = FileResponse(archivo, content_type=TIPO_XLSX)
+    respuesta['Content-Disposition'] = 'attachment; filename="{}"'.format(nombre_archivo(nombre, XLSX))
+    return respuesta
+
+
+def exportar(formato, nombre, columnas, filas):
+    """Devuelve la respuesta de descarga de `filas` en `formato` (`csv` o `xlsx`)."""
+    if formato == XLSX:
+        return exportar_xlsx(nombre, columnas, filas)
+    return exportar_csv(nombre, columnas, filas)
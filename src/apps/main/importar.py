@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+# Importación por lotes de archivos de Excel.
+# La vista de carga guarda el archivo en una :class:`Importacion` pendiente con `registrar`, y la vista que
+# lo procesa obtiene la última del usuario con `pendiente` en lugar de buscar el último archivo de un
+# directorio. Cada :class:`Importador` lee las filas con openpyxl en modo `read_only`, sin cargar el libro
+# completo en memoria, descarta las que ya existen comparándolas con un conjunto de llaves obtenido en una
+# sola consulta y crea los registros con `bulk_create` por lotes, todo dentro de una transacción.
+import zipfile
+
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+from openpyxl import load_workbook
+from openpyxl.utils.exceptions import InvalidFileException
+
+from apps.main.models import Importacion
+
+# Cantidad máxima de errores que se guardan en la importación
+ERRORES_MAXIMOS = 100
+
+# Errores del archivo o de la base de datos con los que la importación queda fallida.
+# Cualquier otro error es un defecto del importador y se propaga.
+ERRORES_IMPORTACION = (InvalidFileException, zipfile.BadZipFile, DatabaseError)
+
+
+class FilaInvalida(ValueError):
+    """Fila del archivo que no se puede importar. El mensaje se guarda en los errores de la importación."""
+    pass
+
+
+def leer_filas(archivo, fila_inicial=2):
+    """Devuelve los valores de cada fila de la hoja activa de `archivo` a partir de `fila_inicial`,
+    leyendo el libro a medida que se recorre.
+    """
+    libro = load_workbook(archivo, read_only=True, data_only=True)
+    try:
+        for fila in libro.active.iter_rows(min_row=fila_inicial, values_only=True):
+            yield fila
+    finally:
+        libro.close()
+
+
+def registrar(tipo, archivo, usuario=None):
+    """Guarda `archivo` en una :class:`Importacion` pendiente de `tipo`."""
+    return Importacion.objects.create(tipo=tipo, archivo=archivo, usuario=usuario)
+
+
+def pendiente(tipo, usuario=None):
+    """Devuelve la última :class:`Importacion` pendiente de `tipo` cargada por `usuario`, o `None`."""
+    importaciones = Importacion.objects.filter(tipo=tipo, estado=Importacion.PENDIENTE)
+    if usuario is not None:
+        importaciones = importaciones.filter(usuario=usuario)
+    return importaciones.order_by('-fecha_creacion', '-id').first()
+
+
+class Importador(object):
+    """Procesa una :class:`Importacion` de `tipo` creando registros de `modelo`.
+
+    Las subclases implementan `crear`, que convierte una fila en un objeto sin guardar (o `None` si la fila
+    no crea registros) y lanza :class:`FilaInvalida` o `ValueError` si la fila tiene errores. Para descartar
+    las filas repetidas implementan `clave`, la llave de cada objeto, y `claves_existentes`, el conjunto de
+    llaves que ya están en la base de datos.
+    """
+    tipo = None
+    modelo = None
+    fila_inicial = 2
+    tamano_lote = 1000
+
+    def claves_existentes(self):
+        return set()
+
+    def clave(self, objeto):
+        return None
+
+    def crear(self, fila):
+        raise NotImplementedError
+
+    def terminar(self):
+        """Se ejecuta dentro de la transacción después de guardar todas las filas.
+
+        Returns:
+            int: la cantidad de registros creados adicionalmente.
+        """
+        return 0
+
+    def guardar(self, lote):
+        self.modelo.objects.bulk_create(lote)
+
+    def procesar(self, importacion, errores):
+        claves = self.claves_existentes()
+        lote = []
+        for numero, fila in enumerate(leer_filas(importacion.archivo, self.fila_inicial), self.fila_inicial):
+            if all(valor is None or valor == '' for valor in fila):
+                continue
+            importacion.filas += 1
+            try:
+                objeto = self.crear(fila)
+            except (ValueError, TypeError) as e:
+                importacion.rechazados += 1
+                errores.append('Fila {}: {}'.format(numero, e))
+                continue
+            if objeto is None:
+                continue
+            clave = self.clave(objeto)
+            if clave is not None:
+                if clave in claves:
+                    importacion.duplicados += 1
+                    continue
+                claves.add(clave)
+            lote.append(objeto)
+            if len(lote) >= self.tamano_lote:
+                self.guardar(lote)
+                importacion.creados += len(lote)
+                lote = []
+        if lote:
+            self.guardar(lote)
+            importacion.creados += len(lote)
+        importacion.creados += self.terminar()
+
+    def importar(self, importacion):
+        """Procesa el archivo de `importacion` y guarda en ella el resultado.
+        Si el archivo no es un libro de Excel válido o falla la base de datos, no se guarda ningún registro
+        y la importación queda fallida.
+        """
+        importacion.fecha_inicio = timezone.now()
+        errores = []
+        try:
+            with transaction.atomic():
+                self.procesar(importacion, errores)
+        except ERRORES_IMPORTACION as e:
+            importacion.estado = Importacion.FALLIDA
+            importacion.creados = 0
+            errores.insert(0, str(e))
+        else:
+            importacion.estado = Importacion.TERMINADA
+        importacion.fecha_fin = timezone.now()
+        if len(errores) > ERRORES_MAXIMOS:
+            errores = errores[:ERRORES_MAXIMOS] + ['y {} errores más'.format(len(errores) - ERRORES_MAXIMOS)]
+        importacion.errores = '\n'.join(errores)
+        importacion.save()
+        return importacion
+
+    def resumen(self, importacion):
+        """Mensaje con el resultado de `importacion` para mostrar al usuario."""
+        if importacion.estado == Importacion.FALLIDA:
+            return 'No se pudo importar el archivo: {}'.format(importacion.errores.split('\n')[0])
+        return '{} filas leídas: {} registros creados, {} repetidas y {} con errores'.format(
+            importacion.filas, importacion.creados, importacion.duplicados, importacion.rechazados)
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from apps.main import tablero
+
+
+class Command(BaseCommand):
+    help = 'Recalcula los datos vencidos de los widgets de la página de inicio.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--forzar',
+            action='store_true',
+            help='Recalcula todos los widgets aunque no estén vencidos')
+        parser.add_argument(
+            '--anio',
+            type=int,
+            help='Año para el que se calculan los widgets, por defecto el actual')
+
+    def handle(self, *args, **options):
+        recalculadas = tablero.calentar(anio=options['anio'], forzar=options['forzar'])
+        self.stdout.write('{} widgets recalculados'.format(recalculadas))
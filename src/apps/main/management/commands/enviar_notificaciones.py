@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from apps.main import notificaciones
+
+
+class Command(BaseCommand):
+    help = 'Envía por lotes las notificaciones por correo electrónico pendientes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=50,
+            help='Cantidad de notificaciones que se reservan en cada lote')
+        parser.add_argument(
+            '--intentos',
+            type=int,
+            default=notificaciones.INTENTOS_MAXIMOS,
+            help='Cantidad máxima de intentos por notificación')
+
+    def handle(self, *args, **options):
+        enviadas, fallidas = notificaciones.enviar_pendientes(
+            tamano_lote=options['lote'],
+            intentos_maximos=options['intentos'])
+        self.stdout.write('{} notificaciones enviadas, {} fallidas'.format(enviadas, fallidas))
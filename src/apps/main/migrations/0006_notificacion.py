@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-18 16:16
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0008_alter_user_username_max_length'),
+        ('main', '0005_auto_20171026_1426'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Notificacion',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('asunto', models.CharField(max_length=255)),
+                ('plantilla', models.CharField(max_length=100)),
+                ('contexto', models.TextField(default='{}')),
+                ('destinatarios', models.TextField(blank=True, help_text='Correos separados por comas')),
+                ('fecha_creacion', models.DateTimeField(default=django.utils.timezone.now)),
+                ('siguiente_intento', models.DateTimeField(default=django.utils.timezone.now)),
+                ('intentos', models.PositiveSmallIntegerField(default=0)),
+                ('enviada', models.BooleanField(default=False)),
+                ('fecha_envio', models.DateTimeField(blank=True, null=True)),
+                ('error', models.TextField(blank=True)),
+                ('grupo', models.ForeignKey(blank=True, help_text='Se envía también a todos los usuarios del grupo', null=True, on_delete=django.db.models.deletion.SET_NULL, to='auth.Group')),
+            ],
+            options={
+                'verbose_name': 'Notificación',
+                'verbose_name_plural': 'Notificaciones',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='notificacion',
+            index=models.Index(fields=['enviada', 'siguiente_intento'], name='main_notifi_enviada_64577f_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-18 16:57
+from __future__ import unicode_literals
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('main', '0006_notificacion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Importacion',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(max_length=30)),
+                ('archivo', models.FileField(upload_to='importaciones/')),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('terminada', 'Terminada'), ('fallida', 'Fallida')], default='pendiente', max_length=10)),
+                ('fecha_creacion', models.DateTimeField(default=django.utils.timezone.now)),
+                ('fecha_inicio', models.DateTimeField(blank=True, null=True)),
+                ('fecha_fin', models.DateTimeField(blank=True, null=True)),
+                ('filas', models.PositiveIntegerField(default=0, help_text='Filas leídas del archivo')),
+                ('creados', models.PositiveIntegerField(default=0, help_text='Registros creados')),
+                ('duplicados', models.PositiveIntegerField(default=0, help_text='Filas omitidas por existir ya en la base de datos')),
+                ('rechazados', models.PositiveIntegerField(default=0, help_text='Filas omitidas por tener errores')),
+                ('errores', models.TextField(blank=True)),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Importación',
+                'verbose_name_plural': 'Importaciones',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='importacion',
+            index=models.Index(fields=['tipo', 'estado'], name='main_import_tipo_7f6081_idx'),
+        ),
+    ]
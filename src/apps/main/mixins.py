@@ -1,17 +1,29 @@
+from django.core.exceptions import FieldDoesNotExist
 from django.db.models import Q
 from django.http import JsonResponse
 from django.views.generic.edit import FormView
 from braces.views import LoginRequiredMixin, CsrfExemptMixin
+from rest_framework import exceptions, status
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from apps.main import exportar
 
 
 class InformeMixin(CsrfExemptMixin, LoginRequiredMixin, FormView):
+    """Informe con un formulario de filtros que responde en JSON al enviarse.
+    Las vistas que declaran `columnas` (ver :mod:`apps.main.exportar`) y construyen cada registro con
+    `get_fila()` también se pueden descargar en CSV o XLSX enviando el parámetro `formato`.
+    """
     form_class = None
     template_name = ''
     queryset = None
     filter_list = None
+    columnas = None
+    nombre_archivo = 'informe'
 
     def get_queryset(self, filtros):
-        queryset = self.queryset
+        queryset = self.queryset.all()
         filter_clauses = None
         for key, filtro in self.filter_list.items():
             if filtros.get(key):
@@ -24,14 +36,50 @@ class InformeMixin(CsrfExemptMixin, LoginRequiredMixin, FormView):
             queryset = queryset.filter(filter_clauses)
         return queryset
 
+    def get_fila(self, objeto):
+        raise NotImplementedError
+
     def create_response(self, queryset):
-        return []
+        return [self.get_fila(objeto) for objeto in queryset]
 
     def post(self, request, *args, **kwargs):
         item_list = self.get_queryset(self.request.POST)
+        formato = self.request.POST.get('formato')
+        if self.columnas and formato in exportar.FORMATOS:
+            filas = (self.get_fila(objeto) for objeto in item_list.iterator())
+            return exportar.exportar(formato, self.nombre_archivo, self.columnas, filas)
         return JsonResponse(self.create_response(item_list), safe=False)
 
 
+class InformeInvalido(exceptions.APIException):
+    """Los filtros recibidos no permiten generar el informe."""
+    status_code = status.HTTP_400_BAD_REQUEST
+    default_detail = 'No se puede generar el informe con los filtros indicados.'
+
+    def __init__(self, mensaje=None):
+        super(InformeInvalido, self).__init__({'mensaje': mensaje or self.default_detail})
+
+
+class ExportarApiMixin(object):
+    """Para las `APIView` de informes: la vista genera sus registros con `get_filas()` y responde con
+    la lista en JSON o, si declara `columnas` y recibe el parámetro `formato`, con la descarga en CSV o XLSX.
+    `get_filas()` puede devolver un generador para que la descarga no cargue todos los registros en memoria;
+    las validaciones deben hacerse antes de empezar a generarlos y lanzar :class:`InformeInvalido`.
+    """
+    columnas = None
+    nombre_archivo = 'informe'
+
+    def get_filas(self, request):
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        filas = self.get_filas(request)
+        formato = request.query_params.get('formato')
+        if self.columnas and formato in exportar.FORMATOS:
+            return exportar.exportar(formato, self.nombre_archivo, self.columnas, filas)
+        return Response(list(filas))
+
+
 class APIFilterMixin():
     queryset = None
     filter_list = None
@@ -48,3 +96,49 @@ class APIFilterMixin():
         if filter_clauses:
             queryset = queryset.filter(filter_clauses)
         return queryset
+
+
+def proyectar(queryset, campos):
+    """Limita el SELECT de `queryset` con `only()` a las columnas que leen los `campos` de un serializer.
+
+    Se incluyen la llave primaria y las relaciones de `select_related`. Si algún campo lee un método
+    que no declara en su atributo `columnas` los campos del modelo que usa, una propiedad o el objeto
+    completo (`source='*'`), no se puede saber qué columnas usa y el queryset se devuelve sin cambios.
+    """
+    select_related = queryset.query.select_related
+    if select_related is True:
+        return queryset
+    modelo = queryset.model
+    columnas = {modelo._meta.pk.name}
+    columnas.update(select_related or {})
+    for campo in campos:
+        if campo.source == '*':
+            return queryset
+        nombre = campo.source.split('.')[0]
+        if nombre in queryset.query.annotations:
+            continue
+        try:
+            campo_modelo = modelo._meta.get_field(nombre)
+        except FieldDoesNotExist:
+            columnas_metodo = getattr(getattr(modelo, nombre, None), 'columnas', None)
+            if columnas_metodo is None:
+                return queryset
+            columnas.update(columnas_metodo)
+            continue
+        # Las relaciones inversas y muchos a muchos se consultan aparte
+        if campo_modelo.concrete and not campo_modelo.many_to_many:
+            columnas.add(nombre)
+    return queryset.only(*columnas)
+
+
+class ProyeccionApiMixin(object):
+    """Para los ViewSets cuyo serializer hereda de :class:`DynamicFieldsModelSerializer`:
+    al pedir `fields=` en un listado o detalle, además de quitar los campos de la respuesta
+    recorta las columnas que se consultan.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super(ProyeccionApiMixin, self).filter_queryset(queryset)
+        if self.request.method in SAFE_METHODS and self.request.query_params.get('fields'):
+            queryset = proyectar(queryset, self.get_serializer().fields.values())
+        return queryset
@@ -2,6 +2,7 @@ import os
 import json
 
 from django.conf import settings
+from django.contrib.auth.models import Group, User
 from django.db import models
 from django.utils import timezone
 from django.utils.text import slugify
@@ -78,3 +79,80 @@ class ArchivoGenerado(models.Model):
         with open(settings.MEDIA_ROOT + '{}.json'.format(slug), "r") as file:
             self.archivo.save('{}.json'.format(slug), File(file))
         os.remove(f.name)
+
+
+class Notificacion(models.Model):
+    """Correo electrónico pendiente de enviar.
+    Las vistas y señales registran la notificación en la misma transacción que el cambio que la origina,
+    y el comando `enviar_notificaciones` las envía por lotes fuera de la solicitud.
+    """
+    asunto = models.CharField(max_length=255)
+    plantilla = models.CharField(max_length=100)
+    contexto = models.TextField(default='{}')
+    destinatarios = models.TextField(blank=True, help_text='Correos separados por comas')
+    grupo = models.ForeignKey(
+        Group,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        help_text='Se envía también a todos los usuarios del grupo')
+    fecha_creacion = models.DateTimeField(default=timezone.now)
+    siguiente_intento = models.DateTimeField(default=timezone.now)
+    intentos = models.PositiveSmallIntegerField(default=0)
+    enviada = models.BooleanField(default=False)
+    fecha_envio = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        verbose_name = "Notificación"
+        verbose_name_plural = "Notificaciones"
+        indexes = [
+            models.Index(fields=['enviada', 'siguiente_intento']),
+        ]
+
+    def __str__(self):
+        return self.asunto
+
+
+class Importacion(models.Model):
+    """Carga de un archivo de Excel.
+    La vista de carga guarda el archivo en estado pendiente y el importador de su `tipo` (ver `apps.main.importar`)
+    lo procesa después, registrando la cantidad de filas, los errores y el tiempo que tomó.
+    """
+    PENDIENTE = 'pendiente'
+    TERMINADA = 'terminada'
+    FALLIDA = 'fallida'
+    ESTADO_CHOICES = (
+        (PENDIENTE, 'Pendiente'),
+        (TERMINADA, 'Terminada'),
+        (FALLIDA, 'Fallida'),
+    )
+    tipo = models.CharField(max_length=30)
+    archivo = models.FileField(upload_to='importaciones/')
+    usuario = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    estado = models.CharField(max_length=10, choices=ESTADO_CHOICES, default=PENDIENTE)
+    fecha_creacion = models.DateTimeField(default=timezone.now)
+    fecha_inicio = models.DateTimeField(null=True, blank=True)
+    fecha_fin = models.DateTimeField(null=True, blank=True)
+    filas = models.PositiveIntegerField(default=0, help_text='Filas leídas del archivo')
+    creados = models.PositiveIntegerField(default=0, help_text='Registros creados')
+    duplicados = models.PositiveIntegerField(default=0, help_text='Filas omitidas por existir ya en la base de datos')
+    rechazados = models.PositiveIntegerField(default=0, help_text='Filas omitidas por tener errores')
+    errores = models.TextField(blank=True)
+
+    class Meta:
+        verbose_name = "Importación"
+        verbose_name_plural = "Importaciones"
+        indexes = [
+            models.Index(fields=['tipo', 'estado']),
+        ]
+
+    def __str__(self):
+        return '{} {}'.format(self.tipo, self.fecha_creacion.strftime('%Y-%m-%d %H:%M'))
+
+    @property
+    def duracion(self):
+        """Segundos que tomó procesar el archivo."""
+        if self.fecha_inicio and self.fecha_fin:
+            return (self.fecha_fin - self.fecha_inicio).total_seconds()
+        return None
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+# Envío diferido de correos electrónicos.
+# En lugar de conectarse al servidor SMTP durante la solicitud, `encolar` guarda una :class:`Notificacion`
+# dentro de la transacción actual. El comando `enviar_notificaciones` las envía por lotes usando una sola
+# conexión y reintenta las que fallen con una espera creciente.
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.template import loader
+from django.utils import timezone
+from django.utils.html import strip_tags
+
+from apps.main.models import Notificacion
+
+# Minutos que una notificación queda reservada por el proceso que la está enviando
+MINUTOS_RESERVA = 10
+# Minutos de espera antes del primer reintento, se duplican en cada intento fallido
+MINUTOS_REINTENTO = 5
+INTENTOS_MAXIMOS = 5
+
+
+def encolar(asunto, plantilla, contexto, destinatarios=(), grupo=None):
+    """Registra una :class:`Notificacion` para enviar la `plantilla` renderizada con `contexto`
+    a los correos de `destinatarios` y a los usuarios de `grupo` (objeto o id).
+    El `contexto` debe poder serializarse como JSON.
+    """
+    return Notificacion.objects.create(
+        asunto=asunto,
+        plantilla=plantilla,
+        contexto=json.dumps(contexto),
+        destinatarios=','.join(correo for correo in destinatarios if correo),
+        grupo_id=getattr(grupo, 'pk', grupo))
+
+
+def reservar(tamano_lote, intentos_maximos=INTENTOS_MAXIMOS):
+    """Obtiene hasta `tamano_lote` notificaciones pendientes y las reserva por `MINUTOS_RESERVA` minutos,
+    para que otro proceso no las envíe al mismo tiempo.
+    """
+    ahora = timezone.now()
+    with transaction.atomic():
+        notificaciones = list(Notificacion.objects.select_for_update().filter(
+            enviada=False,
+            intentos__lt=intentos_maximos,
+            siguiente_intento__lte=ahora).order_by('siguiente_intento', 'id')[:tamano_lote])
+        Notificacion.objects.filter(id__in=[notificacion.id for notificacion in notificaciones]).update(
+            siguiente_intento=ahora + timedelta(minutes=MINUTOS_RESERVA))
+    return notificaciones
+
+
+def correos_por_grupo(notificaciones):
+    """Devuelve un diccionario con los correos de los usuarios de cada grupo usado en `notificaciones`."""
+    grupos = {notificacion.grupo_id for notificacion in notificaciones if notificacion.grupo_id}
+    correos = {}
+    usuarios = User.objects.filter(groups__in=grupos, is_active=True).exclude(email='')
+    for grupo, correo in usuarios.values_list('groups', 'email'):
+        if grupo in grupos:
+            correos.setdefault(grupo, []).append(correo)
+    return correos
+
+
+def crear_mensaje(notificacion, destinatarios, connection):
+    html = loader.render_to_string(notificacion.plantilla, json.loads(notificacion.contexto))
+    mensaje = EmailMultiAlternatives(
+        notificacion.asunto,
+        strip_tags(html).strip(),
+        settings.EMAIL_HOST_USER,
+        destinatarios,
+        connection=connection)
+    mensaje.attach_alternative(html, 'text/html')
+    return mensaje
+
+
+def enviar_pendientes(tamano_lote=50, intentos_maximos=INTENTOS_MAXIMOS):
+    """Envía las notificaciones pendientes por lotes de `tamano_lote`, abriendo una sola conexión
+    al servidor de correo para todo el proceso.
+
+    Returns:
+        tuple: la cantidad de notificaciones enviadas y la de fallidas.
+    """
+    enviadas = fallidas = 0
+    connection = get_connection()
+    connection.open()
+    try:
+        while True:
+            notificaciones = reservar(tamano_lote, intentos_maximos)
+            if not notificaciones:
+                break
+            correos = correos_por_grupo(notificaciones)
+            exitosas = []
+            for notificacion in notificaciones:
+                destinatarios = [correo for correo in notificacion.destinatarios.split(',') if correo]
+                destinatarios += [
+                    correo for correo in correos.get(notificacion.grupo_id, []) if correo not in destinatarios]
+                try:
+                    if destinatarios:
+                        crear_mensaje(notificacion, destinatarios, connection).send()
+                except Exception as e:
+                    fallidas += 1
+                    Notificacion.objects.filter(id=notificacion.id).update(
+                        intentos=notificacion.intentos + 1,
+                        siguiente_intento=timezone.now() + timedelta(
+                            minutes=MINUTOS_REINTENTO * 2 ** notificacion.intentos),
+                        error=str(e))
+                else:
+                    exitosas.append(notificacion.id)
+            Notificacion.objects.filter(id__in=exitosas).update(enviada=True, fecha_envio=timezone.now(), error='')
+            enviadas += len(exitosas)
+    finally:
+        connection.close()
+    return enviadas, fallidas
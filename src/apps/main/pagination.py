@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+# Paginación de los listados de la API.
+# Es opcional para no romper las tablas que todavía cargan el listado completo: una solicitud sin parámetros
+# de paginación devuelve todos los registros como antes. Con los parámetros de DataTables en modo
+# `serverSide` (`draw`, `start`, `length`, `order`, `search` y `columns`) se filtra, ordena y recorta en la
+# base de datos; con `cursor` o `page_size` se pagina por cursor sobre una columna indexada.
+import re
+from collections import OrderedDict
+from functools import reduce
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import CharField, Q, TextField
+from rest_framework import pagination
+from rest_framework.response import Response
+
+PARAMETRO = re.compile(r'^(columns|order)\[(\d+)\]\[(\w+)\](?:\[(\w+)\])?$')
+
+
+def resolver_campo(queryset, ruta):
+    """Devuelve el último campo del modelo de `queryset` en la `ruta` (separada por `__`),
+    o `None` si la ruta no corresponde a una columna: un método, una propiedad o una relación inversa.
+    Las anotaciones del queryset se devuelven como `True`.
+    """
+    if ruta in queryset.query.annotations:
+        return True
+    modelo = queryset.model
+    campo = None
+    for nombre in ruta.split('__'):
+        if modelo is None:
+            return None
+        try:
+            campo = modelo._meta.get_field(nombre)
+        except FieldDoesNotExist:
+            return None
+        if not campo.concrete or campo.many_to_many:
+            return None
+        modelo = campo.related_model
+    return campo
+
+
+def leer_parametros(query_params):
+    """Agrupa los parámetros `columns[i][...]` y `order[i][...]` de DataTables en listas de diccionarios."""
+    grupos = {'columns': {}, 'order': {}}
+    for clave, valor in query_params.items():
+        coincidencia = PARAMETRO.match(clave)
+        if coincidencia:
+            grupo, indice, nombre, subnombre = coincidencia.groups()
+            elemento = grupos[grupo].setdefault(int(indice), {})
+            if subnombre:
+                elemento.setdefault(nombre, {})[subnombre] = valor
+            else:
+                elemento[nombre] = valor
+    return [grupos['columns'][i] for i in sorted(grupos['columns'])], \
+        [grupos['order'][i] for i in sorted(grupos['order'])]
+
+
+def entero(valor, defecto):
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return defecto
+
+
+class DataTablesPagination(pagination.BasePagination):
+    """Adaptador del protocolo server-side de DataTables.
+
+    Cada columna se traduce a la ruta de base de datos indicada en `datatables_columnas` de la vista o,
+    si no está, a la del campo del serializer con el mismo nombre (`columns[i][data]`); las que no
+    corresponden a una columna de la base de datos no se pueden ordenar ni buscar. La búsqueda general
+    usa `search_fields` de la vista o, si no tiene, las columnas de texto.
+    """
+    max_length = 1000
+
+    def rutas(self, queryset, view, columnas):
+        """Devuelve la ruta de base de datos de cada columna, o `None` si no tiene."""
+        campos = view.get_serializer().fields if hasattr(view, 'get_serializer') else {}
+        mapa = getattr(view, 'datatables_columnas', {})
+        rutas = []
+        for columna in columnas:
+            nombre = columna.get('data')
+            campo = campos.get(nombre)
+            ruta = mapa.get(nombre)
+            if ruta is None and campo is not None and campo.source != '*':
+                ruta = campo.source.replace('.', '__')
+            if ruta is not None and not resolver_campo(queryset, ruta):
+                ruta = None
+            rutas.append(ruta)
+        return rutas
+
+    def es_texto(self, queryset, ruta):
+        return isinstance(resolver_campo(queryset, ruta), (CharField, TextField))
+
+    def buscar(self, queryset, rutas, texto):
+        """Filtra los registros que contienen cada palabra de `texto` en alguna de `rutas`."""
+        rutas = [ruta for ruta in rutas if ruta]
+        if not rutas:
+            return queryset
+        for palabra in texto.split():
+            queryset = queryset.filter(
+                reduce(lambda a, b: a | b, [Q(**{'{}__icontains'.format(ruta): palabra}) for ruta in rutas]))
+        return queryset
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        columnas, orden = leer_parametros(params)
+        rutas = self.rutas(queryset, view, columnas)
+        self.draw = entero(params.get('draw'), 0)
+        self.total = queryset.count()
+
+        texto = params.get('search[value]', '').strip()
+        filtrado = False
+        if texto:
+            search_fields = getattr(view, 'search_fields', None)
+            if search_fields:
+                busqueda = [campo.lstrip('^=@$') for campo in search_fields]
+            else:
+                busqueda = [
+                    ruta for ruta, columna in zip(rutas, columnas)
+                    if ruta and columna.get('searchable') != 'false' and self.es_texto(queryset, ruta)]
+            queryset = self.buscar(queryset, busqueda, texto)
+            filtrado = True
+        for ruta, columna in zip(rutas, columnas):
+            valor = columna.get('search', {}).get('value', '').strip()
+            if ruta and valor and self.es_texto(queryset, ruta):
+                queryset = self.buscar(queryset, [ruta], valor)
+                filtrado = True
+        self.filtrados = queryset.count() if filtrado else self.total
+
+        ordenamiento = []
+        for elemento in orden:
+            indice = entero(elemento.get('column'), -1)
+            if 0 <= indice < len(rutas) and rutas[indice] and columnas[indice].get('orderable') != 'false':
+                ordenamiento.append(('-' if elemento.get('dir') == 'desc' else '') + rutas[indice])
+        # La llave primaria al final mantiene el mismo orden entre páginas
+        queryset = queryset.order_by(*(ordenamiento + ['pk']))
+
+        inicio = max(entero(params.get('start'), 0), 0)
+        cantidad = entero(params.get('length'), self.max_length)
+        if cantidad < 0 or cantidad > self.max_length:
+            cantidad = self.max_length
+        return list(queryset[inicio:inicio + cantidad])
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('draw', self.draw),
+            ('recordsTotal', self.total),
+            ('recordsFiltered', self.filtrados),
+            ('data', data),
+        ]))
+
+
+class CursorApiPagination(pagination.CursorPagination):
+    """Paginación por cursor sobre `cursor_ordering` de la vista, por defecto la llave primaria.
+    Cada página filtra a partir de la última posición en lugar de usar `OFFSET`, por lo que debe
+    ordenarse por una columna indexada.
+    """
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    ordering = 'pk'
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, 'cursor_ordering', self.ordering)
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        return tuple(ordering)
+
+
+class PaginacionApi(pagination.BasePagination):
+    """Paginación por defecto de la API (``DEFAULT_PAGINATION_CLASS``).
+    Elige :class:`DataTablesPagination` si la solicitud trae `draw`, :class:`CursorApiPagination` si trae
+    `cursor` o `page_size`, y si no trae ninguno no pagina.
+    """
+
+    def get_paginador(self, request):
+        if 'draw' in request.query_params:
+            return DataTablesPagination()
+        if 'cursor' in request.query_params or 'page_size' in request.query_params:
+            return CursorApiPagination()
+        return None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.paginador = self.get_paginador(request)
+        if self.paginador is None:
+            return None
+        return self.paginador.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginador.get_paginated_response(data)
@@ -0,0 +1,184 @@
+"""Saldos acumulados que se actualizan al guardar o eliminar los registros que los modifican.
+
+Cada saldo es un modelo que hereda de :class:`Saldo` e indica los campos que lo identifican (`LLAVE`) y los
+campos acumulados (`CAMPOS`). Los registros que lo modifican heredan de :class:`MovimientoSaldo` y
+definen su aporte; la señal `post_delete` se conecta a :func:`restar_aporte`. Los comandos que comparan los
+saldos con los registros heredan de :class:`ReconciliarCommand`.
+"""
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
+
+
+class Saldo(models.Model):
+
+    """Base de los modelos de saldos.
+    Las subclases definen `LLAVE`, los nombres de los campos (`<relación>_id`) que identifican cada saldo,
+    `CAMPOS`, los campos acumulados, y :meth:`consultas`, los totales calculados desde los registros.
+    """
+
+    LLAVE = ()
+    CAMPOS = ()
+
+    class Meta:
+        abstract = True
+
+    def llave(self):
+        return tuple(getattr(self, campo) for campo in self.LLAVE)
+
+    @classmethod
+    def vacio(cls):
+        return dict.fromkeys(cls.CAMPOS, 0)
+
+    @classmethod
+    def filtrar(cls, queryset, seleccion):
+        """Limita el `queryset` de saldos a los que tienen el primer campo de `LLAVE` en `seleccion`."""
+        if seleccion is None:
+            return queryset
+        return queryset.filter(**{'{}__in'.format(cls.LLAVE[0]): seleccion})
+
+    @classmethod
+    def aplicar(cls, aporte, signo=1):
+        """Suma al saldo el `aporte` de un registro (ver :meth:`MovimientoSaldo.aporte_saldo`) multiplicado
+        por `signo`. El incremento se hace en la base de datos para no perder cambios concurrentes.
+        Las restas no crean saldos: si el saldo ya no existe es porque se eliminó en cascada junto al registro.
+        """
+        if aporte is None:
+            return
+        llave, campo, cantidad = aporte
+        llave = dict(zip(cls.LLAVE, llave))
+        saldos = cls.objects.filter(**llave)
+        incremento = {campo: F(campo) + signo * cantidad}
+        with transaction.atomic():
+            if saldos.update(**incremento) or signo < 0:
+                return
+            try:
+                with transaction.atomic():
+                    cls.objects.create(**dict(llave, **{campo: cantidad}))
+            except IntegrityError:
+                saldos.update(**incremento)
+
+    @classmethod
+    def consultas(cls, seleccion):
+        """Devuelve tuplas `(campo, queryset)` donde cada `queryset` produce los valores de `LLAVE` seguidos del
+        total del campo, limitados a `seleccion` cuando no es `None`.
+        """
+        return ()
+
+    @classmethod
+    def calcular(cls, seleccion=None):
+        """Calcula los saldos a partir de los registros, sin usar esta tabla.
+        Devuelve un diccionario indexado por los valores de `LLAVE`.
+        """
+        calculados = {}
+        for campo, queryset in cls.consultas(seleccion):
+            for fila in queryset:
+                calculados.setdefault(tuple(fila[:-1]), cls.vacio())[campo] = fila[-1]
+        return calculados
+
+    @classmethod
+    def reconstruir(cls, seleccion=None, guardar=True):
+        """Compara los saldos guardados con los calculados desde los registros.
+        Si `guardar` es verdadero, actualiza en su lugar los saldos de `seleccion` (por defecto, todos) con los
+        calculados y crea los que falten.
+        Devuelve una lista de tuplas con los valores de `LLAVE`, el campo, el valor guardado y el calculado.
+        """
+        with transaction.atomic():
+            guardados = {saldo.llave(): saldo for saldo in cls.filtrar(cls.objects.select_for_update(), seleccion)}
+            calculados = cls.calcular(seleccion)
+            diferencias = []
+            faltantes = []
+            for llave in sorted(set(guardados) | set(calculados)):
+                guardado = guardados.get(llave)
+                calculado = calculados.get(llave, cls.vacio())
+                cambios = {
+                    campo: valor for campo, valor in calculado.items() if getattr(guardado, campo, 0) != valor}
+                diferencias.extend(
+                    llave + (campo, getattr(guardado, campo, 0), cambios[campo])
+                    for campo in cls.CAMPOS if campo in cambios)
+                if not guardar or not cambios:
+                    continue
+                if guardado is None:
+                    faltantes.append(cls(**dict(zip(cls.LLAVE, llave), **calculado)))
+                else:
+                    cls.objects.filter(pk=guardado.pk).update(**cambios)
+            cls.objects.bulk_create(faltantes)
+        return diferencias
+
+
+class MovimientoSaldo(object):
+
+    """Funcionalidad común de los registros que modifican un :class:`Saldo`.
+    Al guardar un registro se aplica al saldo la diferencia entre su aporte anterior y el actual dentro de la
+    misma transacción. Al eliminarlo, la señal `post_delete` conectada a :func:`restar_aporte` resta su aporte,
+    incluso en eliminaciones en cascada.
+    `MODELO_SALDO` es el modelo del saldo o su nombre `'app_label.Modelo'` si se define después del registro.
+    Por defecto el aporte es la `cantidad` del registro en el `CAMPO_SALDO` del saldo identificado por los
+    atributos `LLAVE_SALDO`; los registros que no siempre modifican el saldo sobrescriben :meth:`aporte_saldo`.
+    """
+
+    MODELO_SALDO = None
+    LLAVE_SALDO = ()
+    CAMPO_SALDO = None
+
+    @classmethod
+    def modelo_saldo(cls):
+        if isinstance(cls.MODELO_SALDO, str):
+            return apps.get_model(cls.MODELO_SALDO)
+        return cls.MODELO_SALDO
+
+    def aporte_saldo(self):
+        """Devuelve una tupla `(llave, campo, cantidad)` o `None` si el registro no modifica ningún saldo."""
+        return (tuple(getattr(self, campo) for campo in self.LLAVE_SALDO), self.CAMPO_SALDO, self.cantidad)
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            anterior = None
+            if self.pk is not None:
+                anterior = type(self).objects.filter(pk=self.pk).first()
+            super(MovimientoSaldo, self).save(*args, **kwargs)
+            anterior = anterior.aporte_saldo() if anterior else None
+            actual = self.aporte_saldo()
+            if anterior != actual:
+                self.modelo_saldo().aplicar(anterior, -1)
+                self.modelo_saldo().aplicar(actual)
+
+
+def restar_aporte(sender, instance, **kwargs):
+    """Resta del saldo el aporte del :class:`MovimientoSaldo` eliminado.
+    Se usa una señal para incluir los registros eliminados en cascada.
+    """
+    instance.modelo_saldo().aplicar(instance.aporte_saldo(), -1)
+
+
+class ReconciliarCommand(BaseCommand):
+
+    """Base de los comandos que comparan un :class:`Saldo` con los registros y corrigen las diferencias.
+    Las subclases indican el `modelo`, el nombre del `argumento` con los ids a reconciliar y los mensajes.
+    """
+
+    modelo = None
+    argumento = None
+    ayuda_argumento = ''
+    formato_diferencia = ''
+    mensaje_coinciden = ''
+
+    def add_arguments(self, parser):
+        parser.add_argument(self.argumento, nargs='*', type=int, help=self.ayuda_argumento)
+        parser.add_argument(
+            '--verificar',
+            action='store_true',
+            help='Únicamente compara los saldos guardados con los calculados, sin modificarlos.')
+
+    def handle(self, *args, **options):
+        seleccion = options[self.argumento] or None
+        diferencias = self.modelo.reconstruir(seleccion, guardar=not options['verificar'])
+        for diferencia in diferencias:
+            self.stdout.write(self.formato_diferencia.format(*diferencia))
+        if options['verificar']:
+            if diferencias:
+                raise CommandError('{} diferencias encontradas'.format(len(diferencias)))
+            self.stdout.write(self.mensaje_coinciden)
+            return
+        self.stdout.write('{} diferencias corregidas'.format(len(diferencias)))
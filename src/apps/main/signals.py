@@ -0,0 +1,7 @@
+from django.db.models.signals import post_delete, post_save
+
+from apps.main import tablero
+
+for modelo in {modelo for datos in tablero.WIDGETS.values() for modelo in datos['modelos']}:
+    post_save.connect(tablero.invalidar_modelo, sender=modelo)
+    post_delete.connect(tablero.invalidar_modelo, sender=modelo)
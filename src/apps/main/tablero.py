@@ -0,0 +1,306 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+# Datos de los widgets de la página de inicio.
+# Cada widget se guarda en caché por año y alcance (global o de un capacitador) junto a su versión y la fecha
+# en que se calculó. La versión de una copia combina la versión general del widget con la de su año y alcance.
+# Las señales `post_save` y `post_delete` de los modelos de los que depende el widget incrementan solo la
+# versión de los años y capacitadores de las sedes afectadas (y la global de esos años), con lo que esas copias
+# quedan desactualizadas; cuando no se puede saber a qué sedes afecta el cambio se incrementa la versión
+# general. Las copias con más de `VIGENCIA` segundos quedan vencidas. La página de inicio siempre muestra la
+# copia guardada, aunque esté vencida o desactualizada, y solo calcula durante la solicitud cuando no existe
+# ninguna copia; el comando `calentar_tablero`, que se ejecuta con cron, recalcula las demás.
+import time
+from datetime import datetime
+
+from django.core.cache import cache
+from django.db.models import Case, Count, IntegerField, Sum, When
+from django.db.models.functions import Coalesce, ExtractMonth, ExtractYear
+
+from apps.cyd.models import Asignacion, Calendario, Grupo, Sede
+from apps.tpe.models import Equipamiento, TicketReparacion
+
+# Tiempo en segundos después del cual una copia se considera vencida aunque no haya cambios
+VIGENCIA = 60 * 15
+# Tiempo en segundos que se conserva en caché cada copia, vencida o no
+CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def escuelas_por_sede(sedes):
+    """Devuelve un diccionario con la cantidad de escuelas de los participantes asignados a cada una de `sedes`,
+    lo mismo que :meth:`cyd.Sede.get_escuelas` pero con una sola consulta.
+    """
+    return dict(Asignacion.objects.filter(grupo__sede__in=sedes).order_by().values_list('grupo__sede').annotate(
+        escuelas=Count('participante__escuela', distinct=True)))
+
+
+def calcular_capacitacion(anio, capacitador=None):
+    """Totales de las :class:`cyd.Sede` con asistencias en el año, de todas o solo las de `capacitador`."""
+    sedes_list = Sede.objects.filter(grupos__asistencias__fecha__year=anio)
+    if capacitador is not None:
+        sedes_list = sedes_list.filter(capacitador=capacitador)
+    resumenes = Sede.resumir_participantes(sedes_list)
+    escuelas = escuelas_por_sede(sedes_list.values('id'))
+    return {
+        'capacitacion_total': sum(escuelas.get(e.id, 0) for e in sedes_list),
+        'departamentos_total': sedes_list.order_by().values('municipio__departamento').distinct().count(),
+        'maestros_total': sum(len(resumenes[e.id]['listado']) for e in sedes_list),
+        'aprobados_total': sum(int(resumenes[e.id]['resumen']['estado']['aprobado']['cantidad']) for e in sedes_list),
+        'reprobados_total': sum(int(resumenes[e.id]['resumen']['estado']['reprobado']['cantidad']) for e in sedes_list),
+        'nivelar_total': sum(int(resumenes[e.id]['resumen']['estado']['nivelar']['cantidad']) for e in sedes_list),
+    }
+
+
+def calcular_capacitacion_mensual(anio, capacitador=None):
+    """Cantidad de sedes y de escuelas con asistencias en cada mes del año.
+    Igual que en el listado anual, cada sede se cuenta una vez por cada asistencia del mes.
+    """
+    meses = {'escuelas': [0] * 12, 'sedes': [0] * 12}
+    asistencias = Calendario.objects.filter(fecha__year=anio)
+    if capacitador is not None:
+        asistencias = asistencias.filter(grupo__sede__capacitador=capacitador)
+    conteo = list(asistencias.annotate(mes=ExtractMonth('fecha')).order_by().values(
+        'mes', 'grupo__sede').annotate(cantidad=Count('id')))
+    escuelas = escuelas_por_sede({fila['grupo__sede'] for fila in conteo})
+    for fila in conteo:
+        meses['sedes'][fila['mes'] - 1] += fila['cantidad']
+        meses['escuelas'][fila['mes'] - 1] += fila['cantidad'] * escuelas.get(fila['grupo__sede'], 0)
+    return meses
+
+
+def calcular_equipamiento(anio, capacitador=None):
+    """Totales de los :class:`tpe.Equipamiento` y las reparaciones del año."""
+    totales = Equipamiento.objects.filter(fecha__year=anio).aggregate(
+        equipamiento_total=Count(Case(When(renovacion=False, then=1), output_field=IntegerField())),
+        renovacion_total=Count(Case(When(renovacion=True, then=1), output_field=IntegerField())),
+        computadoras_total=Coalesce(Sum('cantidad_equipo'), 0),
+        alumnos_total=Coalesce(Sum('poblacion__total_alumno'), 0),
+        maestros_total=Coalesce(Sum('poblacion__total_maestro'), 0))
+    totales['reparacion_total'] = TicketReparacion.objects.filter(fecha_fin__year=anio).count()
+    return totales
+
+
+def calcular_equipamiento_mensual(anio, capacitador=None):
+    """Cantidad de :class:`tpe.Equipamiento` nuevos y de renovación por cada mes del año."""
+    meses = {'equipamiento': [0] * 12, 'renovacion': [0] * 12}
+    conteo = Equipamiento.objects.filter(fecha__year=anio).annotate(mes=ExtractMonth('fecha')).order_by().values(
+        'mes', 'renovacion').annotate(cantidad=Count('id'))
+    for fila in conteo:
+        meses['renovacion' if fila['renovacion'] else 'equipamiento'][fila['mes'] - 1] = fila['cantidad']
+    return meses
+
+
+def alcances_sedes(sedes):
+    """Devuelve los alcances `(anio, capacitador)` en los que se muestran las `sedes` (ids o consulta de ids):
+    los años de sus asistencias con el capacitador de cada sede.
+    """
+    return set(Calendario.objects.filter(grupo__sede__in=sedes, fecha__isnull=False).annotate(
+        anio=ExtractYear('fecha')).order_by().values_list('anio', 'grupo__sede__capacitador').distinct())
+
+
+def alcances_anios(anios):
+    """Devuelve el alcance global de cada uno de `anios`, para los widgets sin alcance por capacitador."""
+    return {(anio, None) for anio in anios if anio is not None}
+
+
+def por_sedes(funcion):
+    """Para `WIDGETS`: obtiene los alcances de un registro a partir de las sedes que devuelve `funcion`.
+    Al eliminar un registro en cascada sus asistencias pueden haberse eliminado, por lo que `funcion` puede
+    devolver `None` para invalidar todos los alcances.
+    """
+    def alcances(instancia, eliminado):
+        seleccion = funcion(instancia, eliminado)
+        return None if seleccion is None else alcances_sedes(seleccion)
+    return alcances
+
+
+def anio_de(fecha):
+    return getattr(fecha, 'year', None)
+
+
+# Por cada widget: la función que calcula sus datos, si acepta el alcance de un capacitador
+# y, por cada modelo cuyos cambios lo invalidan, la función que devuelve los alcances `(anio, capacitador)`
+# afectados por un registro (o `None` si no se pueden determinar).
+ALCANCES_CAPACITACION = {
+    'cyd.Sede': por_sedes(lambda sede, eliminado: None if eliminado else [sede.pk]),
+    'cyd.Grupo': por_sedes(lambda grupo, eliminado: None if eliminado else [grupo.sede_id]),
+    'cyd.Calendario': por_sedes(
+        lambda calendario, eliminado: None if eliminado else Grupo.objects.filter(
+            pk=calendario.grupo_id).values('sede')),
+    'cyd.Curso': por_sedes(lambda curso, eliminado: Grupo.objects.filter(curso=curso.pk).values('sede')),
+    'cyd.Participante': por_sedes(
+        lambda participante, eliminado: Asignacion.objects.filter(participante=participante.pk).values('grupo__sede')),
+    'cyd.Asignacion': por_sedes(
+        lambda asignacion, eliminado: Grupo.objects.filter(pk=asignacion.grupo_id).values('sede')),
+    'cyd.NotaAsistencia': por_sedes(
+        lambda nota, eliminado: Asignacion.objects.filter(pk=nota.asignacion_id).values('grupo__sede')),
+    'cyd.NotaHito': por_sedes(
+        lambda nota, eliminado: Asignacion.objects.filter(pk=nota.asignacion_id).values('grupo__sede')),
+}
+
+WIDGETS = {
+    'capacitacion': {
+        'calcular': calcular_capacitacion,
+        'por_capacitador': True,
+        'modelos': ALCANCES_CAPACITACION,
+    },
+    'capacitacion_mensual': {
+        'calcular': calcular_capacitacion_mensual,
+        'por_capacitador': True,
+        'modelos': {
+            modelo: ALCANCES_CAPACITACION[modelo]
+            for modelo in ('cyd.Sede', 'cyd.Grupo', 'cyd.Calendario', 'cyd.Participante', 'cyd.Asignacion')},
+    },
+    'equipamiento': {
+        'calcular': calcular_equipamiento,
+        'por_capacitador': False,
+        'modelos': {
+            'tpe.Equipamiento': lambda equipamiento, eliminado: alcances_anios([anio_de(equipamiento.fecha)]),
+            'tpe.TicketReparacion': lambda ticket, eliminado: alcances_anios([anio_de(ticket.fecha_fin)]),
+            'escuela.EscPoblacion': lambda poblacion, eliminado: alcances_anios(
+                Equipamiento.objects.filter(poblacion=poblacion.pk).annotate(
+                    anio=ExtractYear('fecha')).order_by().values_list('anio', flat=True).distinct()),
+        },
+    },
+    'equipamiento_mensual': {
+        'calcular': calcular_equipamiento_mensual,
+        'por_capacitador': False,
+        'modelos': {
+            'tpe.Equipamiento': lambda equipamiento, eliminado: alcances_anios([anio_de(equipamiento.fecha)]),
+        },
+    },
+}
+
+
+def alcance(capacitador):
+    return getattr(capacitador, 'pk', capacitador) or 'global'
+
+
+def clave_version(widget, anio=None, capacitador=None):
+    if anio is None:
+        return 'main:tablero:{}:version'.format(widget)
+    return 'main:tablero:{}:{}:{}:version'.format(widget, anio, alcance(capacitador))
+
+
+def clave(widget, anio, capacitador=None):
+    return 'main:tablero:{}:{}:{}'.format(widget, anio, alcance(capacitador))
+
+
+def version(widget, anio=None, capacitador=None):
+    """Devuelve la versión de `widget` para el año y alcance indicados: la versión general del widget y la del
+    alcance, iniciándolas con la hora actual si aún no existen.
+    """
+    general = cache.get_or_set(clave_version(widget), int(time.time()), None)
+    if anio is None:
+        return general
+    return (general, cache.get_or_set(clave_version(widget, anio, capacitador), int(time.time()), None))
+
+
+def incrementar(llave):
+    try:
+        cache.incr(llave)
+    except ValueError:
+        cache.set(llave, int(time.time()), None)
+
+
+def invalidar(*widgets, alcances=None):
+    """Incrementa la versión de cada uno de `widgets` (por defecto, todos).
+    Si se indican `alcances` (tuplas `(anio, capacitador)`), solo se incrementa la versión de esos alcances y la
+    global de sus años; si no, la versión general del widget.
+    """
+    for widget in widgets or WIDGETS:
+        if alcances is None:
+            incrementar(clave_version(widget))
+            continue
+        por_capacitador = WIDGETS[widget]['por_capacitador']
+        llaves = set()
+        for anio_alcance, capacitador in alcances:
+            llaves.add(clave_version(widget, anio_alcance))
+            if por_capacitador and capacitador is not None:
+                llaves.add(clave_version(widget, anio_alcance, capacitador))
+        for llave in llaves:
+            incrementar(llave)
+
+
+def invalidar_modelo(sender, instance=None, **kwargs):
+    """Invalida los alcances afectados por `instance` en los widgets que dependen del modelo `sender`.
+    Se conecta a las señales de los modelos de `WIDGETS`; sin `instance` se invalidan todos los alcances.
+    """
+    eliminado = 'created' not in kwargs
+    for widget, datos in WIDGETS.items():
+        funcion = datos['modelos'].get(sender._meta.label)
+        if funcion is None:
+            continue
+        invalidar(widget, alcances=None if instance is None else funcion(instance, eliminado))
+
+
+def invalidar_sedes(widgets, sedes):
+    """Invalida los alcances de `sedes` (ids o consulta de ids) en `widgets`."""
+    invalidar(*widgets, alcances=alcances_sedes(sedes))
+
+
+def widgets_modelo(modelo):
+    """Devuelve los widgets que dependen de `modelo` (clase o etiqueta `app_label.Modelo`)."""
+    etiqueta = getattr(getattr(modelo, '_meta', None), 'label', modelo)
+    return [widget for widget, datos in WIDGETS.items() if etiqueta in datos['modelos']]
+
+
+def desactualizada(widget, anio, capacitador, copia):
+    return copia['version'] != version(widget, anio, capacitador)
+
+
+def vencida(widget, anio, capacitador, copia):
+    return desactualizada(widget, anio, capacitador, copia) or time.time() - copia['fecha'] > VIGENCIA
+
+
+def calcular(widget, anio=None, capacitador=None):
+    """Calcula los datos de `widget` y los guarda en caché."""
+    anio = anio or datetime.now().year
+    copia = {'version': version(widget, anio, capacitador), 'fecha': time.time()}
+    copia['datos'] = WIDGETS[widget]['calcular'](anio, capacitador)
+    cache.set(clave(widget, anio, capacitador), copia, CACHE_TIMEOUT)
+    return copia['datos']
+
+
+def obtener(widget, anio=None, capacitador=None):
+    """Devuelve los datos guardados de `widget`, aunque estén vencidos o desactualizados; los recalcula el
+    comando `calentar_tablero`. Solo se calculan durante la solicitud si todavía no existe ninguna copia.
+
+    Raises:
+        KeyError: si `widget` no es un widget válido.
+    """
+    anio = anio or datetime.now().year
+    if not WIDGETS[widget]['por_capacitador']:
+        capacitador = None
+    copia = cache.get(clave(widget, anio, capacitador))
+    if copia is None:
+        return calcular(widget, anio, capacitador)
+    return copia['datos']
+
+
+def alcances(widget, anio):
+    """Devuelve los alcances para los que se guarda `widget`: global y, si aplica, cada capacitador
+    con sedes que tengan asistencias en el año.
+    """
+    alcances = [None]
+    if WIDGETS[widget]['por_capacitador']:
+        alcances += list(Sede.objects.filter(
+            grupos__asistencias__fecha__year=anio).order_by().values_list('capacitador', flat=True).distinct())
+    return alcances
+
+
+def calentar(anio=None, forzar=False):
+    """Recalcula las copias vencidas, desactualizadas o inexistentes de todos los widgets, o todas si `forzar`.
+
+    Returns:
+        int: la cantidad de copias recalculadas.
+    """
+    anio = anio or datetime.now().year
+    recalculadas = 0
+    for widget in WIDGETS:
+        for capacitador in alcances(widget, anio):
+            copia = cache.get(clave(widget, anio, capacitador))
+            if forzar or copia is None or vencida(widget, anio, capacitador, copia):
+                calcular(widget, anio, capacitador)
+                recalculadas += 1
+    return recalculadas
@@ -0,0 +1,59 @@
+import csv
+import inspect
+import io
+from datetime import date
+
+from django.test import SimpleTestCase
+from openpyxl import load_workbook
+
+from apps.main import exportar
+
+COLUMNAS = (
+    ('codigo', 'UDI'),
+    ('escuela.nombre', 'Escuela'),
+    ('equipada', 'Equipada'),
+    ('fecha', 'Fecha'),
+    ('cooperante.nombre', 'Cooperantes'),
+)
+
+
+def filas(cantidad):
+    for indice in range(cantidad):
+        yield {
+            'codigo': '<a href="/escuela/{0}/">00-00-{0:04d}-43</a>'.format(indice),
+            'escuela': {'nombre': 'Escuela {}'.format(indice), 'url': '/escuela/'},
+            'equipada': indice % 2 == 0,
+            'fecha': date(2020, 1, 1 + indice % 28),
+            'cooperante': [{'nombre': 'Funsepa'}, {'nombre': 'Cooperante\x0b {}'.format(indice)}],
+        }
+
+
+class ExportarTestCase(SimpleTestCase):
+    """Pruebas para la descarga de informes en CSV y XLSX"""
+
+    def test_csv(self):
+        generador = filas(3)
+        respuesta = exportar.exportar('csv', 'escuelas', COLUMNAS, generador)
+        self.assertIn('escuelas_', respuesta['Content-Disposition'])
+        # Las filas se leen hasta que se envía la respuesta
+        self.assertEqual(inspect.getgeneratorstate(generador), inspect.GEN_CREATED)
+        contenido = b''.join(respuesta.streaming_content).decode('utf-8')
+        self.assertTrue(contenido.startswith('\ufeff'))
+        lineas = list(csv.reader(io.StringIO(contenido[1:])))
+        self.assertEqual(lineas[0], ['UDI', 'Escuela', 'Equipada', 'Fecha', 'Cooperantes'])
+        self.assertEqual(
+            lineas[1], ['00-00-0000-43', 'Escuela 0', 'Sí', '2020-01-01', 'Funsepa, Cooperante\x0b 0'])
+        self.assertEqual(len(lineas), 4)
+
+    def test_xlsx(self):
+        respuesta = exportar.exportar('xlsx', 'escuelas', COLUMNAS, filas(500))
+        self.assertEqual(respuesta['Content-Type'], exportar.TIPO_XLSX)
+        libro = load_workbook(io.BytesIO(b''.join(respuesta.streaming_content)), read_only=True)
+        hoja = libro['escuelas']
+        registros = list(hoja.iter_rows(values_only=True))
+        self.assertEqual(len(registros), 501)
+        self.assertEqual(registros[0], ('UDI', 'Escuela', 'Equipada', 'Fecha', 'Cooperantes'))
+        self.assertEqual(registros[2][:3], ('00-00-0001-43', 'Escuela 1', 'No'))
+        self.assertEqual(registros[2][3].date(), date(2020, 1, 2))
+        # Los caracteres de control no válidos en Excel se eliminan
+        self.assertEqual(registros[2][4], 'Funsepa, Cooperante 1')
@@ -0,0 +1,77 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import Group, User
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from django.utils.six import StringIO
+
+from apps.main import notificaciones
+from apps.main.models import Notificacion
+
+PLANTILLA = 'inventario/email/email_solicitud.html'
+
+
+class NotificacionesTestCase(TestCase):
+    """Pruebas para el envío diferido de notificaciones por correo electrónico"""
+
+    def setUp(self):
+        self.grupo = Group.objects.create(name='bodega')
+        for indice in range(3):
+            usuario = User.objects.create(username='bodega{}'.format(indice), email='bodega{}@funsepa.org'.format(indice))
+            usuario.groups.add(self.grupo)
+        User.objects.create(username='inactivo', email='inactivo@funsepa.org', is_active=False).groups.add(self.grupo)
+
+    def contexto(self, indice):
+        return {'solicitud_id': str(indice), 'estado': 'Creada', 'usuario': 'Usuario', 'url': '/'}
+
+    def test_envio_por_lotes(self):
+        for indice in range(5):
+            notificaciones.encolar(
+                'Solicitud {}'.format(indice),
+                PLANTILLA,
+                self.contexto(indice),
+                destinatarios=['tecnico@funsepa.org', ''],
+                grupo=self.grupo if indice % 2 else None)
+        self.assertEqual(len(mail.outbox), 0)
+
+        self.assertEqual(notificaciones.enviar_pendientes(tamano_lote=2), (5, 0))
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(mail.outbox[0].to, ['tecnico@funsepa.org'])
+        self.assertEqual(
+            sorted(mail.outbox[1].to),
+            ['bodega0@funsepa.org', 'bodega1@funsepa.org', 'bodega2@funsepa.org', 'tecnico@funsepa.org'])
+        self.assertEqual(mail.outbox[1].alternatives[0][1], 'text/html')
+        self.assertFalse(Notificacion.objects.filter(enviada=False).exists())
+
+        # Las notificaciones enviadas no se vuelven a enviar
+        self.assertEqual(notificaciones.enviar_pendientes(), (0, 0))
+        self.assertEqual(len(mail.outbox), 5)
+
+    def test_reintentos(self):
+        fallida = notificaciones.encolar('Fallida', 'no/existe.html', {}, destinatarios=['tecnico@funsepa.org'])
+        notificaciones.encolar('Correcta', PLANTILLA, self.contexto(1), grupo=self.grupo.id)
+        self.assertEqual(notificaciones.enviar_pendientes(), (1, 1))
+        fallida.refresh_from_db()
+        self.assertEqual(fallida.intentos, 1)
+        self.assertFalse(fallida.enviada)
+        self.assertIn('no/existe.html', fallida.error)
+        self.assertGreater(fallida.siguiente_intento, timezone.now())
+
+        # Solo se reintenta al llegar la fecha del siguiente intento y hasta el máximo de intentos
+        self.assertEqual(notificaciones.enviar_pendientes(), (0, 0))
+        for intentos in (2, 3):
+            Notificacion.objects.filter(id=fallida.id).update(siguiente_intento=timezone.now() - timedelta(minutes=1))
+            self.assertEqual(notificaciones.enviar_pendientes(intentos_maximos=3), (0, 1))
+        Notificacion.objects.filter(id=fallida.id).update(siguiente_intento=timezone.now() - timedelta(minutes=1))
+        self.assertEqual(notificaciones.enviar_pendientes(intentos_maximos=3), (0, 0))
+        self.assertEqual(Notificacion.objects.get(id=fallida.id).intentos, 3)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_comando(self):
+        notificaciones.encolar('Solicitud', PLANTILLA, self.contexto(1), destinatarios=['tecnico@funsepa.org'])
+        salida = StringIO()
+        call_command('enviar_notificaciones', stdout=salida)
+        self.assertIn('1 notificaciones enviadas', salida.getvalue())
+        self.assertEqual(len(mail.outbox), 1)
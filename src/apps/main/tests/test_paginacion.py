@@ -0,0 +1,103 @@
+from urllib.parse import parse_qs, urlparse
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.cyd.api_views import ParticipanteViewSet
+from apps.cyd.models import Participante
+from apps.cyd.tests.factories import ParticipanteFactory
+from apps.escuela.tests.factories import EscuelaFactory
+from apps.inventario.models import Dispositivo
+from apps.inventario.serializers import DispositivoSerializer
+from apps.main import models as main_m
+from apps.main.mixins import proyectar
+from apps.main.serializers import DynamicFieldsModelSerializer
+
+
+class PaginacionApiTestCase(TestCase):
+    """Pruebas para la paginación opcional de la API y la proyección de campos con `fields=`"""
+
+    def setUp(self):
+        self.usuario = User.objects.create(username='capacitador')
+        departamento = main_m.Departamento.objects.create(nombre='Guatemala')
+        self.escuela = EscuelaFactory(
+            municipio=main_m.Municipio.objects.create(departamento=departamento, nombre='Mixco'))
+        for indice in range(12):
+            ParticipanteFactory(
+                escuela=self.escuela,
+                nombre='Maestra' if indice % 3 else 'Director',
+                apellido='Apellido {:02d}'.format(indice))
+
+    def listar(self, **params):
+        request = APIRequestFactory().get('/', params)
+        force_authenticate(request, user=self.usuario)
+        return ParticipanteViewSet.as_view({'get': 'list'})(request).data
+
+    def datatables(self, **params):
+        base = {
+            'draw': '3', 'start': '0', 'length': '5',
+            'columns[0][data]': 'nombre', 'columns[0][searchable]': 'true', 'columns[0][orderable]': 'true',
+            'columns[1][data]': 'apellido', 'columns[1][searchable]': 'true', 'columns[1][orderable]': 'true',
+            'columns[2][data]': 'url', 'columns[2][searchable]': 'true', 'columns[2][orderable]': 'true',
+            'order[0][column]': '1', 'order[0][dir]': 'desc', 'search[value]': '',
+        }
+        base.update(params)
+        return self.listar(**base)
+
+    def test_sin_paginacion(self):
+        # Sin parámetros de paginación se devuelve el listado completo
+        self.assertEqual(len(self.listar()), 12)
+
+    def test_datatables(self):
+        respuesta = self.datatables()
+        self.assertEqual((respuesta['draw'], respuesta['recordsTotal'], respuesta['recordsFiltered']), (3, 12, 12))
+        self.assertEqual(
+            [participante['apellido'] for participante in respuesta['data']],
+            ['Apellido {:02d}'.format(indice) for indice in range(11, 6, -1)])
+
+        respuesta = self.datatables(**{'search[value]': 'director', 'start': '2'})
+        self.assertEqual((respuesta['recordsTotal'], respuesta['recordsFiltered']), (12, 4))
+        self.assertEqual([participante['apellido'] for participante in respuesta['data']], ['Apellido 03', 'Apellido 00'])
+
+        # Búsqueda por columna; las columnas que no son de la base de datos se ignoran
+        respuesta = self.datatables(**{
+            'columns[1][search][value]': '0', 'order[0][column]': '2', 'columns[2][search][value]': 'x'})
+        self.assertEqual(respuesta['recordsFiltered'], 11)
+        self.assertEqual(len(respuesta['data']), 5)
+
+    def test_cursor(self):
+        ids = sorted(Participante.objects.values_list('id', flat=True))
+        respuesta = self.listar(page_size=5)
+        self.assertEqual([participante['id'] for participante in respuesta['results']], ids[:5])
+        cursor = parse_qs(urlparse(respuesta['next']).query)['cursor'][0]
+        siguiente = self.listar(page_size=5, cursor=cursor)
+        self.assertEqual([participante['id'] for participante in siguiente['results']], ids[5:10])
+        self.assertIsNone(self.listar(page_size=20)['next'])
+
+    def test_proyeccion(self):
+        respuesta = self.listar(fields='id,nombre,escuela')
+        self.assertEqual(set(respuesta[0].keys()), {'id', 'nombre', 'escuela'})
+
+        class Serializer(DynamicFieldsModelSerializer):
+            class Meta:
+                model = Participante
+                fields = ('id', 'nombre', 'escuela', 'asignaciones')
+
+        campos = Serializer(fields='nombre,escuela,asignaciones').fields.values()
+        queryset = proyectar(Participante.objects.all(), campos)
+        self.assertEqual(queryset.query.deferred_loading, ({'id', 'nombre', 'escuela'}, False))
+        # Con select_related se incluye la relación para no diferirla
+        queryset = proyectar(Participante.objects.select_related('rol'), campos)
+        self.assertIn('rol', queryset.query.deferred_loading[0])
+        with self.assertNumQueries(1):
+            self.assertEqual(len([participante.rol.nombre for participante in queryset]), 12)
+
+        # Un campo que lee un método no permite recortar las columnas
+        campos = Serializer(fields='nombre').fields
+        campos['url'] = ParticipanteViewSet.serializer_class().fields['url']
+        self.assertEqual(proyectar(Participante.objects.all(), campos.values()).query.deferred_loading[0], set())
+        # salvo que el método declare las columnas que lee
+        campos = DispositivoSerializer(fields='triage,url').fields.values()
+        self.assertEqual(
+            proyectar(Dispositivo.objects.all(), campos).query.deferred_loading, ({'id', 'triage', 'tipo'}, False))
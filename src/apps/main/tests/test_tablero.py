@@ -0,0 +1,134 @@
+from datetime import date
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils.six import StringIO
+
+from apps.cyd import models as cyd_m
+from apps.cyd.tests import factories
+from apps.escuela.models import EscPoblacion
+from apps.escuela.tests.factories import EscuelaFactory
+from apps.main import models as main_m
+from apps.main import tablero
+from apps.tpe import models as tpe_m
+
+ANIO = 2020
+
+
+class TableroTestCase(TestCase):
+    """Pruebas para la caché de los widgets de la página de inicio"""
+
+    def setUp(self):
+        cache.clear()
+        departamento = main_m.Departamento.objects.create(nombre='Guatemala')
+        municipio = main_m.Municipio.objects.create(departamento=departamento, nombre='Mixco')
+        self.escuelas = [EscuelaFactory(municipio=municipio), EscuelaFactory(municipio=municipio)]
+        curso = factories.CursoFactory()
+        factories.CrHitoFactory(curso=curso)
+        cr_asistencia = cyd_m.CrAsistencia.objects.create(curso=curso, modulo_num=1, punteo_max=0)
+        self.sedes = [factories.SedeFactory(escuela_beneficiada=self.escuelas[0]) for _ in range(2)]
+        self.grupos = [factories.GrupoFactory(sede=sede, curso=curso) for sede in self.sedes]
+        for grupo, mes in ((self.grupos[0], 3), (self.grupos[0], 5), (self.grupos[1], 3)):
+            cyd_m.Calendario.objects.create(cr_asistencia=cr_asistencia, grupo=grupo, fecha=date(ANIO, mes, 1))
+        for escuela, grupo in ((0, 0), (0, 0), (1, 0), (0, 1)):
+            participante = factories.ParticipanteFactory(escuela=self.escuelas[escuela])
+            cyd_m.Asignacion.asignar([participante], [self.grupos[grupo]])
+        self.nota = cyd_m.NotaHito.objects.filter(asignacion__grupo=self.grupos[0]).first()
+        self.nota.nota = 80
+        self.nota.save()
+
+        tpe_m.EquipamientoEstado.objects.create(id=1, estado='Entregado')
+        tpe_m.Equipamiento.objects.create(
+            id=1, escuela=self.escuelas[0], fecha=date(ANIO, 3, 1), cantidad_equipo=10,
+            poblacion=EscPoblacion.objects.create(escuela=self.escuelas[0], alumno=20, maestro=2))
+        tpe_m.Equipamiento.objects.create(
+            id=2, escuela=self.escuelas[1], fecha=date(ANIO, 7, 1), cantidad_equipo=5, renovacion=True)
+
+    def calcular_sin_cache(self, sedes_list):
+        """Los totales como los calculaba la página de inicio, sede por sede."""
+        return {
+            'capacitacion_total': sum(e.get_escuelas().count() for e in sedes_list),
+            'maestros_total': sum(len(e.get_participantes()['listado']) for e in sedes_list),
+            'aprobados_total': sum(e.get_participantes()['resumen']['estado']['aprobado']['cantidad'] for e in sedes_list),
+            'reprobados_total': sum(e.get_participantes()['resumen']['estado']['reprobado']['cantidad'] for e in sedes_list),
+            'nivelar_total': sum(e.get_participantes()['resumen']['estado']['nivelar']['cantidad'] for e in sedes_list),
+        }
+
+    def test_capacitacion(self):
+        sedes_list = list(cyd_m.Sede.objects.filter(grupos__asistencias__fecha__year=ANIO))
+        datos = tablero.calcular_capacitacion(ANIO)
+        self.assertEqual(datos['capacitacion_total'], 5)
+        self.assertEqual(datos['aprobados_total'], 2)
+        self.assertEqual(datos['departamentos_total'], 1)
+        self.assertEqual({k: v for k, v in datos.items() if k != 'departamentos_total'}, self.calcular_sin_cache(sedes_list))
+
+        capacitador = self.sedes[1].capacitador
+        datos = tablero.calcular_capacitacion(ANIO, capacitador)
+        self.assertEqual((datos['capacitacion_total'], datos['maestros_total']), (1, 1))
+
+        meses = tablero.calcular_capacitacion_mensual(ANIO)
+        self.assertEqual((meses['sedes'][2], meses['escuelas'][2]), (2, 3))
+        self.assertEqual((meses['sedes'][4], meses['escuelas'][4]), (1, 2))
+        self.assertEqual(sum(meses['sedes']), 3)
+        self.assertEqual(sum(tablero.calcular_capacitacion_mensual(ANIO, capacitador)['sedes']), 1)
+
+    def test_equipamiento(self):
+        self.assertEqual(tablero.calcular_equipamiento(ANIO), {
+            'equipamiento_total': 1,
+            'renovacion_total': 1,
+            'computadoras_total': 15,
+            'alumnos_total': 20,
+            'maestros_total': 2,
+            'reparacion_total': 0})
+        meses = tablero.calcular_equipamiento_mensual(ANIO)
+        self.assertEqual((meses['equipamiento'][2], meses['renovacion'][6]), (1, 1))
+        self.assertEqual(sum(meses['equipamiento']) + sum(meses['renovacion']), 2)
+
+    def test_invalidacion(self):
+        # Global y por cada capacitador para los widgets de capacitación, solo global para los de equipamiento
+        self.assertEqual(tablero.calentar(ANIO), 8)
+        self.assertEqual(tablero.calentar(ANIO), 0)
+        with self.assertNumQueries(0):
+            self.assertEqual(tablero.obtener('equipamiento', ANIO)['computadoras_total'], 15)
+            tablero.obtener('capacitacion', ANIO, self.sedes[0].capacitador)
+
+        # Las copias desactualizadas por un cambio se siguen mostrando hasta que las recalcula el comando
+        tpe_m.Equipamiento.objects.create(id=3, escuela=self.escuelas[1], fecha=date(ANIO, 8, 1), cantidad_equipo=7)
+        with self.assertNumQueries(0):
+            self.assertEqual(tablero.obtener('equipamiento', ANIO)['computadoras_total'], 15)
+        self.assertEqual(tablero.calentar(ANIO), 2)
+        with self.assertNumQueries(0):
+            self.assertEqual(tablero.obtener('equipamiento', ANIO)['computadoras_total'], 22)
+
+        # Los cambios de otro año no desactualizan las copias del año
+        tpe_m.Equipamiento.objects.create(id=4, escuela=self.escuelas[1], fecha=date(ANIO - 1, 8, 1))
+        self.assertEqual(tablero.calentar(ANIO), 0)
+
+        # Las copias solo vencidas por tiempo se siguen mostrando hasta que las recalcula el comando
+        copia = cache.get(tablero.clave('equipamiento', ANIO))
+        copia['fecha'] -= tablero.VIGENCIA + 1
+        cache.set(tablero.clave('equipamiento', ANIO), copia)
+        with self.assertNumQueries(0):
+            self.assertEqual(tablero.obtener('equipamiento', ANIO)['computadoras_total'], 22)
+        self.assertEqual(tablero.calentar(ANIO), 1)
+
+        # Una nota solo desactualiza el resumen global y el del capacitador de su sede
+        nota = cyd_m.NotaHito.objects.filter(asignacion__grupo=self.grupos[1]).first()
+        nota.nota = 50
+        nota.save()
+        with self.assertNumQueries(0):
+            tablero.obtener('capacitacion', ANIO, self.sedes[0].capacitador)
+        self.assertEqual(tablero.calentar(ANIO), 2)
+        self.assertEqual(tablero.calcular_capacitacion(ANIO, self.sedes[1].capacitador), tablero.obtener(
+            'capacitacion', ANIO, self.sedes[1].capacitador))
+
+        # Las notas se actualizan sin señales, pero también invalidan el resumen de capacitación
+        cyd_m.Asignacion.actualizar_notas()
+        self.assertEqual(tablero.calentar(ANIO), 3)
+        self.assertEqual(tablero.calentar(ANIO, forzar=True), 8)
+
+    def test_comando(self):
+        salida = StringIO()
+        call_command('calentar_tablero', anio=ANIO, stdout=salida)
+        self.assertIn('8 widgets recalculados', salida.getvalue())
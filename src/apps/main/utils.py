@@ -1,3 +1,7 @@
+import re
+import unicodedata
+
+
 def get_telefonica(num_telefono):
 	if(num_telefono < 30000000 or num_telefono >= 60000000):
 		return "otro"
@@ -62,4 +66,12 @@ def get_telefonica(num_telefono):
 		return "claro"
 
 	else:
-		return "otro"
\ No newline at end of file
+		return "otro"
+
+def normalizar(texto):
+	"""Convierte `texto` a minúsculas, sin tildes ni signos de puntuación y con un solo espacio entre palabras.
+	Se usa para comparar textos sin importar tildes ni mayúsculas.
+	"""
+	texto = unicodedata.normalize('NFKD', texto or '')
+	texto = ''.join(caracter for caracter in texto if not unicodedata.combining(caracter)).lower()
+	return ' '.join(re.sub(r'[^\w]+', ' ', texto).split())
@@ -5,10 +5,10 @@ from django.urls import reverse_lazy
 from braces.views import LoginRequiredMixin
 from django.views.generic import TemplateView
 
+from apps.main import tablero
 from apps.tpe.models import (
-    Equipamiento, Garantia, TicketReparacion,
+    Garantia, TicketReparacion,
     TicketSoporte, TicketReparacionRepuesto)
-from apps.cyd.models import (Sede, Participante)
 from apps.tpe.forms import TicketReparacionRepuestoAuthForm
 
 
@@ -19,30 +19,18 @@ class IndexView(LoginRequiredMixin, TemplateView):
         widgets = []
 
         if self.request.user.groups.filter(Q(name='cyd')).exists():
-            today = datetime.now()
-            departamentos = []
+            capacitador = None
             if self.request.user.groups.filter(Q(name='cyd_capacitador')).exists():
-                sedes_list = self.request.user.sedes.filter(grupos__asistencias__fecha__year=today.year)
-            else:
-                sedes_list = Sede.objects.filter(grupos__asistencias__fecha__year=today.year)
-
-            (departamentos.append(e.municipio.departamento.nombre) for e in sedes_list)
-
+                capacitador = self.request.user
+            extra = {'url': reverse_lazy('capacitacion_list_home')}
+            extra.update(tablero.obtener('capacitacion', capacitador=capacitador))
             widgets.append({
                 'queryset': '',
                 'template_name': 'widgets/cyd_capacitacion_chart.html',
                 'media_js': {
                     'js/distributed/Chart.min.js'
                 },
-                'extra': {
-                    'url': reverse_lazy('capacitacion_list_home'),
-                    'capacitacion_total': sum(e.get_escuelas().count() for e in sedes_list),
-                    'departamentos_total': len(list(set(departamentos))),
-                    'maestros_total': sum(len(e.get_participantes()['listado']) for e in sedes_list),
-                    'aprobados_total': sum(int(e.get_participantes()['resumen']['estado']['aprobado']['cantidad']) for e in sedes_list),
-                    'reprobados_total': sum(int(e.get_participantes()['resumen']['estado']['reprobado']['cantidad']) for e in sedes_list),
-                    'nivelar_total': sum(int(e.get_participantes()['resumen']['estado']['nivelar']['cantidad']) for e in sedes_list),
-                }
+                'extra': extra
             })
 
             widgets.append({
@@ -64,24 +52,15 @@ class IndexView(LoginRequiredMixin, TemplateView):
             })
 
         if self.request.user.groups.filter(Q(name='tpe') | Q(name='consulta')).exists():
-            today = datetime.now()
-            equipamiento_list = Equipamiento.objects.filter(fecha__year=today.year)
-            reparaciones = TicketReparacion.objects.filter(fecha_fin__year=today.year).count()
+            extra = {'url': reverse_lazy('equipamiento_list_home')}
+            extra.update(tablero.obtener('equipamiento'))
             widgets.append({
                 'queryset': '',
                 'template_name': 'widgets/tpe_equipamiento_chart.html',
                 'media_js': {
                     'js/distributed/Chart.min.js'
                 },
-                'extra': {
-                    'url': reverse_lazy('equipamiento_list_home'),
-                    'equipamiento_total': equipamiento_list.filter(renovacion=False).count(),
-                    'computadoras_total': sum(e.cantidad_equipo for e in equipamiento_list),
-                    'alumnos_total': sum(e.poblacion.total_alumno for e in equipamiento_list if e.poblacion),
-                    'maestros_total': sum(e.poblacion.total_maestro for e in equipamiento_list if e.poblacion),
-                    'renovacion_total': equipamiento_list.filter(renovacion=True).count(),
-                    'reparacion_total': reparaciones,
-                }
+                'extra': extra
             })
             widgets.append({
                 'queryset': '',
@@ -9,6 +9,7 @@ from rest_framework.filters import SearchFilter
 from rest_framework import viewsets
 from braces.views import LoginRequiredMixin
 
+from apps.main.mixins import ProyeccionApiMixin
 from apps.mye import models as mye_m
 from apps.tpe import (
     serializers as tpe_serializers,
@@ -97,7 +98,7 @@ class EquipamientoViewSet(LoginRequiredMixin, viewsets.ReadOnlyModelViewSet):
     filter_backends = (SearchFilter, filters.DjangoFilterBackend)
 
 
-class EquipamientoFullViewSet(LoginRequiredMixin, viewsets.ReadOnlyModelViewSet):
+class EquipamientoFullViewSet(LoginRequiredMixin, ProyeccionApiMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = tpe_serializers.EquipamientoFullSerializer
     queryset = tpe_m.Equipamiento.objects.all()
     filter_class = EquipamientoFilter
@@ -8,6 +8,7 @@ from braces.views import (
     LoginRequiredMixin, PermissionRequiredMixin, GroupRequiredMixin,
     CsrfExemptMixin, JsonRequestResponseMixin)
 
+from apps.main import tablero
 from apps.main.mixins import InformeMixin
 from apps.escuela.views import EscuelaDetail
 from apps.escuela.models import Escuela
@@ -67,21 +68,7 @@ class EquipamientoInformeView(EquipamientoListView):
 
 class EquipamientoListHomeView(CsrfExemptMixin, JsonRequestResponseMixin, View):
     def post(self, request, *args, **kwargs):
-        today = datetime.now()
-        equipamiento_list = {'equipamiento': [], 'renovacion': []}
-        for i in range(1, 13):
-            equipamiento_list['equipamiento'].append(
-                tpe_m.Equipamiento.objects.filter(
-                    fecha__year=today.year,
-                    fecha__month=i,
-                    renovacion=False)
-                .count())
-            equipamiento_list['renovacion'].append(
-                tpe_m.Equipamiento.objects.filter(
-                    fecha__year=today.year,
-                    fecha__month=i,
-                    renovacion=True)
-                .count())
+        equipamiento_list = tablero.obtener('equipamiento_mensual')
         return self.render_json_response(equipamiento_list)
 
 
@@ -258,24 +245,31 @@ class ReparacionListView(InformeMixin):
     filter_list = {
         'estado': 'estado',
     }
-    queryset = tpe_m.TicketReparacion.objects.all()
-
-    def create_response(self, queryset):
-        var = [
-            {
-                'ticket': '<a href="{}">{}</a>'.format(
-                    reparacion.ticket.get_absolute_url(),
-                    reparacion.ticket),
-                'triage': reparacion.triage,
-                'dispositivo': str(reparacion.tipo_dispositivo),
-                'fecha_inicio': str(reparacion.fecha_inicio),
-                'falla_reportada': reparacion.falla_reportada,
-                'escuela': '<a href="{}">{}</a>'.format(
-                    reparacion.ticket.garantia.equipamiento.escuela.get_absolute_url(),
-                    reparacion.ticket.garantia.equipamiento.escuela)
-            } for reparacion in queryset
-        ]
-        return var
+    queryset = tpe_m.TicketReparacion.objects.select_related(
+        'ticket__garantia__equipamiento__escuela', 'tipo_dispositivo')
+    columnas = (
+        ('ticket', 'Ticket'),
+        ('triage', 'Triage'),
+        ('dispositivo', 'Dispositivo'),
+        ('fecha_inicio', 'Fecha de inicio'),
+        ('falla_reportada', 'Falla reportada'),
+        ('escuela', 'Escuela'),
+    )
+    nombre_archivo = 'reparaciones'
+
+    def get_fila(self, reparacion):
+        return {
+            'ticket': '<a href="{}">{}</a>'.format(
+                reparacion.ticket.get_absolute_url(),
+                reparacion.ticket),
+            'triage': reparacion.triage,
+            'dispositivo': str(reparacion.tipo_dispositivo),
+            'fecha_inicio': str(reparacion.fecha_inicio),
+            'falla_reportada': reparacion.falla_reportada,
+            'escuela': '<a href="{}">{}</a>'.format(
+                reparacion.ticket.garantia.equipamiento.escuela.get_absolute_url(),
+                reparacion.ticket.garantia.equipamiento.escuela)
+        }
 
 
 class ReparacionUpdateView(LoginRequiredMixin, UpdateView):
@@ -366,28 +360,38 @@ class MonitoreoCreateView(CsrfExemptMixin, JsonRequestResponseMixin, View):
 class MonitoreoListView(InformeMixin):
     form_class = tpe_f.MonitoreoListForm
     template_name = 'tpe/monitoreo_list.html'
-    queryset = tpe_m.Monitoreo.objects.all().order_by('equipamiento', 'fecha')
+    queryset = tpe_m.Monitoreo.objects.select_related(
+        'equipamiento__escuela__municipio__departamento', 'creado_por__perfil').order_by('equipamiento', 'fecha')
     filter_list = {
         'fecha_min': 'fecha__gte',
         'fecha_max': 'fecha__lte',
         'usuario': 'creado_por__perfil__id'
     }
-
-    def create_response(self, queryset):
-        return [
-            {
-                'entrega': monitoreo.equipamiento.id,
-                'entrega_url': monitoreo.equipamiento.get_absolute_url(),
-                'escuela': str(monitoreo.equipamiento.escuela),
-                'escuela_url': monitoreo.equipamiento.escuela.get_absolute_url(),
-                'escuela_codigo': monitoreo.equipamiento.escuela.codigo,
-                'departamento': str(monitoreo.equipamiento.escuela.municipio.departamento),
-                'municipio': str(monitoreo.equipamiento.escuela.municipio.nombre),
-                'comentario': monitoreo.comentario,
-                'fecha': monitoreo.fecha,
-                'usuario': str(monitoreo.creado_por.perfil),
-            } for monitoreo in queryset
-        ]
+    columnas = (
+        ('entrega', 'Entrega'),
+        ('escuela_codigo', 'UDI'),
+        ('escuela', 'Escuela'),
+        ('departamento', 'Departamento'),
+        ('municipio', 'Municipio'),
+        ('fecha', 'Fecha'),
+        ('usuario', 'Usuario'),
+        ('comentario', 'Comentario'),
+    )
+    nombre_archivo = 'monitoreos'
+
+    def get_fila(self, monitoreo):
+        return {
+            'entrega': monitoreo.equipamiento.id,
+            'entrega_url': monitoreo.equipamiento.get_absolute_url(),
+            'escuela': str(monitoreo.equipamiento.escuela),
+            'escuela_url': monitoreo.equipamiento.escuela.get_absolute_url(),
+            'escuela_codigo': monitoreo.equipamiento.escuela.codigo,
+            'departamento': str(monitoreo.equipamiento.escuela.municipio.departamento),
+            'municipio': str(monitoreo.equipamiento.escuela.municipio.nombre),
+            'comentario': monitoreo.comentario,
+            'fecha': monitoreo.fecha,
+            'usuario': str(monitoreo.creado_por.perfil),
+        }
 
 
 class TicketInformeView(InformeMixin):
@@ -400,29 +404,39 @@ class TicketInformeView(InformeMixin):
         'fecha_cierre_min': 'fecha_cierre__gte',
         'fecha_cierre_max': 'fecha_cierre__lte'
     }
-    queryset = tpe_m.TicketSoporte.objects.all()
-
-    def create_response(self, queryset):
-        var = [
-            {
-                'entrega': ticket.garantia.equipamiento.id,
-                'escuela': {
-                    'nombre': ticket.garantia.equipamiento.escuela.nombre,
-                    'codigo': ticket.garantia.equipamiento.escuela.codigo,
-                    'url': ticket.garantia.equipamiento.escuela.get_absolute_url()
-                },
-                'no_ticket': '<a href="{}">{}<a/>'.format(
-                    ticket.get_absolute_url(),
-                    ticket.id),
-                'fecha_inicio': str(ticket.fecha_abierto),
-                'fecha_fin': str(ticket.fecha_cierre) if ticket.fecha_cierre else "",
-                'estado': 'Cerrado' if ticket.cerrado else 'Abierto',
-                'costo_reparacion': ticket.get_costo_reparacion(),
-                'costo_transporte': ticket.get_costo_transporte(),
-                'costo_total': ticket.get_costo_total(),
-            } for ticket in queryset
-        ]
-        return var
+    queryset = tpe_m.TicketSoporte.objects.select_related('garantia__equipamiento__escuela')
+    columnas = (
+        ('no_ticket', 'Ticket'),
+        ('entrega', 'Entrega'),
+        ('escuela.codigo', 'UDI'),
+        ('escuela.nombre', 'Escuela'),
+        ('fecha_inicio', 'Fecha de apertura'),
+        ('fecha_fin', 'Fecha de cierre'),
+        ('estado', 'Estado'),
+        ('costo_reparacion', 'Costo de reparación'),
+        ('costo_transporte', 'Costo de transporte'),
+        ('costo_total', 'Costo total'),
+    )
+    nombre_archivo = 'tickets'
+
+    def get_fila(self, ticket):
+        return {
+            'entrega': ticket.garantia.equipamiento.id,
+            'escuela': {
+                'nombre': ticket.garantia.equipamiento.escuela.nombre,
+                'codigo': ticket.garantia.equipamiento.escuela.codigo,
+                'url': ticket.garantia.equipamiento.escuela.get_absolute_url()
+            },
+            'no_ticket': '<a href="{}">{}<a/>'.format(
+                ticket.get_absolute_url(),
+                ticket.id),
+            'fecha_inicio': str(ticket.fecha_abierto),
+            'fecha_fin': str(ticket.fecha_cierre) if ticket.fecha_cierre else "",
+            'estado': 'Cerrado' if ticket.cerrado else 'Abierto',
+            'costo_reparacion': ticket.get_costo_reparacion(),
+            'costo_transporte': ticket.get_costo_transporte(),
+            'costo_total': ticket.get_costo_total(),
+        }
 
 
 class TicketReparacionInformeView(InformeMixin):
@@ -435,37 +449,51 @@ class TicketReparacionInformeView(InformeMixin):
         'triage': 'triage',
         'tecnico_asignado': 'tecnico_asignado'
     }
-    queryset = tpe_m.TicketReparacion.objects.all()
-
-    def create_response(self, queryset):
-        var = [
-            {
-                'entrega': reparacion.ticket.garantia.equipamiento.id,
-                'escuela': {
-                    'nombre': reparacion.ticket.garantia.equipamiento.escuela.nombre,
-                    'codigo': reparacion.ticket.garantia.equipamiento.escuela.codigo,
-                    'url': reparacion.ticket.garantia.equipamiento.escuela.get_absolute_url()
-                },
-                'no_ticket': '<a href="{}">{}<a/>'.format(
-                    reparacion.ticket.get_absolute_url(),
-                    reparacion.ticket.id),
-                'triage': {
-                    'triage': '{}-{}'.format(reparacion.tipo_dispositivo, reparacion.triage),
-                    'url': reparacion.get_absolute_url()},
-                'fecha_inicio': str(reparacion.fecha_inicio),
-                'fecha_fin': str(reparacion.fecha_fin) if reparacion.fecha_fin else "",
-                'falla_reportada': reparacion.falla_reportada,
-                'falla_encontrada': reparacion.falla_encontrada,
-                'solucion_detalle': reparacion.solucion_detalle,
-                'estado': str(reparacion.estado),
-                'tecnico_asignado': reparacion.tecnico_asignado.get_full_name(),
-                'cooperante': [{
-                    'nombre': cooperante.nombre,
-                    'url': cooperante.get_absolute_url()}
-                    for cooperante in reparacion.ticket.garantia.equipamiento.cooperante.all()],
-            } for reparacion in queryset
-        ]
-        return var
+    queryset = tpe_m.TicketReparacion.objects.select_related(
+        'ticket__garantia__equipamiento__escuela', 'tipo_dispositivo', 'estado', 'tecnico_asignado')
+    columnas = (
+        ('no_ticket', 'Ticket'),
+        ('entrega', 'Entrega'),
+        ('escuela.codigo', 'UDI'),
+        ('escuela.nombre', 'Escuela'),
+        ('triage.triage', 'Triage'),
+        ('fecha_inicio', 'Fecha de inicio'),
+        ('fecha_fin', 'Fecha de fin'),
+        ('falla_reportada', 'Falla reportada'),
+        ('falla_encontrada', 'Falla encontrada'),
+        ('solucion_detalle', 'Solución'),
+        ('estado', 'Estado'),
+        ('tecnico_asignado', 'Técnico asignado'),
+        ('cooperante.nombre', 'Cooperantes'),
+    )
+    nombre_archivo = 'reparaciones'
+
+    def get_fila(self, reparacion):
+        return {
+            'entrega': reparacion.ticket.garantia.equipamiento.id,
+            'escuela': {
+                'nombre': reparacion.ticket.garantia.equipamiento.escuela.nombre,
+                'codigo': reparacion.ticket.garantia.equipamiento.escuela.codigo,
+                'url': reparacion.ticket.garantia.equipamiento.escuela.get_absolute_url()
+            },
+            'no_ticket': '<a href="{}">{}<a/>'.format(
+                reparacion.ticket.get_absolute_url(),
+                reparacion.ticket.id),
+            'triage': {
+                'triage': '{}-{}'.format(reparacion.tipo_dispositivo, reparacion.triage),
+                'url': reparacion.get_absolute_url()},
+            'fecha_inicio': str(reparacion.fecha_inicio),
+            'fecha_fin': str(reparacion.fecha_fin) if reparacion.fecha_fin else "",
+            'falla_reportada': reparacion.falla_reportada,
+            'falla_encontrada': reparacion.falla_encontrada,
+            'solucion_detalle': reparacion.solucion_detalle,
+            'estado': str(reparacion.estado),
+            'tecnico_asignado': reparacion.tecnico_asignado.get_full_name(),
+            'cooperante': [{
+                'nombre': cooperante.nombre,
+                'url': cooperante.get_absolute_url()}
+                for cooperante in reparacion.ticket.garantia.equipamiento.cooperante.all()],
+        }
 
 
 class TicketCalendarView(CsrfExemptMixin, JsonRequestResponseMixin, View):
@@ -168,6 +168,18 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Cache
+# La caché se comparte entre todos los procesos del servidor y los de cron, para que las versiones de los
+# catálogos, gráficas y widgets que invalidan las señales sean las mismas en todos. La tabla se crea con
+# `python src/manage.py createcachetable`.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'suni_cache',
+    }
+}
+
 # Internationalization
 # https://docs.djangoproject.com/en/1.10/topics/i18n/
 
@@ -182,7 +194,8 @@ USE_L10N = True
 USE_TZ = True
 
 REST_FRAMEWORK = {
-    'DEFAULT_FILTER_BACKENDS': ('django_filters.rest_framework.DjangoFilterBackend',)
+    'DEFAULT_FILTER_BACKENDS': ('django_filters.rest_framework.DjangoFilterBackend',),
+    'DEFAULT_PAGINATION_CLASS': 'apps.main.pagination.PaginacionApi',
 }
 
 # Static files (CSS, JavaScript, Images)
@@ -255,7 +268,12 @@ DBBACKUP_STORAGE_OPTIONS = {}
 CRONTAB_DJANGO_PROJECT_NAME = 'src'
 
 CRONJOBS = [
-    ('*/59 * * * *', 'apps.main.cron.backup_cron', '>> ~/cronjob.log')
+    ('*/59 * * * *', 'apps.main.cron.backup_cron', '>> ~/cronjob.log'),
+    ('*/5 * * * *', 'apps.main.cron.generar_qr_cron', '>> ~/cronjob.log'),
+    ('0 2 * * *', 'apps.main.cron.reconstruir_indicadores_cron', '>> ~/cronjob.log'),
+    ('30 2 * * *', 'apps.main.cron.cerrar_periodos_cron', '>> ~/cronjob.log'),
+    ('* * * * *', 'apps.main.cron.enviar_notificaciones_cron', '>> ~/cronjob.log'),
+    ('*/5 * * * *', 'apps.main.cron.calentar_tablero_cron', '>> ~/cronjob.log'),
 ]
 
 # Para conectar a SUNI1
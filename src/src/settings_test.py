@@ -9,4 +9,13 @@ DATABASES = {
     }
 }
 
+# Las pruebas se ejecutan en un solo proceso; la caché en memoria evita contar sus consultas en
+# `assertNumQueries`
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
 EMAIL_BACKEND = 'django.core.mail.backends.locmen.EmailBackend'
@@ -0,0 +1,18 @@
+from .settings_test import *
+
+# Motor de DB
+# Igual al de producción, para las pruebas que necesitan bloqueos de filas entre varios hilos
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.mysql',
+        'NAME': 'suni_dev',
+        'USER': 'root',
+        'PASSWORD': '',
+        'HOST': 'localhost',
+        'PORT': '3306',
+        'TEST': {
+            'NAME': 'test_suni',
+        },
+    }
+}
@@ -465,8 +465,18 @@ var urldispositivo = $("#grid_id").data("url");
             actualizar=[];
           },
           error: function (response) {
-            //var jsonResponse = JSON.parse(response.responseText);
-            bootbox.alert({message:"Error al ingresar datos", className:"modal modal-danger fade"});
+            // Los errores de validación se devuelven por fila y por campo
+            var mensaje = "Error al ingresar datos";
+            var datos = response.responseJSON;
+            if (datos && datos.errores) {
+              mensaje = $("<div>").text(datos.mensaje).html() + "<ul>" + $.map(datos.errores, function (error) {
+                var campos = $.map(error.errores, function (mensajes, campo) {
+                  return campo + ": " + mensajes.join(", ");
+                });
+                return "<li>" + $("<div>").text((error.triage || "Fila " + error.fila) + " - " + campos.join("; ")).html() + "</li>";
+              }).join("") + "</ul>";
+            }
+            bootbox.alert({message:mensaje, className:"modal modal-danger fade"});
             actualizar=[];
           }
         });
@@ -16,6 +16,45 @@ var hdd=[];
 var tipos_monitores =[];
 var os =[];
 var urldispositivo = $("#grid_id").data("url");
+
+/*Los catalogos se guardan en la sesion del navegador junto a su version, por lo que solo se
+  vuelven a pedir cuando cambian. Se copia cada catalogo en la llave de la respuesta que usa el grid*/
+function cargarCatalogos(response, callback) {
+  var llave = 'catalogos_inventario';
+  var guardados = JSON.parse(sessionStorage.getItem(llave) || '{}');
+  var nombres = $.map(response.catalogos, function (nombre) { return nombre; });
+  var faltantes = guardados.version == response.version_catalogos ? $.grep(nombres, function (nombre) {
+    return !(nombre in guardados.catalogos);
+  }) : nombres;
+  var asignar = function (catalogos) {
+    $.each(response.catalogos, function (campo, nombre) {
+      response[campo] = catalogos[nombre];
+    });
+    callback(response);
+  };
+  if (faltantes.length == 0) {
+    asignar(guardados.catalogos);
+    return;
+  }
+  $.ajax({
+    type: 'GET',
+    url: $('#grid_id').data('catalogos'),
+    dataType: 'json',
+    data: {nombres: faltantes.join(',')},
+    success: function (respuesta) {
+      if (guardados.version != respuesta.version) {
+        guardados = {version: respuesta.version, catalogos: {}};
+      }
+      $.extend(guardados.catalogos, respuesta.catalogos);
+      sessionStorage.setItem(llave, JSON.stringify(guardados));
+      asignar(guardados.catalogos);
+    },
+    error: function (respuesta) {
+      console.log(respuesta);
+    }
+  });
+}
+
 $.ajax({
   type: 'POST',  
   url: $('#grid_id').data('dispo'), 
@@ -26,7 +65,15 @@ $.ajax({
    
   },
   success: function (response) {
-    
+    cargarCatalogos(response, mostrarGrid);
+  },
+  error: function (response) {
+    console.log(response);
+  }
+});
+
+/*Muestra el grid con los dispositivos del paquete y las listas de los catalogos*/
+function mostrarGrid(response) {
     marcas = response.marcas;
     datos=response.data;
     dispositivo = response.dispositivo
@@ -434,11 +481,7 @@ $.ajax({
            columns: encabezado
        });
      grid.setData(datos);
-  },
-  error: function (response) {
-    console.log(response);
-  }
-});
+}
 /*Funcion para actualizar los dispositivos de primero ordena  y elimina el numero de fila repetida despues
       obtenermos las filas del grid que vamos a actualizar y las enviamos por un POST
     */
@@ -468,8 +511,18 @@ $.ajax({
           actualizar=[];
         },
         error: function (response) {
-          //var jsonResponse = JSON.parse(response.responseText);
-          bootbox.alert({message:"Error al ingresar datos", className:"modal modal-danger fade"});
+          // Los errores de validación se devuelven por fila y por campo
+          var mensaje = "Error al ingresar datos";
+          var datos = response.responseJSON;
+          if (datos && datos.errores) {
+            mensaje = $("<div>").text(datos.mensaje).html() + "<ul>" + $.map(datos.errores, function (error) {
+              var campos = $.map(error.errores, function (mensajes, campo) {
+                return campo + ": " + mensajes.join(", ");
+              });
+              return "<li>" + $("<div>").text((error.triage || "Fila " + error.fila) + " - " + campos.join("; ")).html() + "</li>";
+            }).join("") + "</ul>";
+          }
+          bootbox.alert({message:mensaje, className:"modal modal-danger fade"});
           actualizar=[];
         }
       });
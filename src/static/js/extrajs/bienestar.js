@@ -839,8 +839,8 @@ class BienestarGenerarGraficas {
       $.ajax({
         url:$('#generar-graficas').data("url"),
         dataType:'json',
-        error:function(){
-          console.log("Error");
+        error:function(xhr){
+          bootbox.alert(xhr.responseJSON || "Error al importar el archivo");
         },
         success:function(data){
           bootbox.alert(data, function(){
@@ -44,8 +44,8 @@ class CourseraGenerarInforme {
       $.ajax({
         url:$('#generar-graficas').data("url"),
         dataType:'json',
-        error:function(){
-          console.log("Error");
+        error:function(xhr){
+          bootbox.alert(xhr.responseJSON || "Error al importar el archivo");
         },
         success:function(data){
           bootbox.alert(data, function(){
@@ -1147,8 +1147,8 @@ CalendarioCyD.init = function () {
                     if(respuesta.status=="ok"){
                         $('#form_participante #id_grupo').trigger('change');
                         new Noty({
-                            text: 'Participante creado con éxito',
-                            type: 'success',
+                            text: respuesta.omitidos.length > 0 ? respuesta.message : 'Participante creado con éxito',
+                            type: respuesta.omitidos.length > 0 ? 'warning' : 'success',
                             timeout: 1500,
                         }).show();
                         $('#id_nombre').val('');
@@ -1176,7 +1176,6 @@ CalendarioCyD.init = function () {
 
 (function( ParticipanteImportar, $, undefined ) {
     var tabla_importar;
-    var filas_borrar = [];
     var email_validator = function(email, callback){
         if(email){
             if(/.+@.+/.test(email)){
@@ -1237,83 +1236,87 @@ CalendarioCyD.init = function () {
     var guardar_tabla = function () {
         var udi = $('#id_udi').val();
         var grupo = $('#id_grupo').val();
-        var progress = 0;
+        var filas = [];
         if (udi && grupo) {
             $.each(tabla_importar.getData(), function (index, fila) {
                 if (fila[0] && fila[1] && fila[2] && fila[3] && fila[4]) {
-                    udi_send = fila[7] ? fila[7] : udi
-                    try{
-                        $.ajax({
-                            beforeSend: function(xhr, settings) {
-                                xhr.setRequestHeader("X-CSRFToken", $("[name=csrfmiddlewaretoken]").val());
-                            },
-                            data: JSON.stringify({
-                                grupo: grupo,
-                                udi: udi_send,
-                                dpi: fila[0],
-                                nombre: fila[1],
-                                apellido: fila[2],
-                                genero: fila[3],
-                                rol: fila[4],
-                                mail: fila[5],
-                                tel_movil: fila[6],
-                            }),
-                            error: function (xhr, status, errorThrown) {
-                                new Noty({
-                                    text: 'Error al crear a ' + fila[1] + ' ' + fila[2],
-                                    type: 'error',
-                                    timeout: 3500,
-                                }).show();
-                                progress += 1;
-                                notificar_fin(tabla_importar.countRows(), progress);
-                            },
-                            success: function (respuesta) {
-                                if(respuesta.status=="ok"){
-                                    progress += 1;
-                                    filas_borrar.push(index + 1);
-                                    notificar_fin(tabla_importar.countRows(), progress);
-                                    //tabla_importar.alter('remove_row', index);
-                                }
-                                else{
-                                    bootbox.alert("Error desconocido.");
-                                }
-                            },
-                            contentType: "application/json; charset=utf-8",
-                            dataType: 'json',
-                            type: 'POST',
-                            url: participante_add_ajax_url
-                        });
+                    filas.push({
+                        grupo: grupo,
+                        udi: fila[7] ? fila[7] : udi,
+                        dpi: fila[0],
+                        nombre: fila[1],
+                        apellido: fila[2],
+                        genero: fila[3],
+                        rol: fila[4],
+                        mail: fila[5],
+                        tel_movil: fila[6],
+                    });
+                }
+            });
+        }
+        if (filas.length == 0) {
+            notificar_fin();
+            return;
+        }
+        // Todas las filas se envían en una sola solicitud para que la asignación se haga una vez por grupo
+        $.ajax({
+            beforeSend: function(xhr, settings) {
+                xhr.setRequestHeader("X-CSRFToken", $("[name=csrfmiddlewaretoken]").val());
+            },
+            data: JSON.stringify(filas),
+            error: function (xhr, status, errorThrown) {
+                new Noty({
+                    text: 'Error al crear los participantes',
+                    type: 'error',
+                    timeout: 3500,
+                }).show();
+                notificar_fin();
+            },
+            success: function (respuesta) {
+                if(respuesta.status=="ok"){
+                    if (respuesta.omitidos.length > 0) {
+                        new Noty({
+                            text: respuesta.message,
+                            type: 'warning',
+                            timeout: 5000,
+                        }).show();
                     }
-                    catch(err){
-                        console.log('asd');
+                    if (respuesta.errores.length > 0) {
+                        new Noty({
+                            text: 'Error al crear a ' + respuesta.errores.join(', '),
+                            type: 'error',
+                            timeout: 3500,
+                        }).show();
                     }
+                    notificar_fin(respuesta.asignados);
                 }
                 else{
-                    progress += 1;
+                    bootbox.alert("Error desconocido.");
                 }
-            });
-        }
+            },
+            contentType: "application/json; charset=utf-8",
+            dataType: 'json',
+            type: 'POST',
+            url: participante_add_ajax_url
+        });
     }
 
-    var notificar_fin = function(length_all, progress) {
-        if (length_all == progress) {
+    var notificar_fin = function(asignados) {
+        if (asignados !== undefined) {
             new Noty({
-                text: 'Proceso terminado. Creados ' + filas_borrar.length + ' participantes.',
+                text: 'Proceso terminado. Creados ' + asignados + ' participantes.',
                 type: 'success',
                 timeout: 1000,
             }).show();
+        }
 
-            filas_borrar.sort(function(a, b){return b-a});
-
-            $('#btn-crear').prop('disabled', false);
+        $('#btn-crear').prop('disabled', false);
 
-            filas_borrar = [];
-            $('#id_grupo').trigger('change');
-            Pace.stop();
-            tabla_importar.updateSettings({
-                data : []
-            });
-        }
+        $('#id_grupo').trigger('change');
+        Pace.stop();
+        tabla_importar.updateSettings({
+            data : []
+        });
     }
 
     ParticipanteImportar.init = function () {
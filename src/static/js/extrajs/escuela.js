@@ -250,17 +250,28 @@
     EscuelaBuscar.filtro_list = [];
     EscuelaBuscar.iniciar_tabla = function () {
         let tabla = $('#escuela-table').DataTable({
-            dom: 'lfrtipB',
-            buttons: ['excel','pdf'],
+            // Con `serverSide` los botones de exportar solo tendrían la página actual
+            dom: 'lfrtip',
             processing: true,
+            serverSide: true,
+            searching: false,
+            ordering: false,
             deferLoading: 0,
             ajax: {
                 url: $('#escuela-list-form').attr('action'),
                 type: "POST",
                 deferRender: true,
-                dataSrc: '',
-                data: function () {
-                    return $('#escuela-list-form').serializeObject();
+                dataSrc: function (json) {
+                    json.recordsTotal = json.total;
+                    json.recordsFiltered = json.total;
+                    EscuelaBuscar.mostrar_facetas(json.facetas);
+                    return json.resultados;
+                },
+                data: function (d) {
+                    var datos = $('#escuela-list-form').serializeObject();
+                    datos.pagina = Math.floor(d.start / d.length) + 1;
+                    datos.por_pagina = d.length;
+                    return datos;
                 }
             },
             preDrawCallback: function () {
@@ -299,6 +310,18 @@
         return tabla;
     }
 
+    EscuelaBuscar.mostrar_facetas = function (facetas) {
+        var nombres = {departamento: 'Departamento', sector: 'Sector', nivel: 'Nivel', equipada: 'Equipada', capacitada: 'Capacitada'};
+        $('#lista-facetas').empty();
+        $.each(nombres, function (faceta, titulo) {
+            var items = $.map(facetas[faceta] || [], function (item) {
+                var nombre = item.valor === true ? 'Sí' : (item.valor === false ? 'No' : item.nombre);
+                return '<li>' + nombre + ' <span class="badge">' + item.cantidad + '</span></li>';
+            });
+            $('#lista-facetas').append('<li><b>' + titulo + '</b><ul>' + items.join('') + '</ul></li>');
+        });
+    }
+
     // Public
     EscuelaBuscar.init = function () {
         $('#spinner').hide();
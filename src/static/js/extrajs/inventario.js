@@ -992,8 +992,20 @@ class EntradaDetalleDetail {
 
     SalidaDetalleList.init = function () {
         $('#btn-terminar').click(function () {
-            bootbox.confirm({
-                message: "¿Está seguro que quiere dar por finalizada la edición de la salida?",
+          /* Primero se simula la finalización para mostrar los totales antes de confirmar */
+          $.ajax({
+            type: "POST",
+            url: urlFinalizar,
+            dataType: 'json',
+            data: {
+              csrfmiddlewaretoken: $('input[name="csrfmiddlewaretoken"]').val(),
+              id:pk,
+              simular: true
+            },
+            success: function (simulacion) {
+              bootbox.confirm({
+                message: "¿Está seguro que quiere dar por finalizada la edición de la salida?</br>" +
+                  "Se darán de baja " + simulacion.dispositivos + " dispositivos por un total de Q" + simulacion.precio_total + ".",
                 buttons: {
                     confirm: {
                         label: '<i class="fa fa-check"></i> Confirmar',
@@ -1027,7 +1039,13 @@ class EntradaDetalleDetail {
                     }
 
                 }
-            });
+              });
+            },
+            error: function (response) {
+              var mensaje = JSON.parse(response.responseText)
+              bootbox.alert({message: "<h3><i class='fa fa-frown-o' style='font-size: 45px;'></i>&nbsp;&nbsp;&nbsp;HA OCURRIDO UN ERROR!!</h3></br>" + mensaje['mensaje'], className:"modal modal-danger fade"});
+            }
+          });
 
 
         });
@@ -3604,18 +3622,22 @@ class DispositivoList {
           e.preventDefault();
           /**/
           var tablaDispositivos = $('#dispositivo-table-search').DataTable({
-             dom: 'lfrtipB',
+             // Con `serverSide` los botones de DataTables solo exportarían la página actual; la plantilla
+             // descarga el listado completo con los mismos filtros desde `api_dispositivo_exportar`
+             dom: 'lfrtip',
              destroy:true,
-             buttons: ['excel', 'pdf'],
              processing: true,
+             serverSide: true,
              deferLoading: [0],
              ajax: {
                  url: $('#dispositivo-list-form').attr('action'),
                  deferRender: true,
-                 dataSrc: '',
+                 dataSrc: 'data',
                  cache: true,
                  data: function (params) {
-                     return $('#dispositivo-list-form').serializeObject(true);
+                     return $.extend(params, $('#dispositivo-list-form').serializeObject(true), {
+                       fields: 'triage,tipo,marca,modelo,serie,clase,tarima,estado,etapa,url'
+                     });
                  }
              },
              columns: [
@@ -25,6 +25,31 @@ $.fn.serializeObject = function(not_null)
     return o;
 };
 
+function exportar_informe(formulario, url, formato, metodo) {
+    /*
+    Descarga en `formato` (csv o xlsx) el informe generado en el servidor con los filtros de `formulario`.
+    Con el método GET los filtros se envían igual que en la consulta de la tabla; con POST se envía
+    un formulario oculto para que el navegador reciba el archivo.
+    */
+    url = url || $(formulario).attr('action') || window.location.pathname;
+    if ((metodo || 'get').toLowerCase() == 'get') {
+        window.location = url + '?' + $.param($.extend($(formulario).serializeObject(true), {formato: formato}));
+        return;
+    }
+    var envio = $('<form>', {action: url, method: 'post'}).hide();
+    $.each($(formulario).serializeArray(), function () {
+        envio.append($('<input>', {type: 'hidden', name: this.name, value: this.value}));
+    });
+    envio.append($('<input>', {type: 'hidden', name: 'formato', value: formato}));
+    envio.appendTo('body').submit().remove();
+}
+
+$(document).on('click', '[data-exportar]', function (e) {
+    e.preventDefault();
+    var boton = $(this);
+    exportar_informe(boton.closest('form'), boton.data('url'), boton.data('exportar'), boton.data('metodo'));
+});
+
 function validar_udi(codigo) {
     return /^\d{2}-\d{2}-\d{4}-\d{2}$/.test(codigo);
 }